@@ -1,6 +1,9 @@
+from collections.abc import AsyncIterator
 from typing import Annotated
 
-from fastapi import Query
+from fastapi import Query, Request
+
+from services.report_config import invalidate_report_config_cache
 
 
 class PaginateQueryParams:
@@ -28,3 +31,13 @@ class PaginateQueryParams:
     ):
         self.page = page
         self.page_size = page_size
+
+
+async def invalidate_report_config_on_change(request: Request) -> AsyncIterator[None]:
+    """Dependency: сбросить кеш конфигураций отчетов после запроса, изменяющего данные."""
+
+    try:
+        yield
+    finally:
+        if request.method not in ("GET", "HEAD", "OPTIONS"):
+            invalidate_report_config_cache()
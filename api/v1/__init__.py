@@ -1,7 +1,11 @@
+from fastapi import Depends
 from fastapi.routing import APIRouter
 
+from api.utils import invalidate_report_config_on_change
+
 from .bars import router as bars_router
 from .google_report_ids import router as google_report_router
+from .jobs import router as jobs_router
 from .report_elements import router as report_elements_router
 from .report_groups import router as report_groups_router
 from .report_name import router as report_name_router
@@ -11,8 +15,17 @@ from .reports import router as reports_router
 router = APIRouter()
 router.include_router(reports_router, prefix="/reports", tags=["Reports"])
 router.include_router(bars_router, prefix="/bars", tags=["Bars"])
-router.include_router(report_name_router, prefix="/report_name", tags=["Report Name"])
-router.include_router(report_groups_router, prefix="/report_group", tags=["Report Group"])
-router.include_router(report_elements_router, prefix="/report_element", tags=["Report Elements"])
+router.include_router(jobs_router, prefix="/jobs", tags=["Jobs"])
+# Изменение отчетов, групп и элементов сбрасывает кеш конфигураций отчетов
+report_config_dependencies = [Depends(invalidate_report_config_on_change)]
+router.include_router(
+    report_name_router, prefix="/report_name", tags=["Report Name"], dependencies=report_config_dependencies
+)
+router.include_router(
+    report_groups_router, prefix="/report_group", tags=["Report Group"], dependencies=report_config_dependencies
+)
+router.include_router(
+    report_elements_router, prefix="/report_element", tags=["Report Elements"], dependencies=report_config_dependencies
+)
 router.include_router(google_report_router, prefix="/google_report_id", tags=["Google Report Id"])
 router.include_router(report_settings_router, prefix="/report_settings", tags=["Report Settings"])
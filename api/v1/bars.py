@@ -1,12 +1,16 @@
 import logging
+from dataclasses import asdict
 from datetime import date, datetime
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Query
 
 from constants import gen_db_name_enum
+from db.mssql import get_pools_metrics
 from schemas.bars import Category, ExtendedService, Organisation, TotalReport
-from services.bars import BarsService, get_bars_service
+from services.bars import BarsService
+from services.container import get_bars_service, get_single_flight
+from utils.single_flight import SingleFlight, flight_key
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -20,8 +24,8 @@ async def get_tariffs(
 ) -> list[Category]:
     """Список тарифов."""
 
-    bars_service.choose_db(db_name=db_name.value)
-    return bars_service.get_tariffs(organization_id=organization_id)
+    bars_service = bars_service.for_database(db_name.value)
+    return await bars_service.get_tariffs(organization_id=organization_id)
 
 
 @router.post("/organisations")
@@ -31,8 +35,19 @@ async def get_organisations(
 ) -> list[Organisation]:
     """Список Организаций."""
 
-    bars_service.choose_db(db_name=db_name.value)
-    return bars_service.get_organisations()
+    bars_service = bars_service.for_database(db_name.value)
+    return await bars_service.get_organisations()
+
+
+@router.post("/invalidate_reference_cache")
+async def invalidate_reference_cache(
+    db_name: Annotated[gen_db_name_enum(), Query(description="База данных")],
+    bars_service: Annotated[BarsService, Depends(get_bars_service)],
+) -> dict:
+    """Сброс кеша организаций и тарифов."""
+
+    bars_service = bars_service.for_database(db_name.value)
+    return {"deleted": await bars_service.invalidate_reference_cache()}
 
 
 @router.post("/total_report")
@@ -45,17 +60,23 @@ async def get_total_report(
     hide_internal: bool = True,
     hide_discount: bool = False,
     bars_service: BarsService = Depends(get_bars_service),
+    single_flight: SingleFlight = Depends(get_single_flight),
 ) -> TotalReport:
     """Список Организаций."""
 
-    bars_service.choose_db(db_name=db_name.value)
-    return bars_service.get_total_report(
-        organization_id=organization_id,
-        date_from=date_from,
-        date_to=date_to,
-        hide_zeroes=hide_zeroes,
-        hide_internal=hide_internal,
-        hide_discount=hide_discount,
+    bars_service = bars_service.for_database(db_name.value)
+    params = {
+        "organization_id": organization_id,
+        "date_from": date_from,
+        "date_to": date_to,
+        "hide_zeroes": hide_zeroes,
+        "hide_internal": hide_internal,
+        "hide_discount": hide_discount,
+    }
+    # Одинаковые одновременные запросы (в том числе из других процессов) ждут одного вычисления
+    return await single_flight.run(
+        flight_key("bars.total_report", db_name=db_name.value, **params),
+        lambda: bars_service.get_total_report(**params),
     )
 
 
@@ -70,10 +91,17 @@ async def get_loan_transactions_by_service_name_pattern(
 ) -> list[ExtendedService]:
     """Список купленных услуг группой клиентов."""
 
-    bars_service.choose_db(db_name=db_name.value)
-    return bars_service.get_loan_transactions_by_service_names(
+    bars_service = bars_service.for_database(db_name.value)
+    return await bars_service.get_loan_transactions_by_service_names(
         date_from=date_from,
         date_to=date_to,
         service_names=service_names,
         use_like=use_like,
     )
+
+
+@router.get("/pool_metrics")
+async def get_pool_metrics() -> list[dict]:
+    """Метрики пулов соединений MSSQL."""
+
+    return [asdict(metrics) for metrics in get_pools_metrics()]
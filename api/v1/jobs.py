@@ -0,0 +1,30 @@
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+
+from schemas.jobs import Job, JobCreate
+from services.container import get_job_service
+from services.jobs import JobService
+
+router = APIRouter()
+
+
+@router.post("/")
+async def submit_job(
+    job_create: JobCreate,
+    job_service: Annotated[JobService, Depends(get_job_service)],
+) -> Job:
+    """Поставить долгий отчет в очередь. Выполняется процессами-воркерами (worker.py)."""
+
+    return await job_service.submit(job_create)
+
+
+@router.get("/{job_id}")
+async def get_job(
+    job_id: UUID,
+    job_service: Annotated[JobService, Depends(get_job_service)],
+) -> Job:
+    """Статус, прогресс и результат задачи."""
+
+    return await job_service.get_job(job_id)
@@ -13,7 +13,8 @@ from schemas.report import (
     ReportNameDetail,
     ReportNameFullDetail,
 )
-from services.settings import SettingsService, get_settings_service
+from services.container import get_settings_service
+from services.settings import SettingsService
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -38,8 +39,7 @@ async def get_new_services(
             detail="Need any value from other_report_name or report_name",
         )
 
-    settings_service.choose_db(db_name=db_name.value)
-    return await settings_service.get_new_tariff(report_name_title)
+    return await settings_service.for_database(db_name.value).get_new_tariff(report_name_title)
 
 
 @router.get("/distributed_services")
@@ -1,4 +1,5 @@
 import logging
+from dataclasses import asdict
 from datetime import date, datetime, timedelta
 from typing import Annotated
 
@@ -6,10 +7,22 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 
 from constants import gen_db_name_enum
 from core.settings import settings
-from gateways.telegram import TelegramBot, get_telegram_bot
-from legacy.barsicreport2 import BarsicReport2Service, get_legacy_service
-from services.bars import BarsService, get_bars_service
-from services.workers import WorkerService, get_worker_service
+from gateways.telegram import TelegramBot
+from legacy.barsicreport2 import BarsicReport2Service
+from repositories.report_cache import get_report_cache_metrics
+from schemas.jobs import Job, JobCreate, JobKind
+from services.container import (
+    get_job_service,
+    get_legacy_service,
+    get_prewarm_service,
+    get_single_flight,
+    get_telegram_bot,
+    get_worker_service,
+)
+from services.jobs import JobService
+from services.prewarm import PrewarmService, closed_business_day
+from services.workers import WorkerService
+from utils.single_flight import SingleFlight, flight_key
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +36,7 @@ async def client_count(
 ) -> dict:
     """Количество людей в зоне."""
 
-    return legacy_service.count_clients_print()
+    return await legacy_service.count_clients_print()
 
 
 @router.post("/create_reports")
@@ -36,7 +49,7 @@ async def create_reports(
 ) -> dict:
     """Создание всех отчетов."""
 
-    await legacy_service.run_report(
+    report_run = await legacy_service.run_report(
         date_from=date_from,
         date_to=date_to,
         use_yadisk=use_yadisk,
@@ -44,8 +57,9 @@ async def create_reports(
     )
 
     return {
-        "ok": True,
-        "Google Report": legacy_service.spreadsheet["spreadsheetUrl"],
+        "ok": not report_run.failed_days,
+        "Google Report": report_run.spreadsheet_url,
+        "failed_days": report_run.failed_days,
     }
 
 
@@ -66,7 +80,7 @@ async def create_total_report_by_day(
     date_from: datetime = datetime.combine(date.today(), datetime.min.time()),
     date_to: datetime = datetime.combine(date.today(), datetime.min.time()),
     use_cache: bool = True,
-    bars_service: BarsService = Depends(get_bars_service),
+    force: bool = False,
     worker_service: WorkerService = Depends(get_worker_service),
 ) -> dict:
     """Список Организаций."""
@@ -74,8 +88,8 @@ async def create_total_report_by_day(
     if date_from >= date_to:
         raise HTTPException(status_code=404, detail="date_from >= date_to")
 
-    bars_service.choose_db(db_name=db_name.value)
-    return await worker_service.get_total_report_with_groups(date_from, date_to, use_cache=use_cache)
+    worker_service = worker_service.for_database(db_name.value)
+    return await worker_service.get_total_report_with_groups(date_from, date_to, use_cache=use_cache, force=force)
 
 
 @router.post("/create_purchased_goods_report")
@@ -91,7 +105,7 @@ async def create_purchased_goods_report(
 ) -> dict:
     """Список Организаций."""
 
-    worker_service.choose_db(db_name=db_name.value)
+    worker_service = worker_service.for_database(db_name.value)
     return await worker_service.create_purchased_goods_report(
         date_from=date_from,
         date_to=date_to,
@@ -109,7 +123,9 @@ async def create_attendance_report(
     save_to_yandex: bool = False,
     save_to_google: bool = True,
     use_cache: bool = True,
+    force: bool = False,
     worker_service: WorkerService = Depends(get_worker_service),
+    single_flight: SingleFlight = Depends(get_single_flight),
 ) -> dict:
     """Отчет по посещениям."""
 
@@ -119,11 +135,50 @@ async def create_attendance_report(
     if date_from >= date_to:
         raise HTTPException(status_code=404, detail="date_from >= date_to")
 
-    worker_service.choose_db(db_name="Aquapark_Ulyanovsk")
-    return await worker_service.create_attendance_report(
-        date_from=date_from,
-        date_to=date_to,
-        save_to_yandex=save_to_yandex,
-        save_to_google=save_to_google,
-        use_cache=use_cache,
+    worker_service = worker_service.for_database("Aquapark_Ulyanovsk")
+    params = {
+        "date_from": date_from,
+        "date_to": date_to,
+        "save_to_yandex": save_to_yandex,
+        "save_to_google": save_to_google,
+        "use_cache": use_cache,
+        "force": force,
+    }
+    return await single_flight.run(
+        flight_key("reports.create_attendance_report", **params),
+        lambda: worker_service.create_attendance_report(**params),
+    )
+
+
+@router.get("/report_cache_metrics")
+async def report_cache_metrics() -> list[dict]:
+    """Попадания и промахи кеша отчетов (память процесса и Redis) по типам отчетов."""
+
+    return [asdict(metrics) for metrics in get_report_cache_metrics()]
+
+
+@router.post("/prewarm")
+async def prewarm_report_cache(
+    job_service: Annotated[JobService, Depends(get_job_service)],
+    day: date | None = None,
+) -> Job:
+    """Поставить в очередь прогрев кеша отчетов за закрытый рабочий день (по умолчанию - последний).
+
+    Прогрев выполняют процессы-воркеры; статус и результат - в /jobs/{job_id} и /reports/prewarm_status.
+    """
+
+    return await job_service.submit(
+        JobCreate(
+            kind=JobKind.PREWARM_REPORT_CACHE,
+            params={"day": day or closed_business_day(datetime.now())},
+        )
     )
+
+
+@router.get("/prewarm_status")
+async def prewarm_status(
+    prewarm_service: Annotated[PrewarmService, Depends(get_prewarm_service)],
+) -> dict:
+    """Результат последнего прогрева кеша: время и ошибки по этапам."""
+
+    return {"last_run": await prewarm_service.get_last_run()}
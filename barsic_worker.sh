@@ -0,0 +1,5 @@
+#!/usr/bin/env sh
+export PYTHONPATH=src:$PYTHONPATH
+
+echo "Starting barsic_worker..."
+python worker.py
@@ -1,3 +1,4 @@
+from datetime import time
 from logging import config as logging_config
 
 from pydantic import AnyUrl, EmailStr, Field
@@ -27,6 +28,12 @@ class PostgresSettings(BaseSettings):
             f"{self.postgres_port}/{self.postgres_db}"
         )
 
+    @property
+    def pg_listen_dsn(self) -> str:
+        """DSN для выделенного соединения asyncpg (LISTEN/NOTIFY)."""
+
+        return self.pg_dsn.replace("postgresql+asyncpg://", "postgresql://", 1)
+
 
 class RedisSettings(BaseSettings):
     """Настройки Redis."""
@@ -34,6 +41,10 @@ class RedisSettings(BaseSettings):
     redis_host: str = Field("127.0.0.1", validation_alias="REDIS_HOST")
     redis_port: int = Field(6379, validation_alias="REDIS_PORT")
 
+    # Кеш справочников MSSQL (организации, тарифы)
+    reference_cache_ttl: int = Field(7 * 24 * 60 * 60, validation_alias="REFERENCE_CACHE_TTL")
+    reference_cache_recheck_interval: int = Field(5 * 60, validation_alias="REFERENCE_CACHE_RECHECK_INTERVAL")
+
 
 class AppSettings(BaseSettings):
     """Настройки приложения."""
@@ -48,6 +59,41 @@ class AppSettings(BaseSettings):
     mssql_pwd: str = Field(validation_alias="MSSQL_PWD")
     mssql_database1: str = Field(validation_alias="MSSQL_DATABASE1")
 
+    # Пул соединений MSSQL (на каждую пару сервер + база данных)
+    mssql_pool_min_size: int = Field(1, validation_alias="MSSQL_POOL_MIN_SIZE")
+    mssql_pool_max_size: int = Field(10, validation_alias="MSSQL_POOL_MAX_SIZE")
+    mssql_pool_idle_timeout: float = Field(300, validation_alias="MSSQL_POOL_IDLE_TIMEOUT")
+    mssql_pool_ping_interval: float = Field(30, validation_alias="MSSQL_POOL_PING_INTERVAL")
+    mssql_pool_acquire_timeout: float = Field(30, validation_alias="MSSQL_POOL_ACQUIRE_TIMEOUT")
+    # Потоки для блокирующих вызовов pyodbc из асинхронного кода
+    mssql_executor_workers: int = Field(10, validation_alias="MSSQL_EXECUTOR_WORKERS")
+    # Сколько дней отчета строится одновременно на одну базу MSSQL
+    mssql_database_concurrency: int = Field(4, validation_alias="MSSQL_DATABASE_CONCURRENCY")
+    # Как часто каталог тарифов сверяется с базой (по водяному знаку ChangeTime), в секундах
+    tariff_catalog_refresh_interval: float = Field(60, validation_alias="TARIFF_CATALOG_REFRESH_INTERVAL")
+    # Сколько последних дней данные в базе еще меняются: такие дни не кешируются в report_cache
+    report_cache_mutable_days: int = Field(2, validation_alias="REPORT_CACHE_MUTABLE_DAYS")
+    # Сколько месяцев хранится кеш отчетов (0 - без ограничения)
+    report_cache_retention_months: int = Field(36, validation_alias="REPORT_CACHE_RETENTION_MONTHS")
+    # Хранить содержимое отчетов в компактном сжатом виде (report_blob) вместо JSONB
+    report_cache_compact: bool = Field(True, validation_alias="REPORT_CACHE_COMPACT")
+    # Кеш запечатанных отчетов перед Postgres: LRU в памяти процесса (ограничен по байтам) и общий уровень в Redis
+    report_cache_memory_max_bytes: int = Field(64 * 1024 * 1024, validation_alias="REPORT_CACHE_MEMORY_MAX_BYTES")
+    # Сколько секунд запись живет в памяти процесса (записи других процессов сбрасываются только по времени)
+    report_cache_memory_ttl: float = Field(5 * 60, validation_alias="REPORT_CACHE_MEMORY_TTL")
+    report_cache_redis_ttl: int = Field(24 * 60 * 60, validation_alias="REPORT_CACHE_REDIS_TTL")
+    # Фоновые задачи: сколько секунд хранятся задачи с результатами и сколько процессов их выполняет
+    job_ttl: int = Field(7 * 24 * 60 * 60, validation_alias="JOB_TTL")
+    job_workers: int = Field(2, validation_alias="JOB_WORKERS")
+    # Имя группы воркеров (worker.py) в Redis: свое на каждом хосте, если воркеры запущены на нескольких
+    job_worker_group: str = Field("default", validation_alias="JOB_WORKER_GROUP")
+    # Объединение одинаковых одновременных запросов: время аренды в Redis (продлевается) и интервал опроса
+    single_flight_lease_ttl: int = Field(60, validation_alias="SINGLE_FLIGHT_LEASE_TTL")
+    single_flight_poll_interval: float = Field(0.5, validation_alias="SINGLE_FLIGHT_POLL_INTERVAL")
+    # Ночной прогрев кеша отчетов после закрытия рабочего дня (локальное время)
+    prewarm_enabled: bool = Field(True, validation_alias="PREWARM_ENABLED")
+    prewarm_time: time = Field(time(23, 30), validation_alias="PREWARM_TIME")
+
     add_beach_report: bool = Field(False, validation_alias="ADD_BEACH_REPORT")
     mssql_database2: str = Field(validation_alias="MSSQL_DATABASE2")
 
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from uuid import UUID
+
+import asyncpg
+import orjson
+
+logger = logging.getLogger(__name__)
+
+CONFIG_CHANGED_CHANNEL = "config_changed"
+
+
+@dataclass(frozen=True)
+class ConfigChange:
+    """Изменение конфигурации в Postgres (рассылается триггером notify_config_change).
+
+    Пустой report_name_ids означает, что затронуты все отчеты таблицы.
+    """
+
+    version: int
+    table: str
+    report_name_ids: list[UUID] = field(default_factory=list)
+
+
+ConfigChangeHandler = Callable[[ConfigChange], None]
+
+_handlers: dict[str, list[ConfigChangeHandler]] = {}
+
+
+def subscribe(tables: Iterable[str], handler: ConfigChangeHandler) -> None:
+    """Подписать обработчик (сброс кеша) на изменения таблиц конфигурации."""
+
+    for table in tables:
+        handlers = _handlers.setdefault(table, [])
+        if handler not in handlers:
+            handlers.append(handler)
+
+
+def dispatch(change: ConfigChange) -> None:
+    for handler in _handlers.get(change.table, []):
+        try:
+            handler(change)
+        except Exception:
+            logger.exception(f"Config change handler {handler} failed on {change}")
+
+
+def dispatch_reset() -> None:
+    """Сбросить все подписанные кеши (уведомления могли быть пропущены)."""
+
+    for table in list(_handlers):
+        dispatch(ConfigChange(version=0, table=table))
+
+
+class ConfigChangesListener:
+    """Слушает канал LISTEN config_changed на выделенном соединении asyncpg.
+
+    После переподключения сверяет текущую версию конфигурации (config_version_seq) с последней
+    полученной и, если за время разрыва были изменения, сбрасывает все кеши.
+    """
+
+    def __init__(self, dsn: str, reconnect_delay: float = 5):
+        self._dsn = dsn
+        self._reconnect_delay = reconnect_delay
+        self._version: int | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def version(self) -> int | None:
+        return self._version
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="config-changes-listener")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Config changes listener error: {e}. Reconnecting in {self._reconnect_delay}s")
+
+            await asyncio.sleep(self._reconnect_delay)
+
+    async def _listen(self) -> None:
+        connection = await asyncpg.connect(self._dsn)
+        closed = asyncio.Event()
+        connection.add_termination_listener(lambda _: closed.set())
+        try:
+            await connection.add_listener(CONFIG_CHANGED_CHANNEL, self._on_notification)
+            version = await self._current_version(connection)
+            if self._version is not None and version != self._version:
+                logger.info(f"Config changed while listener was offline ({self._version} -> {version})")
+                dispatch_reset()
+            self._version = version
+
+            await closed.wait()
+
+        finally:
+            if not connection.is_closed():
+                await connection.close()
+
+    @staticmethod
+    async def _current_version(connection: asyncpg.Connection) -> int:
+        last_value, is_called = await connection.fetchrow("SELECT last_value, is_called FROM config_version_seq")
+        return last_value if is_called else 0
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            data = orjson.loads(payload)
+            change = ConfigChange(
+                version=data["version"],
+                table=data["table"],
+                report_name_ids=[UUID(id_) for id_ in data.get("report_name_ids") or []],
+            )
+        except (orjson.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            logger.error(f"Bad config change notification {payload!r}: {e}")
+            dispatch_reset()
+            return
+
+        self._version = max(self._version or 0, change.version)
+        dispatch(change)
+
+
+listener: ConfigChangesListener | None = None
@@ -1,6 +1,16 @@
+import asyncio
 import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import partial
+from typing import Any
 
-from pyodbc import Connection, connect
+from pyodbc import Connection, Error, InterfaceError, OperationalError, connect
 
 from constants import MssqlDriverType
 from core.settings import settings
@@ -9,6 +19,379 @@ from utils.backoff import backoff
 logger = logging.getLogger(__name__)
 
 
+class PoolTimeoutError(RuntimeError):
+    """Не удалось получить соединение из пула за отведенное время."""
+
+
+@dataclass
+class PoolMetrics:
+    """Метрики пула соединений."""
+
+    server: str
+    database: str
+    size: int
+    in_use: int
+    idle: int
+    max_size: int
+    created: int
+    closed: int
+    borrowed: int
+    waits: int
+    timeouts: int
+    failed_pings: int
+
+
+class _PooledConnection:
+    __slots__ = ("connection", "created_at", "last_used_at")
+
+    def __init__(self, connection: Connection):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+
+
+def _driver() -> str:
+    return getattr(MssqlDriverType, settings.mssql_driver_type).value
+
+
+def _connection_string(server: str, port: int, database: str, user: str, password: str) -> str:
+    return (
+        f"DRIVER={_driver()};"
+        f"SERVER={server};"
+        f"PORT={port};"
+        f"DATABASE={database};"
+        f"UID={user};"
+        f"PWD={password};"
+        f"TrustServerCertificate=yes;"
+        f"Encrypt=no"
+    )
+
+
+@backoff()
+def _open_connection(connection_string: str) -> Connection:
+    return connect(connection_string)
+
+
+def _close_quietly(connection: Connection) -> None:
+    try:
+        connection.close()
+    except Error as e:
+        logger.warning(f"Error while closing mssql connection: {e}")
+
+
+class MsSqlConnectionPool:
+    """Пул соединений к одной базе MSSQL.
+
+    При создании пул открывает min_size соединений (fill). Соединения выдаются в порядке LIFO, чтобы
+    в работе оставались "теплые" соединения, а лишние простаивающие соединения (сверх min_size)
+    закрываются по idle_timeout при выдаче и возврате соединений.
+    Соединение, которое простаивало дольше ping_interval, перед выдачей проверяется запросом SELECT 1.
+    """
+
+    def __init__(
+        self,
+        *,
+        server: str,
+        port: int,
+        database: str,
+        user: str,
+        password: str,
+        min_size: int,
+        max_size: int,
+        idle_timeout: float,
+        ping_interval: float,
+        acquire_timeout: float,
+    ):
+        self._server = server
+        self._database = database
+        self._connection_string = _connection_string(server, port, database, user, password)
+        self._min_size = min_size
+        self._max_size = max(max_size, 1)
+        self._idle_timeout = idle_timeout
+        self._ping_interval = ping_interval
+        self._acquire_timeout = acquire_timeout
+
+        self._cond = threading.Condition()
+        self._idle: deque[_PooledConnection] = deque()
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+
+        self._created_count = 0
+        self._closed_count = 0
+        self._borrowed_count = 0
+        self._waits_count = 0
+        self._timeouts_count = 0
+        self._failed_pings_count = 0
+
+    def fill(self) -> None:
+        """Открыть соединения до min_size, чтобы первые запросы не ждали подключения."""
+
+        while True:
+            with self._cond:
+                if self._closed or self._size >= min(self._min_size, self._max_size):
+                    return
+                self._size += 1
+
+            try:
+                pooled = self._create()
+            except Exception as e:
+                logger.warning(f"Mssql pool prefill for {self._server}/{self._database} failed: {e}")
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                return
+
+            self.release(pooled, in_use=False)
+
+    def acquire(self) -> _PooledConnection:
+        """Взять соединение из пула (или открыть новое, если пул не заполнен)."""
+
+        deadline = time.monotonic() + self._acquire_timeout
+        expired = []
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Mssql connection pool is closed")
+
+                expired.extend(self._pop_expired())
+                if self._idle:
+                    pooled = self._idle.pop()
+                    break
+
+                if self._size < self._max_size:
+                    self._size += 1
+                    pooled = None
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts_count += 1
+                    raise PoolTimeoutError(
+                        f"Timeout {self._acquire_timeout}s while waiting connection to "
+                        f"{self._server}/{self._database} (max_size={self._max_size})"
+                    )
+
+                self._waits_count += 1
+                self._cond.wait(remaining)
+
+            self._in_use += 1
+            self._borrowed_count += 1
+
+        for expired_pooled in expired:
+            _close_quietly(expired_pooled.connection)
+
+        try:
+            if pooled is None:
+                return self._create()
+
+            if time.monotonic() - pooled.last_used_at > self._ping_interval and not self._is_alive(pooled):
+                _close_quietly(pooled.connection)
+                with self._cond:
+                    self._closed_count += 1
+                    self._failed_pings_count += 1
+                return self._create()
+
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        return pooled
+
+    def release(self, pooled: _PooledConnection, discard: bool = False, in_use: bool = True) -> None:
+        """Вернуть соединение в пул. Сломанные соединения закрываются (discard=True).
+
+        Заодно закрываются соединения, простаивающие дольше idle_timeout (сверх min_size).
+        in_use=False - соединение открыто для пула (fill) и не выдавалось.
+        """
+
+        if not discard and in_use:
+            try:
+                # Сбрасываем незавершенную транзакцию, чтобы следующий потребитель получил чистое соединение
+                pooled.connection.rollback()
+            except Error as e:
+                logger.warning(f"Mssql connection is broken, discarding: {e}")
+                discard = True
+
+        with self._cond:
+            if in_use:
+                self._in_use -= 1
+            if discard or self._closed:
+                self._size -= 1
+                self._closed_count += 1
+                closing = [pooled]
+            else:
+                pooled.last_used_at = time.monotonic()
+                self._idle.append(pooled)
+                closing = self._pop_expired()
+            self._cond.notify()
+
+        for closing_pooled in closing:
+            _close_quietly(closing_pooled.connection)
+
+    def close(self) -> None:
+        """Закрыть все простаивающие соединения. Выданные соединения закроются при возврате."""
+
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._closed_count += len(idle)
+            self._cond.notify_all()
+
+        for pooled in idle:
+            _close_quietly(pooled.connection)
+
+    def metrics(self) -> PoolMetrics:
+        with self._cond:
+            return PoolMetrics(
+                server=self._server,
+                database=self._database,
+                size=self._size,
+                in_use=self._in_use,
+                idle=len(self._idle),
+                max_size=self._max_size,
+                created=self._created_count,
+                closed=self._closed_count,
+                borrowed=self._borrowed_count,
+                waits=self._waits_count,
+                timeouts=self._timeouts_count,
+                failed_pings=self._failed_pings_count,
+            )
+
+    def _create(self) -> _PooledConnection:
+        pooled = _PooledConnection(_open_connection(self._connection_string))
+        with self._cond:
+            self._created_count += 1
+        return pooled
+
+    def _pop_expired(self) -> list[_PooledConnection]:
+        """Извлечь из пула простаивающие соединения сверх min_size. Вызывается под блокировкой."""
+
+        expired = []
+        now = time.monotonic()
+        # Самые старые простаивающие соединения находятся в начале очереди
+        while self._idle and self._size > self._min_size and now - self._idle[0].last_used_at > self._idle_timeout:
+            expired.append(self._idle.popleft())
+            self._size -= 1
+            self._closed_count += 1
+
+        return expired
+
+    @staticmethod
+    def _is_alive(pooled: _PooledConnection) -> bool:
+        try:
+            cursor = pooled.connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+        except Error as e:
+            logger.warning(f"Mssql connection ping failed: {e}")
+            return False
+
+        return True
+
+
+_pools: dict[tuple[str, int, str, str], MsSqlConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(server: str, port: int, database: str, user: str, password: str) -> MsSqlConnectionPool:
+    """Возвращает пул соединений для пары сервер + база данных (создает при первом обращении)."""
+
+    key = (server, port, database, user)
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is not None:
+            return pool
+
+        pool = _pools[key] = MsSqlConnectionPool(
+            server=server,
+            port=port,
+            database=database,
+            user=user,
+            password=password,
+            min_size=settings.mssql_pool_min_size,
+            max_size=settings.mssql_pool_max_size,
+            idle_timeout=settings.mssql_pool_idle_timeout,
+            ping_interval=settings.mssql_pool_ping_interval,
+            acquire_timeout=settings.mssql_pool_acquire_timeout,
+        )
+
+    # Вне блокировки: подключение к одной базе не задерживает создание пулов других баз
+    pool.fill()
+    return pool
+
+
+def get_pools_metrics() -> list[PoolMetrics]:
+    return [pool.metrics() for pool in list(_pools.values())]
+
+
+def close_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+
+    for pool in pools:
+        pool.close()
+
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Выделенный ограниченный пул потоков для блокирующих вызовов драйвера pyodbc."""
+
+    global _executor  # noqa: PLW0603
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.mssql_executor_workers,
+                    thread_name_prefix="mssql",
+                )
+
+    return _executor
+
+
+async def run_in_executor(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Выполнить блокирующую функцию работы с MSSQL, не блокируя event loop."""
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(func, *args, **kwargs))
+
+
+_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+def get_database_semaphore(database: str) -> asyncio.Semaphore:
+    """Ограничение числа одновременных задач построения отчета на одну базу MSSQL."""
+
+    semaphore = _semaphores.get(database)
+    if semaphore is None:
+        semaphore = _semaphores[database] = asyncio.Semaphore(max(settings.mssql_database_concurrency, 1))
+
+    return semaphore
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
 class MsSqlDatabase:
     def __init__(self, server: str, user: str, password: str, port: int = 1433):
         self._server = server
@@ -17,25 +400,50 @@ class MsSqlDatabase:
         self._user = user
         self._password = password
         self._connection: Connection | None = None
+        self._local = threading.local()
 
     @property
     def _driver(self) -> str:
-        return getattr(MssqlDriverType, settings.mssql_driver_type).value
+        return _driver()
+
+    @property
+    def database(self) -> str | None:
+        return self._database
 
     def set_database(self, database: str) -> None:
         self._database = database
 
-    @backoff()
+    def with_database(self, database: str) -> "MsSqlDatabase":
+        """Копия, привязанная к базе database (пулы соединений общие)."""
+
+        db = MsSqlDatabase(server=self._server, user=self._user, password=self._password, port=self._port)
+        db.set_database(database)
+        return db
+
+    @contextmanager
+    def connection(self, database: str | None = None) -> Iterator[Connection]:
+        """Взять соединение из пула на время блока with."""
+
+        database = database or self._database
+        if database is None:
+            raise RuntimeError("Mssql Database not set")
+
+        pool = get_pool(self._server, self._port, database, self._user, self._password)
+        pooled = pool.acquire()
+        discard = False
+        try:
+            yield pooled.connection
+
+        except (OperationalError, InterfaceError):
+            discard = True
+            raise
+
+        finally:
+            pool.release(pooled, discard=discard)
+
     def _connect(self):
-        self._connection = connect(
-            f"DRIVER={self._driver};"
-            f"SERVER={self._server};"
-            f"PORT={self._port};"
-            f"DATABASE={self._database};"
-            f"UID={self._user};"
-            f"PWD={self._password};"
-            f"TrustServerCertificate=yes;"
-            f"Encrypt=no"
+        self._connection = _open_connection(
+            _connection_string(self._server, self._port, self._database, self._user, self._password)
         )
 
     def disconnect(self):
@@ -44,6 +452,8 @@ class MsSqlDatabase:
             self._connection = None
 
     def connect(self) -> Connection:
+        """Выделенное соединение вне пула (для скриптов), закрывается через disconnect()."""
+
         if self._database is None:
             raise RuntimeError("Mssql Database not set")
 
@@ -52,11 +462,21 @@ class MsSqlDatabase:
 
         return self._connection
 
+    def _borrowed(self) -> list:
+        borrowed = getattr(self._local, "borrowed", None)
+        if borrowed is None:
+            borrowed = self._local.borrowed = []
+        return borrowed
+
     def __enter__(self) -> Connection:
-        return self.connect()
+        connection_cm = self.connection()
+        connection = connection_cm.__enter__()
+        self._borrowed().append(connection_cm)
+        return connection
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
-        self.disconnect()
+        connection_cm = self._borrowed().pop()
+        connection_cm.__exit__(exc_type, exc_val, exc_tb)
 
 
 def mssql_connection(server, database, user, password) -> Connection:
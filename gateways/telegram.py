@@ -1,8 +1,6 @@
 from aiogram import Bot
 from aiogram.types import Message
 
-from core.settings import settings
-
 
 class TelegramBot(Bot):
     def __init__(self, telegram_token):
@@ -11,6 +9,5 @@ class TelegramBot(Bot):
     async def send_message(self, channel_id: int, text: str) -> Message:
         return await self._bot.send_message(channel_id, text)
 
-
-def get_telegram_bot():
-    return TelegramBot(settings.telegram_token)
+    async def close(self) -> None:
+        await self._bot.session.close()
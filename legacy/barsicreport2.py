@@ -1,7 +1,9 @@
+import asyncio
 import contextlib
 import logging
 import re
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from typing import Any
 
@@ -10,90 +12,266 @@ import httplib2
 from dateutil.relativedelta import relativedelta
 from fastapi.exceptions import HTTPException
 from oauth2client.service_account import ServiceAccountCredentials
+from pyodbc import ProgrammingError
+from redis.asyncio import Redis
 from starlette import status
 
 from constants import FREE_TARIFFS, GOOGLE_DOC_VERSION
 from core.settings import settings
-from db.mssql import MsSqlDatabase
-from gateways.telegram import TelegramBot, get_telegram_bot
+from db.mssql import MsSqlDatabase, get_database_semaphore, run_in_executor
+from gateways.telegram import TelegramBot
 from legacy import functions
 from legacy.to_google_sheets import Spreadsheet, create_new_google_doc
-from repositories.yandex import YandexRepository, get_yandex_repo
+from repositories.cache import CacheRepository
+from repositories.yandex import YandexRepository
 from schemas.bars import ClientsCount
 from schemas.google_report_ids import GoogleReportIdCreate
+from schemas.report_cache import ReportCacheCreate
+from schemas.rk import SmileReport
 from schemas.total_report import Company, DBName
-from services.bars import BarsService, get_bars_service
-from services.report_config import ReportConfigService, get_report_config_service
-from services.rk import RKService, get_rk_service
-from services.settings import SettingsService, get_settings_service
+from services.bars import BarsService
+from services.report_config import ReportConfigService
+from services.reports import ReportService
+from services.rk import RKService
+from services.settings import SettingsService
+from sql.cashdesk import SERVICE_POINTS_SQL, SP_REPORT_CASH_DESK_MONEY_SQL
+from sql.client_count import SP_REPORT_CLIENT_COUNT_TOTALS_SQL, sp_report_client_count_totals_batch_sql
 from sql.customer_count import CURRENT_CUSTOMER_COUNT_SQL
+from sql.get_companies import GET_COMPANIES_WATERMARK_SQL, LIST_ORGANISATIONS_SQL
+from utils.codecs import dump_value, load_value
+from utils.dates import day_start, days_range
+from utils.leases import redis_lease
+from utils.pipeline import ProgressCallback, run_by_days
 
 logger = logging.getLogger("barsicreport2")
 
+_google_sheet_lock = asyncio.Lock()
+_last_year_locks: dict[tuple[int, int], asyncio.Lock] = {}
+
 
 AQUA_COMPANIES_IDS = (36, 7203673, 7203674, 13240081, 15826592, 16049033)
 
+# Типы неизменяемых записей report_cache с данными закрытых дней для сравнения с прошлым годом
+LAST_YEAR_TOTAL_REPORT_TYPE = "last_year_total"
+LAST_YEAR_SMILE_REPORT_TYPE = "last_year_smile"
+LAST_YEAR_CASHDESK_REPORT_TYPE = "last_year_cashdesk"
+LAST_YEAR_CUSTOMER_COUNT_REPORT_TYPE = "last_year_customer_count"
+# Количество клиентов за день (sp_reportClientCountTotals), кешируются только закрытые дни
+CLIENT_COUNT_TOTALS_REPORT_TYPE = "client_count_totals"
+
+# Аренда месячной Google-таблицы Финансового отчета: запись дней в нее не пересекается между процессами
+GOOGLE_SHEET_LEASE_PREFIX = "barsic:google_sheet:financial"
+# Аренда продлевается, пока идет запись (вызовы Google API выполняются в потоке); TTL - время до ее
+# освобождения после падения процесса
+GOOGLE_SHEET_LEASE_TTL = 60
+GOOGLE_SHEET_LEASE_POLL_INTERVAL = 1.0
+
+# Размеры листов Финансового отчета в Google-таблице
+SHEET_WIDTH = 73
+SHEET2_WIDTH = 3
+SHEET3_WIDTH = 26
+SHEET4_WIDTH = 3
+SHEET5_WIDTH = 3
+SHEET6_WIDTH = 16
+SHEET_HEIGHT = 40
+SHEET2_HEIGHT = 40
+SHEET4_HEIGHT = 300
+SHEET5_HEIGHT = 300
+SHEET6_HEIGHT = 40
+
+
+@dataclass(frozen=True)
+class LastYearReports:
+    """Данные прошлого года для сравнения: итоговые отчеты Аквапарка, Смайл, кассовый отчет, количество клиентов."""
+
+    itog_reports: tuple[dict, ...]
+    smile_report: SmileReport
+    cashdesk_report: dict
+    customer_count: int
+
+
+@dataclass(frozen=True)
+class LoadedReports:
+    """Данные отчетов за период (результат стадии load_report)."""
+
+    smile_report: SmileReport
+    smile_report_lastyear: SmileReport
+    customer_count: int = 0
+    customer_count_last_year: int = 0
+    itog_reports: tuple[dict, ...] = ()
+    itog_reports_lastyear: tuple[dict, ...] = ()
+    itog_report_month: dict | None = None
+    smile_report_month: SmileReport | None = None
+    cashdesk_report_org1: dict | None = None
+    cashdesk_report_org1_lastyear: dict | None = None
+    client_count_totals_org1: list | None = None
+    itog_report_beach: dict | None = None
+    cashdesk_report_org2: dict | None = None
+    client_count_totals_org2: list | None = None
+    report_bitrix: tuple[int, float] = (0, 0)
+    report_bitrix_lastyear: tuple[int, float] = (0, 0)
+
+
+@dataclass(frozen=True)
+class FinReports:
+    """Финансовые отчеты за день, которые выгружаются в Google-таблицу."""
+
+    fin_report: dict
+    fin_report_last_year: dict
+    fin_report_beach: dict
+    finreport_dict_month: dict | None = None
+    agentreport_dict_month: dict | None = None
+
+
+@dataclass
+class GoogleSheetContext:
+    """Состояние выгрузки одного дня в Google-таблицу: документ, отчеты и номера заполняемых строк."""
+
+    spreadsheet: dict
+    data_report: str
+    reports: FinReports
+    start_line: int = 1
+    reprint: int = 2
+    nex_line: int = 1
+    sheet2_line: int = 1
+
+
+@dataclass(frozen=True)
+class DayReports:
+    """Результат сохранения отчетов за день (стадия save_reports).
+
+    Финансовый отчет записывается в Google-таблицу отдельно, после построения всех дней (export_days_to_google_sheet).
+    """
+
+    report: LoadedReports
+    fin_reports: FinReports
+    to_yandex: list[str]
+    to_messanger: list[str]
+
+
+@dataclass(frozen=True)
+class ReportRun:
+    """Результат run_report."""
+
+    failed_days: list[date]
+    spreadsheet_url: str | None = None
+
 
 class BarsicReport2Service:
     """
     Функционал предыдущей версии.
+
+    Состояние одного запуска (отчеты за день, таблица, номера строк) передается между стадиями
+    явно, поэтому один экземпляр может одновременно строить отчеты за разные дни и периоды.
     """
 
-    def __init__(self, bars_srv: MsSqlDatabase, rk_srv: MsSqlDatabase):
+    def __init__(
+        self,
+        bars_srv: MsSqlDatabase,
+        rk_srv: MsSqlDatabase,
+        redis: Redis | None,
+        report_config_service: ReportConfigService,
+        report_service: ReportService,
+        settings_service: SettingsService,
+        bars_service: BarsService,
+        rk_service: RKService,
+        yandex_repo: YandexRepository,
+        cache_repo: CacheRepository,
+        telegram_bot: TelegramBot,
+    ):
         self.bars_srv = bars_srv
         self.rk_srv = rk_srv
+        self._redis = redis
+
+        self._report_config_service = report_config_service
+        self._report_service = report_service
+        # Отчеты строятся только по базе Аквапарка: привязываем к ней копии общих сервисов
+        self._settings_service = settings_service.for_database("Aquapark_Ulyanovsk")
+        self._bars_service = bars_service.for_database(settings.mssql_database1)
+        self._rk_service = rk_service
+        self._yandex_repo = yandex_repo
+        self._cache_repo = cache_repo
+        self._telegram_bot = telegram_bot
+
+    def _fetchall(self, database: str, sql: str, params: tuple = ()) -> list:
+        """Блокирующий запрос к базе Барс на соединении из пула (выполняется в executor)."""
+
+        with self.bars_srv.connection(database) as connect:
+            cursor = connect.cursor()
+            cursor.execute(sql, *params)
+            return cursor.fetchall()
 
-        self.count_sql_error = 0
-        self.org_for_finreport = {}
-        self.orgs = []
-        self.new_agentservice = []
-        self.agentorgs = []
+    def _get_total_report(self, database: str, **kwargs) -> dict:
+        with self.bars_srv.connection(database) as connect:
+            return functions.get_total_report(connect=connect, **kwargs)
 
-        self._report_config_service: ReportConfigService = get_report_config_service()
-        self._settings_service: SettingsService = get_settings_service()
-        self._bars_service: BarsService = get_bars_service()
-        self._rk_service: RKService = get_rk_service()
-        self._yandex_repo: YandexRepository = get_yandex_repo()
-        self._telegram_bot: TelegramBot = get_telegram_bot()
+    def _get_total_reports_by_day(self, database: str, **kwargs) -> dict[date, dict]:
+        with self.bars_srv.connection(database) as connect:
+            return functions.get_total_reports_by_day(connect=connect, **kwargs)
 
-    def get_clients_count(self) -> list[ClientsCount]:
+    def _get_client_count_totals_by_day(self, database: str, org, days: list[datetime]) -> dict[datetime, tuple | None]:
+        """Количество клиентов по дням за одно обращение к базе (пакет вызовов sp_reportClientCountTotals).
+
+        Если пакет не удалось выполнить, процедура вызывается по одному дню на том же соединении.
+        """
+
+        params = [param for day in days for param in (org, day_start(day), day_start(day + timedelta(1)))]
+        with self.bars_srv.connection(database) as connect:
+            result_sets = None
+            try:
+                cursor = connect.cursor()
+                cursor.execute(sp_report_client_count_totals_batch_sql(len(days)), *params)
+                result_sets = functions.fetch_result_sets(cursor)
+
+            except ProgrammingError as e:
+                logger.warning(f"Batch sp_reportClientCountTotals failed, fallback to day by day: {e}")
+
+            if result_sets is None or len(result_sets) != len(days):
+                result_sets = []
+                for day in days:
+                    cursor = connect.cursor()
+                    cursor.execute(
+                        SP_REPORT_CLIENT_COUNT_TOTALS_SQL, org, day_start(day), day_start(day + timedelta(1))
+                    )
+                    result_sets.append(cursor.fetchall())
+
+        return {day: tuple(rows[0]) if rows else None for day, rows in zip(days, result_sets, strict=True)}
+
+    async def get_clients_count(self) -> list[ClientsCount]:
         """Получение количества человек в зоне."""
 
-        self.bars_srv.set_database(settings.mssql_database1)
-        with self.bars_srv as connect:
-            cursor = connect.cursor()
-            cursor.execute(CURRENT_CUSTOMER_COUNT_SQL)
-            rows = cursor.fetchall()
-            if not rows:
-                return [ClientsCount(count=0, id=488, zone_name="", code="0003")]
+        rows = await run_in_executor(self._fetchall, settings.mssql_database1, CURRENT_CUSTOMER_COUNT_SQL)
+        if not rows:
+            return [ClientsCount(count=0, id=488, zone_name="", code="0003")]
 
         return [ClientsCount(count=row[0], id=row[1], zone_name=row[2], code=row[3]) for row in rows]
 
-    def count_clients_print(self):
+    async def count_clients_print(self):
         """Получение количества человек в зоне Аквазоны."""
 
-        aqua_company = self.get_companies()[0]
-        clients_count = self.get_clients_count()
-        self.bars_srv.set_database(settings.mssql_database1)
-        with self.bars_srv as connect:
-            total_report = functions.get_total_report(
-                connect=connect,
-                org=aqua_company.id,
-                org_name=aqua_company.name,
-                date_from=datetime.now(),
-                date_to=datetime.now() + timedelta(1),
-            )
+        aqua_company = (await self.get_companies())[0]
+        clients_count = await self.get_clients_count()
+        total_report = await run_in_executor(
+            self._get_total_report,
+            settings.mssql_database1,
+            org=aqua_company.id,
+            org_name=aqua_company.name,
+            date_from=datetime.now(),
+            date_to=datetime.now() + timedelta(1),
+        )
         try:
             count_clients = int(total_report["Аквазона"][0])
         except KeyError:
             count_clients = 0
 
         try:
-            count_clients_allday = self.reportClientCountTotals(
-                database=settings.mssql_database1,
-                org=aqua_company.id,
-                date_from=datetime.now(),
-                date_to=datetime.now() + timedelta(1),
+            count_clients_allday = (
+                await self.reportClientCountTotals(
+                    database=settings.mssql_database1,
+                    org=aqua_company.id,
+                    date_from=datetime.now(),
+                    date_to=datetime.now() + timedelta(1),
+                )
             )[0][1]
         except IndexError:
             count_clients_allday = 0
@@ -103,10 +281,10 @@ class BarsicReport2Service:
             clients_count[0].zone_name: clients_count[0].count,
         }
 
-    def get_companies(self) -> list[Company]:
+    async def get_companies(self) -> list[Company]:
         """Получение списка организаций из баз данных Аквапарка и Пляжа."""
 
-        aqua_companies_db = self.list_organisation(database=settings.mssql_database1)
+        aqua_companies_db = await self.list_organisation(database=settings.mssql_database1)
         aqua_companies_map = {company_db[0]: company_db[2] for company_db in aqua_companies_db}
         companies = [
             Company(id=id_, name=name, db_name=DBName.AQUA)
@@ -115,7 +293,7 @@ class BarsicReport2Service:
         ]
 
         if settings.add_beach_report:
-            beach_companies_db = self.list_organisation(database=settings.mssql_database2)
+            beach_companies_db = await self.list_organisation(database=settings.mssql_database2)
             companies.append(
                 Company(
                     id=beach_companies_db[0][0],
@@ -126,53 +304,44 @@ class BarsicReport2Service:
 
         return companies
 
-    def list_organisation(
+    async def list_organisation(
         self,
         database,
     ):
         """Функция делает запрос в базу Барс и возвращает список заведенных
         в базе организаций в виде списка кортежей."""
 
-        self.bars_srv.set_database(database)
-        with self.bars_srv as connect:
-            cursor = connect.cursor()
-            id_type = 1
-            cursor.execute(
-                f"""
-                SELECT
-                    SuperAccountId, Type, Descr, CanRegister, CanPass, IsStuff, IsBlocked,
-                    BlockReason, DenyReturn, ClientCategoryId, DiscountCard, PersonalInfoId,
-                    Address, Inn, ExternalId, RegisterTime,LastTransactionTime,
-                    LegalEntityRelationTypeId, SellServicePointId, DepositServicePointId,
-                    AllowIgnoreStoredPledge, Email, Latitude, Longitude, Phone, WebSite,
-                    TNG_ProfileId
-                FROM
-                    SuperAccount
-                WHERE
-                    Type={id_type}
-                """
-            )
-            return cursor.fetchall()
+        id_type = 1
+
+        async def load() -> list[list]:
+            rows = await run_in_executor(self._fetchall, database, LIST_ORGANISATIONS_SQL, (id_type,))
+            return [list(row) for row in rows]
+
+        async def load_watermark() -> tuple:
+            rows = await run_in_executor(self._fetchall, database, GET_COMPANIES_WATERMARK_SQL, (id_type,))
+            return tuple(rows[0])
+
+        return await self._cache_repo.get_or_load(
+            key=self._cache_repo.key(database, "organisations_full"),
+            loader=load,
+            watermark_loader=load_watermark,
+        )
 
-    def reportClientCountTotals(
+    async def reportClientCountTotals(
         self,
         database,
         org,
         date_from,
         date_to,
     ):
-        date_from = date_from.strftime("%Y%m%d 00:00:00")
-        date_to = date_to.strftime("%Y%m%d 00:00:00")
-
-        self.bars_srv.set_database(database)
-        with self.bars_srv as connect:
-            cursor = connect.cursor()
-            cursor.execute(
-                f"exec sp_reportClientCountTotals @sa={org},@from='{date_from}',@to='{date_to}',@categoryId=0"
-            )
-            return cursor.fetchall()
+        return await run_in_executor(
+            self._fetchall,
+            database,
+            SP_REPORT_CLIENT_COUNT_TOTALS_SQL,
+            (org, day_start(date_from), day_start(date_to)),
+        )
 
-    def client_count_totals_period(
+    async def client_count_totals_period(
         self,
         database,
         org,
@@ -192,24 +361,56 @@ class BarsicReport2Service:
         else:
             first_day = date_from
             count.append((org_name, 0))
+        days = days_range(first_day, date_to)
+        client_counts = await self.get_client_count_totals_by_day(database, org, days)
+
         total = 0
-        while first_day < date_to:
-            client_count = self.reportClientCountTotals(
-                database=database,
-                org=org,
-                date_from=first_day,
-                date_to=first_day + timedelta(1),
-            )
-            try:
-                count.append((client_count[0][0], client_count[0][1]))
-                total += client_count[0][1]
-            except IndexError:
-                count.append((first_day, 0))
-            first_day += timedelta(1)
+        for day in days:
+            client_count = client_counts[day]
+            if client_count is None:
+                count.append((day, 0))
+            else:
+                count.append(client_count)
+                total += client_count[1]
         count.append(("Итого", total))
         return count
 
-    def cash_report_request(
+    async def get_client_count_totals_by_day(self, database, org, days: list[datetime]) -> dict[datetime, tuple | None]:
+        """Количество клиентов по дням: закрытые дни берутся из report_cache, остальные запрашиваются в базе
+        одним пакетом. Для дня без данных возвращается None."""
+
+        report_type = f"{CLIENT_COUNT_TOTALS_REPORT_TYPE}:{database}:{org}"
+        mutable_from = day_start(datetime.now()) - timedelta(settings.report_cache_mutable_days)
+        cached = await self._report_service.get_reports_by_dates(
+            report_type, [day.date() for day in days if day < mutable_from]
+        )
+
+        client_counts = {}
+        missing_days = []
+        for day in days:
+            if day.date() in cached:
+                client_counts[day] = load_value(cached[day.date()].report_data["data"])
+            else:
+                missing_days.append(day)
+
+        if missing_days:
+            rows = await run_in_executor(self._get_client_count_totals_by_day, database, org, missing_days)
+            client_counts |= {day: row[:2] if row is not None else None for day, row in rows.items()}
+            await self._report_service.save_immutable_reports(
+                [
+                    ReportCacheCreate(
+                        report_date=day.date(),
+                        report_type=report_type,
+                        report_data={"data": dump_value(client_counts[day])},
+                    )
+                    for day in missing_days
+                    if day < mutable_from
+                ]
+            )
+
+        return client_counts
+
+    async def cash_report_request(
         self,
         database,
         date_from,
@@ -217,53 +418,42 @@ class BarsicReport2Service:
     ):
         """Делает запрос в базу Барс и возвращает суммовой отчет за запрашиваемый период."""
 
-        date_from = date_from.strftime("%Y%m%d 00:00:00")
-        date_to = date_to.strftime("%Y%m%d 00:00:00")
-
-        self.bars_srv.set_database(database)
-        with self.bars_srv as connect:
-            cursor = connect.cursor()
-            cursor.execute(f"exec sp_reportCashDeskMoney @from='{date_from}', @to='{date_to}'")
-            return cursor.fetchall()
+        return await run_in_executor(
+            self._fetchall,
+            database,
+            SP_REPORT_CASH_DESK_MONEY_SQL,
+            (day_start(date_from), day_start(date_to)),
+        )
 
-    def service_point_request(
+    async def service_point_request(
         self,
         database,
     ):
         """Делает запрос в базу Барс и возвращает список рабочих мест."""
 
-        self.bars_srv.set_database(database)
-        with self.bars_srv as connect:
-            cursor = connect.cursor()
-            cursor.execute(
-                """
-                    SELECT
-                        ServicePointId, Name, SuperAccountId, Type, Code, IsInternal
-                    FROM
-                        ServicePoint
-                """
-            )
-            return cursor.fetchall()
+        return await run_in_executor(self._fetchall, database, SERVICE_POINTS_SQL)
 
-    def cashdesk_report(
+    async def cashdesk_report(
         self,
         companies: list[Company],
         database,
         date_from,
         date_to,
+        service_point: list | None = None,
     ):
         """
         Преобразует запросы из базы в суммовой отчет
         :return: dict
         """
-        cash_report = self.cash_report_request(
+        cash_report = await self.cash_report_request(
             database=database,
             date_from=date_from,
             date_to=date_to,
         )
-        service_point = self.service_point_request(
-            database=database,
-        )
+        if service_point is None:
+            service_point = await self.service_point_request(
+                database=database,
+            )
         service_point_dict = {}
         for point in service_point:
             service_point_dict[point[0]] = (
@@ -331,7 +521,9 @@ class BarsicReport2Service:
             report["Организация"] = [[beach_company.name]]
         return report
 
-    def create_fin_report(self, fin_report_config: dict[str, Any], customer_count: int = 0) -> dict:
+    def create_fin_report(
+        self, report: LoadedReports, fin_report_config: dict[str, Any], customer_count: int = 0
+    ) -> dict:
         """Форминует финансовый отчет в установленном формате"""
 
         logger.info("Формирование финансового отчета")
@@ -342,7 +534,7 @@ class BarsicReport2Service:
             if org != "Не учитывать":
                 fin_report[org] = [0, 0.00]
                 for serv in services:
-                    itog_report_aqua = self.itog_reports[0]
+                    itog_report_aqua = report.itog_reports[0]
                     try:
                         if org == "Дата":
                             fin_report[org][0] = itog_report_aqua[serv][0]
@@ -355,7 +547,7 @@ class BarsicReport2Service:
                             pass
 
                         else:
-                            for itog_report in self.itog_reports:
+                            for itog_report in report.itog_reports:
                                 if serv in FREE_TARIFFS:
                                     little_children_count += itog_report.get(serv, [0])[0]
 
@@ -372,20 +564,22 @@ class BarsicReport2Service:
         fin_report["Кол-во проходов"] = [total_customer_count, 0.00]
 
         fin_report.setdefault("Online Продажи", [0, 0.0])
-        fin_report["Online Продажи"][0] += self.report_bitrix[0]
-        fin_report["Online Продажи"][1] += self.report_bitrix[1]
+        fin_report["Online Продажи"][0] += report.report_bitrix[0]
+        fin_report["Online Продажи"][1] += report.report_bitrix[1]
 
-        fin_report["Смайл"][0] = self.smile_report.total_count
-        fin_report["Смайл"][1] = self.smile_report.total_sum
+        fin_report["Смайл"][0] = report.smile_report.total_count
+        fin_report["Смайл"][1] = report.smile_report.total_sum
 
-        total_cashdesk_report = self.cashdesk_report_org1["Итого"][0]
+        total_cashdesk_report = report.cashdesk_report_org1["Итого"][0]
         fin_report["MaxBonus"] = (
             0,
             float(total_cashdesk_report[6] - total_cashdesk_report[7]),
         )
         return fin_report
 
-    def create_fin_report_last_year(self, fin_report_config: dict[str, Any], customer_count: int = 0) -> dict:
+    def create_fin_report_last_year(
+        self, report: LoadedReports, fin_report_config: dict[str, Any], customer_count: int = 0
+    ) -> dict:
         """Форминует финансовый отчет за прошлый год в установленном формате."""
 
         logger.info("Формирование финансового отчета за прошлый год")
@@ -396,7 +590,7 @@ class BarsicReport2Service:
             if org != "Не учитывать":
                 fin_report_last_year[org] = [0, 0.00]
                 for serv in services:
-                    itog_report_aqua_lastyear = self.itog_reports_lastyear[0]
+                    itog_report_aqua_lastyear = report.itog_reports_lastyear[0]
                     try:
                         if org == "Дата":
                             fin_report_last_year[org][0] = itog_report_aqua_lastyear[serv][0]
@@ -408,7 +602,7 @@ class BarsicReport2Service:
                             pass
 
                         else:
-                            for itog_report in self.itog_reports_lastyear:
+                            for itog_report in report.itog_reports_lastyear:
                                 if serv in FREE_TARIFFS:
                                     customers_with_free_tariffs += itog_report.get(serv, [0])[0]
 
@@ -426,12 +620,12 @@ class BarsicReport2Service:
         fin_report_last_year["Кол-во проходов"] = [total_customer_count, 0.00]
 
         fin_report_last_year.setdefault("Online Продажи", [0, 0.0])
-        fin_report_last_year["Online Продажи"][0] += self.report_bitrix_lastyear[0]
-        fin_report_last_year["Online Продажи"][1] += self.report_bitrix_lastyear[1]
-        fin_report_last_year["Смайл"][0] = self.smile_report_lastyear.total_count
-        fin_report_last_year["Смайл"][1] = self.smile_report_lastyear.total_sum
+        fin_report_last_year["Online Продажи"][0] += report.report_bitrix_lastyear[0]
+        fin_report_last_year["Online Продажи"][1] += report.report_bitrix_lastyear[1]
+        fin_report_last_year["Смайл"][0] = report.smile_report_lastyear.total_count
+        fin_report_last_year["Смайл"][1] = report.smile_report_lastyear.total_sum
 
-        total_cashdesk_report = self.cashdesk_report_org1_lastyear["Итого"][0]
+        total_cashdesk_report = report.cashdesk_report_org1_lastyear["Итого"][0]
         fin_report_last_year["MaxBonus"] = (
             0,
             total_cashdesk_report[6] - total_cashdesk_report[7],
@@ -439,7 +633,7 @@ class BarsicReport2Service:
 
         return fin_report_last_year
 
-    def create_fin_report_beach(self) -> dict:
+    def create_fin_report_beach(self, report: LoadedReports) -> dict:
         """Форминует финансовый отчет по пляжу в установленном формате"""
 
         logger.info("Формирование финансового отчета по пляжу")
@@ -450,22 +644,24 @@ class BarsicReport2Service:
             "Карты": (0, 0),
             "Итого по отчету": (0, 0),
         }
-        for service in self.itog_report_beach or []:
+        for service in report.itog_report_beach or []:
             if service in {"Дата", "Выход с пляжа"}:
                 fin_report_beach[service] = (
-                    self.itog_report_beach[service][0],
-                    self.itog_report_beach[service][1],
+                    report.itog_report_beach[service][0],
+                    report.itog_report_beach[service][1],
                 )
-            elif self.itog_report_beach[service][3] not in fin_report_beach:
-                fin_report_beach[self.itog_report_beach[service][3]] = (
-                    self.itog_report_beach[service][0],
-                    self.itog_report_beach[service][1],
+            elif report.itog_report_beach[service][3] not in fin_report_beach:
+                fin_report_beach[report.itog_report_beach[service][3]] = (
+                    report.itog_report_beach[service][0],
+                    report.itog_report_beach[service][1],
                 )
             else:
                 with contextlib.suppress(TypeError):
-                    fin_report_beach[self.itog_report_beach[service][3]] = (
-                        fin_report_beach[self.itog_report_beach[service][3]][0] + self.itog_report_beach[service][0],
-                        fin_report_beach[self.itog_report_beach[service][3]][1] + self.itog_report_beach[service][1],
+                    fin_report_beach[report.itog_report_beach[service][3]] = (
+                        fin_report_beach[report.itog_report_beach[service][3]][0]
+                        + report.itog_report_beach[service][0],
+                        fin_report_beach[report.itog_report_beach[service][3]][1]
+                        + report.itog_report_beach[service][1],
                     )
 
         if "Выход с пляжа" not in fin_report_beach:
@@ -507,24 +703,14 @@ class BarsicReport2Service:
 
         return result
 
-    async def export_to_google_sheet(self, date_from, http_auth, googleservice, fin_report: dict):
+    async def export_to_google_sheet(
+        self, date_from, http_auth, googleservice, reports: FinReports, report: LoadedReports
+    ) -> str | None:
         """
-        Формирование и заполнение google-таблицы
+        Формирование и заполнение google-таблицы. Возвращает ссылку на таблицу
         """
         logger.info("Сохранение Финансового отчета в Google-таблицах...")
-        self.sheet_width = 73
-        self.sheet2_width = 3
-        self.sheet3_width = 26
-        self.sheet4_width = 3
-        self.sheet5_width = 3
-        self.sheet6_width = 16
-        self.sheet_height = 40
-        self.sheet2_height = 40
-        self.sheet4_height = 300
-        self.sheet5_height = 300
-        self.sheet6_height = 40
-
-        self.data_report = datetime.strftime(fin_report["Дата"][0], "%m")
+        fin_report = reports.fin_report
         month = [
             "",
             "Январь",
@@ -540,133 +726,121 @@ class BarsicReport2Service:
             "Ноябрь",
             "Декабрь",
         ]
-        self.data_report = month[int(self.data_report)]
+        data_report = month[fin_report["Дата"][0].month]
 
         doc_name = (
-            f"{datetime.strftime(fin_report['Дата'][0], '%Y-%m')} ({self.data_report}) - Финансовый отчет по Аквапарку"
+            f"{datetime.strftime(fin_report['Дата'][0], '%Y-%m')} ({data_report}) - Финансовый отчет по Аквапарку"
         )
 
         if fin_report["Дата"][0] + timedelta(1) != fin_report["Дата"][1]:
             logger.info("Экспорт отчета в Google Sheet за несколько дней невозможен!")
-        else:
-            google_report_id = await self._report_config_service.get_financial_doc_id_by_date(date_from)
-            if google_report_id is None:
-                google_doc = create_new_google_doc(
-                    googleservice=googleservice,
-                    doc_name=doc_name,
-                    data_report=self.data_report,
-                    finreport_dict=fin_report,
-                    http_auth=http_auth,
-                    date_from=date_from,
-                    sheet_width=self.sheet_width,
-                    sheet2_width=self.sheet2_width,
-                    sheet3_width=self.sheet3_width,
-                    sheet4_width=self.sheet4_width,
-                    sheet5_width=self.sheet5_width,
-                    sheet6_width=self.sheet6_width,
-                    sheet_height=self.sheet_height,
-                    sheet2_height=self.sheet2_height,
-                    sheet4_height=self.sheet4_height,
-                    sheet5_height=self.sheet5_height,
-                    sheet6_height=self.sheet6_height,
-                )
-                google_report_id = GoogleReportIdCreate(
-                    month=google_doc[0],
-                    doc_id=google_doc[1],
-                    report_type="financial",
-                    version=GOOGLE_DOC_VERSION,
-                )
-                await self._report_config_service.add_google_report_id(google_report_id)
-                logger.info(f"Создана новая таблица с Id: {google_report_id.doc_id}")
-
-            if google_report_id.version != GOOGLE_DOC_VERSION:
-                error_message = (
-                    f"Версия Финансового отчета ({google_report_id.version}) не соответствует текущей "
-                    f"({GOOGLE_DOC_VERSION}).\n"
-                    f"Необходимо сначала удалить ссылку на старую версию, "
-                    f"затем заново сформировать отчет с начала месяца."
-                )
-                logger.error(error_message)
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=error_message,
-                )
-
-            google_doc = (google_report_id.month, google_report_id.doc_id)
-            self.spreadsheet = (
-                googleservice.spreadsheets().get(spreadsheetId=google_doc[1], ranges=[], includeGridData=True).execute()
+            return None
+
+        google_report_id = await self._report_config_service.get_financial_doc_id_by_date(date_from)
+        if google_report_id is None:
+            google_doc = await asyncio.to_thread(
+                create_new_google_doc,
+                googleservice=googleservice,
+                doc_name=doc_name,
+                data_report=data_report,
+                finreport_dict=fin_report,
+                http_auth=http_auth,
+                date_from=date_from,
+                sheet_width=SHEET_WIDTH,
+                sheet2_width=SHEET2_WIDTH,
+                sheet3_width=SHEET3_WIDTH,
+                sheet4_width=SHEET4_WIDTH,
+                sheet5_width=SHEET5_WIDTH,
+                sheet6_width=SHEET6_WIDTH,
+                sheet_height=SHEET_HEIGHT,
+                sheet2_height=SHEET2_HEIGHT,
+                sheet4_height=SHEET4_HEIGHT,
+                sheet5_height=SHEET5_HEIGHT,
+                sheet6_height=SHEET6_HEIGHT,
+            )
+            google_report_id = GoogleReportIdCreate(
+                month=google_doc[0],
+                doc_id=google_doc[1],
+                report_type="financial",
+                version=GOOGLE_DOC_VERSION,
+            )
+            await self._report_config_service.add_google_report_id(google_report_id)
+            logger.info(f"Создана новая таблица с Id: {google_report_id.doc_id}")
+
+        if google_report_id.version != GOOGLE_DOC_VERSION:
+            error_message = (
+                f"Версия Финансового отчета ({google_report_id.version}) не соответствует текущей "
+                f"({GOOGLE_DOC_VERSION}).\n"
+                f"Необходимо сначала удалить ссылку на старую версию, "
+                f"затем заново сформировать отчет с начала месяца."
+            )
+            logger.error(error_message)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=error_message,
             )
 
-            # -------------------------------- ЗАПОЛНЕНИЕ ДАННЫМИ ------------------------------------------------
+        google_doc = (google_report_id.month, google_report_id.doc_id)
+        # Вызовы Google API блокирующие: выполняются в потоке, чтобы цикл событий продлевал аренду таблицы
+        return await asyncio.to_thread(
+            self.fill_google_sheet, googleservice, google_doc[1], data_report, reports=reports, report=report
+        )
 
-            # Проверка нет ли текущей даты в таблице
-            logger.info("Проверка нет ли текущей даты в таблице...")
-            self.start_line = 1
-            self.reprint = 2
+    def fill_google_sheet(
+        self, googleservice, doc_id: str, data_report: str, reports: FinReports, report: LoadedReports
+    ) -> str:
+        """Записать день в строку таблицы (новую или уже существующую). Возвращает ссылку на таблицу."""
+
+        fin_report = reports.fin_report
+        sheet = GoogleSheetContext(
+            spreadsheet=googleservice.spreadsheets()
+            .get(spreadsheetId=doc_id, ranges=[], includeGridData=True)
+            .execute(),
+            data_report=data_report,
+            reports=reports,
+        )
 
-            for line_table in self.spreadsheet["sheets"][0]["data"][0]["rowData"]:
-                try:
-                    if line_table["values"][0]["formattedValue"] == datetime.strftime(
-                        fin_report["Дата"][0], "%d.%m.%Y"
-                    ):
-                        self.rewrite_google_sheet(
-                            googleservice,
-                            fin_report=self.fin_report,
-                            fin_report_last_year=self.fin_report_last_year,
-                            fin_report_beach=self.fin_report_beach,
-                        )
-                        self.reprint = 0
-                        break
-                    if line_table["values"][0]["formattedValue"] == "ИТОГО":
-                        break
-                    self.start_line += 1
-                except KeyError:
-                    self.start_line += 1
-            if self.reprint:
-                self.write_google_sheet(
-                    googleservice,
-                    fin_report=self.fin_report,
-                    fin_report_last_year=self.fin_report_last_year,
-                    fin_report_beach=self.fin_report_beach,
-                )
-            # width_table = len(self.spreadsheet['sheets'][0]['data'][0]['rowData'][0]['values'])
-        return True
+        # -------------------------------- ЗАПОЛНЕНИЕ ДАННЫМИ ------------------------------------------------
 
-    def rewrite_google_sheet(
-        self,
-        googleservice,
-        fin_report: dict,
-        fin_report_last_year: dict,
-        fin_report_beach: dict,
-    ):
+        # Проверка нет ли текущей даты в таблице
+        logger.info("Проверка нет ли текущей даты в таблице...")
+        for line_table in sheet.spreadsheet["sheets"][0]["data"][0]["rowData"]:
+            try:
+                if line_table["values"][0]["formattedValue"] == datetime.strftime(fin_report["Дата"][0], "%d.%m.%Y"):
+                    self.rewrite_google_sheet(googleservice, report=report, sheet=sheet)
+                    sheet.reprint = 0
+                    break
+                if line_table["values"][0]["formattedValue"] == "ИТОГО":
+                    break
+                sheet.start_line += 1
+            except KeyError:
+                sheet.start_line += 1
+        if sheet.reprint:
+            self.write_google_sheet(googleservice, report=report, sheet=sheet)
+        # width_table = len(sheet.spreadsheet['sheets'][0]['data'][0]['rowData'][0]['values'])
+        return sheet.spreadsheet["spreadsheetUrl"]
+
+    def rewrite_google_sheet(self, googleservice, report: LoadedReports, sheet: GoogleSheetContext):
         """
         Заполнение google-таблицы в случае, если данные уже существуют
         """
         logger.warning("Перезапись уже существующей строки...")
-        self.reprint = 1
-        self.write_google_sheet(
-            googleservice,
-            fin_report=fin_report,
-            fin_report_last_year=fin_report_last_year,
-            fin_report_beach=fin_report_beach,
-        )
+        sheet.reprint = 1
+        self.write_google_sheet(googleservice, report=report, sheet=sheet)
 
-    def write_google_sheet(
-        self,
-        googleservice,
-        fin_report: dict,
-        fin_report_last_year: dict,
-        fin_report_beach: dict,
-    ):
+    def write_google_sheet(self, googleservice, report: LoadedReports, sheet: GoogleSheetContext):
         """Заполнение google-таблицы"""
+        fin_report = sheet.reports.fin_report
+        fin_report_last_year = sheet.reports.fin_report_last_year
+        fin_report_beach = sheet.reports.fin_report_beach
         # SHEET 1
         logger.info("Заполнение листа 1...")
         sheetId = 0
         ss = Spreadsheet(
-            self.spreadsheet["spreadsheetId"],
+            sheet.spreadsheet["spreadsheetId"],
             sheetId,
             googleservice,
-            self.spreadsheet["sheets"][sheetId]["properties"]["title"],
+            sheet.spreadsheet["sheets"][sheetId]["properties"]["title"],
         )
 
         # Заполнение строки с данными
@@ -679,7 +853,7 @@ class BarsicReport2Service:
             "Суббота",
             "Воскресенье",
         ]
-        self.nex_line = self.start_line
+        sheet.nex_line = sheet.start_line
 
         control_total_sum = sum(
             [
@@ -708,90 +882,90 @@ class BarsicReport2Service:
             )
 
         ss.prepare_setValues(
-            f"A{self.nex_line}:BU{self.nex_line}",
+            f"A{sheet.nex_line}:BU{sheet.nex_line}",
             [
                 [
                     datetime.strftime(fin_report["Дата"][0], "%d.%m.%Y"),
                     weekday_rus[fin_report["Дата"][0].weekday()],
-                    f"='План'!C{self.nex_line}",
+                    f"='План'!C{sheet.nex_line}",
                     f"{fin_report['Кол-во проходов'][0]}",
                     f"{fin_report_last_year['Кол-во проходов'][0]}",
-                    f"='План'!E{self.nex_line}",
+                    f"='План'!E{sheet.nex_line}",
                     f"={str(fin_report['ИТОГО'][1]).replace('.', ',')}"
-                    f"-I{self.nex_line}+AL{self.nex_line}+BT{self.nex_line}+BU{self.nex_line}+'Смайл'!C{self.nex_line}-BR{self.nex_line}",
-                    f"=IFERROR(G{self.nex_line}/D{self.nex_line};0)",
+                    f"-I{sheet.nex_line}+AL{sheet.nex_line}+BT{sheet.nex_line}+BU{sheet.nex_line}+'Смайл'!C{sheet.nex_line}-BR{sheet.nex_line}",
+                    f"=IFERROR(G{sheet.nex_line}/D{sheet.nex_line};0)",
                     f"={str(fin_report['MaxBonus'][1]).replace('.', ',')}",
                     f"={str(fin_report_last_year['ИТОГО'][1]).replace('.', ',')}"
                     f"-{str(fin_report_last_year['MaxBonus'][1]).replace('.', ',')}"
                     f"+{str(fin_report_last_year['Online Продажи'][1]).replace('.', ',')}",
                     fin_report["Билеты аквапарка"][0],
                     fin_report["Билеты аквапарка"][1],
-                    f"=IFERROR(L{self.nex_line}/K{self.nex_line};0)",
+                    f"=IFERROR(L{sheet.nex_line}/K{sheet.nex_line};0)",
                     fin_report["Депозит"][1],
                     fin_report["Штраф"][1],
                     # Общепит
-                    f"='План'!I{self.nex_line}",
-                    f"='План'!J{self.nex_line}",
-                    f"=IFERROR(Q{self.nex_line}/P{self.nex_line};0)",
+                    f"='План'!I{sheet.nex_line}",
+                    f"='План'!J{sheet.nex_line}",
+                    f"=IFERROR(Q{sheet.nex_line}/P{sheet.nex_line};0)",
                     fin_report["Общепит"][0] + fin_report["Смайл"][0],
                     fin_report["Общепит"][1] + fin_report["Смайл"][1],
-                    f"=IFERROR(T{self.nex_line}/S{self.nex_line};0)",
+                    f"=IFERROR(T{sheet.nex_line}/S{sheet.nex_line};0)",
                     fin_report_last_year["Общепит"][0] + fin_report_last_year["Смайл"][0],
                     fin_report_last_year["Общепит"][1] + fin_report_last_year["Смайл"][1],
-                    f"=IFERROR(W{self.nex_line}/V{self.nex_line};0)",
+                    f"=IFERROR(W{sheet.nex_line}/V{sheet.nex_line};0)",
                     # Фотоуслуги
-                    f"='План'!L{self.nex_line}",
-                    f"='План'!M{self.nex_line}",
-                    f"=IFERROR(Z{self.nex_line}/Y{self.nex_line};0)",
+                    f"='План'!L{sheet.nex_line}",
+                    f"='План'!M{sheet.nex_line}",
+                    f"=IFERROR(Z{sheet.nex_line}/Y{sheet.nex_line};0)",
                     fin_report["Фотоуслуги"][0],
                     fin_report["Фотоуслуги"][1],
-                    f"=IFERROR(AC{self.nex_line}/AB{self.nex_line};0)",
+                    f"=IFERROR(AC{sheet.nex_line}/AB{sheet.nex_line};0)",
                     fin_report_last_year["Фотоуслуги"][0],
                     fin_report_last_year["Фотоуслуги"][1],
-                    f"=IFERROR(AF{self.nex_line}/AE{self.nex_line};0)",
+                    f"=IFERROR(AF{sheet.nex_line}/AE{sheet.nex_line};0)",
                     # УЛËТSHOP
-                    f"='План'!O{self.nex_line}",
-                    f"='План'!P{self.nex_line}",
-                    f"=IFERROR(AI{self.nex_line}/AH{self.nex_line};0)",
+                    f"='План'!O{sheet.nex_line}",
+                    f"='План'!P{sheet.nex_line}",
+                    f"=IFERROR(AI{sheet.nex_line}/AH{sheet.nex_line};0)",
                     0,
                     0,
-                    f"=IFERROR(AL{self.nex_line}/AK{self.nex_line};0)",
+                    f"=IFERROR(AL{sheet.nex_line}/AK{sheet.nex_line};0)",
                     fin_report_last_year["УЛËТSHOP"][0],
                     fin_report_last_year["УЛËТSHOP"][1],
-                    f"=IFERROR(AO{self.nex_line}/AN{self.nex_line};0)",
+                    f"=IFERROR(AO{sheet.nex_line}/AN{sheet.nex_line};0)",
                     # Аренда полотенец
-                    f"='План'!R{self.nex_line}",
-                    f"='План'!S{self.nex_line}",
-                    f"=IFERROR(AR{self.nex_line}/AQ{self.nex_line};0)",
+                    f"='План'!R{sheet.nex_line}",
+                    f"='План'!S{sheet.nex_line}",
+                    f"=IFERROR(AR{sheet.nex_line}/AQ{sheet.nex_line};0)",
                     fin_report["Аренда полотенец"][0],
                     fin_report["Аренда полотенец"][1],
-                    f"=IFERROR(AU{self.nex_line}/AT{self.nex_line};0)",
+                    f"=IFERROR(AU{sheet.nex_line}/AT{sheet.nex_line};0)",
                     fin_report_last_year["Аренда полотенец"][0],
                     fin_report_last_year["Аренда полотенец"][1],
-                    f"=IFERROR(AX{self.nex_line}/AW{self.nex_line};0)",
+                    f"=IFERROR(AX{sheet.nex_line}/AW{sheet.nex_line};0)",
                     # Фишпиллинг
-                    f"='План'!U{self.nex_line}",
-                    f"='План'!V{self.nex_line}",
-                    f"=IFERROR(BA{self.nex_line}/AZ{self.nex_line};0)",
+                    f"='План'!U{sheet.nex_line}",
+                    f"='План'!V{sheet.nex_line}",
+                    f"=IFERROR(BA{sheet.nex_line}/AZ{sheet.nex_line};0)",
                     fin_report["Фишпиллинг"][0],
                     fin_report["Фишпиллинг"][1],
-                    f"=IFERROR(BD{self.nex_line}/BC{self.nex_line};0)",
+                    f"=IFERROR(BD{sheet.nex_line}/BC{sheet.nex_line};0)",
                     fin_report_last_year["Фишпиллинг"][0],
                     fin_report_last_year["Фишпиллинг"][1],
-                    f"=IFERROR(BG{self.nex_line}/BF{self.nex_line};0)",
+                    f"=IFERROR(BG{sheet.nex_line}/BF{sheet.nex_line};0)",
                     # Билеты аквапарка КОРП
                     fin_report["Билеты аквапарка КОРП"][0],
                     fin_report["Билеты аквапарка КОРП"][1],
-                    f"=IFERROR(BJ{self.nex_line}/BI{self.nex_line};0)",
+                    f"=IFERROR(BJ{sheet.nex_line}/BI{sheet.nex_line};0)",
                     fin_report["Прочее"][0] + fin_report["Сопутствующие товары"][0],
                     fin_report["Прочее"][1] + fin_report["Сопутствующие товары"][1],
                     fin_report["Online Продажи"][0],
                     fin_report["Online Продажи"][1],
-                    f"=IFERROR(BO{self.nex_line}/BN{self.nex_line};0)",
+                    f"=IFERROR(BO{sheet.nex_line}/BN{sheet.nex_line};0)",
                     # Нулевые
                     fin_report["Нулевые"][0],
                     fin_report["Нулевые"][1],
-                    f"=IFERROR(BR{self.nex_line}/BQ{self.nex_line};0)",
+                    f"=IFERROR(BR{sheet.nex_line}/BQ{sheet.nex_line};0)",
                     0,
                     0,
                 ]
@@ -801,7 +975,7 @@ class BarsicReport2Service:
 
         # Задание форматы вывода строки
         ss.prepare_setCellsFormats(
-            f"A{self.nex_line}:BU{self.nex_line}",
+            f"A{sheet.nex_line}:BU{sheet.nex_line}",
             [
                 [
                     {
@@ -892,18 +1066,18 @@ class BarsicReport2Service:
             ],
         )
         # Цвет фона ячеек
-        if self.nex_line % 2 != 0:
+        if sheet.nex_line % 2 != 0:
             ss.prepare_setCellsFormat(
-                f"A{self.nex_line}:BU{self.nex_line}",
+                f"A{sheet.nex_line}:BU{sheet.nex_line}",
                 {"backgroundColor": functions.htmlColorToJSON("#fef8e3")},
                 fields="userEnteredFormat.backgroundColor",
             )
 
         # Бордер
-        for j in range(self.sheet_width):
+        for j in range(SHEET_WIDTH):
             ss.set_border_format(
-                start_row=self.nex_line - 1,
-                end_row=self.nex_line,
+                start_row=sheet.nex_line - 1,
+                end_row=sheet.nex_line,
                 start_col=j,
                 end_col=j + 1,
             )
@@ -913,20 +1087,20 @@ class BarsicReport2Service:
         # Вычисление последней строки в таблице
         logger.info("Заполнение строки ИТОГО на листе 1...")
 
-        self.sheet2_line = 1
-        for line_table in self.spreadsheet["sheets"][2]["data"][0]["rowData"]:
+        sheet.sheet2_line = 1
+        for line_table in sheet.spreadsheet["sheets"][2]["data"][0]["rowData"]:
             try:
                 if line_table["values"][0]["formattedValue"] == "ИТОГО":
                     break
-                self.sheet2_line += 1
+                sheet.sheet2_line += 1
             except KeyError:
-                self.sheet2_line += 1
+                sheet.sheet2_line += 1
 
-        for i, line_table in enumerate(self.spreadsheet["sheets"][0]["data"][0]["rowData"]):
+        for i, line_table in enumerate(sheet.spreadsheet["sheets"][0]["data"][0]["rowData"]):
             try:
                 if line_table["values"][0]["formattedValue"] == "ИТОГО":
                     # Если строка переписывается - итого на 1 поз вниз, если новая - на 2 поз
-                    height_table = i + self.reprint
+                    height_table = i + sheet.reprint
                     break
                 height_table = 4
             except KeyError:
@@ -1019,7 +1193,7 @@ class BarsicReport2Service:
                 [
                     "Выполнение плана (трафик)",
                     "",
-                    f"=IFERROR('План'!C{self.sheet2_line};0)",
+                    f"=IFERROR('План'!C{sheet.sheet2_line};0)",
                     f"=IFERROR(ROUND(D{height_table}/C{height_table + 1};2);0)",
                 ]
             ],
@@ -1031,7 +1205,7 @@ class BarsicReport2Service:
                 [
                     "Выполнение плана (доход)",
                     "",
-                    f"=IFERROR('План'!E{self.sheet2_line};0)",
+                    f"=IFERROR('План'!E{sheet.sheet2_line};0)",
                     f"=IFERROR(ROUND(G{height_table}/C{height_table + 2};2);0)",
                 ]
             ],
@@ -1371,7 +1545,7 @@ class BarsicReport2Service:
         )
 
         # Бордер
-        for j in range(self.sheet_width):
+        for j in range(SHEET_WIDTH):
             ss.set_border_format(
                 start_row=height_table - 1,
                 end_row=height_table,
@@ -1397,21 +1571,21 @@ class BarsicReport2Service:
         logger.info("Заполнение листа 2...")
         sheetId = 1
         ss = Spreadsheet(
-            self.spreadsheet["spreadsheetId"],
+            sheet.spreadsheet["spreadsheetId"],
             sheetId,
             googleservice,
-            self.spreadsheet["sheets"][sheetId]["properties"]["title"],
+            sheet.spreadsheet["sheets"][sheetId]["properties"]["title"],
         )
 
-        self.nex_line = self.start_line
+        sheet.nex_line = sheet.start_line
 
         ss.prepare_setValues(
-            f"A{self.nex_line}:C{self.nex_line}",
+            f"A{sheet.nex_line}:C{sheet.nex_line}",
             [
                 [
                     datetime.strftime(fin_report["Дата"][0], "%d.%m.%Y"),
-                    self.smile_report.total_count,
-                    self.smile_report.total_sum,
+                    report.smile_report.total_count,
+                    report.smile_report.total_sum,
                 ]
             ],
             "ROWS",
@@ -1419,7 +1593,7 @@ class BarsicReport2Service:
 
         # Задание форматы вывода строки
         ss.prepare_setCellsFormats(
-            f"A{self.nex_line}:C{self.nex_line}",
+            f"A{sheet.nex_line}:C{sheet.nex_line}",
             [
                 [
                     {
@@ -1432,18 +1606,18 @@ class BarsicReport2Service:
             ],
         )
         # Цвет фона ячеек
-        if self.nex_line % 2 != 0:
+        if sheet.nex_line % 2 != 0:
             ss.prepare_setCellsFormat(
-                f"A{self.nex_line}:C{self.nex_line}",
+                f"A{sheet.nex_line}:C{sheet.nex_line}",
                 {"backgroundColor": functions.htmlColorToJSON("#fef8e3")},
                 fields="userEnteredFormat.backgroundColor",
             )
 
         # Бордер
-        for j in range(self.sheet2_width):
+        for j in range(SHEET2_WIDTH):
             ss.set_border_format(
-                start_row=self.nex_line - 1,
-                end_row=self.nex_line,
+                start_row=sheet.nex_line - 1,
+                end_row=sheet.nex_line,
                 start_col=j,
                 end_col=j + 1,
             )
@@ -1452,11 +1626,11 @@ class BarsicReport2Service:
         # Вычисление последней строки в таблице
         logger.info("Заполнение строки ИТОГО на листе 2...")
 
-        for i, line_table in enumerate(self.spreadsheet["sheets"][1]["data"][0]["rowData"]):
+        for i, line_table in enumerate(sheet.spreadsheet["sheets"][1]["data"][0]["rowData"]):
             try:
                 if line_table["values"][0]["formattedValue"] == "ИТОГО":
                     # Если строка переписывается - итого на 1 поз вниз, если новая - на 2 поз
-                    height_table = i + self.reprint
+                    height_table = i + sheet.reprint
                     break
                 height_table = 4
             except KeyError:
@@ -1498,7 +1672,7 @@ class BarsicReport2Service:
         )
 
         # Бордер
-        for j in range(self.sheet2_width):
+        for j in range(SHEET2_WIDTH):
             ss.set_border_format(
                 start_row=height_table - 1,
                 end_row=height_table,
@@ -1507,37 +1681,37 @@ class BarsicReport2Service:
             )
         ss.runPrepared()
 
-        if self.itog_report_month:
+        if report.itog_report_month:
             # SHEET 4
             logger.info("Заполнение  листа 4...")
             sheetId = 3
             ss = Spreadsheet(
-                self.spreadsheet["spreadsheetId"],
+                sheet.spreadsheet["spreadsheetId"],
                 sheetId,
                 googleservice,
-                self.spreadsheet["sheets"][sheetId]["properties"]["title"],
+                sheet.spreadsheet["sheets"][sheetId]["properties"]["title"],
             )
 
-            self.nex_line = 1
+            sheet.nex_line = 1
             ss.prepare_setValues(
-                f"A{self.nex_line}:C{self.nex_line}",
+                f"A{sheet.nex_line}:C{sheet.nex_line}",
                 [["Итоговый отчет", "", ""]],
                 "ROWS",
             )
             ss.prepare_setCellsFormat(
-                f"A{self.nex_line}:C{self.nex_line}",
+                f"A{sheet.nex_line}:C{sheet.nex_line}",
                 {
                     "horizontalAlignment": "LEFT",
                     "textFormat": {"bold": True, "fontSize": 18},
                 },
             )
 
-            self.nex_line += 1
+            sheet.nex_line += 1
             ss.prepare_setValues(
-                f"A{self.nex_line}:C{self.nex_line}",
+                f"A{sheet.nex_line}:C{sheet.nex_line}",
                 [
                     [
-                        f"За {self.data_report} {datetime.strftime(fin_report['Дата'][0], '%Y')}",
+                        f"За {sheet.data_report} {datetime.strftime(fin_report['Дата'][0], '%Y')}",
                         "",
                         "",
                     ]
@@ -1545,45 +1719,45 @@ class BarsicReport2Service:
                 "ROWS",
             )
             ss.prepare_setCellsFormat(
-                f"A{self.nex_line}:C{self.nex_line}",
+                f"A{sheet.nex_line}:C{sheet.nex_line}",
                 {"horizontalAlignment": "LEFT", "textFormat": {"bold": False}},
             )
 
-            self.nex_line += 2
+            sheet.nex_line += 2
             ss.prepare_setValues(
-                f"A{self.nex_line}:C{self.nex_line}",
+                f"A{sheet.nex_line}:C{sheet.nex_line}",
                 [["Название", "Количество", "Сумма"]],
                 "ROWS",
             )
             ss.prepare_setCellsFormat(
-                f"A{self.nex_line}:C{self.nex_line}",
+                f"A{sheet.nex_line}:C{sheet.nex_line}",
                 {
                     "horizontalAlignment": "LEFT",
                     "textFormat": {"bold": True, "fontSize": 14},
                 },
             )
             ss.prepare_setCellsFormat(
-                f"A{self.nex_line}:C{self.nex_line}",
+                f"A{sheet.nex_line}:C{sheet.nex_line}",
                 {"backgroundColor": functions.htmlColorToJSON("#f7cb4d")},
                 fields="userEnteredFormat.backgroundColor",
             )
-            for j in range(self.sheet4_width):
+            for j in range(SHEET4_WIDTH):
                 ss.set_border_format(
-                    start_row=self.nex_line - 1,
-                    end_row=self.nex_line,
+                    start_row=sheet.nex_line - 1,
+                    end_row=sheet.nex_line,
                     start_col=j,
                     end_col=j + 1,
                 )
             ss.runPrepared()
 
-            for group, group_values in self.finreport_dict_month.items():
+            for group, group_values in sheet.reports.finreport_dict_month.items():
                 if group == "Контрольная сумма":
                     continue
                 if group == "Дата":
                     continue
-                self.nex_line += 1
+                sheet.nex_line += 1
                 ss.prepare_setValues(
-                    f"A{self.nex_line}:C{self.nex_line}",
+                    f"A{sheet.nex_line}:C{sheet.nex_line}",
                     [
                         [
                             group,
@@ -1594,7 +1768,7 @@ class BarsicReport2Service:
                     "ROWS",
                 )
                 ss.prepare_setCellsFormats(
-                    f"A{self.nex_line}:C{self.nex_line}",
+                    f"A{sheet.nex_line}:C{sheet.nex_line}",
                     [
                         [
                             {"textFormat": {"bold": True, "fontSize": 12}},
@@ -1615,14 +1789,14 @@ class BarsicReport2Service:
                     ],
                 )
                 ss.prepare_setCellsFormat(
-                    f"A{self.nex_line}:C{self.nex_line}",
+                    f"A{sheet.nex_line}:C{sheet.nex_line}",
                     {"backgroundColor": functions.htmlColorToJSON("#fce8b2")},
                     fields="userEnteredFormat.backgroundColor",
                 )
-                for j in range(self.sheet4_width):
+                for j in range(SHEET4_WIDTH):
                     ss.set_border_format(
-                        start_row=self.nex_line - 1,
-                        end_row=self.nex_line,
+                        start_row=sheet.nex_line - 1,
+                        end_row=sheet.nex_line,
                         start_col=j,
                         end_col=j + 1,
                     )
@@ -1632,10 +1806,10 @@ class BarsicReport2Service:
                         continue
                     if folder == "":
                         continue
-                    self.nex_line += 1
+                    sheet.nex_line += 1
                     folder_name = "Без группировки" if folder is None else folder
                     ss.prepare_setValues(
-                        f"A{self.nex_line}:C{self.nex_line}",
+                        f"A{sheet.nex_line}:C{sheet.nex_line}",
                         [
                             [
                                 folder_name,
@@ -1646,7 +1820,7 @@ class BarsicReport2Service:
                         "ROWS",
                     )
                     ss.prepare_setCellsFormats(
-                        f"A{self.nex_line}:C{self.nex_line}",
+                        f"A{sheet.nex_line}:C{sheet.nex_line}",
                         [
                             [
                                 {"textFormat": {"bold": True}},
@@ -1667,14 +1841,14 @@ class BarsicReport2Service:
                         ],
                     )
                     ss.prepare_setCellsFormat(
-                        f"A{self.nex_line}:C{self.nex_line}",
+                        f"A{sheet.nex_line}:C{sheet.nex_line}",
                         {"backgroundColor": functions.htmlColorToJSON("#fef8e3")},
                         fields="userEnteredFormat.backgroundColor",
                     )
-                    for j in range(self.sheet4_width):
+                    for j in range(SHEET4_WIDTH):
                         ss.set_border_format(
-                            start_row=self.nex_line - 1,
-                            end_row=self.nex_line,
+                            start_row=sheet.nex_line - 1,
+                            end_row=sheet.nex_line,
                             start_col=j,
                             end_col=j + 1,
                         )
@@ -1682,14 +1856,14 @@ class BarsicReport2Service:
                     for service_name, service_count, service_sum in folder_values:
                         if service_name == "Итого по папке":
                             continue
-                        self.nex_line += 1
+                        sheet.nex_line += 1
                         ss.prepare_setValues(
-                            f"A{self.nex_line}:C{self.nex_line}",
+                            f"A{sheet.nex_line}:C{sheet.nex_line}",
                             [[service_name, service_count, service_sum]],
                             "ROWS",
                         )
                         ss.prepare_setCellsFormats(
-                            f"A{self.nex_line}:C{self.nex_line}",
+                            f"A{sheet.nex_line}:C{sheet.nex_line}",
                             [
                                 [
                                     {"textFormat": {"bold": False}},
@@ -1709,33 +1883,33 @@ class BarsicReport2Service:
                                 ]
                             ],
                         )
-                        for j in range(self.sheet4_width):
+                        for j in range(SHEET4_WIDTH):
                             ss.set_border_format(
-                                start_row=self.nex_line - 1,
-                                end_row=self.nex_line,
+                                start_row=sheet.nex_line - 1,
+                                end_row=sheet.nex_line,
                                 start_col=j,
                                 end_col=j + 1,
                             )
 
-            while self.nex_line < self.sheet4_height:
-                self.nex_line += 1
-                ss.prepare_setValues(f"A{self.nex_line}:C{self.nex_line}", [["", "", ""]], "ROWS")
+            while sheet.nex_line < SHEET4_HEIGHT:
+                sheet.nex_line += 1
+                ss.prepare_setValues(f"A{sheet.nex_line}:C{sheet.nex_line}", [["", "", ""]], "ROWS")
                 ss.prepare_setCellsFormat(
-                    f"A{self.nex_line}:C{self.nex_line}",
+                    f"A{sheet.nex_line}:C{sheet.nex_line}",
                     {
                         "horizontalAlignment": "LEFT",
                         "textFormat": {"bold": False, "fontSize": 10},
                     },
                 )
                 ss.prepare_setCellsFormat(
-                    f"A{self.nex_line}:C{self.nex_line}",
+                    f"A{sheet.nex_line}:C{sheet.nex_line}",
                     {"backgroundColor": functions.htmlColorToJSON("#ffffff")},
                     fields="userEnteredFormat.backgroundColor",
                 )
-                for j in range(self.sheet4_width):
+                for j in range(SHEET4_WIDTH):
                     ss.set_border_format(
-                        start_row=self.nex_line - 1,
-                        end_row=self.nex_line,
+                        start_row=sheet.nex_line - 1,
+                        end_row=sheet.nex_line,
                         start_col=j,
                         end_col=j + 1,
                         style="NONE",
@@ -1747,32 +1921,32 @@ class BarsicReport2Service:
             logger.info("Заполнение  листа 5...")
             sheetId = 4
             ss = Spreadsheet(
-                self.spreadsheet["spreadsheetId"],
+                sheet.spreadsheet["spreadsheetId"],
                 sheetId,
                 googleservice,
-                self.spreadsheet["sheets"][sheetId]["properties"]["title"],
+                sheet.spreadsheet["sheets"][sheetId]["properties"]["title"],
             )
 
-            self.nex_line = 1
+            sheet.nex_line = 1
             ss.prepare_setValues(
-                f"A{self.nex_line}:C{self.nex_line}",
+                f"A{sheet.nex_line}:C{sheet.nex_line}",
                 [["Итоговый отчет платежного агента", "", ""]],
                 "ROWS",
             )
             ss.prepare_setCellsFormat(
-                f"A{self.nex_line}:C{self.nex_line}",
+                f"A{sheet.nex_line}:C{sheet.nex_line}",
                 {
                     "horizontalAlignment": "LEFT",
                     "textFormat": {"bold": True, "fontSize": 18},
                 },
             )
 
-            self.nex_line += 1
+            sheet.nex_line += 1
             ss.prepare_setValues(
-                f"A{self.nex_line}:C{self.nex_line}",
+                f"A{sheet.nex_line}:C{sheet.nex_line}",
                 [
                     [
-                        f"За {self.data_report} {datetime.strftime(fin_report['Дата'][0], '%Y')}",
+                        f"За {sheet.data_report} {datetime.strftime(fin_report['Дата'][0], '%Y')}",
                         "",
                         "",
                     ]
@@ -1780,58 +1954,58 @@ class BarsicReport2Service:
                 "ROWS",
             )
             ss.prepare_setCellsFormat(
-                f"A{self.nex_line}:C{self.nex_line}",
+                f"A{sheet.nex_line}:C{sheet.nex_line}",
                 {"horizontalAlignment": "LEFT", "textFormat": {"bold": False}},
             )
 
-            self.nex_line += 2
+            sheet.nex_line += 2
             ss.prepare_setValues(
-                f"A{self.nex_line}:C{self.nex_line}",
+                f"A{sheet.nex_line}:C{sheet.nex_line}",
                 [["Название", "Количество", "Сумма"]],
                 "ROWS",
             )
             ss.prepare_setCellsFormat(
-                f"A{self.nex_line}:C{self.nex_line}",
+                f"A{sheet.nex_line}:C{sheet.nex_line}",
                 {
                     "horizontalAlignment": "LEFT",
                     "textFormat": {"bold": True, "fontSize": 14},
                 },
             )
             ss.prepare_setCellsFormat(
-                f"A{self.nex_line}:C{self.nex_line}",
+                f"A{sheet.nex_line}:C{sheet.nex_line}",
                 {"backgroundColor": functions.htmlColorToJSON("#f7cb4d")},
                 fields="userEnteredFormat.backgroundColor",
             )
-            for j in range(self.sheet5_width):
+            for j in range(SHEET5_WIDTH):
                 ss.set_border_format(
-                    start_row=self.nex_line - 1,
-                    end_row=self.nex_line,
+                    start_row=sheet.nex_line - 1,
+                    end_row=sheet.nex_line,
                     start_col=j,
                     end_col=j + 1,
                 )
             ss.runPrepared()
 
-            for group in self.agentreport_dict_month:
+            for group in sheet.reports.agentreport_dict_month:
                 if group == "Контрольная сумма":
                     continue
                 if group == "Дата":
                     continue
                 if group == "Не учитывать":
                     continue
-                self.nex_line += 1
+                sheet.nex_line += 1
                 ss.prepare_setValues(
-                    f"A{self.nex_line}:C{self.nex_line}",
+                    f"A{sheet.nex_line}:C{sheet.nex_line}",
                     [
                         [
                             group,
-                            self.agentreport_dict_month[group]["Итого по группе"][0][1],
-                            self.agentreport_dict_month[group]["Итого по группе"][0][2],
+                            sheet.reports.agentreport_dict_month[group]["Итого по группе"][0][1],
+                            sheet.reports.agentreport_dict_month[group]["Итого по группе"][0][2],
                         ]
                     ],
                     "ROWS",
                 )
                 ss.prepare_setCellsFormats(
-                    f"A{self.nex_line}:C{self.nex_line}",
+                    f"A{sheet.nex_line}:C{sheet.nex_line}",
                     [
                         [
                             {"textFormat": {"bold": True, "fontSize": 12}},
@@ -1852,38 +2026,38 @@ class BarsicReport2Service:
                     ],
                 )
                 ss.prepare_setCellsFormat(
-                    f"A{self.nex_line}:C{self.nex_line}",
+                    f"A{sheet.nex_line}:C{sheet.nex_line}",
                     {"backgroundColor": functions.htmlColorToJSON("#fce8b2")},
                     fields="userEnteredFormat.backgroundColor",
                 )
-                for j in range(self.sheet4_width):
+                for j in range(SHEET4_WIDTH):
                     ss.set_border_format(
-                        start_row=self.nex_line - 1,
-                        end_row=self.nex_line,
+                        start_row=sheet.nex_line - 1,
+                        end_row=sheet.nex_line,
                         start_col=j,
                         end_col=j + 1,
                     )
 
-                for folder in self.agentreport_dict_month[group]:
+                for folder in sheet.reports.agentreport_dict_month[group]:
                     if folder == "Итого по группе":
                         continue
                     if folder == "":
                         continue
-                    self.nex_line += 1
+                    sheet.nex_line += 1
                     folder_name = "Без группировки" if folder is None else folder
                     ss.prepare_setValues(
-                        f"A{self.nex_line}:C{self.nex_line}",
+                        f"A{sheet.nex_line}:C{sheet.nex_line}",
                         [
                             [
                                 folder_name,
-                                self.agentreport_dict_month[group][folder][0][1],
-                                self.agentreport_dict_month[group][folder][0][2],
+                                sheet.reports.agentreport_dict_month[group][folder][0][1],
+                                sheet.reports.agentreport_dict_month[group][folder][0][2],
                             ]
                         ],
                         "ROWS",
                     )
                     ss.prepare_setCellsFormats(
-                        f"A{self.nex_line}:C{self.nex_line}",
+                        f"A{sheet.nex_line}:C{sheet.nex_line}",
                         [
                             [
                                 {"textFormat": {"bold": True}},
@@ -1904,29 +2078,29 @@ class BarsicReport2Service:
                         ],
                     )
                     ss.prepare_setCellsFormat(
-                        f"A{self.nex_line}:C{self.nex_line}",
+                        f"A{sheet.nex_line}:C{sheet.nex_line}",
                         {"backgroundColor": functions.htmlColorToJSON("#fef8e3")},
                         fields="userEnteredFormat.backgroundColor",
                     )
-                    for j in range(self.sheet4_width):
+                    for j in range(SHEET4_WIDTH):
                         ss.set_border_format(
-                            start_row=self.nex_line - 1,
-                            end_row=self.nex_line,
+                            start_row=sheet.nex_line - 1,
+                            end_row=sheet.nex_line,
                             start_col=j,
                             end_col=j + 1,
                         )
 
-                    for servise in self.agentreport_dict_month[group][folder]:
+                    for servise in sheet.reports.agentreport_dict_month[group][folder]:
                         if servise[0] == "Итого по папке":
                             continue
-                        self.nex_line += 1
+                        sheet.nex_line += 1
                         ss.prepare_setValues(
-                            f"A{self.nex_line}:C{self.nex_line}",
+                            f"A{sheet.nex_line}:C{sheet.nex_line}",
                             [[servise[0], servise[1], servise[2]]],
                             "ROWS",
                         )
                         ss.prepare_setCellsFormats(
-                            f"A{self.nex_line}:C{self.nex_line}",
+                            f"A{sheet.nex_line}:C{sheet.nex_line}",
                             [
                                 [
                                     {"textFormat": {"bold": False}},
@@ -1946,33 +2120,33 @@ class BarsicReport2Service:
                                 ]
                             ],
                         )
-                        for j in range(self.sheet5_width):
+                        for j in range(SHEET5_WIDTH):
                             ss.set_border_format(
-                                start_row=self.nex_line - 1,
-                                end_row=self.nex_line,
+                                start_row=sheet.nex_line - 1,
+                                end_row=sheet.nex_line,
                                 start_col=j,
                                 end_col=j + 1,
                             )
 
-            while self.nex_line < self.sheet5_height:
-                self.nex_line += 1
-                ss.prepare_setValues(f"A{self.nex_line}:C{self.nex_line}", [["", "", ""]], "ROWS")
+            while sheet.nex_line < SHEET5_HEIGHT:
+                sheet.nex_line += 1
+                ss.prepare_setValues(f"A{sheet.nex_line}:C{sheet.nex_line}", [["", "", ""]], "ROWS")
                 ss.prepare_setCellsFormat(
-                    f"A{self.nex_line}:C{self.nex_line}",
+                    f"A{sheet.nex_line}:C{sheet.nex_line}",
                     {
                         "horizontalAlignment": "LEFT",
                         "textFormat": {"bold": False, "fontSize": 10},
                     },
                 )
                 ss.prepare_setCellsFormat(
-                    f"A{self.nex_line}:C{self.nex_line}",
+                    f"A{sheet.nex_line}:C{sheet.nex_line}",
                     {"backgroundColor": functions.htmlColorToJSON("#ffffff")},
                     fields="userEnteredFormat.backgroundColor",
                 )
-                for j in range(self.sheet5_width):
+                for j in range(SHEET5_WIDTH):
                     ss.set_border_format(
-                        start_row=self.nex_line - 1,
-                        end_row=self.nex_line,
+                        start_row=sheet.nex_line - 1,
+                        end_row=sheet.nex_line,
                         start_col=j,
                         end_col=j + 1,
                         style="NONE",
@@ -1984,10 +2158,10 @@ class BarsicReport2Service:
         logger.info("Заполнение листа 6...")
         sheetId = 5
         ss = Spreadsheet(
-            self.spreadsheet["spreadsheetId"],
+            sheet.spreadsheet["spreadsheetId"],
             sheetId,
             googleservice,
-            self.spreadsheet["sheets"][sheetId]["properties"]["title"],
+            sheet.spreadsheet["sheets"][sheetId]["properties"]["title"],
         )
 
         # Заполнение строки с данными
@@ -2000,28 +2174,28 @@ class BarsicReport2Service:
             "Суббота",
             "Воскресенье",
         ]
-        self.nex_line = self.start_line
+        sheet.nex_line = sheet.start_line
         if settings.add_beach_report:
             ss.prepare_setValues(
-                f"A{self.nex_line}:P{self.nex_line}",
+                f"A{sheet.nex_line}:P{sheet.nex_line}",
                 [
                     [
                         datetime.strftime(fin_report_beach["Дата"][0], "%d.%m.%Y"),
                         weekday_rus[fin_report_beach["Дата"][0].weekday()],
-                        f"='План'!L{self.nex_line}",
+                        f"='План'!L{sheet.nex_line}",
                         fin_report_beach["Выход с пляжа"][0],
-                        f"='План'!M{self.nex_line}",
+                        f"='План'!M{sheet.nex_line}",
                         str(fin_report_beach["Итого по отчету"][1]).replace(".", ","),
                         fin_report_beach["Депозит"][1],
                         fin_report_beach["Карты"][0],
                         fin_report_beach["Карты"][1],
-                        f"=IFERROR(I{self.nex_line}/H{self.nex_line};0)",
+                        f"=IFERROR(I{sheet.nex_line}/H{sheet.nex_line};0)",
                         fin_report_beach["Услуги"][0],
                         fin_report_beach["Услуги"][1],
-                        f"=IFERROR(L{self.nex_line}/K{self.nex_line};0)",
+                        f"=IFERROR(L{sheet.nex_line}/K{sheet.nex_line};0)",
                         fin_report_beach["Товары"][0],
                         fin_report_beach["Товары"][1],
-                        f"=IFERROR(O{self.nex_line}/N{self.nex_line};0)",
+                        f"=IFERROR(O{sheet.nex_line}/N{sheet.nex_line};0)",
                     ]
                 ],
                 "ROWS",
@@ -2029,7 +2203,7 @@ class BarsicReport2Service:
 
         # Задание форматы вывода строки
         ss.prepare_setCellsFormats(
-            f"A{self.nex_line}:P{self.nex_line}",
+            f"A{sheet.nex_line}:P{sheet.nex_line}",
             [
                 [
                     {
@@ -2055,18 +2229,18 @@ class BarsicReport2Service:
             ],
         )
         # Цвет фона ячеек
-        if self.nex_line % 2 != 0:
+        if sheet.nex_line % 2 != 0:
             ss.prepare_setCellsFormat(
-                f"A{self.nex_line}:P{self.nex_line}",
+                f"A{sheet.nex_line}:P{sheet.nex_line}",
                 {"backgroundColor": functions.htmlColorToJSON("#fef8e3")},
                 fields="userEnteredFormat.backgroundColor",
             )
 
         # Бордер
-        for j in range(self.sheet6_width):
+        for j in range(SHEET6_WIDTH):
             ss.set_border_format(
-                start_row=self.nex_line - 1,
-                end_row=self.nex_line,
+                start_row=sheet.nex_line - 1,
+                end_row=sheet.nex_line,
                 start_col=j,
                 end_col=j + 1,
             )
@@ -2074,11 +2248,11 @@ class BarsicReport2Service:
         # ------------------------------------------- Заполнение ИТОГО --------------------------------------
         logger.info("Заполнение строки ИТОГО на листе 2...")
 
-        for i, line_table in enumerate(self.spreadsheet["sheets"][1]["data"][0]["rowData"]):
+        for i, line_table in enumerate(sheet.spreadsheet["sheets"][1]["data"][0]["rowData"]):
             try:
                 if line_table["values"][0]["formattedValue"] == "ИТОГО":
                     # Если строка переписывается - итого на 1 поз вниз, если новая - на 2 поз
-                    height_table = i + self.reprint
+                    height_table = i + sheet.reprint
                     break
                 height_table = 4
             except KeyError:
@@ -2114,7 +2288,7 @@ class BarsicReport2Service:
                 [
                     "Выполнение плана (трафик)",
                     "",
-                    f"=IFERROR('План'!L{self.sheet2_line};0)",
+                    f"=IFERROR('План'!L{sheet.sheet2_line};0)",
                     f"=IFERROR(ROUND(D{height_table}/C{height_table + 1};2);0)",
                 ]
             ],
@@ -2126,7 +2300,7 @@ class BarsicReport2Service:
                 [
                     "Выполнение плана (доход)",
                     "",
-                    f"=IFERROR('План'!M{self.sheet2_line};0)",
+                    f"=IFERROR('План'!M{sheet.sheet2_line};0)",
                     f"=IFERROR(ROUND(F{height_table}/C{height_table + 2};2);0)",
                 ]
             ],
@@ -2280,7 +2454,7 @@ class BarsicReport2Service:
         )
 
         # Бордер
-        for j in range(self.sheet6_width):
+        for j in range(SHEET6_WIDTH):
             ss.set_border_format(
                 start_row=height_table - 1,
                 end_row=height_table,
@@ -2303,7 +2477,7 @@ class BarsicReport2Service:
             )
         ss.runPrepared()
 
-    def sms_report(self, date_from, fin_report: dict) -> str:
+    def sms_report(self, date_from, fin_report: dict, report: LoadedReports) -> str:
         """Составляет текстовую версию финансового отчета."""
 
         logger.info("Составление SMS-отчета...")
@@ -2343,10 +2517,10 @@ class BarsicReport2Service:
 
         resporse += f"Общая ИТОГО - {total_sum:.2f} ₽;\n\n"
 
-        if settings.add_beach_report and self.itog_report_beach["Итого по отчету"][1]:
+        if settings.add_beach_report and report.itog_report_beach["Итого по отчету"][1]:
             with contextlib.suppress(KeyError):
-                resporse += f"Люди (пляж) - {self.itog_report_beach['Летняя зона | БЕЗЛИМИТ | 1 проход'][0]};\n"
-            resporse += f"Итого по пляжу - {self.itog_report_beach['Итого по отчету'][1]:.2f} ₽;\n"
+                resporse += f"Люди (пляж) - {report.itog_report_beach['Летняя зона | БЕЗЛИМИТ | 1 проход'][0]};\n"
+            resporse += f"Итого по пляжу - {report.itog_report_beach['Итого по отчету'][1]:.2f} ₽;\n"
 
         resporse += "Без ЧП."
 
@@ -2356,14 +2530,13 @@ class BarsicReport2Service:
 
     async def save_reports(
         self,
+        report: LoadedReports,
         date_from,
         aqua_company: Company,
         fin_report_config: dict[str, Any],
         total_report_config: dict[str, Any],
         agent_report_config: dict[str, Any],
-        customer_count: int = 0,
-        customer_count_last_year: int = 0,
-    ) -> tuple[list[str], list[str]]:
+    ) -> DayReports:
         """
         Функция управления
         """
@@ -2371,11 +2544,11 @@ class BarsicReport2Service:
         to_yandex = []
         to_messanger = []
 
-        self.fin_report = self.create_fin_report(fin_report_config, customer_count)
+        fin_report = self.create_fin_report(report, fin_report_config, report.customer_count)
         payment_agent_report = self.create_payment_agent_report(
             functions.concatenate_total_reports(
-                self.itog_reports[0],
-                {"Смайл": (self.smile_report.total_count, self.smile_report.total_sum)},
+                report.itog_reports[0],
+                {"Смайл": (report.smile_report.total_count, report.smile_report.total_sum)},
             ),
             agent_report_config=agent_report_config,
             aqua_company=aqua_company,
@@ -2383,23 +2556,61 @@ class BarsicReport2Service:
         # agentreport_xls
         to_yandex.append(self._yandex_repo.export_payment_agent_report(payment_agent_report, date_from))
         # finreport_google
-        self.fin_report_last_year = self.create_fin_report_last_year(fin_report_config, customer_count_last_year)
-        self.fin_report_beach = self.create_fin_report_beach()
+        fin_report_last_year = self.create_fin_report_last_year(
+            report, fin_report_config, report.customer_count_last_year
+        )
+        fin_report_beach = self.create_fin_report_beach(report)
 
-        self.finreport_dict_month = None
-        if self.itog_report_month:
-            self.finreport_dict_month = functions.create_month_finance_report(
-                itog_report_month=self.itog_report_month,
+        finreport_dict_month = agentreport_dict_month = None
+        if report.itog_report_month:
+            finreport_dict_month = functions.create_month_finance_report(
+                itog_report_month=report.itog_report_month,
                 total_report_config=total_report_config,
                 fin_report_config=fin_report_config,
-                smile_report_month=self.smile_report_month,
+                smile_report_month=report.smile_report_month,
             )
-            self.agentreport_dict_month = functions.create_month_agent_report(
-                month_total_report=self.itog_report_month,
+            agentreport_dict_month = functions.create_month_agent_report(
+                month_total_report=report.itog_report_month,
                 agent_report_config=agent_report_config,
-                smile_report_month=self.smile_report_month,
+                smile_report_month=report.smile_report_month,
             )
 
+        fin_reports = FinReports(
+            fin_report=fin_report,
+            fin_report_last_year=fin_report_last_year,
+            fin_report_beach=fin_report_beach,
+            finreport_dict_month=finreport_dict_month,
+            agentreport_dict_month=agentreport_dict_month,
+        )
+
+        # finreport_telegram:
+        to_messanger.append(self.sms_report(date_from, fin_report=fin_report, report=report))
+
+        # check_itogreport_xls:
+        for itog_report in report.itog_reports:
+            if itog_report["Итого по отчету"][1]:
+                to_yandex.append(self._yandex_repo.save_organisation_total(itog_report, date_from))
+
+        if settings.add_beach_report and report.itog_report_beach["Итого по отчету"][1]:
+            to_yandex.append(self._yandex_repo.save_organisation_total(report.itog_report_beach, date_from))
+
+        # check_cashreport_xls:
+        if report.cashdesk_report_org1["Итого"][0][1]:
+            to_yandex.append(self._yandex_repo.save_cashdesk_report(report.cashdesk_report_org1, date_from))
+        if settings.add_beach_report and report.cashdesk_report_org2["Итого"][0][1]:
+            to_yandex.append(self._yandex_repo.save_cashdesk_report(report.cashdesk_report_org2, date_from))
+        # check_client_count_total_xls:
+        if report.client_count_totals_org1[-1][1]:
+            to_yandex.append(self._yandex_repo.save_client_count_totals(report.client_count_totals_org1, date_from))
+        if settings.add_beach_report and report.client_count_totals_org2[-1][1]:
+            to_yandex.append(self._yandex_repo.save_client_count_totals(report.client_count_totals_org2, date_from))
+
+        return DayReports(report=report, fin_reports=fin_reports, to_yandex=to_yandex, to_messanger=to_messanger)
+
+    @staticmethod
+    def _build_google_service() -> tuple[Any, Any]:
+        """Авторизация в Google API: (http_auth, googleservice)."""
+
         credentials = ServiceAccountCredentials.from_json_keyfile_dict(
             settings.google_api_settings.google_service_account_config,
             scopes=[
@@ -2407,10 +2618,10 @@ class BarsicReport2Service:
                 "https://www.googleapis.com/auth/drive",
             ],
         )
-        httpAuth = credentials.authorize(httplib2.Http())
+        http_auth = credentials.authorize(httplib2.Http())
         try:
             logger.info("Попытка авторизации с Google-документами ...")
-            googleservice = apiclient.discovery.build("sheets", "v4", http=httpAuth, cache_discovery=False)
+            googleservice = apiclient.discovery.build("sheets", "v4", http=http_auth, cache_discovery=False)
 
         except IndexError as e:
             error_message = f"Ошибка {e!r}"
@@ -2420,156 +2631,359 @@ class BarsicReport2Service:
                 detail=error_message,
             )
 
-        await self.export_to_google_sheet(date_from, httpAuth, googleservice, fin_report=self.fin_report)
+        return http_auth, googleservice
 
-        # finreport_telegram:
-        to_messanger.append(self.sms_report(date_from, fin_report=self.fin_report))
+    async def export_days_to_google_sheet(
+        self, day_reports: dict[datetime, DayReports], errors: dict[datetime, Exception]
+    ) -> str | None:
+        """Записать финансовые отчеты дней в Google-таблицу по одному, по возрастанию дат.
 
-        # check_itogreport_xls:
-        for itog_report in self.itog_reports:
-            if itog_report["Итого по отчету"][1]:
-                to_yandex.append(self._yandex_repo.save_organisation_total(itog_report, date_from))
+        Строка дня находится по текущему состоянию таблицы (перед строкой "ИТОГО"), а формулы ссылаются
+        на строку листа "План" по номеру, поэтому дни пишутся строго по порядку: внутри процесса под
+        _google_sheet_lock, между процессами (API и воркеры задач) - под арендой таблицы месяца в Redis.
+        После дня, который не удалось
+        построить или записать, более поздние дни не записываются (и попадают в errors), чтобы не сдвинуть строки.
+        Возвращает ссылку на таблицу.
+        """
 
-        if settings.add_beach_report and self.itog_report_beach["Итого по отчету"][1]:
-            to_yandex.append(self._yandex_repo.save_organisation_total(self.itog_report_beach, date_from))
+        http_auth, googleservice = await asyncio.to_thread(self._build_google_service)
+        days = sorted(day_reports.keys() | errors.keys())
+        spreadsheet_url = None
+        async with _google_sheet_lock, contextlib.AsyncExitStack() as leases:
+            # Аренды берутся по возрастанию месяцев, поэтому процессы не ждут друг друга по кругу
+            for month in sorted({day.strftime("%Y-%m") for day in days}):
+                await leases.enter_async_context(
+                    redis_lease(
+                        self._redis,
+                        f"{GOOGLE_SHEET_LEASE_PREFIX}:{month}",
+                        ttl=GOOGLE_SHEET_LEASE_TTL,
+                        poll_interval=GOOGLE_SHEET_LEASE_POLL_INTERVAL,
+                    )
+                )
 
-        # check_cashreport_xls:
-        if self.cashdesk_report_org1["Итого"][0][1]:
-            to_yandex.append(self._yandex_repo.save_cashdesk_report(self.cashdesk_report_org1, date_from))
-        if settings.add_beach_report and self.cashdesk_report_org2["Итого"][0][1]:
-            to_yandex.append(self._yandex_repo.save_cashdesk_report(self.cashdesk_report_org2, date_from))
-        # check_client_count_total_xls:
-        if self.client_count_totals_org1[-1][1]:
-            to_yandex.append(self._yandex_repo.save_client_count_totals(self.client_count_totals_org1, date_from))
-        if settings.add_beach_report and self.client_count_totals_org2[-1][1]:
-            to_yandex.append(self._yandex_repo.save_client_count_totals(self.client_count_totals_org2, date_from))
+            for i, day in enumerate(days):
+                if day not in errors:
+                    try:
+                        spreadsheet_url = await self.export_to_google_sheet(
+                            day,
+                            http_auth,
+                            googleservice,
+                            reports=day_reports[day].fin_reports,
+                            report=day_reports[day].report,
+                        )
+                        continue
 
-        return to_yandex, to_messanger
+                    except HTTPException:
+                        # Ошибка таблицы (например, устаревшая версия) одинакова для всех дней
+                        raise
+                    except Exception as e:
+                        logger.exception(f"Финансовый отчет за {day.date()} не записан в Google-таблицу")
+                        errors[day] = e
+
+                for skipped_day in days[i + 1 :]:
+                    if skipped_day not in errors:
+                        logger.error(
+                            f"Финансовый отчет за {skipped_day.date()} не записан: не записан более ранний день"
+                        )
+                        errors[skipped_day] = RuntimeError(f"Не записан более ранний день {day.date()}")
+                break
 
-    async def load_report(
-        self,
-        date_from,
-        date_to,
-        companies: list[Company],
-    ):
-        """Выполнить отчеты"""
+        return spreadsheet_url
 
-        self.itog_report_beach = None
-        self.report_bitrix = (0, 0)
-        self.report_bitrix_lastyear = (0, 0)
-        self.smile_report = self._rk_service.get_smile_report(
-            date_from=date_from,
-            date_to=date_to,
-        )
-        self.smile_report_lastyear = self._rk_service.get_smile_report(
-            date_from=date_from - relativedelta(years=1),
-            date_to=date_to - relativedelta(years=1),
-        )
+    @staticmethod
+    def _last_year_report_types(aqua_companies: list[Company]) -> dict[str, str]:
+        total_report_types = {
+            str(company.id): f"{LAST_YEAR_TOTAL_REPORT_TYPE}:{settings.mssql_database1}:{company.id}"
+            for company in aqua_companies
+        }
+        return total_report_types | {
+            "smile": LAST_YEAR_SMILE_REPORT_TYPE,
+            "cashdesk": f"{LAST_YEAR_CASHDESK_REPORT_TYPE}:{settings.mssql_database1}",
+            "customer_count": f"{LAST_YEAR_CUSTOMER_COUNT_REPORT_TYPE}:{settings.mssql_database1}",
+        }
 
-        if companies[0]:
-            self.bars_srv.set_database(settings.mssql_database1)
-            with self.bars_srv as connect:
-                self.itog_reports = []
-                self.itog_reports_lastyear = []
-                for company in companies:
-                    if company.db_name == DBName.BEACH:
-                        continue
+    async def get_last_year_reports(self, date_from, date_to, companies: list[Company]) -> LastYearReports:
+        """Данные прошлого года для сравнения.
 
-                    self.itog_reports.append(
-                        functions.get_total_report(
-                            connect=connect,
-                            org=company.id,
-                            org_name=company.name,
-                            date_from=date_from,
-                            date_to=date_to,
-                        )
+        Данные за один день берутся из неизменяемого кеша report_cache: при промахе в кеш одним заходом
+        загружаются все дни месяца. Данные за период из нескольких дней запрашиваются в базе.
+        """
+
+        if date_to != date_from + timedelta(1):
+            return await self._load_last_year_reports(date_from, date_to, companies)
+
+        day = date_from.date()
+        last_year_reports = await self._get_cached_last_year_reports([day], companies)
+        if day not in last_year_reports:
+            async with _last_year_locks.setdefault((day.year, day.month), asyncio.Lock()):
+                last_year_reports = await self._get_cached_last_year_reports([day], companies)
+                if day not in last_year_reports:
+                    last_year_reports = await self.prefetch_last_year_reports(day, companies)
+
+        return last_year_reports[day]
+
+    async def prefetch_last_year_reports(self, day: date, companies: list[Company]) -> dict[date, LastYearReports]:
+        """Загрузить в кеш данные всех закрытых дней месяца. Итоговые отчеты запрашиваются одним пакетом."""
+
+        month_start = datetime(day.year, day.month, 1)
+        month_end = min(month_start + relativedelta(months=1), day_start(datetime.now()))
+        days = days_range(month_start, month_end)
+        aqua_companies = [company for company in companies if company.db_name != DBName.BEACH]
+        logger.info(f"Загрузка данных прошлого года за {month_start.strftime('%m.%Y')} ({len(days)} дн.)")
+
+        service_point = await self.service_point_request(database=settings.mssql_database1)
+        itog_reports_by_company, smile_reports, cashdesk_reports, customer_counts = await asyncio.gather(
+            asyncio.gather(
+                *(
+                    run_in_executor(
+                        self._get_total_reports_by_day,
+                        settings.mssql_database1,
+                        org=company.id,
+                        org_name=company.name,
+                        date_from=month_start,
+                        date_to=month_end,
                     )
-                    self.itog_reports_lastyear.append(
-                        functions.get_total_report(
-                            connect=connect,
-                            org=company.id,
-                            org_name=company.name,
-                            date_from=date_from - relativedelta(years=1),
-                            date_to=date_to - relativedelta(years=1),
-                        )
+                    for company in aqua_companies
+                )
+            ),
+            asyncio.gather(
+                *(self._rk_service.get_smile_report(date_from=day_, date_to=day_ + timedelta(1)) for day_ in days)
+            ),
+            asyncio.gather(
+                *(
+                    self.cashdesk_report(
+                        companies=companies,
+                        database=settings.mssql_database1,
+                        date_from=day_,
+                        date_to=day_ + timedelta(1),
+                        service_point=service_point,
                     )
+                    for day_ in days
+                )
+            ),
+            asyncio.gather(*(self._bars_service.get_customer_count(day_, day_ + timedelta(1)) for day_ in days)),
+        )
 
-            self.itog_report_month = None
-            if int((date_to - timedelta(1)).strftime("%y%m")) < int(date_to.strftime("%y%m")):
-                self._bars_service.choose_db(settings.mssql_database1)
-                organizations = self._bars_service.get_organisations()
-                itog_report_month = {}
-                for organization in organizations:
-                    self.bars_srv.set_database(settings.mssql_database1)
-                    with self.bars_srv as connect:
-                        itog_report_month_for_org = functions.get_total_report(
-                            connect=connect,
-                            org=organization.super_account_id,
-                            org_name=organization.descr,
-                            date_from=datetime.strptime(
-                                "01" + (date_to - timedelta(1)).strftime("%m%y"),
-                                "%d%m%y",
-                            ),
-                            date_to=date_to,
-                        )
-                    itog_report_month = functions.concatenate_total_reports(
-                        itog_report_month, itog_report_month_for_org
-                    )
+        last_year_reports = {
+            day_.date(): LastYearReports(
+                itog_reports=tuple(itog_reports[day_.date()] for itog_reports in itog_reports_by_company),
+                smile_report=smile_report,
+                cashdesk_report=cashdesk_report,
+                customer_count=customer_count,
+            )
+            for day_, smile_report, cashdesk_report, customer_count in zip(
+                days, smile_reports, cashdesk_reports, customer_counts, strict=True
+            )
+        }
 
-                self.itog_report_month = itog_report_month
-                self.smile_report_month = self._rk_service.get_smile_report(
-                    date_from=datetime.strptime("01" + (date_to - timedelta(1)).strftime("%m%y"), "%d%m%y"),
-                    date_to=date_to,
+        report_types = self._last_year_report_types(aqua_companies)
+        report_caches = []
+        for day_, reports in last_year_reports.items():
+            report_data = {
+                "smile": reports.smile_report.model_dump(),
+                "cashdesk": reports.cashdesk_report,
+                "customer_count": reports.customer_count,
+            }
+            report_data |= {
+                str(company.id): itog_report
+                for company, itog_report in zip(aqua_companies, reports.itog_reports, strict=True)
+            }
+            report_caches.extend(
+                ReportCacheCreate(
+                    report_date=day_,
+                    report_type=report_type,
+                    report_data={"data": dump_value(report_data[name])},
                 )
-
-            self.cashdesk_report_org1 = self.cashdesk_report(
-                database=settings.mssql_database1,
-                date_from=date_from,
-                date_to=date_to,
-                companies=companies,
+                for name, report_type in report_types.items()
             )
-            self.cashdesk_report_org1_lastyear = self.cashdesk_report(
-                database=settings.mssql_database1,
-                date_from=date_from - relativedelta(years=1),
-                date_to=date_to - relativedelta(years=1),
-                companies=companies,
+        await self._report_service.save_immutable_reports(report_caches)
+
+        return last_year_reports
+
+    async def _get_cached_last_year_reports(
+        self, days: list[date], companies: list[Company]
+    ) -> dict[date, LastYearReports]:
+        """Данные прошлого года из кеша за дни, по которым сохранены все части."""
+
+        aqua_companies = [company for company in companies if company.db_name != DBName.BEACH]
+        report_types = self._last_year_report_types(aqua_companies)
+        cached = dict(
+            zip(
+                report_types,
+                await asyncio.gather(
+                    *(
+                        self._report_service.get_reports_by_dates(report_type, days)
+                        for report_type in report_types.values()
+                    )
+                ),
+                strict=True,
             )
-            self.client_count_totals_org1 = self.client_count_totals_period(
+        )
+
+        last_year_reports = {}
+        for day in days:
+            if any(day not in reports for reports in cached.values()):
+                continue
+
+            data = {name: load_value(reports[day].report_data["data"]) for name, reports in cached.items()}
+            last_year_reports[day] = LastYearReports(
+                itog_reports=tuple(data[str(company.id)] for company in aqua_companies),
+                smile_report=SmileReport.model_validate(data["smile"]),
+                cashdesk_report=data["cashdesk"],
+                customer_count=data["customer_count"],
+            )
+
+        return last_year_reports
+
+    async def _load_last_year_reports(self, date_from, date_to, companies: list[Company]) -> LastYearReports:
+        aqua_companies = [company for company in companies if company.db_name != DBName.BEACH]
+        itog_reports, smile_report, cashdesk_report, customer_count = await asyncio.gather(
+            asyncio.gather(
+                *(
+                    run_in_executor(
+                        self._get_total_report,
+                        settings.mssql_database1,
+                        org=company.id,
+                        org_name=company.name,
+                        date_from=date_from,
+                        date_to=date_to,
+                    )
+                    for company in aqua_companies
+                )
+            ),
+            self._rk_service.get_smile_report(date_from=date_from, date_to=date_to),
+            self.cashdesk_report(
                 database=settings.mssql_database1,
-                org=companies[0].id,
-                org_name=companies[0].name,
                 date_from=date_from,
                 date_to=date_to,
-            )
+                companies=companies,
+            ),
+            self._bars_service.get_customer_count(date_from, date_to),
+        )
+        return LastYearReports(
+            itog_reports=tuple(itog_reports),
+            smile_report=smile_report,
+            cashdesk_report=cashdesk_report,
+            customer_count=customer_count,
+        )
+
+    async def load_report(
+        self,
+        date_from,
+        date_to,
+        companies: list[Company],
+    ) -> LoadedReports:
+        """Загрузить данные отчетов за период.
+
+        Независимые запросы (отчет Смайла в RK, итоговые и кассовые отчеты Аквапарка и Пляжа, отчеты за месяц
+        по организациям, количество клиентов) выполняются одновременно на соединениях из пулов.
+        Данные прошлого года для сравнения берутся из кеша закрытых дней (get_last_year_reports).
+        """
 
+        date_from_lastyear = date_from - relativedelta(years=1)
+        date_to_lastyear = date_to - relativedelta(years=1)
+        is_month_end = int((date_to - timedelta(1)).strftime("%y%m")) < int(date_to.strftime("%y%m"))
+        month_start = datetime.strptime("01" + (date_to - timedelta(1)).strftime("%m%y"), "%d%m%y")
+        aqua_companies = [company for company in companies if company.db_name != DBName.BEACH]
         beach_company = None
         if settings.add_beach_report:
             beach_company = next(company for company in companies if company.db_name == DBName.BEACH)
+
+        def total_report(database: str, date_from, date_to, **kwargs):
+            return run_in_executor(self._get_total_report, database, date_from=date_from, date_to=date_to, **kwargs)
+
+        async def month_total_report() -> dict:
+            organizations = await self._bars_service.get_organisations()
+            itog_reports_month = await asyncio.gather(
+                *(
+                    total_report(
+                        settings.mssql_database1,
+                        month_start,
+                        date_to,
+                        org=organization.super_account_id,
+                        org_name=organization.descr,
+                    )
+                    for organization in organizations
+                )
+            )
+            itog_report_month = {}
+            for itog_report_month_for_org in itog_reports_month:
+                itog_report_month = functions.concatenate_total_reports(itog_report_month, itog_report_month_for_org)
+
+            return itog_report_month
+
+        loads = {
+            "smile_report": self._rk_service.get_smile_report(date_from=date_from, date_to=date_to),
+            "customer_count": self._bars_service.get_customer_count(date_from, date_to),
+            "last_year": self.get_last_year_reports(date_from_lastyear, date_to_lastyear, companies),
+        }
+        if companies[0]:
+            loads |= {
+                "itog_reports": asyncio.gather(
+                    *(
+                        total_report(
+                            settings.mssql_database1, date_from, date_to, org=company.id, org_name=company.name
+                        )
+                        for company in aqua_companies
+                    )
+                ),
+                "cashdesk_report_org1": self.cashdesk_report(
+                    database=settings.mssql_database1,
+                    date_from=date_from,
+                    date_to=date_to,
+                    companies=companies,
+                ),
+                "client_count_totals_org1": self.client_count_totals_period(
+                    database=settings.mssql_database1,
+                    org=companies[0].id,
+                    org_name=companies[0].name,
+                    date_from=date_from,
+                    date_to=date_to,
+                ),
+            }
+            if is_month_end:
+                loads |= {
+                    "itog_report_month": month_total_report(),
+                    "smile_report_month": self._rk_service.get_smile_report(date_from=month_start, date_to=date_to),
+                }
+
         if beach_company:
-            self.bars_srv.set_database(settings.mssql_database2)
-            with self.bars_srv as connect:
-                self.itog_report_beach = functions.get_total_report(
-                    connect=connect,
+            loads |= {
+                "itog_report_beach": total_report(
+                    settings.mssql_database2,
+                    date_from,
+                    date_to,
                     org=beach_company.id,
                     org_name=beach_company.name,
+                    is_legacy_database=True,
+                ),
+                "cashdesk_report_org2": self.cashdesk_report(
+                    database=settings.mssql_database2,
                     date_from=date_from,
                     date_to=date_to,
-                    is_legacy_database=True,
-                )
-
-            self.cashdesk_report_org2 = self.cashdesk_report(
-                database=settings.mssql_database2,
-                date_from=date_from,
-                date_to=date_to,
-                companies=companies,
-            )
-            self.client_count_totals_org2 = self.client_count_totals_period(
-                database=settings.mssql_database2,
-                org=beach_company.id,
-                org_name=beach_company.name,
-                date_from=date_from,
-                date_to=date_to,
-            )
+                    companies=companies,
+                ),
+                "client_count_totals_org2": self.client_count_totals_period(
+                    database=settings.mssql_database2,
+                    org=beach_company.id,
+                    org_name=beach_company.name,
+                    date_from=date_from,
+                    date_to=date_to,
+                ),
+            }
+
+        results = dict(zip(loads, await asyncio.gather(*loads.values()), strict=True))
+        if "itog_reports" in results:
+            results["itog_reports"] = tuple(results["itog_reports"])
+
+        last_year: LastYearReports = results.pop("last_year")
+        return LoadedReports(
+            **results,
+            smile_report_lastyear=last_year.smile_report,
+            customer_count_last_year=last_year.customer_count,
+            itog_reports_lastyear=last_year.itog_reports,
+            cashdesk_report_org1_lastyear=last_year.cashdesk_report,
+        )
 
     async def run_report(
         self,
@@ -2577,7 +2991,10 @@ class BarsicReport2Service:
         date_to,
         use_yadisk: bool = False,
         telegram_report: bool = False,
-    ):
+        progress: ProgressCallback | None = None,
+    ) -> ReportRun:
+        """Создать отчеты за каждый день периода."""
+
         period = []
         while True:
             period.append(date_from)
@@ -2587,7 +3004,6 @@ class BarsicReport2Service:
 
         # Поиск новых услуг
         for report_name in ("GoogleReport", "PlatAgentReport"):
-            self._settings_service.choose_db("Aquapark_Ulyanovsk")
             new_tariffs = await self._settings_service.get_new_tariff(report_name)
             if new_tariffs:
                 error_message = f"Найдены нераспределенные тарифы в отчете {report_name}: {new_tariffs}"
@@ -2597,57 +3013,48 @@ class BarsicReport2Service:
                     detail=error_message,
                 )
 
-        to_yandex = []
-        to_messanger = []
-        companies = self.get_companies()
-        for date in period:
-            date_from = date
-            date_to = date + timedelta(1)
-            await self.load_report(date_from, date_to, companies)
-
-            self._bars_service.choose_db(settings.mssql_database1)
-            customer_count = self._bars_service.get_customer_count(date_from, date_to)
-            customer_count_last_year = self._bars_service.get_customer_count(
-                date_from - relativedelta(years=1), date_to - relativedelta(years=1)
-            )
+        companies = await self.get_companies()
+        fin_report_config = await self._report_config_service.get_report_elements_with_groups("GoogleReport")
+        total_report_config = await self._report_config_service.get_report_elements_with_groups("ItogReport")
+        agent_report_config = await self._report_config_service.get_report_elements_with_groups("PlatAgentReport")
 
-            fin_report_config = await self._report_config_service.get_report_elements_with_groups("GoogleReport")
-            total_report_config = await self._report_config_service.get_report_elements_with_groups("ItogReport")
-            agent_report_config = await self._report_config_service.get_report_elements_with_groups("PlatAgentReport")
-            to_yandex, to_messanger = await self.save_reports(
-                date_from=date_from,
+        async def create_day_reports(day: datetime) -> DayReports:
+            async with semaphore:
+                report = await self.load_report(day, day + timedelta(1), companies)
+
+            return await self.save_reports(
+                report=report,
+                date_from=day,
                 aqua_company=companies[0],
                 fin_report_config=fin_report_config,
                 total_report_config=total_report_config,
                 agent_report_config=agent_report_config,
-                customer_count=customer_count,
-                customer_count_last_year=customer_count_last_year,
             )
 
+        # Дни загружаются параллельно (не больше mssql_database_concurrency на базу) и сохраняются по готовности,
+        # а в Google-таблицу записываются по порядку дат
+        semaphore = get_database_semaphore(settings.mssql_database1)
+        day_reports, errors = await run_by_days(period, create_day_reports, progress=progress)
+        if not day_reports:
+            raise next(iter(errors.values()))
+
+        spreadsheet_url = await self.export_days_to_google_sheet(day_reports, errors)
+
+        date_from = max(day_reports)
+        last_day_reports = day_reports[date_from]
+
         # Отправка в яндекс диск
         if use_yadisk:
             self._yandex_repo.sync_to_yadisk(
-                paths=to_yandex,
+                paths=last_day_reports.to_yandex,
                 date_from=date_from,
             )
 
         if telegram_report:
-            for message in to_messanger:
+            for message in last_day_reports.to_messanger:
                 await self._telegram_bot.send_message(settings.telegram_chanel_id, message)
 
-
-def get_legacy_service() -> BarsicReport2Service:
-    bars_srv = MsSqlDatabase(
-        server=settings.mssql_server,
-        user=settings.mssql_user,
-        password=settings.mssql_pwd,
-    )
-    rk_srv = MsSqlDatabase(
-        server=settings.mssql_server_rk,
-        user=settings.mssql_user_rk,
-        password=settings.mssql_pwd_rk,
-    )
-    return BarsicReport2Service(
-        bars_srv=bars_srv,
-        rk_srv=rk_srv,
-    )
+        return ReportRun(
+            failed_days=sorted(day.date() for day in errors),
+            spreadsheet_url=spreadsheet_url,
+        )
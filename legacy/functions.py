@@ -1,9 +1,21 @@
+import logging
 from copy import deepcopy
+from datetime import date, timedelta
 from decimal import Decimal
 from typing import Any
 
-from api.v1.report_settings import logger
+from pyodbc import ProgrammingError
+
+from legacy import report_plans
 from schemas.rk import SmileReport
+from sql.sp_report_totals_v2 import (
+    SP_REPORT_TOTALS_V2_OLD_VERSION_SQL,
+    SP_REPORT_TOTALS_V2_SQL,
+    sp_report_totals_v2_batch_sql,
+)
+from utils.dates import day_start, days_range
+
+logger = logging.getLogger(__name__)
 
 
 def is_int(value):
@@ -69,111 +81,8 @@ def create_month_agent_report(
 ):
     """Создает отчет платежного агента за месяц."""
 
-    result = {}
-    result["Контрольная сумма"] = {}
-    result["Контрольная сумма"]["Cумма"] = [["Сумма", 0, 0.0]]
-    result["ИТОГО"] = {}
-    result["ИТОГО"][""] = [["Сумма", 0, 0.0]]
-
-    for org, tariffs in agent_report_config.items():
-        result[org] = {}
-        result[org]["Итого по группе"] = [["Итого по группе", 0, 0.0]]
-        for tariff in tariffs:
-            try:
-                service_name = month_total_report[tariff][2]
-                count = month_total_report[tariff][0]
-                summ = month_total_report[tariff][1]
-
-                if tariff == "Дата":
-                    result[org][tariff] = []
-                    result[org][tariff].append(
-                        [
-                            tariff,
-                            count,
-                            summ,
-                        ]
-                    )
-                elif tariff == "Депозит":
-                    result[org][tariff] = []
-                    result[org][tariff].append([tariff, 0, summ])
-                    result[org]["Итого по группе"][0][2] += summ
-                    result["Контрольная сумма"]["Cумма"][0][2] += summ
-                elif tariff == "Организация":
-                    pass
-                else:
-                    try:
-                        if result[org][service_name]:
-                            result[org][service_name].append(
-                                [
-                                    tariff,
-                                    count,
-                                    summ,
-                                ]
-                            )
-                            result[org][service_name][0][1] += count
-                            result[org][service_name][0][2] += summ
-                            result[org]["Итого по группе"][0][1] += count
-                            result[org]["Итого по группе"][0][2] += summ
-                            if tariff != "Итого по отчету":
-                                result["Контрольная сумма"]["Cумма"][0][1] += count
-                                result["Контрольная сумма"]["Cумма"][0][2] += summ
-                        else:
-                            result[org][service_name] = []
-                            result[org][service_name].append(["Итого по папке", 0, 0.0])
-                            result[org][service_name].append(
-                                [
-                                    tariff,
-                                    count,
-                                    summ,
-                                ]
-                            )
-                            result[org][service_name][0][1] += count
-                            result[org][service_name][0][2] += summ
-                            result[org]["Итого по группе"][0][1] += count
-                            result[org]["Итого по группе"][0][2] += summ
-                            if tariff != "Итого по отчету":
-                                result["Контрольная сумма"]["Cумма"][0][1] += count
-                                result["Контрольная сумма"]["Cумма"][0][2] += summ
-                    except KeyError:
-                        result[org][service_name] = []
-                        result[org][service_name].append(["Итого по папке", 0, 0.0])
-                        result[org][service_name].append(
-                            (
-                                tariff,
-                                count,
-                                summ,
-                            )
-                        )
-                        result[org][service_name][0][1] += count
-                        result[org][service_name][0][2] += summ
-                        result[org]["Итого по группе"][0][1] += count
-                        result[org]["Итого по группе"][0][2] += summ
-                        if tariff != "Итого по отчету":
-                            result["Контрольная сумма"]["Cумма"][0][1] += count
-                            result["Контрольная сумма"]["Cумма"][0][2] += summ
-            except KeyError:
-                pass
-            except TypeError:
-                pass
-
-            if tariff == "Смайл":
-                result[org]["Смайл"] = []
-                result[org]["Смайл"].append(["Итого по папке", 0, 0.0])
-                result[org]["Смайл"].append(
-                    (
-                        "Смайл",
-                        smile_report_month.total_count,
-                        smile_report_month.total_sum,
-                    )
-                )
-                result[org]["Смайл"][0][1] += smile_report_month.total_count
-                result[org]["Смайл"][0][2] += smile_report_month.total_sum
-                result[org]["Итого по группе"][0][1] += smile_report_month.total_count
-                result[org]["Итого по группе"][0][2] += smile_report_month.total_sum
-                result["Контрольная сумма"]["Cумма"][0][1] += smile_report_month.total_count
-                result["Контрольная сумма"]["Cумма"][0][2] += smile_report_month.total_sum
-                result["ИТОГО"][""][0][1] += smile_report_month.total_count
-                result["ИТОГО"][""][0][2] += smile_report_month.total_sum
+    plan = report_plans.get_agent_plan(agent_report_config)
+    result = report_plans.apply_agent_plan(plan, month_total_report, smile_report_month)
 
     if (
         result["ИТОГО"][""][0][2] != result["Контрольная сумма"]["Cумма"][0][2]
@@ -198,74 +107,10 @@ def create_month_finance_report(
 ):
     """Создает финансовый отчет за месяц."""
 
-    month_finance_report = {}
-    control_sum_group = month_finance_report.setdefault("Контрольная сумма", {})
-    control_sum = control_sum_group.setdefault("Cумма", [["Сумма", 0, 0.0]])
-
-    for group_name, groups in total_report_config.items():
-        finreport_group = month_finance_report.setdefault(group_name, {})
-        finreport_group_total = finreport_group.setdefault("Итого по группе", [["Итого по группе", 0, 0.0]])
-        for oldgroup in groups:
-            try:
-                for service_name in fin_report_config[oldgroup]:
-                    try:
-                        service_count, service_sum, org_name, group_name = itog_report_month[service_name]
-
-                        if service_name == "Дата":
-                            product_group = finreport_group.setdefault(oldgroup, [])
-                            product_group.append([service_name, service_count, service_sum])
-                        elif service_name == "Депозит":
-                            product_group = finreport_group.setdefault(oldgroup, [])
-                            product_group.append([service_name, 0, service_sum])
-                            finreport_group_total[0][2] += service_sum
-                            control_sum[0][2] += service_sum
-                        elif service_name == "Организация":
-                            pass
-                        else:
-                            product_group = finreport_group.setdefault(org_name, [["Итого по папке", 0, 0.0]])
-                            product_group.append([service_name, service_count, service_sum])
-                            product_group[0][1] += service_count
-                            product_group[0][2] += service_sum
-                            finreport_group_total[0][1] += service_count
-                            finreport_group_total[0][2] += service_sum
-                            if service_name != "Итого по отчету":
-                                control_sum[0][1] += service_count
-                                control_sum[0][2] += service_sum
-                    except KeyError:
-                        continue
-                    except TypeError:
-                        continue
-
-            except KeyError as e:
-                logger.error(
-                    f"Несоответствие конфигураций XML-файлов\nГруппа {oldgroup} не существует! \nKeyError: {e}"
-                )
+    plan = report_plans.get_finance_plan(total_report_config, fin_report_config)
+    month_finance_report = report_plans.apply_finance_plan(plan, itog_report_month, smile_report_month)
+    control_sum = month_finance_report["Контрольная сумма"]["Cумма"]
 
-            if oldgroup == "Общепит":
-                product_group = finreport_group.setdefault(
-                    "Общепит (Смайл)",
-                    [["Итого по папке", 0, 0.0]],
-                )
-                product_group.append(
-                    [
-                        "Смайл",
-                        smile_report_month.total_count,
-                        smile_report_month.total_sum,
-                    ]
-                )
-                product_group[0][1] += smile_report_month.total_count
-                product_group[0][2] += smile_report_month.total_sum
-                finreport_group_total[0][1] += smile_report_month.total_count
-                finreport_group_total[0][2] += smile_report_month.total_sum
-
-    control_sum[0][1] += smile_report_month.total_count
-    control_sum[0][2] += smile_report_month.total_sum
-    month_finance_report["ИТОГО"]["Итого по группе"][0][1] += smile_report_month.total_count
-    month_finance_report["ИТОГО"]["Итого по группе"][0][2] += smile_report_month.total_sum
-    month_finance_report["ИТОГО"][""][0][1] += smile_report_month.total_count
-    month_finance_report["ИТОГО"][""][0][2] += smile_report_month.total_sum
-    month_finance_report["ИТОГО"][""][1][1] += smile_report_month.total_count
-    month_finance_report["ИТОГО"][""][1][2] += smile_report_month.total_sum
     if (
         month_finance_report["ИТОГО"][""][1][2] != control_sum[0][2]
         or month_finance_report["ИТОГО"][""][1][1] != control_sum[0][1]
@@ -280,37 +125,21 @@ def create_month_finance_report(
     return month_finance_report
 
 
-def get_total_report(
-    connect,
-    org,
-    org_name,
-    date_from,
-    date_to,
-    hide_zeroes="0",
-    hide_internal="1",
-    hide_discount="0",
-    is_legacy_database=False,
-):
-    """Делает запрос в базу Барс и возвращает итоговый отчет за запрашиваемый период."""
+def fetch_result_sets(cursor) -> list[list]:
+    """Прочитать все наборы строк, которые вернул пакет запросов."""
 
-    date_from_date = date_from.strftime("%Y%m%d 00:00:00")
-    date_to_date = date_to.strftime("%Y%m%d 00:00:00")
-
-    SQL_REQUEST = (
-        f"exec sp_reportOrganizationTotals_v2 "
-        f"@sa={org},"
-        f"@from='{date_from_date}',"
-        f"@to='{date_to_date}',"
-        f"@hideZeroes={hide_zeroes},"
-        f"@hideInternal={hide_internal}"
-    )
-    # В аквапарке новая версия БД, добавляем новое поле в запрос
-    if not is_legacy_database:
-        SQL_REQUEST += f",@hideDiscount={hide_discount}"
+    result_sets = []
+    while True:
+        if cursor.description is not None:
+            result_sets.append(cursor.fetchall())
+        if not cursor.nextset():
+            break
+
+    return result_sets
 
-    cursor = connect.cursor()
-    cursor.execute(SQL_REQUEST)
-    rows = cursor.fetchall()
+
+def _total_report_from_rows(rows, org, org_name, date_from, date_to) -> dict[str, tuple]:
+    """Преобразует строки процедуры sp_reportOrganizationTotals_v2 в итоговый отчет."""
 
     result = {
         row[4]: (
@@ -338,3 +167,87 @@ def get_total_report(
     result["Дата"] = (date_from, date_to, "", "")
 
     return result
+
+
+def get_total_report(
+    connect,
+    org,
+    org_name,
+    date_from,
+    date_to,
+    hide_zeroes="0",
+    hide_internal="1",
+    hide_discount="0",
+    is_legacy_database=False,
+):
+    """Делает запрос в базу Барс и возвращает итоговый отчет за запрашиваемый период."""
+
+    params = [org, day_start(date_from), day_start(date_to), int(hide_zeroes), int(hide_internal)]
+    sql = SP_REPORT_TOTALS_V2_OLD_VERSION_SQL
+    # В аквапарке новая версия БД, добавляем новое поле в запрос
+    if not is_legacy_database:
+        sql = SP_REPORT_TOTALS_V2_SQL
+        params.append(int(hide_discount))
+
+    cursor = connect.cursor()
+    cursor.execute(sql, *params)
+    rows = cursor.fetchall()
+
+    return _total_report_from_rows(rows, org, org_name, date_from, date_to)
+
+
+def get_total_reports_by_day(
+    connect,
+    org,
+    org_name,
+    date_from,
+    date_to,
+    hide_zeroes="0",
+    hide_internal="1",
+    hide_discount="0",
+    is_legacy_database=False,
+) -> dict[date, dict[str, tuple]]:
+    """Итоговые отчеты по каждому дню периода за одно обращение к базе Барс.
+
+    Процедура вызывается для каждого дня внутри одного пакета, поэтому результат совпадает с вызовами по дням.
+    Если пакет не удалось выполнить (старые версии БД SkiBars), отчеты запрашиваются по одному дню.
+    """
+
+    days = days_range(date_from, date_to)
+    if not days:
+        return {}
+
+    flags = [int(hide_zeroes), int(hide_internal)]
+    if not is_legacy_database:
+        flags.append(int(hide_discount))
+
+    params = [param for day in days for param in (org, day_start(day), day_start(day + timedelta(1)), *flags)]
+    result_sets = None
+    try:
+        cursor = connect.cursor()
+        cursor.execute(sp_report_totals_v2_batch_sql(len(days), is_legacy_database), *params)
+        result_sets = fetch_result_sets(cursor)
+
+    except ProgrammingError as e:
+        logger.warning(f"Batch sp_reportOrganizationTotals_v2 failed, fallback to day by day: {e}")
+
+    if result_sets is None or len(result_sets) != len(days):
+        return {
+            day.date(): get_total_report(
+                connect=connect,
+                org=org,
+                org_name=org_name,
+                date_from=day,
+                date_to=day + timedelta(1),
+                hide_zeroes=hide_zeroes,
+                hide_internal=hide_internal,
+                hide_discount=hide_discount,
+                is_legacy_database=is_legacy_database,
+            )
+            for day in days
+        }
+
+    return {
+        day.date(): _total_report_from_rows(rows, org, org_name, day, day + timedelta(1))
+        for day, rows in zip(days, result_sets, strict=True)
+    }
@@ -0,0 +1,314 @@
+"""Скомпилированные планы построения отчетов.
+
+Конфигурация отчета (вложенные словари групп и элементов) один раз разворачивается в плоский
+список шагов или индекс "элемент -> ячейки отчета", а применение плана к итоговому отчету дня —
+один линейный проход. Планы кешируются по отпечатку конфигурации, поэтому при пересборке
+большого количества дней конфигурация разбирается один раз.
+"""
+
+import hashlib
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+import orjson
+
+from schemas.bars import TotalReport
+from schemas.rk import SmileReport
+
+logger = logging.getLogger(__name__)
+
+PLANS_CACHE_SIZE = 64
+
+# Виды шагов плана
+DATE = "date"
+DEPOSIT = "deposit"
+SERVICE = "service"
+SMILE = "smile"
+ORG = "org"
+
+T = TypeVar("T")
+
+_plans: dict[tuple[str, str], Any] = {}
+
+
+def config_digest(*configs: Any) -> str:
+    """Отпечаток конфигурации (с учетом порядка ключей, от которого зависит порядок строк отчета)."""
+
+    dump = orjson.dumps(configs, option=orjson.OPT_NON_STR_KEYS, default=str)
+    return hashlib.blake2b(dump, digest_size=16).hexdigest()
+
+
+def _cached_plan(kind: str, compile_plan: Callable[..., T], *configs: Any) -> T:
+    key = (kind, config_digest(*configs))
+    plan = _plans.get(key)
+    if plan is None:
+        if len(_plans) >= PLANS_CACHE_SIZE:
+            _plans.clear()
+        plan = _plans[key] = compile_plan(*configs)
+
+    return plan
+
+
+def clear_plans() -> None:
+    _plans.clear()
+
+
+@dataclass(frozen=True, slots=True)
+class FinanceReportPlan:
+    """План финансового отчета: группы отчета и шаги (вид, группа, старая группа, услуга)."""
+
+    groups: tuple[str, ...]
+    steps: tuple[tuple[str, str, str, str], ...]
+
+
+def compile_finance_plan(total_report_config: dict[str, Any], fin_report_config: dict) -> FinanceReportPlan:
+    steps = []
+    for group_name, groups in total_report_config.items():
+        for oldgroup in groups:
+            services = fin_report_config.get(oldgroup)
+            if services is None:
+                logger.error(f"Несоответствие конфигураций XML-файлов\nГруппа {oldgroup} не существует!")
+            else:
+                for service_name in services:
+                    if service_name == "Дата":
+                        steps.append((DATE, group_name, oldgroup, service_name))
+                    elif service_name == "Депозит":
+                        steps.append((DEPOSIT, group_name, oldgroup, service_name))
+                    elif service_name != "Организация":
+                        steps.append((SERVICE, group_name, oldgroup, service_name))
+
+            if oldgroup == "Общепит":
+                steps.append((SMILE, group_name, oldgroup, "Смайл"))
+
+    return FinanceReportPlan(groups=tuple(total_report_config), steps=tuple(steps))
+
+
+def get_finance_plan(total_report_config: dict[str, Any], fin_report_config: dict) -> FinanceReportPlan:
+    return _cached_plan("finance", compile_finance_plan, total_report_config, fin_report_config)
+
+
+def apply_finance_plan(
+    plan: FinanceReportPlan,
+    itog_report_month: dict[str, tuple],
+    smile_report_month: SmileReport,
+) -> dict:
+    """Финансовый отчет по плану. Результат совпадает с обходом конфигурации по группам."""
+
+    month_finance_report = {}
+    control_sum_group = month_finance_report.setdefault("Контрольная сумма", {})
+    control_sum = control_sum_group.setdefault("Cумма", [["Сумма", 0, 0.0]])
+    group_totals = {}
+    for group_name in plan.groups:
+        finreport_group = month_finance_report.setdefault(group_name, {})
+        group_totals[group_name] = finreport_group.setdefault("Итого по группе", [["Итого по группе", 0, 0.0]])
+
+    for kind, group_name, oldgroup, service_name in plan.steps:
+        finreport_group = month_finance_report[group_name]
+        finreport_group_total = group_totals[group_name]
+        if kind == SMILE:
+            product_group = finreport_group.setdefault(
+                "Общепит (Смайл)",
+                [["Итого по папке", 0, 0.0]],
+            )
+            product_group.append(
+                [
+                    "Смайл",
+                    smile_report_month.total_count,
+                    smile_report_month.total_sum,
+                ]
+            )
+            product_group[0][1] += smile_report_month.total_count
+            product_group[0][2] += smile_report_month.total_sum
+            finreport_group_total[0][1] += smile_report_month.total_count
+            finreport_group_total[0][2] += smile_report_month.total_sum
+            continue
+
+        service = itog_report_month.get(service_name)
+        if service is None:
+            continue
+
+        try:
+            service_count, service_sum, org_name, _ = service
+            if kind == DATE:
+                product_group = finreport_group.setdefault(oldgroup, [])
+                product_group.append([service_name, service_count, service_sum])
+            elif kind == DEPOSIT:
+                product_group = finreport_group.setdefault(oldgroup, [])
+                product_group.append([service_name, 0, service_sum])
+                finreport_group_total[0][2] += service_sum
+                control_sum[0][2] += service_sum
+            else:
+                product_group = finreport_group.setdefault(org_name, [["Итого по папке", 0, 0.0]])
+                product_group.append([service_name, service_count, service_sum])
+                product_group[0][1] += service_count
+                product_group[0][2] += service_sum
+                finreport_group_total[0][1] += service_count
+                finreport_group_total[0][2] += service_sum
+                if service_name != "Итого по отчету":
+                    control_sum[0][1] += service_count
+                    control_sum[0][2] += service_sum
+        except TypeError:
+            continue
+
+    control_sum[0][1] += smile_report_month.total_count
+    control_sum[0][2] += smile_report_month.total_sum
+    month_finance_report["ИТОГО"]["Итого по группе"][0][1] += smile_report_month.total_count
+    month_finance_report["ИТОГО"]["Итого по группе"][0][2] += smile_report_month.total_sum
+    month_finance_report["ИТОГО"][""][0][1] += smile_report_month.total_count
+    month_finance_report["ИТОГО"][""][0][2] += smile_report_month.total_sum
+    month_finance_report["ИТОГО"][""][1][1] += smile_report_month.total_count
+    month_finance_report["ИТОГО"][""][1][2] += smile_report_month.total_sum
+
+    return month_finance_report
+
+
+@dataclass(frozen=True, slots=True)
+class AgentReportPlan:
+    """План отчета платежного агента: шаги (вид, организация, тариф)."""
+
+    steps: tuple[tuple[str, str, str], ...]
+
+
+def compile_agent_plan(agent_report_config: dict[str, Any]) -> AgentReportPlan:
+    steps = []
+    for org, tariffs in agent_report_config.items():
+        steps.append((ORG, org, ""))
+        for tariff in tariffs:
+            if tariff == "Дата":
+                steps.append((DATE, org, tariff))
+            elif tariff == "Депозит":
+                steps.append((DEPOSIT, org, tariff))
+            elif tariff != "Организация":
+                steps.append((SERVICE, org, tariff))
+
+            if tariff == "Смайл":
+                steps.append((SMILE, org, tariff))
+
+    return AgentReportPlan(steps=tuple(steps))
+
+
+def get_agent_plan(agent_report_config: dict[str, Any]) -> AgentReportPlan:
+    return _cached_plan("agent", compile_agent_plan, agent_report_config)
+
+
+def apply_agent_plan(
+    plan: AgentReportPlan,
+    month_total_report: dict[str, tuple],
+    smile_report_month: SmileReport,
+) -> dict:
+    """Отчет платежного агента по плану. Результат совпадает с обходом конфигурации по организациям."""
+
+    result = {}
+    result["Контрольная сумма"] = {}
+    result["Контрольная сумма"]["Cумма"] = [["Сумма", 0, 0.0]]
+    result["ИТОГО"] = {}
+    result["ИТОГО"][""] = [["Сумма", 0, 0.0]]
+
+    for kind, org, tariff in plan.steps:
+        if kind == ORG:
+            result[org] = {}
+            result[org]["Итого по группе"] = [["Итого по группе", 0, 0.0]]
+            continue
+
+        if kind == SMILE:
+            result[org]["Смайл"] = []
+            result[org]["Смайл"].append(["Итого по папке", 0, 0.0])
+            result[org]["Смайл"].append(
+                (
+                    "Смайл",
+                    smile_report_month.total_count,
+                    smile_report_month.total_sum,
+                )
+            )
+            result[org]["Смайл"][0][1] += smile_report_month.total_count
+            result[org]["Смайл"][0][2] += smile_report_month.total_sum
+            result[org]["Итого по группе"][0][1] += smile_report_month.total_count
+            result[org]["Итого по группе"][0][2] += smile_report_month.total_sum
+            result["Контрольная сумма"]["Cумма"][0][1] += smile_report_month.total_count
+            result["Контрольная сумма"]["Cумма"][0][2] += smile_report_month.total_sum
+            result["ИТОГО"][""][0][1] += smile_report_month.total_count
+            result["ИТОГО"][""][0][2] += smile_report_month.total_sum
+            continue
+
+        service = month_total_report.get(tariff)
+        if service is None:
+            continue
+
+        try:
+            service_name = service[2]
+            count = service[0]
+            summ = service[1]
+
+            if kind == DATE:
+                result[org][tariff] = [[tariff, count, summ]]
+            elif kind == DEPOSIT:
+                result[org][tariff] = [[tariff, 0, summ]]
+                result[org]["Итого по группе"][0][2] += summ
+                result["Контрольная сумма"]["Cумма"][0][2] += summ
+            else:
+                product_group = result[org].get(service_name)
+                if product_group:
+                    product_group.append([tariff, count, summ])
+                else:
+                    # Новая папка: строка тарифа в списке (если папка была пустой) или в кортеже (если ее не было)
+                    row = [tariff, count, summ] if product_group is not None else (tariff, count, summ)
+                    product_group = result[org][service_name] = [["Итого по папке", 0, 0.0], row]
+
+                product_group[0][1] += count
+                product_group[0][2] += summ
+                result[org]["Итого по группе"][0][1] += count
+                result[org]["Итого по группе"][0][2] += summ
+                if tariff != "Итого по отчету":
+                    result["Контрольная сумма"]["Cумма"][0][1] += count
+                    result["Контрольная сумма"]["Cумма"][0][2] += summ
+        except (KeyError, TypeError):
+            continue
+
+    return result
+
+
+@dataclass(frozen=True, slots=True)
+class AttendanceReportPlan:
+    """План отчета по посещаемости: макет заголовков и индекс "элемент -> ячейки (h1, h2, h3)"."""
+
+    layout: tuple[tuple[str, tuple[tuple[str, tuple[str, ...]], ...]], ...]
+    index: dict[str, tuple[tuple[str, str, str], ...]]
+
+
+def compile_attendance_plan(report_config: dict[str, Any]) -> AttendanceReportPlan:
+    layout = []
+    index: dict[str, list[tuple[str, str, str]]] = {}
+    for h1_header, h2_headers in report_config.items():
+        h2_layout = []
+        for h2_header, h3_headers in h2_headers.items():
+            h2_layout.append((h2_header, tuple(h3_headers)))
+            for h3_header, elements in h3_headers.items():
+                for element in elements:
+                    index.setdefault(element, []).append((h1_header, h2_header, h3_header))
+        layout.append((h1_header, tuple(h2_layout)))
+
+    return AttendanceReportPlan(
+        layout=tuple(layout),
+        index={element: tuple(cells) for element, cells in index.items()},
+    )
+
+
+def get_attendance_plan(report_config: dict[str, Any]) -> AttendanceReportPlan:
+    return _cached_plan("attendance", compile_attendance_plan, report_config)
+
+
+def apply_attendance_plan(plan: AttendanceReportPlan, total_report: TotalReport) -> dict:
+    """Суммы GoodAmount итогового отчета по ячейкам отчета по посещаемости."""
+
+    result = {
+        h1_header: {h2_header: dict.fromkeys(h3_headers, 0) for h2_header, h3_headers in h2_layout}
+        for h1_header, h2_layout in plan.layout
+    }
+    total_report_map = {el.name: el for el in total_report.elements}
+    for name, element in total_report_map.items():
+        for h1_header, h2_header, h3_header in plan.index.get(name, ()):
+            result[h1_header][h2_header][h3_header] += element.good_amount
+
+    return result
@@ -6,16 +6,32 @@ from redis.asyncio import Redis
 
 from api import router as api_router
 from core.settings import settings
-from db import redis_db
+from db import config_changes, mssql, redis_db
 from middleware.exceptions import exception_traceback_middleware
+from services import prewarm
+from services.container import close_app_services, create_app_services
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     redis_db.redis = Redis(host=settings.redis_host, port=settings.redis_port, db=0, decode_responses=True)
+    config_changes.listener = config_changes.ConfigChangesListener(settings.pg_listen_dsn)
+    config_changes.listener.start()
+    # Сервисы и клиенты внешних систем общие для всех запросов процесса
+    app.state.services = create_app_services()
+    await app.state.services.report_service.apply_retention()
+    if settings.prewarm_enabled:
+        prewarm.scheduler = prewarm.PrewarmScheduler(app.state.services.prewarm_service)
+        prewarm.scheduler.start()
     yield
 
+    if prewarm.scheduler is not None:
+        await prewarm.scheduler.stop()
+    await close_app_services(app.state.services)
+    await config_changes.listener.stop()
     await redis_db.redis.close()
+    mssql.shutdown_executor()
+    mssql.close_pools()
 
 
 app = FastAPI(
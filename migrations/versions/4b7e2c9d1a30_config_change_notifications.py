@@ -0,0 +1,72 @@
+"""config_change_notifications
+
+Revision ID: 4b7e2c9d1a30
+Revises: 21bb69ba60bd
+Create Date: 2026-10-18 10:12:41.218004
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "4b7e2c9d1a30"
+down_revision = "21bb69ba60bd"
+branch_labels = None
+depends_on = None
+
+CONFIG_TABLES = ("report_name", "report_group", "report_element", "google_report_ids")
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE IF NOT EXISTS config_version_seq")
+    # Каждое изменение конфигурации получает новую версию и рассылается всем процессам через NOTIFY
+    # (уведомление доставляется только после фиксации транзакции)
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_config_change() RETURNS trigger AS $$
+        DECLARE
+            report_name_ids uuid[] := ARRAY[]::uuid[];
+            group_ids uuid[] := ARRAY[]::uuid[];
+        BEGIN
+            IF TG_TABLE_NAME = 'report_name' THEN
+                IF TG_OP <> 'INSERT' THEN report_name_ids := report_name_ids || OLD.id; END IF;
+                IF TG_OP <> 'DELETE' THEN report_name_ids := report_name_ids || NEW.id; END IF;
+            ELSIF TG_TABLE_NAME = 'report_group' THEN
+                IF TG_OP <> 'INSERT' THEN report_name_ids := report_name_ids || OLD.report_name_id; END IF;
+                IF TG_OP <> 'DELETE' THEN report_name_ids := report_name_ids || NEW.report_name_id; END IF;
+            ELSIF TG_TABLE_NAME = 'report_element' THEN
+                IF TG_OP <> 'INSERT' THEN group_ids := group_ids || OLD.group_id; END IF;
+                IF TG_OP <> 'DELETE' THEN group_ids := group_ids || NEW.group_id; END IF;
+                -- При каскадном удалении группы отчет уже не найти: пустой список означает "все отчеты"
+                report_name_ids := ARRAY(
+                    SELECT DISTINCT report_name_id FROM report_group WHERE id = ANY(group_ids)
+                );
+            END IF;
+
+            PERFORM pg_notify(
+                'config_changed',
+                json_build_object(
+                    'version', nextval('config_version_seq'),
+                    'table', TG_TABLE_NAME,
+                    'report_name_ids', report_name_ids
+                )::text
+            );
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in CONFIG_TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_config_changed "
+            f"AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE PROCEDURE notify_config_change()"
+        )
+
+
+def downgrade() -> None:
+    for table in CONFIG_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_config_changed ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS notify_config_change()")
+    op.execute("DROP SEQUENCE IF EXISTS config_version_seq")
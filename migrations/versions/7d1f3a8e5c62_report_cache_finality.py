@@ -0,0 +1,29 @@
+"""report_cache_finality
+
+Revision ID: 7d1f3a8e5c62
+Revises: 4b7e2c9d1a30
+Create Date: 2026-10-18 14:03:27.551930
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "7d1f3a8e5c62"
+down_revision = "4b7e2c9d1a30"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("report_cache", sa.Column("sealed_at", sa.DateTime(), nullable=True))
+    op.add_column("report_cache", sa.Column("content_hash", sa.String(length=64), nullable=True))
+    op.add_column("report_cache", sa.Column("source_watermark", sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("report_cache", "source_watermark")
+    op.drop_column("report_cache", "content_hash")
+    op.drop_column("report_cache", "sealed_at")
@@ -0,0 +1,24 @@
+"""report_cache_type_date_index
+
+Revision ID: 9a4c2e7b1f08
+Revises: 7d1f3a8e5c62
+Create Date: 2026-10-18 15:41:09.302117
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "9a4c2e7b1f08"
+down_revision = "7d1f3a8e5c62"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_report_cache_report_type_report_date", "report_cache", ["report_type", "report_date"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_report_cache_report_type_report_date", table_name="report_cache")
@@ -0,0 +1,168 @@
+"""report_cache_partitioning
+
+Revision ID: c3e81f5a2d47
+Revises: 9a4c2e7b1f08
+Create Date: 2026-10-18 16:27:52.640193
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "c3e81f5a2d47"
+down_revision = "9a4c2e7b1f08"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE report_cache RENAME TO report_cache_old")
+    # Имена ограничений (и их индексов) уникальны в схеме: освобождаем их для новой таблицы
+    op.execute("ALTER TABLE report_cache_old RENAME CONSTRAINT report_cache_pkey TO report_cache_old_pkey")
+    op.execute("ALTER TABLE report_cache_old RENAME CONSTRAINT report_cache_id_key TO report_cache_old_id_key")
+    op.execute("ALTER TABLE report_cache_old RENAME CONSTRAINT unique_report TO unique_report_old")
+    op.execute("DROP INDEX IF EXISTS ix_report_cache_report_type_report_date")
+    # Ключ партиционирования (report_date) должен входить в первичный ключ и уникальные ограничения
+    op.execute(
+        """
+        CREATE TABLE report_cache (
+            id uuid NOT NULL,
+            report_date date NOT NULL,
+            report_type varchar(255) NOT NULL,
+            report_data jsonb NOT NULL,
+            sealed_at timestamp without time zone,
+            content_hash varchar(64),
+            source_watermark varchar(255),
+            created_at timestamp without time zone,
+            updated_at timestamp without time zone,
+            CONSTRAINT report_cache_pkey PRIMARY KEY (id, report_date),
+            CONSTRAINT unique_report UNIQUE (report_type, report_date)
+        ) PARTITION BY RANGE (report_date)
+        """
+    )
+    op.execute("CREATE TABLE report_cache_default PARTITION OF report_cache DEFAULT")
+    # Создает партицию месяца (если ее нет) и переносит в нее строки этого месяца из партиции по умолчанию
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION ensure_report_cache_partition(month_date date) RETURNS text AS $$
+        DECLARE
+            month_start date := date_trunc('month', month_date)::date;
+            month_end date := (date_trunc('month', month_date) + interval '1 month')::date;
+            partition_name text := 'report_cache_' || to_char(month_start, 'YYYY_MM');
+        BEGIN
+            IF to_regclass(partition_name) IS NOT NULL THEN
+                RETURN partition_name;
+            END IF;
+
+            PERFORM pg_advisory_xact_lock(hashtext('report_cache_partitions'));
+            IF to_regclass(partition_name) IS NULL THEN
+                EXECUTE format(
+                    'CREATE TABLE %I (LIKE report_cache INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name
+                );
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM report_cache_default '
+                    'WHERE report_date >= %L AND report_date < %L RETURNING *) '
+                    'INSERT INTO %I SELECT * FROM moved',
+                    month_start, month_end, partition_name
+                );
+                EXECUTE format(
+                    'ALTER TABLE report_cache ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, month_start, month_end
+                );
+            END IF;
+
+            RETURN partition_name;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    # Удаляет партиции месяцев, которые целиком раньше before_date (хранение отчетов ограничено по времени)
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION drop_report_cache_partitions(before_date date) RETURNS integer AS $$
+        DECLARE
+            partition_row record;
+            dropped integer := 0;
+        BEGIN
+            PERFORM pg_advisory_xact_lock(hashtext('report_cache_partitions'));
+            FOR partition_row IN
+                SELECT child.relname AS name
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = 'report_cache' AND child.relname ~ '^report_cache_\\d{4}_\\d{2}$'
+            LOOP
+                IF to_date(substring(partition_row.name FROM 14), 'YYYY_MM') + interval '1 month' <= before_date THEN
+                    EXECUTE format('ALTER TABLE report_cache DETACH PARTITION %I', partition_row.name);
+                    EXECUTE format('DROP TABLE %I', partition_row.name);
+                    dropped := dropped + 1;
+                END IF;
+            END LOOP;
+
+            RETURN dropped;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        SELECT ensure_report_cache_partition(month::date)
+        FROM (
+            SELECT DISTINCT date_trunc('month', report_date::date) AS month FROM report_cache_old
+            UNION
+            SELECT date_trunc('month', now()) + interval '1 month' * shift FROM generate_series(0, 2) AS shift
+        ) AS months
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO report_cache (
+            id, report_date, report_type, report_data, sealed_at, content_hash, source_watermark, created_at, updated_at
+        )
+        SELECT
+            id, report_date::date, report_type, report_data, sealed_at, content_hash, source_watermark, created_at,
+            updated_at
+        FROM report_cache_old
+        """
+    )
+    op.execute("DROP TABLE report_cache_old")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE report_cache RENAME TO report_cache_partitioned")
+    op.execute(
+        "ALTER TABLE report_cache_partitioned RENAME CONSTRAINT report_cache_pkey TO report_cache_partitioned_pkey"
+    )
+    op.execute("ALTER TABLE report_cache_partitioned RENAME CONSTRAINT unique_report TO unique_report_partitioned")
+    op.execute(
+        """
+        CREATE TABLE report_cache (
+            id uuid NOT NULL PRIMARY KEY UNIQUE,
+            report_date varchar(255) NOT NULL,
+            report_type varchar(255) NOT NULL,
+            report_data jsonb NOT NULL,
+            sealed_at timestamp without time zone,
+            content_hash varchar(64),
+            source_watermark varchar(255),
+            created_at timestamp without time zone,
+            updated_at timestamp without time zone,
+            CONSTRAINT unique_report UNIQUE (report_date, report_type)
+        )
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO report_cache (
+            id, report_date, report_type, report_data, sealed_at, content_hash, source_watermark, created_at, updated_at
+        )
+        SELECT
+            id, to_char(report_date, 'YYYY-MM-DD'), report_type, report_data, sealed_at, content_hash,
+            source_watermark, created_at, updated_at
+        FROM report_cache_partitioned
+        """
+    )
+    op.execute("DROP TABLE report_cache_partitioned CASCADE")
+    op.execute("DROP FUNCTION IF EXISTS drop_report_cache_partitions(date)")
+    op.execute("DROP FUNCTION IF EXISTS ensure_report_cache_partition(date)")
+    op.execute("CREATE INDEX ix_report_cache_report_type_report_date ON report_cache (report_type, report_date)")
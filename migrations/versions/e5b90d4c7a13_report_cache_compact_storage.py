@@ -0,0 +1,28 @@
+"""report_cache_compact_storage
+
+Revision ID: e5b90d4c7a13
+Revises: c3e81f5a2d47
+Create Date: 2026-10-18 18:04:11.372815
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "e5b90d4c7a13"
+down_revision = "c3e81f5a2d47"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Колонка добавляется в партиционированную таблицу и во все ее партиции
+    op.add_column("report_cache", sa.Column("report_blob", sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    # Компактные отчеты без колонки не прочитать: это кеш, он будет построен заново
+    op.execute("DELETE FROM report_cache WHERE report_blob IS NOT NULL")
+    op.drop_column("report_cache", "report_blob")
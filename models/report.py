@@ -37,6 +37,19 @@ class ReportNameModel(Base, IDMixin, TitleMixin, CRUDMixin):
             result = await session.execute(request)
             return result.scalars().first()
 
+    @classmethod
+    async def get_with_elements_by_title(cls, title: str) -> Self:
+        """Отчет с группами и элементами групп одним запросом."""
+
+        async with async_session() as session:
+            request = (
+                select(cls)
+                .options(joinedload(cls.groups).joinedload(ReportGroupModel.elements))
+                .where(cls.title == title)
+            )
+            result = await session.execute(request)
+            return result.unique().scalars().first()
+
 
 class ReportGroupModel(Base, IDMixin, CRUDMixin):
     """Группа элементов в отчете"""
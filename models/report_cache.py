@@ -1,9 +1,21 @@
 import logging
-from datetime import date
+import uuid
+from collections.abc import Iterable
+from datetime import date, datetime
 from typing import Self
 
-from sqlalchemy import Column, String, UniqueConstraint, select
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    LargeBinary,
+    PrimaryKeyConstraint,
+    String,
+    UniqueConstraint,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID, insert
 
 from db.postgres import Base, async_session
 
@@ -11,22 +23,139 @@ from .mixins import CRUDMixin, IDMixin
 
 logger = logging.getLogger(__name__)
 
+# Месяцы, партиции которых уже созданы (в рамках процесса)
+_partitions: set[date] = set()
+
+
+def _month_start(value: date) -> date:
+    return value.replace(day=1)
+
 
 class ReportCacheModel(Base, IDMixin, CRUDMixin):
-    """Таблица с кешом сгенерированных отчетов."""
+    """Таблица с кешом сгенерированных отчетов.
+
+    Таблица партиционирована по месяцам report_date (RANGE), поэтому запросы за период читают только
+    партиции своих месяцев, а устаревшие месяцы удаляются целиком (drop_partitions_before).
+    """
 
     __tablename__ = "report_cache"
-    report_date = Column(String(255), nullable=False)
+    id = Column(UUID(as_uuid=True), default=uuid.uuid4, nullable=False)
+    report_date = Column(Date, nullable=False)
     report_type = Column(String(255), nullable=False)
     report_data = Column(JSONB, nullable=False, default=dict)
-    __table_args__ = (UniqueConstraint("report_date", "report_type", name="unique_report"),)
+    # Компактное содержимое отчета (utils.report_codec); если задано, report_data пустой
+    report_blob = Column(LargeBinary, nullable=True)
+    # Отчет за закрытый день запечатывается: при обходе кеша он не пересчитывается без явного force
+    sealed_at = Column(DateTime, nullable=True)
+    content_hash = Column(String(64), nullable=True)
+    source_watermark = Column(String(255), nullable=True)
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "report_date", name="report_cache_pkey"),
+        UniqueConstraint("report_type", "report_date", name="unique_report"),
+        {"postgresql_partition_by": "RANGE (report_date)"},
+    )
 
     @classmethod
     async def get_by_date(cls, report_type: str, report_date: date) -> Self:
         async with async_session() as session:
             request = select(cls).where(
-                cls.report_date == report_date.isoformat(),
+                cls.report_date == report_date,
                 cls.report_type == report_type,
             )
             result = await session.execute(request)
             return result.scalars().first()
+
+    @classmethod
+    async def get_by_dates(cls, report_type: str, report_dates: Iterable[date]) -> list[Self]:
+        async with async_session() as session:
+            request = select(cls).where(
+                cls.report_date.in_(list(report_dates)),
+                cls.report_type == report_type,
+            )
+            result = await session.execute(request)
+            return result.scalars().all()
+
+    @classmethod
+    async def get_range(cls, report_type: str, date_from: date, date_to: date) -> list[Self]:
+        """Отчеты одного типа за период [date_from, date_to) одним запросом по индексу (тип, дата)."""
+
+        async with async_session() as session:
+            request = (
+                select(cls)
+                .where(
+                    cls.report_type == report_type,
+                    cls.report_date >= date_from,
+                    cls.report_date < date_to,
+                )
+                .order_by(cls.report_date)
+            )
+            result = await session.execute(request)
+            return result.scalars().all()
+
+    @classmethod
+    async def upsert_many(cls, reports: list[dict]) -> None:
+        """Добавить или обновить отчеты одним запросом (INSERT ... ON CONFLICT DO UPDATE)."""
+
+        if not reports:
+            return
+
+        await cls.ensure_partitions(report["report_date"] for report in reports)
+        request = insert(cls).values(reports)
+        request = request.on_conflict_do_update(
+            constraint="unique_report",
+            set_={
+                "report_data": request.excluded.report_data,
+                "report_blob": request.excluded.report_blob,
+                "sealed_at": request.excluded.sealed_at,
+                "content_hash": request.excluded.content_hash,
+                "source_watermark": request.excluded.source_watermark,
+                "updated_at": datetime.utcnow(),
+            },
+        )
+        async with async_session() as session:
+            await session.execute(request)
+            await session.commit()
+
+    @classmethod
+    async def create_many_if_not_exists(cls, reports: list[dict]) -> None:
+        """Добавить отчеты одним запросом, пропуская уже существующие (по дате и типу отчета)."""
+
+        if not reports:
+            return
+
+        await cls.ensure_partitions(report["report_date"] for report in reports)
+        async with async_session() as session:
+            await session.execute(insert(cls).values(reports).on_conflict_do_nothing(constraint="unique_report"))
+            await session.commit()
+
+    async def save(self, commit=True):
+        await self.ensure_partitions([self.report_date])
+        return await super().save(commit=commit)
+
+    @classmethod
+    async def ensure_partitions(cls, report_dates: Iterable[date]) -> None:
+        """Создать партиции месяцев (строки без партиции попадают в report_cache_default)."""
+
+        months = {_month_start(report_date) for report_date in report_dates} - _partitions
+        if not months:
+            return
+
+        async with async_session() as session:
+            for month in sorted(months):
+                await session.execute(text("SELECT ensure_report_cache_partition(:month)"), {"month": month})
+            await session.commit()
+
+        _partitions.update(months)
+
+    @classmethod
+    async def drop_partitions_before(cls, before: date) -> int:
+        """Удалить партиции месяцев, которые целиком раньше даты. Возвращает количество удаленных партиций."""
+
+        async with async_session() as session:
+            result = await session.execute(
+                text("SELECT drop_report_cache_partitions(:before)"), {"before": _month_start(before)}
+            )
+            await session.commit()
+
+        _partitions.clear()
+        return result.scalar_one()
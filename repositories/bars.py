@@ -1,33 +1,88 @@
-from datetime import datetime
+import logging
+from collections.abc import Sequence
+from datetime import date, datetime, timedelta
+from functools import partial
 
 from pyodbc import ProgrammingError, Row
 
 from core.settings import settings
 from db.mssql import MsSqlDatabase
 from repositories.base import BaseRepository
-from sql.category import GET_TARIFFS_SQL
+from repositories.cache import CacheRepository, get_cache_repo
+from sql.category import (
+    GET_TARIFFS_CATALOG_CHANGES_SQL,
+    GET_TARIFFS_CATALOG_SQL,
+    GET_TARIFFS_CATALOG_WATERMARK_SQL,
+    GET_TARIFFS_SQL,
+    GET_TARIFFS_WATERMARK_SQL,
+)
 from sql.customer_count import CURRENT_CUSTOMER_COUNT_SQL, PERIOD_CUSTOMER_COUNT_SQL
-from sql.get_companies import GET_COMPANIES_SQL
+from sql.get_companies import GET_COMPANIES_SQL, GET_COMPANIES_WATERMARK_SQL
 from sql.sp_report_totals_v2 import (
     SP_REPORT_TOTALS_V2_OLD_VERSION_SQL,
     SP_REPORT_TOTALS_V2_SQL,
+    sp_report_totals_v2_batch_sql,
 )
 from sql.transactions import (
     GET_LOAN_TRANSACTIONS_BY_SERVICE_NAME_PATTERN,
     GET_LOAN_TRANSACTIONS_BY_SERVICE_NAMES,
 )
+from utils.dates import days_range
+
+logger = logging.getLogger(__name__)
 
 
 class BarsRepository(BaseRepository):
-    def get_tariffs(self, organization_id: int) -> list[Row]:
-        sql = GET_TARIFFS_SQL.format(organization_id=organization_id)
-        return self._fetchall(sql)
+    def __init__(self, db: MsSqlDatabase, cache: CacheRepository):
+        super().__init__(db)
+        self._cache = cache
+
+    async def _watermark(self, sql: str, params: tuple) -> tuple:
+        return tuple(await self.fetchone(sql, params))
+
+    async def get_tariffs(self, organization_id: int) -> list[dict]:
+        """Тарифы организации (через кеш справочников)."""
+
+        return await self._cache.get_or_load(
+            key=self._cache.key(self._db.database, "tariffs", organization_id),
+            loader=partial(self.run_sql_to_dict, GET_TARIFFS_SQL, (organization_id,)),
+            watermark_loader=partial(self._watermark, GET_TARIFFS_WATERMARK_SQL, (organization_id,)),
+        )
+
+    async def get_organisations(self) -> list[dict]:
+        """Организации (через кеш справочников)."""
+
+        return await self._cache.get_or_load(
+            key=self._cache.key(self._db.database, "organisations"),
+            loader=partial(self.run_sql_to_dict, GET_COMPANIES_SQL),
+            watermark_loader=partial(self._watermark, GET_COMPANIES_WATERMARK_SQL, (1,)),
+        )
+
+    async def get_tariffs_catalog(
+        self, organization_ids: Sequence[int], changed_since: datetime | None = None
+    ) -> list[dict]:
+        """Тарифы организаций (все или измененные начиная с changed_since) в обход кеша справочников."""
+
+        placeholders = self._placeholders(len(organization_ids))
+        if changed_since is None:
+            sql = GET_TARIFFS_CATALOG_SQL.format(organization_ids=placeholders)
+            return await self.run_sql_to_dict(sql, tuple(organization_ids))
+
+        sql = GET_TARIFFS_CATALOG_CHANGES_SQL.format(organization_ids=placeholders)
+        return await self.run_sql_to_dict(sql, (*organization_ids, changed_since))
 
-    def get_organisations(self) -> list[Row]:
-        sql = GET_COMPANIES_SQL
-        return self._fetchall(sql)
+    async def get_tariffs_catalog_watermark(
+        self, organization_ids: Sequence[int]
+    ) -> tuple[datetime | None, int, int | None]:
+        """Водяной знак тарифов организаций: MAX(ChangeTime), количество и контрольная сумма набора id."""
 
-    def get_total_report(
+        sql = GET_TARIFFS_CATALOG_WATERMARK_SQL.format(organization_ids=self._placeholders(len(organization_ids)))
+        return await self._watermark(sql, tuple(organization_ids))
+
+    async def invalidate_reference_cache(self) -> int:
+        return await self._cache.invalidate(self._db.database)
+
+    async def get_total_report(
         self,
         org: int,
         date_from: datetime,
@@ -38,35 +93,58 @@ class BarsRepository(BaseRepository):
     ) -> list[Row]:
         """Формирование Итогового отчета."""
 
-        date_from = date_from.isoformat()
-        date_to = date_to.isoformat()
-        hide_zeroes = int(hide_zeroes)
-        hide_internal = int(hide_internal)
-        hide_discount = int(hide_discount)
-
-        sql = SP_REPORT_TOTALS_V2_SQL.format(
-            org=org,
-            date_from=date_from,
-            date_to=date_to,
-            hide_zeroes=hide_zeroes,
-            hide_internal=hide_internal,
-            hide_discount=hide_discount,
-        )
+        params = (org, date_from, date_to, int(hide_zeroes), int(hide_internal))
         try:
-            return self._fetchall(sql)
+            return await self.fetchall(SP_REPORT_TOTALS_V2_SQL, (*params, int(hide_discount)))
 
         except ProgrammingError:
             # Обратная совместимость для старой версии БД SkiBars
-            sql = SP_REPORT_TOTALS_V2_OLD_VERSION_SQL.format(
-                org=org,
-                date_from=date_from,
-                date_to=date_to,
-                hide_zeroes=hide_zeroes,
-                hide_internal=hide_internal,
-            )
-            return self._fetchall(sql)
-
-    def get_loan_transactions_by_service_name_pattern(
+            return await self.fetchall(SP_REPORT_TOTALS_V2_OLD_VERSION_SQL, params)
+
+    async def get_total_report_by_days(
+        self,
+        org: int,
+        date_from: datetime,
+        date_to: datetime,
+        hide_zeroes: bool,
+        hide_internal: bool,
+        hide_discount: bool,
+    ) -> dict[date, list[Row]]:
+        """Формирование Итогового отчета по каждому дню периода за одно обращение к серверу.
+
+        Процедура вызывается для каждого дня внутри одного пакета, поэтому результат совпадает с вызовами по дням.
+        Для старых версий БД SkiBars отчет собирается вызовами по дням.
+        """
+
+        days = days_range(date_from, date_to)
+        if not days:
+            return {}
+
+        flags = (int(hide_zeroes), int(hide_internal), int(hide_discount))
+        params = [param for day in days for param in (org, day, day + timedelta(days=1), *flags)]
+        result_sets = None
+        try:
+            result_sets = await self.fetch_result_sets(sp_report_totals_v2_batch_sql(len(days)), params)
+
+        except ProgrammingError as e:
+            logger.warning(f"Batch sp_reportOrganizationTotals_v2 failed, fallback to day by day: {e}")
+
+        if result_sets is None or len(result_sets) != len(days):
+            return {
+                day.date(): await self.get_total_report(
+                    org=org,
+                    date_from=day,
+                    date_to=day + timedelta(days=1),
+                    hide_zeroes=hide_zeroes,
+                    hide_internal=hide_internal,
+                    hide_discount=hide_discount,
+                )
+                for day in days
+            }
+
+        return {day.date(): rows for day, rows in zip(days, result_sets, strict=True)}
+
+    async def get_loan_transactions_by_service_name_pattern(
         self,
         date_from: datetime,
         date_to: datetime,
@@ -78,19 +156,13 @@ class BarsRepository(BaseRepository):
         В паттерне указывается часть названия услуги для поиска, например "КОРП" найдет все услуги,
         в названии которых встречается строка КОРП
         """
-        _date_from = date_from.isoformat()
-        _date_to = date_to.isoformat()
-        _companies_ids = ",".join(str(_id) for _id in companies_ids)
-
         sql = GET_LOAN_TRANSACTIONS_BY_SERVICE_NAME_PATTERN.format(
-            date_from=_date_from,
-            date_to=_date_to,
-            service_name_pattern=service_name_pattern,
-            companies_ids=_companies_ids,
+            companies_ids=self._placeholders(len(companies_ids)),
         )
-        return self._fetchall(sql)
+        params = (date_from, date_to, f"%{service_name_pattern}%", *companies_ids, *companies_ids)
+        return await self.fetchall(sql, params)
 
-    def get_loan_transactions_by_service_names(
+    async def get_loan_transactions_by_service_names(
         self,
         date_from: datetime,
         date_to: datetime,
@@ -102,36 +174,25 @@ class BarsRepository(BaseRepository):
         В паттерне указывается часть названия услуги для поиска, например "КОРП" найдет все услуги,
         в названии которых встречается строка КОРП
         """
-        _date_from = date_from.isoformat()
-        _date_to = date_to.isoformat()
-        _companies_ids = ",".join(str(_id) for _id in companies_ids)
-
         sql = GET_LOAN_TRANSACTIONS_BY_SERVICE_NAMES.format(
-            date_from=_date_from,
-            date_to=_date_to,
-            service_names=", ".join(f"'{service_name}'" for service_name in service_names),
-            companies_ids=_companies_ids,
+            service_names=self._placeholders(len(service_names)),
+            companies_ids=self._placeholders(len(companies_ids)),
         )
-        return self._fetchall(sql)
+        params = (date_from, date_to, *service_names, *companies_ids, *companies_ids)
+        return await self.fetchall(sql, params)
 
-    def get_period_customer_count(
+    async def get_period_customer_count(
         self,
         date_from: datetime,
         date_to: datetime,
     ) -> int:
-        _date_from = date_from.isoformat()
-        _date_to = date_to.isoformat()
-        sql = PERIOD_CUSTOMER_COUNT_SQL.format(
-            date_from=_date_from,
-            date_to=_date_to,
-        )
-        res = self._fetchone(sql)
+        res = await self.fetchone(PERIOD_CUSTOMER_COUNT_SQL, (date_from, date_to))
         return res[0]
 
-    def get_current_customer_count(
+    async def get_current_customer_count(
         self,
     ) -> int:
-        res = self._fetchone(CURRENT_CUSTOMER_COUNT_SQL)
+        res = await self.fetchone(CURRENT_CUSTOMER_COUNT_SQL)
         return res[1]
 
 
@@ -141,4 +202,4 @@ def get_bars_repo() -> BarsRepository:
         user=settings.mssql_user,
         password=settings.mssql_pwd,
     )
-    return BarsRepository(db)
+    return BarsRepository(db, cache=get_cache_repo())
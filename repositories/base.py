@@ -1,32 +1,76 @@
+import copy
 from abc import ABC
+from collections.abc import Sequence
+from typing import Self
 
 from pyodbc import Row
 
-from db.mssql import MsSqlDatabase
+from db.mssql import MsSqlDatabase, run_in_executor
 
 
 class BaseRepository(ABC):
     def __init__(self, db: MsSqlDatabase):
         self._db = db
 
-    def set_database(self, db_name: str) -> None:
-        self._db.set_database(db_name)
+    @property
+    def database(self) -> str | None:
+        return self._db.database
 
-    def _fetchall(self, sql: str) -> list[Row]:
+    def for_database(self, db_name: str) -> Self:
+        """Копия репозитория, работающая с базой db_name."""
+
+        repo = copy.copy(self)
+        repo._db = self._db.with_database(db_name)
+        return repo
+
+    @staticmethod
+    def _placeholders(count: int) -> str:
+        """Список маркеров параметров для конструкции IN (...)."""
+
+        return ", ".join("?" * count)
+
+    async def fetchall(self, sql: str, params: Sequence = ()) -> list[Row]:
+        return await run_in_executor(self._fetchall, sql, params)
+
+    async def fetchone(self, sql: str, params: Sequence = ()) -> Row:
+        return await run_in_executor(self._fetchone, sql, params)
+
+    async def run_sql_to_dict(self, sql: str, params: Sequence = ()) -> list[dict]:
+        return await run_in_executor(self._run_sql_to_dict, sql, params)
+
+    async def fetch_result_sets(self, sql: str, params: Sequence = ()) -> list[list[Row]]:
+        return await run_in_executor(self._fetch_result_sets, sql, params)
+
+    def _fetchall(self, sql: str, params: Sequence = ()) -> list[Row]:
         with self._db as conn:
             cursor = conn.cursor()
-            cursor.execute(sql)
+            cursor.execute(sql, *params)
             return cursor.fetchall()
 
-    def _fetchone(self, sql: str) -> Row:
+    def _fetchone(self, sql: str, params: Sequence = ()) -> Row:
         with self._db as conn:
             cursor = conn.cursor()
-            cursor.execute(sql)
+            cursor.execute(sql, *params)
             return cursor.fetchone()
 
-    def _run_sql_to_dict(self, sql: str) -> list[dict]:
+    def _fetch_result_sets(self, sql: str, params: Sequence = ()) -> list[list[Row]]:
+        """Выполнить пакет запросов и вернуть все наборы строк."""
+
+        with self._db as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, *params)
+            result_sets = []
+            while True:
+                if cursor.description is not None:
+                    result_sets.append(cursor.fetchall())
+                if not cursor.nextset():
+                    break
+
+            return result_sets
+
+    def _run_sql_to_dict(self, sql: str, params: Sequence = ()) -> list[dict]:
         with self._db as conn:
             cursor = conn.cursor()
-            cursor.execute(sql)
+            cursor.execute(sql, *params)
             columns = [column[0] for column in cursor.description]
             return [dict(zip(columns, row, strict=False)) for row in cursor.fetchall()]
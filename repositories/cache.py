@@ -0,0 +1,116 @@
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import orjson
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.settings import settings
+from db import redis_db
+from utils.codecs import dump_value, load_value
+
+logger = logging.getLogger(__name__)
+
+# v2: данные хранятся через utils.codecs (записи в прежнем формате не читаются)
+KEY_PREFIX = "barsic:reference:v2"
+
+
+class CacheRepository:
+    """Read-through кеш справочных данных MSSQL (организации, тарифы) в Redis.
+
+    Запись хранит данные, водяной знак источника (например, MAX(ChangeTime)) и время последней проверки.
+    Раз в recheck_interval секунд водяной знак сверяется с базой, и при изменении данные перечитываются.
+    """
+
+    def __init__(self, redis: Redis | None, ttl: int, recheck_interval: int):
+        self._redis = redis
+        self._ttl = ttl
+        self._recheck_interval = recheck_interval
+
+    @staticmethod
+    def key(database: str, *parts: Any) -> str:
+        return ":".join([KEY_PREFIX, database, *(str(part) for part in parts)])
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[list]],
+        watermark_loader: Callable[[], Awaitable[Any]] | None = None,
+    ) -> list:
+        """Вернуть данные из кеша, а при промахе или устаревании загрузить их из источника.
+
+        Данные хранятся через utils.codecs, поэтому datetime, date, Decimal и кортежи возвращаются теми же
+        типами, что и из источника.
+        """
+
+        entry = await self._get(key)
+        if entry is not None and (
+            watermark_loader is None or time.time() - entry["checked_at"] < self._recheck_interval
+        ):
+            return load_value(entry["data"])
+
+        watermark = self._dump_watermark(await watermark_loader()) if watermark_loader is not None else None
+        if entry is not None:
+            if watermark == entry["watermark"]:
+                entry["checked_at"] = time.time()
+                await self._set(key, entry)
+                return load_value(entry["data"])
+
+            logger.info(f"Reference cache '{key}' is stale, reloading")
+
+        data = dump_value(await loader())
+        await self._set(key, {"data": data, "watermark": watermark, "checked_at": time.time()})
+        # Приводим данные к виду, в котором они будут прочитаны из кеша (например, UUID - строкой)
+        return load_value(orjson.loads(orjson.dumps(data)))
+
+    async def invalidate(self, database: str | None = None) -> int:
+        """Удалить закешированные справочники базы данных (или всех баз)."""
+
+        if self._redis is None:
+            return 0
+
+        pattern = self.key(database or "*", "*")
+        deleted = 0
+        try:
+            async for key in self._redis.scan_iter(match=pattern):
+                deleted += await self._redis.delete(key)
+
+        except RedisError as e:
+            logger.error(f"Reference cache invalidation failed: {e}")
+
+        return deleted
+
+    @staticmethod
+    def _dump_watermark(watermark: Any) -> str | None:
+        return None if watermark is None else str(watermark)
+
+    async def _get(self, key: str) -> dict | None:
+        if self._redis is None:
+            return None
+
+        try:
+            raw = await self._redis.get(key)
+        except RedisError as e:
+            logger.error(f"Reference cache read failed: {e}")
+            return None
+
+        return orjson.loads(raw) if raw else None
+
+    async def _set(self, key: str, entry: dict) -> None:
+        if self._redis is None:
+            return
+
+        try:
+            await self._redis.set(key, orjson.dumps(entry), ex=self._ttl)
+        except RedisError as e:
+            logger.error(f"Reference cache write failed: {e}")
+
+
+def get_cache_repo() -> CacheRepository:
+    return CacheRepository(
+        redis=redis_db.redis,
+        ttl=settings.reference_cache_ttl,
+        recheck_interval=settings.reference_cache_recheck_interval,
+    )
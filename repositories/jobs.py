@@ -0,0 +1,91 @@
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from core.settings import settings
+from db import redis_db
+from schemas.jobs import Job
+
+KEY_PREFIX = "barsic:jobs"
+QUEUE_KEY = f"{KEY_PREFIX}:queue"
+# Задачи, которые взяты из очереди воркером, но еще не завершены (отдельный список на каждого воркера)
+PROCESSING_KEY = f"{KEY_PREFIX}:processing"
+
+
+class JobRepository:
+    """Фоновые задачи в Redis: записи задач (с результатом) и очередь на выполнение.
+
+    Воркер забирает задачу из очереди атомарно в свой список processing_key(worker_id) (BLMOVE) и удаляет
+    ее оттуда только после завершения, поэтому задачи упавшего воркера возвращаются в очередь
+    (requeue_processing).
+    """
+
+    def __init__(self, redis: Redis, ttl: int):
+        self._redis = redis
+        self._ttl = ttl
+
+    @staticmethod
+    def key(job_id: UUID | str) -> str:
+        return f"{KEY_PREFIX}:job:{job_id}"
+
+    @staticmethod
+    def processing_key(worker_id: str) -> str:
+        return f"{PROCESSING_KEY}:{worker_id}"
+
+    @staticmethod
+    def active_key(digest: str) -> str:
+        return f"{KEY_PREFIX}:active:{digest}"
+
+    async def get(self, job_id: UUID | str) -> Job | None:
+        raw = await self._redis.get(self.key(job_id))
+        return Job.model_validate_json(raw) if raw else None
+
+    async def save(self, job: Job) -> None:
+        await self._redis.set(self.key(job.id), job.model_dump_json(), ex=self._ttl)
+
+    async def enqueue(self, job: Job) -> None:
+        await self.save(job)
+        await self._redis.lpush(QUEUE_KEY, str(job.id))
+
+    async def dequeue(self, timeout: float, worker_id: str) -> UUID | None:
+        """Взять следующую задачу из очереди в список воркера (ждать не дольше timeout секунд)."""
+
+        job_id = await self._redis.blmove(QUEUE_KEY, self.processing_key(worker_id), timeout, "RIGHT", "LEFT")
+        return UUID(job_id) if job_id else None
+
+    async def ack(self, job_id: UUID, worker_id: str) -> None:
+        await self._redis.lrem(self.processing_key(worker_id), 0, str(job_id))
+
+    async def requeue_processing(self, worker_id: str) -> list[UUID]:
+        """Вернуть в очередь невыполненные задачи остановленных воркеров.
+
+        worker_id - id воркера или glob-шаблон Redis (например, все воркеры хоста).
+        """
+
+        job_ids = []
+        async for processing_key in self._redis.scan_iter(match=self.processing_key(worker_id)):
+            while job_id := await self._redis.lmove(processing_key, QUEUE_KEY, "LEFT", "RIGHT"):
+                job_ids.append(UUID(job_id))
+
+        return job_ids
+
+    async def claim_active(self, digest: str, job_id: UUID) -> UUID:
+        """Закрепить задачу за набором параметров. Возвращает уже закрепленную задачу, если она есть."""
+
+        if await self._redis.set(self.active_key(digest), str(job_id), nx=True, ex=self._ttl):
+            return job_id
+
+        active_id = await self._redis.get(self.active_key(digest))
+        return UUID(active_id) if active_id else job_id
+
+    async def set_active(self, digest: str, job_id: UUID) -> None:
+        await self._redis.set(self.active_key(digest), str(job_id), ex=self._ttl)
+
+    async def release_active(self, digest: str, job_id: UUID) -> None:
+        active_key = self.active_key(digest)
+        if await self._redis.get(active_key) == str(job_id):
+            await self._redis.delete(active_key)
+
+
+def get_job_repo() -> JobRepository:
+    return JobRepository(redis=redis_db.redis, ttl=settings.job_ttl)
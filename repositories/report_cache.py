@@ -0,0 +1,220 @@
+import base64
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date
+
+import orjson
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.settings import settings
+from db import redis_db
+from schemas.report_cache import ReportCache
+from utils.report_codec import LazyReportData, encode_report_data
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "barsic:report_cache"
+
+
+@dataclass
+class ReportCacheMetrics:
+    """Счетчики попаданий кеша отчетов одного типа."""
+
+    report_type: str
+    memory_hits: int = 0
+    redis_hits: int = 0
+    misses: int = 0
+
+
+@dataclass(slots=True)
+class _MemoryEntry:
+    report: ReportCache
+    size: int
+    expires_at: float
+
+
+class _MemoryLRU:
+    """LRU отчетов в памяти процесса, ограниченный суммарным размером записей в байтах.
+
+    Размер записи - размер ее упакованного вида (как в Redis), поэтому раскодированные отчеты
+    занимают в памяти больше учтенного.
+    """
+
+    def __init__(self):
+        self._entries: OrderedDict[str, _MemoryEntry] = OrderedDict()
+        self._size = 0
+
+    def get(self, key: str) -> ReportCache | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self.pop(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return entry.report
+
+    def put(self, key: str, report: ReportCache, size: int) -> None:
+        self.pop(key)
+        if size > settings.report_cache_memory_max_bytes:
+            return
+
+        self._entries[key] = _MemoryEntry(report, size, time.monotonic() + settings.report_cache_memory_ttl)
+        self._size += size
+        while self._size > settings.report_cache_memory_max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.size
+
+    def pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry.size
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+
+# Уровень в памяти и счетчики общие для всех экземпляров репозитория в процессе
+_memory = _MemoryLRU()
+_metrics: dict[str, ReportCacheMetrics] = {}
+
+
+def _count(report_type: str, memory_hits: int = 0, redis_hits: int = 0, misses: int = 0) -> None:
+    metrics = _metrics.setdefault(report_type, ReportCacheMetrics(report_type=report_type))
+    metrics.memory_hits += memory_hits
+    metrics.redis_hits += redis_hits
+    metrics.misses += misses
+
+
+def _dump(report: ReportCache) -> bytes:
+    report_data = report.report_data
+    blob = report_data.blob if isinstance(report_data, LazyReportData) else encode_report_data(report_data)
+    return orjson.dumps(
+        {
+            "report": report.model_dump(mode="json", exclude={"report_data"}),
+            "report_blob": base64.b64encode(blob).decode(),
+        }
+    )
+
+
+def _load(raw: str | bytes) -> ReportCache:
+    entry = orjson.loads(raw)
+    report = ReportCache.model_validate(entry["report"] | {"report_data": {}})
+    report.report_data = LazyReportData(base64.b64decode(entry["report_blob"]))
+    return report
+
+
+class ReportCacheRepository:
+    """Двухуровневый кеш записей report_cache перед Postgres: LRU в памяти процесса и общий Redis.
+
+    Записи хранятся уже провалидированными (ReportCache) с упакованным содержимым, которое раскодируется
+    при первом обращении. Кешируются только запечатанные отчеты (за закрытые дни): отчеты за изменяемые дни
+    пересобираются в других процессах, и их копия в кеше могла бы пережить сброс (чтение, начатое до
+    сохранения, записало бы в кеш старую строку). Такие отчеты всегда читаются из Postgres.
+    При сохранении и удалении отчетов записи явно сбрасываются в обоих уровнях.
+    """
+
+    def __init__(self, redis: Redis | None, ttl: int):
+        self._redis = redis
+        self._ttl = ttl
+
+    @staticmethod
+    def key(report_type: str, report_date: date) -> str:
+        return f"{KEY_PREFIX}:{report_type}:{report_date.isoformat()}"
+
+    async def get_many(self, report_type: str, report_dates: Iterable[date]) -> dict[date, ReportCache]:
+        """Отчеты, найденные в кеше. Отсутствующие даты нужно прочитать из Postgres."""
+
+        reports = {}
+        missing = []
+        for report_date in report_dates:
+            report = _memory.get(self.key(report_type, report_date))
+            if report is not None:
+                reports[report_date] = report
+            else:
+                missing.append(report_date)
+
+        redis_reports = await self._get_from_redis(report_type, missing)
+        for report_date, (report, size) in redis_reports.items():
+            _memory.put(self.key(report_type, report_date), report, size)
+            reports[report_date] = report
+
+        _count(
+            report_type,
+            memory_hits=len(reports) - len(redis_reports),
+            redis_hits=len(redis_reports),
+            misses=len(missing) - len(redis_reports),
+        )
+        return reports
+
+    async def set_many(self, reports: Iterable[ReportCache]) -> None:
+        """Сохранить в кеше запечатанные отчеты; остальные пропускаются."""
+
+        entries = {}
+        for report in reports:
+            if report.sealed_at is None:
+                continue
+
+            key = self.key(report.report_type, report.report_date)
+            raw = _dump(report)
+            _memory.put(key, report, len(raw))
+            entries[key] = raw
+
+        if self._redis is None or not entries:
+            return
+
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for key, raw in entries.items():
+                    pipe.set(key, raw, ex=self._ttl)
+                await pipe.execute()
+
+        except RedisError as e:
+            logger.error(f"Report cache write failed: {e}")
+
+    async def invalidate(self, report_type: str, report_dates: Iterable[date]) -> None:
+        keys = [self.key(report_type, report_date) for report_date in report_dates]
+        for key in keys:
+            _memory.pop(key)
+
+        if self._redis is None or not keys:
+            return
+
+        try:
+            await self._redis.delete(*keys)
+        except RedisError as e:
+            logger.error(f"Report cache invalidation failed: {e}")
+
+    @staticmethod
+    def clear_memory() -> None:
+        _memory.clear()
+
+    async def _get_from_redis(self, report_type: str, report_dates: list[date]) -> dict[date, tuple[ReportCache, int]]:
+        if self._redis is None or not report_dates:
+            return {}
+
+        try:
+            raws = await self._redis.mget([self.key(report_type, report_date) for report_date in report_dates])
+        except RedisError as e:
+            logger.error(f"Report cache read failed: {e}")
+            return {}
+
+        return {
+            report_date: (_load(raw), len(raw))
+            for report_date, raw in zip(report_dates, raws, strict=True)
+            if raw is not None
+        }
+
+
+def get_report_cache_metrics() -> list[ReportCacheMetrics]:
+    return list(_metrics.values())
+
+
+def get_report_cache_repo() -> ReportCacheRepository:
+    return ReportCacheRepository(redis=redis_db.redis, ttl=settings.report_cache_redis_ttl)
@@ -4,19 +4,16 @@ from core.settings import settings
 from db.mssql import MsSqlDatabase
 from repositories.base import BaseRepository
 from sql.rk_smile_request import RK_SMILE_TOTAL_SUM
+from utils.dates import day_start
 
 
 class RKRepository(BaseRepository):
-    def get_smile_report(
+    async def get_smile_report(
         self,
         date_from: datetime,
         date_to: datetime,
     ) -> dict:
-        sql = RK_SMILE_TOTAL_SUM.format(
-            date_from=date_from.strftime("%Y%m%d 00:00:00"),
-            date_to=date_to.strftime("%Y%m%d 00:00:00"),
-        )
-        res = self._run_sql_to_dict(sql)
+        res = await self.run_sql_to_dict(RK_SMILE_TOTAL_SUM, (day_start(date_from), day_start(date_to)))
         return res[0]
 
 
@@ -146,11 +146,12 @@ class YandexRepository:
         """Сохраняет отчет по количеству клиентов за день в Excel"""
 
         column = ["", "A", "B", "C", "D", "E", "F", "G", "H", "I", "J", "K", "L", "M"]
-        self.row = "0"
+        row = "0"
 
         def next_row():
-            self.row = str(int(self.row) + 1)
-            return self.row
+            nonlocal row
+            row = str(int(row) + 1)
+            return row
 
         # объект
         wb = Workbook()
@@ -185,137 +186,137 @@ class YandexRepository:
         # ws['A1'] = "Hello!"
 
         ws[column[3] + next_row()] = "Отчет по купленным товарам"
-        ws.merge_cells(start_row=self.row, start_column=3, end_row=self.row, end_column=12)
+        ws.merge_cells(start_row=row, start_column=3, end_row=row, end_column=12)
         ws[column[1] + next_row()] = ""
         ws[column[3] + next_row()] = f"По товарам: {', '.join(goods)}"
-        ws.merge_cells(start_row=self.row, start_column=3, end_row=self.row, end_column=12)
-        ws[column[3] + self.row].font = ReportStyle.font
-        ws[column[3] + self.row].alignment = ReportStyle.align_top
+        ws.merge_cells(start_row=row, start_column=3, end_row=row, end_column=12)
+        ws[column[3] + row].font = ReportStyle.font
+        ws[column[3] + row].alignment = ReportStyle.align_top
         ws[column[1] + next_row()] = ""
 
         if date_from == date_to - timedelta(days=1):
             ws[column[3] + next_row()] = "За:"
-            ws[column[3] + self.row].font = ReportStyle.font
-            ws[column[3] + self.row].alignment = ReportStyle.align_top
-            ws[column[5] + self.row] = date_from.strftime("%d.%m.%Y")
-            ws[column[5] + self.row].font = ReportStyle.font_bold
-            ws[column[5] + self.row].alignment = ReportStyle.align_top
+            ws[column[3] + row].font = ReportStyle.font
+            ws[column[3] + row].alignment = ReportStyle.align_top
+            ws[column[5] + row] = date_from.strftime("%d.%m.%Y")
+            ws[column[5] + row].font = ReportStyle.font_bold
+            ws[column[5] + row].alignment = ReportStyle.align_top
         else:
             ws[column[3] + next_row()] = "За период с:"
-            ws[column[3] + self.row].font = ReportStyle.font
-            ws[column[3] + self.row].alignment = ReportStyle.align_top
-            ws[column[5] + self.row] = date_from.strftime("%d.%m.%Y")
-            ws[column[5] + self.row].font = ReportStyle.font_bold
-            ws[column[5] + self.row].alignment = ReportStyle.align_top
-            ws[column[7] + self.row] = "По:"
-            ws[column[7] + self.row].font = ReportStyle.font
-            ws[column[7] + self.row].alignment = ReportStyle.align_top
-            ws[column[9] + self.row] = (date_to - timedelta(days=1)).strftime("%d.%m.%Y")
-            ws[column[9] + self.row].font = ReportStyle.font_bold
-            ws[column[9] + self.row].alignment = ReportStyle.align_top
+            ws[column[3] + row].font = ReportStyle.font
+            ws[column[3] + row].alignment = ReportStyle.align_top
+            ws[column[5] + row] = date_from.strftime("%d.%m.%Y")
+            ws[column[5] + row].font = ReportStyle.font_bold
+            ws[column[5] + row].alignment = ReportStyle.align_top
+            ws[column[7] + row] = "По:"
+            ws[column[7] + row].font = ReportStyle.font
+            ws[column[7] + row].alignment = ReportStyle.align_top
+            ws[column[9] + row] = (date_to - timedelta(days=1)).strftime("%d.%m.%Y")
+            ws[column[9] + row].font = ReportStyle.font_bold
+            ws[column[9] + row].alignment = ReportStyle.align_top
 
         # ТАБЛИЦА
         def merge_table():
-            ws.merge_cells(start_row=self.row, start_column=2, end_row=self.row, end_column=9)
-            ws.merge_cells(start_row=self.row, start_column=10, end_row=self.row, end_column=11)
-            ws.merge_cells(start_row=self.row, start_column=12, end_row=self.row, end_column=13)
-            ws[column[2] + self.row].font = ReportStyle.font
-            ws[column[10] + self.row].font = ReportStyle.font
-            ws[column[12] + self.row].font = ReportStyle.font
-            ws[column[2] + self.row].alignment = ReportStyle.align_top
-            ws[column[10] + self.row].alignment = ReportStyle.align_top
-            ws[column[12] + self.row].alignment = ReportStyle.align_top
+            ws.merge_cells(start_row=row, start_column=2, end_row=row, end_column=9)
+            ws.merge_cells(start_row=row, start_column=10, end_row=row, end_column=11)
+            ws.merge_cells(start_row=row, start_column=12, end_row=row, end_column=13)
+            ws[column[2] + row].font = ReportStyle.font
+            ws[column[10] + row].font = ReportStyle.font
+            ws[column[12] + row].font = ReportStyle.font
+            ws[column[2] + row].alignment = ReportStyle.align_top
+            ws[column[10] + row].alignment = ReportStyle.align_top
+            ws[column[12] + row].alignment = ReportStyle.align_top
             b = 2
             while b <= 13:
-                ws[column[b] + self.row].border = ReportStyle.border
+                ws[column[b] + row].border = ReportStyle.border
                 b += 1
 
         def merge_table_h3():
-            ws.merge_cells(start_row=self.row, start_column=2, end_row=self.row, end_column=9)
-            ws.merge_cells(start_row=self.row, start_column=10, end_row=self.row, end_column=11)
-            ws.merge_cells(start_row=self.row, start_column=12, end_row=self.row, end_column=13)
-            ws[column[2] + self.row].font = ReportStyle.h3
-            ws[column[10] + self.row].font = ReportStyle.h3
-            ws[column[12] + self.row].font = ReportStyle.h3
-            ws[column[2] + self.row].alignment = ReportStyle.align_top
-            ws[column[10] + self.row].alignment = ReportStyle.align_top
-            ws[column[12] + self.row].alignment = ReportStyle.align_top
-            ws[column[2] + self.row].border = ReportStyle.border_left
-            ws[column[13] + self.row].border = ReportStyle.border_right
+            ws.merge_cells(start_row=row, start_column=2, end_row=row, end_column=9)
+            ws.merge_cells(start_row=row, start_column=10, end_row=row, end_column=11)
+            ws.merge_cells(start_row=row, start_column=12, end_row=row, end_column=13)
+            ws[column[2] + row].font = ReportStyle.h3
+            ws[column[10] + row].font = ReportStyle.h3
+            ws[column[12] + row].font = ReportStyle.h3
+            ws[column[2] + row].alignment = ReportStyle.align_top
+            ws[column[10] + row].alignment = ReportStyle.align_top
+            ws[column[12] + row].alignment = ReportStyle.align_top
+            ws[column[2] + row].border = ReportStyle.border_left
+            ws[column[13] + row].border = ReportStyle.border_right
 
         def merge_table_h2():
-            ws.merge_cells(start_row=self.row, start_column=2, end_row=self.row, end_column=9)
-            ws.merge_cells(start_row=self.row, start_column=10, end_row=self.row, end_column=11)
-            ws.merge_cells(start_row=self.row, start_column=12, end_row=self.row, end_column=13)
-            ws[column[2] + self.row].font = ReportStyle.h2
-            ws[column[10] + self.row].font = ReportStyle.h2
-            ws[column[12] + self.row].font = ReportStyle.h2
-            ws[column[2] + self.row].alignment = ReportStyle.align_top
-            ws[column[10] + self.row].alignment = ReportStyle.align_top
-            ws[column[12] + self.row].alignment = ReportStyle.align_top
-            ws[column[2] + self.row].border = ReportStyle.border_left
-            ws[column[13] + self.row].border = ReportStyle.border_right
+            ws.merge_cells(start_row=row, start_column=2, end_row=row, end_column=9)
+            ws.merge_cells(start_row=row, start_column=10, end_row=row, end_column=11)
+            ws.merge_cells(start_row=row, start_column=12, end_row=row, end_column=13)
+            ws[column[2] + row].font = ReportStyle.h2
+            ws[column[10] + row].font = ReportStyle.h2
+            ws[column[12] + row].font = ReportStyle.h2
+            ws[column[2] + row].alignment = ReportStyle.align_top
+            ws[column[10] + row].alignment = ReportStyle.align_top
+            ws[column[12] + row].alignment = ReportStyle.align_top
+            ws[column[2] + row].border = ReportStyle.border_left
+            ws[column[13] + row].border = ReportStyle.border_right
 
         def merge_width_h2():
-            ws.merge_cells(start_row=self.row, start_column=2, end_row=self.row, end_column=13)
-            ws[column[2] + self.row].font = ReportStyle.h2
-            ws[column[2] + self.row].alignment = ReportStyle.align_top
+            ws.merge_cells(start_row=row, start_column=2, end_row=row, end_column=13)
+            ws[column[2] + row].font = ReportStyle.h2
+            ws[column[2] + row].alignment = ReportStyle.align_top
             b = 2
             while b <= 13:
                 if b == 2:
-                    ws[column[b] + self.row].border = ReportStyle.border_left_top
+                    ws[column[b] + row].border = ReportStyle.border_left_top
                 elif b == 13:
-                    ws[column[b] + self.row].border = ReportStyle.border_right_top
+                    ws[column[b] + row].border = ReportStyle.border_right_top
                 else:
-                    ws[column[b] + self.row].border = ReportStyle.border_top
+                    ws[column[b] + row].border = ReportStyle.border_top
                 b += 1
 
         def merge_width_h3():
-            ws.merge_cells(start_row=self.row, start_column=2, end_row=self.row, end_column=13)
-            ws[column[2] + self.row].font = ReportStyle.h3
-            ws[column[2] + self.row].alignment = ReportStyle.align_top
+            ws.merge_cells(start_row=row, start_column=2, end_row=row, end_column=13)
+            ws[column[2] + row].font = ReportStyle.h3
+            ws[column[2] + row].alignment = ReportStyle.align_top
             b = 2
             while b <= 13:
                 if b == 2:
-                    ws[column[b] + self.row].border = ReportStyle.border_left
+                    ws[column[b] + row].border = ReportStyle.border_left
                 elif b == 13:
-                    ws[column[b] + self.row].border = ReportStyle.border_right
+                    ws[column[b] + row].border = ReportStyle.border_right
                 b += 1
 
         ws[column[2] + next_row()] = "Наименование"
-        ws[column[10] + self.row] = "Количество"
-        ws[column[12] + self.row] = "Сумма"
+        ws[column[10] + row] = "Количество"
+        ws[column[12] + row] = "Сумма"
         merge_table()
-        ws[column[2] + self.row].font = ReportStyle.h3
-        ws[column[10] + self.row].font = ReportStyle.h3
-        ws[column[12] + self.row].font = ReportStyle.h3
-        ws[column[2] + self.row].alignment = ReportStyle.align_top
-        ws[column[10] + self.row].alignment = ReportStyle.align_top
-        ws[column[12] + self.row].alignment = ReportStyle.align_top
+        ws[column[2] + row].font = ReportStyle.h3
+        ws[column[10] + row].font = ReportStyle.h3
+        ws[column[12] + row].font = ReportStyle.h3
+        ws[column[2] + row].alignment = ReportStyle.align_top
+        ws[column[10] + row].alignment = ReportStyle.align_top
+        ws[column[12] + row].alignment = ReportStyle.align_top
 
         for line in report:
             if hide_zero and line.summ == Decimal(0):
                 continue
 
             ws[column[2] + next_row()] = line.name[8:] if line.name.startswith("Долг за") else line.name
-            ws[column[10] + self.row] = line.count
-            ws[column[12] + self.row] = line.summ
-            ws[column[12] + self.row].number_format = "#,##0.00 ₽"
+            ws[column[10] + row] = line.count
+            ws[column[12] + row] = line.summ
+            ws[column[12] + row].number_format = "#,##0.00 ₽"
             merge_table()
 
         ws[column[2] + next_row()] = "Итого"
-        ws[column[10] + self.row] = sum(line.count for line in report if line.name not in goods)
-        ws[column[12] + self.row] = sum(line.summ for line in report if line.name not in goods)
-        ws[column[12] + self.row].number_format = "#,##0.00 ₽"
+        ws[column[10] + row] = sum(line.count for line in report if line.name not in goods)
+        ws[column[12] + row] = sum(line.summ for line in report if line.name not in goods)
+        ws[column[12] + row].number_format = "#,##0.00 ₽"
         merge_table_h2()
-        ws[column[2] + self.row].alignment = ReportStyle.align_bottom
-        ws[column[10] + self.row].alignment = ReportStyle.align_bottom
-        ws[column[12] + self.row].alignment = ReportStyle.align_bottom
+        ws[column[2] + row].alignment = ReportStyle.align_bottom
+        ws[column[10] + row].alignment = ReportStyle.align_bottom
+        ws[column[12] + row].alignment = ReportStyle.align_bottom
         b = 2
         while b <= 13:
-            ws[column[b] + self.row].border = ReportStyle.border_top_bottom
+            ws[column[b] + row].border = ReportStyle.border_top_bottom
             b += 1
-        end_line = int(self.row)
+        end_line = int(row)
 
         # раскрвшивание фона для заголовков
         i = 2
@@ -758,11 +759,12 @@ class YandexRepository:
 
         column = ["", "A", "B", "C", "D", "E"]
 
-        self.row = "0"
+        row = "0"
 
         def next_row():
-            self.row = str(int(self.row) + 1)
-            return self.row
+            nonlocal row
+            row = str(int(row) + 1)
+            return row
 
         # объект
         wb = Workbook()
@@ -790,82 +792,83 @@ class YandexRepository:
 
         ws[column[1] + next_row()] = "Отчет платежного агента по приему денежных средств"
         ws.merge_cells(
-            start_row=self.row,
+            start_row=row,
             start_column=1,
-            end_row=self.row,
+            end_row=row,
             end_column=len(column) - 1,
         )
         # шрифты
-        ws[column[1] + self.row].font = ReportStyle.h1
+        ws[column[1] + row].font = ReportStyle.h1
         # выравнивание
-        ws[column[1] + self.row].alignment = ReportStyle.align_left
+        ws[column[1] + row].alignment = ReportStyle.align_left
         # Высота строк
         ws.row_dimensions[1].height = 24
 
         ws[column[1] + next_row()] = f"{report['Организация'][1]}"
         ws.merge_cells(
-            start_row=self.row,
+            start_row=row,
             start_column=1,
-            end_row=self.row,
+            end_row=row,
             end_column=len(column) - 1,
         )
-        ws[column[1] + self.row].font = ReportStyle.font
-        ws[column[1] + self.row].alignment = ReportStyle.align_top
+        ws[column[1] + row].font = ReportStyle.font
+        ws[column[1] + row].alignment = ReportStyle.align_top
 
         ws[column[1] + next_row()] = "За период с:"
-        ws[column[1] + self.row].font = ReportStyle.font
-        ws[column[1] + self.row].alignment = ReportStyle.align_top
-        ws[column[2] + self.row] = (report["Дата"][0]).strftime("%d.%m.%Y")
-        ws[column[2] + self.row].font = ReportStyle.font_bold
-        ws[column[2] + self.row].alignment = ReportStyle.align_top
-        ws[column[3] + self.row] = "по"
-        ws[column[3] + self.row].font = ReportStyle.font
-        ws[column[3] + self.row].alignment = ReportStyle.align_top
-        ws[column[4] + self.row] = (report["Дата"][1] - timedelta(1)).strftime("%d.%m.%Y")
-        ws[column[4] + self.row].font = ReportStyle.font_bold
-        ws[column[4] + self.row].alignment = ReportStyle.align_top
+        ws[column[1] + row].font = ReportStyle.font
+        ws[column[1] + row].alignment = ReportStyle.align_top
+        ws[column[2] + row] = (report["Дата"][0]).strftime("%d.%m.%Y")
+        ws[column[2] + row].font = ReportStyle.font_bold
+        ws[column[2] + row].alignment = ReportStyle.align_top
+        ws[column[3] + row] = "по"
+        ws[column[3] + row].font = ReportStyle.font
+        ws[column[3] + row].alignment = ReportStyle.align_top
+        ws[column[4] + row] = (report["Дата"][1] - timedelta(1)).strftime("%d.%m.%Y")
+        ws[column[4] + row].font = ReportStyle.font_bold
+        ws[column[4] + row].alignment = ReportStyle.align_top
 
         # ТАБЛИЦА
-        self.color = False
+        color = False
 
         def merge_table():
-            ws.merge_cells(start_row=self.row, start_column=1, end_row=self.row, end_column=4)
-            ws[column[1] + self.row].font = ReportStyle.font
-            ws[column[5] + self.row].font = ReportStyle.font
-            ws[column[1] + self.row].alignment = ReportStyle.align_top
-            ws[column[5] + self.row].alignment = ReportStyle.align_top
-            ws[column[5] + self.row].number_format = "#,##0.00 ₽"
+            nonlocal color
+            ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=4)
+            ws[column[1] + row].font = ReportStyle.font
+            ws[column[5] + row].font = ReportStyle.font
+            ws[column[1] + row].alignment = ReportStyle.align_top
+            ws[column[5] + row].alignment = ReportStyle.align_top
+            ws[column[5] + row].number_format = "#,##0.00 ₽"
             b = 1
             while b < len(column):
-                ws[column[b] + self.row].border = ReportStyle.border
+                ws[column[b] + row].border = ReportStyle.border
                 b += 1
-            if self.color:
+            if color:
                 b = 1
                 while b < len(column):
-                    ws[column[b] + self.row].fill = table_color
+                    ws[column[b] + row].fill = table_color
                     b += 1
-                self.color = False
+                color = False
             else:
-                self.color = True
+                color = True
 
         def merge_table_bold():
-            ws.merge_cells(start_row=self.row, start_column=1, end_row=self.row, end_column=4)
-            ws[column[1] + self.row].font = ReportStyle.font_bold
-            ws[column[5] + self.row].font = ReportStyle.font_bold
-            ws[column[1] + self.row].alignment = ReportStyle.align_top
-            ws[column[5] + self.row].alignment = ReportStyle.align_top
+            ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=4)
+            ws[column[1] + row].font = ReportStyle.font_bold
+            ws[column[5] + row].font = ReportStyle.font_bold
+            ws[column[1] + row].alignment = ReportStyle.align_top
+            ws[column[5] + row].alignment = ReportStyle.align_top
             b = 1
             while b < len(column):
-                ws[column[b] + self.row].border = ReportStyle.border
+                ws[column[b] + row].border = ReportStyle.border
                 b += 1
 
         ws[column[1] + next_row()] = "Наименование поставщика услуг"
-        ws[column[5] + self.row] = "Сумма"
+        ws[column[5] + row] = "Сумма"
         merge_table_bold()
         # раскрашивание фона для заголовков
         b = 1
         while b < len(column):
-            ws[column[b] + self.row].fill = ReportStyle.fill
+            ws[column[b] + row].fill = ReportStyle.fill
             b += 1
 
         itog_sum = 0
@@ -874,7 +877,7 @@ class YandexRepository:
                 try:
                     itog_sum += report[line][1]
                     ws[column[1] + next_row()] = line
-                    ws[column[5] + self.row] = report[line][1]
+                    ws[column[5] + row] = report[line][1]
                     merge_table()
                 except AttributeError:
                     pass
@@ -892,8 +895,8 @@ class YandexRepository:
                 f"({itog_sum}) не равна строке ИТОГО "
                 f"({report['ИТОГО'][1]})",
             )
-        ws[column[5] + self.row] = itog_sum
-        ws[column[5] + self.row].number_format = "#,##0.00 ₽"
+        ws[column[5] + row] = itog_sum
+        ws[column[5] + row].number_format = "#,##0.00 ₽"
         merge_table_bold()
 
         # увеличиваем все строки по высоте
@@ -938,11 +941,12 @@ class YandexRepository:
 
         column = ["", "A", "B", "C", "D", "E", "F", "G", "H", "I", "J", "K", "L", "M"]
 
-        self.row = "0"
+        row = "0"
 
         def next_row():
-            self.row = str(int(self.row) + 1)
-            return self.row
+            nonlocal row
+            row = str(int(row) + 1)
+            return row
 
         # объект
         wb = Workbook()
@@ -977,105 +981,105 @@ class YandexRepository:
         # ws['A1'] = "Hello!"
 
         ws[column[3] + next_row()] = "Итоговый отчет"
-        ws.merge_cells(start_row=self.row, start_column=3, end_row=self.row, end_column=12)
+        ws.merge_cells(start_row=row, start_column=3, end_row=row, end_column=12)
         ws[column[1] + next_row()] = ""
         ws[column[3] + next_row()] = organisation_total["Организация"]["Организация"][0][0]
-        ws.merge_cells(start_row=self.row, start_column=3, end_row=self.row, end_column=12)
-        ws[column[3] + self.row].font = ReportStyle.font
-        ws[column[3] + self.row].alignment = ReportStyle.align_top
+        ws.merge_cells(start_row=row, start_column=3, end_row=row, end_column=12)
+        ws[column[3] + row].font = ReportStyle.font
+        ws[column[3] + row].alignment = ReportStyle.align_top
         ws[column[1] + next_row()] = ""
 
         ws[column[3] + next_row()] = "За период с:"
-        ws[column[3] + self.row].font = ReportStyle.font
-        ws[column[3] + self.row].alignment = ReportStyle.align_top
-        ws[column[5] + self.row] = itog_report["Дата"][0].strftime("%d.%m.%Y")
-        ws[column[5] + self.row].font = ReportStyle.font_bold
-        ws[column[5] + self.row].alignment = ReportStyle.align_top
-        ws[column[7] + self.row] = "По:"
-        ws[column[7] + self.row].font = ReportStyle.font
-        ws[column[7] + self.row].alignment = ReportStyle.align_top
-        ws[column[9] + self.row] = (itog_report["Дата"][1] - timedelta(1)).strftime("%d.%m.%Y")
-        ws[column[9] + self.row].font = ReportStyle.font_bold
-        ws[column[9] + self.row].alignment = ReportStyle.align_top
+        ws[column[3] + row].font = ReportStyle.font
+        ws[column[3] + row].alignment = ReportStyle.align_top
+        ws[column[5] + row] = itog_report["Дата"][0].strftime("%d.%m.%Y")
+        ws[column[5] + row].font = ReportStyle.font_bold
+        ws[column[5] + row].alignment = ReportStyle.align_top
+        ws[column[7] + row] = "По:"
+        ws[column[7] + row].font = ReportStyle.font
+        ws[column[7] + row].alignment = ReportStyle.align_top
+        ws[column[9] + row] = (itog_report["Дата"][1] - timedelta(1)).strftime("%d.%m.%Y")
+        ws[column[9] + row].font = ReportStyle.font_bold
+        ws[column[9] + row].alignment = ReportStyle.align_top
 
         # ТАБЛИЦА
         def merge_table():
-            ws.merge_cells(start_row=self.row, start_column=2, end_row=self.row, end_column=9)
-            ws.merge_cells(start_row=self.row, start_column=10, end_row=self.row, end_column=11)
-            ws.merge_cells(start_row=self.row, start_column=12, end_row=self.row, end_column=13)
-            ws[column[2] + self.row].font = ReportStyle.font
-            ws[column[10] + self.row].font = ReportStyle.font
-            ws[column[12] + self.row].font = ReportStyle.font
-            ws[column[2] + self.row].alignment = ReportStyle.align_top
-            ws[column[10] + self.row].alignment = ReportStyle.align_top
-            ws[column[12] + self.row].alignment = ReportStyle.align_top
+            ws.merge_cells(start_row=row, start_column=2, end_row=row, end_column=9)
+            ws.merge_cells(start_row=row, start_column=10, end_row=row, end_column=11)
+            ws.merge_cells(start_row=row, start_column=12, end_row=row, end_column=13)
+            ws[column[2] + row].font = ReportStyle.font
+            ws[column[10] + row].font = ReportStyle.font
+            ws[column[12] + row].font = ReportStyle.font
+            ws[column[2] + row].alignment = ReportStyle.align_top
+            ws[column[10] + row].alignment = ReportStyle.align_top
+            ws[column[12] + row].alignment = ReportStyle.align_top
             b = 2
             while b <= 13:
-                ws[column[b] + self.row].border = ReportStyle.border
+                ws[column[b] + row].border = ReportStyle.border
                 b += 1
 
         def merge_table_h3():
-            ws.merge_cells(start_row=self.row, start_column=2, end_row=self.row, end_column=9)
-            ws.merge_cells(start_row=self.row, start_column=10, end_row=self.row, end_column=11)
-            ws.merge_cells(start_row=self.row, start_column=12, end_row=self.row, end_column=13)
-            ws[column[2] + self.row].font = ReportStyle.h3
-            ws[column[10] + self.row].font = ReportStyle.h3
-            ws[column[12] + self.row].font = ReportStyle.h3
-            ws[column[2] + self.row].alignment = ReportStyle.align_top
-            ws[column[10] + self.row].alignment = ReportStyle.align_top
-            ws[column[12] + self.row].alignment = ReportStyle.align_top
-            ws[column[2] + self.row].border = ReportStyle.border_left
-            ws[column[13] + self.row].border = ReportStyle.border_right
+            ws.merge_cells(start_row=row, start_column=2, end_row=row, end_column=9)
+            ws.merge_cells(start_row=row, start_column=10, end_row=row, end_column=11)
+            ws.merge_cells(start_row=row, start_column=12, end_row=row, end_column=13)
+            ws[column[2] + row].font = ReportStyle.h3
+            ws[column[10] + row].font = ReportStyle.h3
+            ws[column[12] + row].font = ReportStyle.h3
+            ws[column[2] + row].alignment = ReportStyle.align_top
+            ws[column[10] + row].alignment = ReportStyle.align_top
+            ws[column[12] + row].alignment = ReportStyle.align_top
+            ws[column[2] + row].border = ReportStyle.border_left
+            ws[column[13] + row].border = ReportStyle.border_right
 
         def merge_table_h2():
-            ws.merge_cells(start_row=self.row, start_column=2, end_row=self.row, end_column=9)
-            ws.merge_cells(start_row=self.row, start_column=10, end_row=self.row, end_column=11)
-            ws.merge_cells(start_row=self.row, start_column=12, end_row=self.row, end_column=13)
-            ws[column[2] + self.row].font = ReportStyle.h2
-            ws[column[10] + self.row].font = ReportStyle.h2
-            ws[column[12] + self.row].font = ReportStyle.h2
-            ws[column[2] + self.row].alignment = ReportStyle.align_top
-            ws[column[10] + self.row].alignment = ReportStyle.align_top
-            ws[column[12] + self.row].alignment = ReportStyle.align_top
-            ws[column[2] + self.row].border = ReportStyle.border_left
-            ws[column[13] + self.row].border = ReportStyle.border_right
+            ws.merge_cells(start_row=row, start_column=2, end_row=row, end_column=9)
+            ws.merge_cells(start_row=row, start_column=10, end_row=row, end_column=11)
+            ws.merge_cells(start_row=row, start_column=12, end_row=row, end_column=13)
+            ws[column[2] + row].font = ReportStyle.h2
+            ws[column[10] + row].font = ReportStyle.h2
+            ws[column[12] + row].font = ReportStyle.h2
+            ws[column[2] + row].alignment = ReportStyle.align_top
+            ws[column[10] + row].alignment = ReportStyle.align_top
+            ws[column[12] + row].alignment = ReportStyle.align_top
+            ws[column[2] + row].border = ReportStyle.border_left
+            ws[column[13] + row].border = ReportStyle.border_right
 
         def merge_width_h2():
-            ws.merge_cells(start_row=self.row, start_column=2, end_row=self.row, end_column=13)
-            ws[column[2] + self.row].font = ReportStyle.h2
-            ws[column[2] + self.row].alignment = ReportStyle.align_top
+            ws.merge_cells(start_row=row, start_column=2, end_row=row, end_column=13)
+            ws[column[2] + row].font = ReportStyle.h2
+            ws[column[2] + row].alignment = ReportStyle.align_top
             b = 2
             while b <= 13:
                 if b == 2:
-                    ws[column[b] + self.row].border = ReportStyle.border_left_top
+                    ws[column[b] + row].border = ReportStyle.border_left_top
                 elif b == 13:
-                    ws[column[b] + self.row].border = ReportStyle.border_right_top
+                    ws[column[b] + row].border = ReportStyle.border_right_top
                 else:
-                    ws[column[b] + self.row].border = ReportStyle.border_top
+                    ws[column[b] + row].border = ReportStyle.border_top
                 b += 1
 
         def merge_width_h3():
-            ws.merge_cells(start_row=self.row, start_column=2, end_row=self.row, end_column=13)
-            ws[column[2] + self.row].font = ReportStyle.h3
-            ws[column[2] + self.row].alignment = ReportStyle.align_top
+            ws.merge_cells(start_row=row, start_column=2, end_row=row, end_column=13)
+            ws[column[2] + row].font = ReportStyle.h3
+            ws[column[2] + row].alignment = ReportStyle.align_top
             b = 2
             while b <= 13:
                 if b == 2:
-                    ws[column[b] + self.row].border = ReportStyle.border_left
+                    ws[column[b] + row].border = ReportStyle.border_left
                 elif b == 13:
-                    ws[column[b] + self.row].border = ReportStyle.border_right
+                    ws[column[b] + row].border = ReportStyle.border_right
                 b += 1
 
         ws[column[2] + next_row()] = "Название"
-        ws[column[10] + self.row] = "Количество"
-        ws[column[12] + self.row] = "Сумма"
+        ws[column[10] + row] = "Количество"
+        ws[column[12] + row] = "Сумма"
         merge_table()
-        ws[column[2] + self.row].font = ReportStyle.h3
-        ws[column[10] + self.row].font = ReportStyle.h3
-        ws[column[12] + self.row].font = ReportStyle.h3
-        ws[column[2] + self.row].alignment = ReportStyle.align_top
-        ws[column[10] + self.row].alignment = ReportStyle.align_top
-        ws[column[12] + self.row].alignment = ReportStyle.align_top
+        ws[column[2] + row].font = ReportStyle.h3
+        ws[column[10] + row].font = ReportStyle.h3
+        ws[column[12] + row].font = ReportStyle.h3
+        ws[column[2] + row].alignment = ReportStyle.align_top
+        ws[column[10] + row].alignment = ReportStyle.align_top
+        ws[column[12] + row].alignment = ReportStyle.align_top
 
         groups = [
             "Депозит",
@@ -1110,19 +1114,19 @@ class YandexRepository:
                         except TypeError:
                             pass
                         ws[column[2] + next_row()] = service[0]
-                        ws[column[10] + self.row] = service[1]
-                        ws[column[12] + self.row] = service[2]
-                        ws[column[12] + self.row].number_format = "#,##0.00 ₽"
+                        ws[column[10] + row] = service[1]
+                        ws[column[12] + row] = service[2]
+                        ws[column[12] + row].number_format = "#,##0.00 ₽"
                         merge_table()
                     ws[column[10] + next_row()] = service_count
-                    ws[column[12] + self.row] = service_sum
-                    ws[column[12] + self.row].number_format = "#,##0.00 ₽"
+                    ws[column[12] + row] = service_sum
+                    ws[column[12] + row].number_format = "#,##0.00 ₽"
                     merge_table_h3()
                     group_count += service_count
                     group_sum += service_sum
                 ws[column[10] + next_row()] = group_count
-                ws[column[12] + self.row] = group_sum
-                ws[column[12] + self.row].number_format = "#,##0.00 ₽"
+                ws[column[12] + row] = group_sum
+                ws[column[12] + row].number_format = "#,##0.00 ₽"
                 merge_table_h2()
                 all_count += group_count
                 all_sum += group_sum
@@ -1134,8 +1138,8 @@ class YandexRepository:
         bars_total_sum = organisation_total["Итого по отчету"][""][0]
         if all_sum == bars_total_sum[2]:
             ws[column[2] + next_row()] = bars_total_sum[0]
-            ws[column[10] + self.row] = bars_total_sum[1]
-            ws[column[12] + self.row] = bars_total_sum[2]
+            ws[column[10] + row] = bars_total_sum[1]
+            ws[column[12] + row] = bars_total_sum[2]
             self.total_report_sum = all_sum
         else:
             error_code = "Ошибка: Итоговые суммы не совпадают."
@@ -1146,16 +1150,16 @@ class YandexRepository:
             logger.error(f"{error_code} {error_message}")
             return None
 
-        ws[column[12] + self.row].number_format = "#,##0.00 ₽"
+        ws[column[12] + row].number_format = "#,##0.00 ₽"
         merge_table_h2()
-        ws[column[2] + self.row].alignment = ReportStyle.align_bottom
-        ws[column[10] + self.row].alignment = ReportStyle.align_bottom
-        ws[column[12] + self.row].alignment = ReportStyle.align_bottom
+        ws[column[2] + row].alignment = ReportStyle.align_bottom
+        ws[column[10] + row].alignment = ReportStyle.align_bottom
+        ws[column[12] + row].alignment = ReportStyle.align_bottom
         b = 2
         while b <= 13:
-            ws[column[b] + self.row].border = ReportStyle.border_top_bottom
+            ws[column[b] + row].border = ReportStyle.border_top_bottom
             b += 1
-        end_line = int(self.row)
+        end_line = int(row)
 
         # раскрвшивание фона для заголовков
         i = 2
@@ -1240,11 +1244,12 @@ class YandexRepository:
             "N",
         ]
 
-        self.row = "0"
+        row = "0"
 
         def next_row():
-            self.row = str(int(self.row) + 1)
-            return self.row
+            nonlocal row
+            row = str(int(row) + 1)
+            return row
 
         # объект
         wb = Workbook()
@@ -1281,165 +1286,165 @@ class YandexRepository:
 
         ws[column[1] + next_row()] = "Суммовой отчет по чековой ленте"
         ws.merge_cells(
-            start_row=self.row,
+            start_row=row,
             start_column=1,
-            end_row=self.row,
+            end_row=row,
             end_column=len(column) - 1,
         )
         # шрифты
-        ws[column[1] + self.row].font = ReportStyle.h1
+        ws[column[1] + row].font = ReportStyle.h1
         # выравнивание
-        ws[column[1] + self.row].alignment = ReportStyle.align_left
+        ws[column[1] + row].alignment = ReportStyle.align_left
         # Высота строк
         ws.row_dimensions[1].height = 24
 
         ws[column[1] + next_row()] = f"{cashdesk_report['Организация'][0][0]}"
         ws.merge_cells(
-            start_row=self.row,
+            start_row=row,
             start_column=1,
-            end_row=self.row,
+            end_row=row,
             end_column=len(column) - 1,
         )
-        ws[column[1] + self.row].font = ReportStyle.font
-        ws[column[1] + self.row].alignment = ReportStyle.align_top
+        ws[column[1] + row].font = ReportStyle.font
+        ws[column[1] + row].alignment = ReportStyle.align_top
 
         ws[column[1] + next_row()] = "За период с:"
-        ws[column[1] + self.row].font = ReportStyle.font
-        ws[column[1] + self.row].alignment = ReportStyle.align_top
-        ws[column[2] + self.row] = cashdesk_report["Дата"][0][0].strftime("%d.%m.%Y")
-        ws.merge_cells(start_row=self.row, start_column=2, end_row=self.row, end_column=3)
-        ws[column[2] + self.row].font = ReportStyle.font_bold
-        ws[column[2] + self.row].alignment = ReportStyle.align_top
-        ws[column[4] + self.row] = "по"
-        ws[column[4] + self.row].font = ReportStyle.font
-        ws[column[4] + self.row].alignment = ReportStyle.align_top
-        ws[column[5] + self.row] = (cashdesk_report["Дата"][0][1] - timedelta(1)).strftime("%d.%m.%Y")
-        ws.merge_cells(start_row=self.row, start_column=5, end_row=self.row, end_column=7)
-        ws[column[5] + self.row].font = ReportStyle.font_bold
-        ws[column[5] + self.row].alignment = ReportStyle.align_top
+        ws[column[1] + row].font = ReportStyle.font
+        ws[column[1] + row].alignment = ReportStyle.align_top
+        ws[column[2] + row] = cashdesk_report["Дата"][0][0].strftime("%d.%m.%Y")
+        ws.merge_cells(start_row=row, start_column=2, end_row=row, end_column=3)
+        ws[column[2] + row].font = ReportStyle.font_bold
+        ws[column[2] + row].alignment = ReportStyle.align_top
+        ws[column[4] + row] = "по"
+        ws[column[4] + row].font = ReportStyle.font
+        ws[column[4] + row].alignment = ReportStyle.align_top
+        ws[column[5] + row] = (cashdesk_report["Дата"][0][1] - timedelta(1)).strftime("%d.%m.%Y")
+        ws.merge_cells(start_row=row, start_column=5, end_row=row, end_column=7)
+        ws[column[5] + row].font = ReportStyle.font_bold
+        ws[column[5] + row].alignment = ReportStyle.align_top
 
         # ТАБЛИЦА
         def merge_table():
-            ws.merge_cells(start_row=self.row, start_column=1, end_row=self.row, end_column=2)
-            ws.merge_cells(start_row=self.row, start_column=3, end_row=self.row, end_column=6)
-            ws.merge_cells(start_row=self.row, start_column=7, end_row=self.row, end_column=9)
-            ws.merge_cells(start_row=self.row, start_column=11, end_row=self.row, end_column=12)
-            ws[column[1] + self.row].font = ReportStyle.font
-            ws[column[3] + self.row].font = ReportStyle.font
-            ws[column[7] + self.row].font = ReportStyle.font
-            ws[column[10] + self.row].font = ReportStyle.font
-            ws[column[11] + self.row].font = ReportStyle.font
-            ws[column[13] + self.row].font = ReportStyle.font
-            ws[column[14] + self.row].font = ReportStyle.font
-            ws[column[1] + self.row].alignment = ReportStyle.align_top
-            ws[column[3] + self.row].alignment = ReportStyle.align_top
-            ws[column[7] + self.row].alignment = ReportStyle.align_top
-            ws[column[10] + self.row].alignment = ReportStyle.align_top
-            ws[column[11] + self.row].alignment = ReportStyle.align_top
-            ws[column[13] + self.row].alignment = ReportStyle.align_top
-            ws[column[14] + self.row].alignment = ReportStyle.align_top
-            ws[column[3] + self.row].number_format = "#,##0.00 ₽"
-            ws[column[7] + self.row].number_format = "#,##0.00 ₽"
-            ws[column[10] + self.row].number_format = "#,##0.00 ₽"
-            ws[column[11] + self.row].number_format = "#,##0.00 ₽"
-            ws[column[13] + self.row].number_format = "#,##0.00 ₽"
-            ws[column[14] + self.row].number_format = "#,##0.00 ₽"
+            ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
+            ws.merge_cells(start_row=row, start_column=3, end_row=row, end_column=6)
+            ws.merge_cells(start_row=row, start_column=7, end_row=row, end_column=9)
+            ws.merge_cells(start_row=row, start_column=11, end_row=row, end_column=12)
+            ws[column[1] + row].font = ReportStyle.font
+            ws[column[3] + row].font = ReportStyle.font
+            ws[column[7] + row].font = ReportStyle.font
+            ws[column[10] + row].font = ReportStyle.font
+            ws[column[11] + row].font = ReportStyle.font
+            ws[column[13] + row].font = ReportStyle.font
+            ws[column[14] + row].font = ReportStyle.font
+            ws[column[1] + row].alignment = ReportStyle.align_top
+            ws[column[3] + row].alignment = ReportStyle.align_top
+            ws[column[7] + row].alignment = ReportStyle.align_top
+            ws[column[10] + row].alignment = ReportStyle.align_top
+            ws[column[11] + row].alignment = ReportStyle.align_top
+            ws[column[13] + row].alignment = ReportStyle.align_top
+            ws[column[14] + row].alignment = ReportStyle.align_top
+            ws[column[3] + row].number_format = "#,##0.00 ₽"
+            ws[column[7] + row].number_format = "#,##0.00 ₽"
+            ws[column[10] + row].number_format = "#,##0.00 ₽"
+            ws[column[11] + row].number_format = "#,##0.00 ₽"
+            ws[column[13] + row].number_format = "#,##0.00 ₽"
+            ws[column[14] + row].number_format = "#,##0.00 ₽"
             b = 1
             while b < len(column):
-                ws[column[b] + self.row].border = ReportStyle.border
+                ws[column[b] + row].border = ReportStyle.border
                 b += 1
 
         def merge_table_h3():
-            ws.merge_cells(start_row=self.row, start_column=1, end_row=self.row, end_column=2)
-            ws.merge_cells(start_row=self.row, start_column=3, end_row=self.row, end_column=6)
-            ws.merge_cells(start_row=self.row, start_column=7, end_row=self.row, end_column=9)
-            ws.merge_cells(start_row=self.row, start_column=11, end_row=self.row, end_column=12)
-            ws[column[1] + self.row].font = ReportStyle.h3
-            ws[column[3] + self.row].font = ReportStyle.h3
-            ws[column[7] + self.row].font = ReportStyle.h3
-            ws[column[10] + self.row].font = ReportStyle.h3
-            ws[column[11] + self.row].font = ReportStyle.h3
-            ws[column[13] + self.row].font = ReportStyle.h3
-            ws[column[14] + self.row].font = ReportStyle.h3
-            ws[column[1] + self.row].alignment = ReportStyle.align_top
-            ws[column[3] + self.row].alignment = ReportStyle.align_top
-            ws[column[7] + self.row].alignment = ReportStyle.align_top
-            ws[column[10] + self.row].alignment = ReportStyle.align_top
-            ws[column[11] + self.row].alignment = ReportStyle.align_top
-            ws[column[13] + self.row].alignment = ReportStyle.align_top
-            ws[column[14] + self.row].alignment = ReportStyle.align_top
-            ws[column[3] + self.row].number_format = "#,##0.00 ₽"
-            ws[column[7] + self.row].number_format = "#,##0.00 ₽"
-            ws[column[10] + self.row].number_format = "#,##0.00 ₽"
-            ws[column[11] + self.row].number_format = "#,##0.00 ₽"
-            ws[column[13] + self.row].number_format = "#,##0.00 ₽"
-            ws[column[14] + self.row].number_format = "#,##0.00 ₽"
+            ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
+            ws.merge_cells(start_row=row, start_column=3, end_row=row, end_column=6)
+            ws.merge_cells(start_row=row, start_column=7, end_row=row, end_column=9)
+            ws.merge_cells(start_row=row, start_column=11, end_row=row, end_column=12)
+            ws[column[1] + row].font = ReportStyle.h3
+            ws[column[3] + row].font = ReportStyle.h3
+            ws[column[7] + row].font = ReportStyle.h3
+            ws[column[10] + row].font = ReportStyle.h3
+            ws[column[11] + row].font = ReportStyle.h3
+            ws[column[13] + row].font = ReportStyle.h3
+            ws[column[14] + row].font = ReportStyle.h3
+            ws[column[1] + row].alignment = ReportStyle.align_top
+            ws[column[3] + row].alignment = ReportStyle.align_top
+            ws[column[7] + row].alignment = ReportStyle.align_top
+            ws[column[10] + row].alignment = ReportStyle.align_top
+            ws[column[11] + row].alignment = ReportStyle.align_top
+            ws[column[13] + row].alignment = ReportStyle.align_top
+            ws[column[14] + row].alignment = ReportStyle.align_top
+            ws[column[3] + row].number_format = "#,##0.00 ₽"
+            ws[column[7] + row].number_format = "#,##0.00 ₽"
+            ws[column[10] + row].number_format = "#,##0.00 ₽"
+            ws[column[11] + row].number_format = "#,##0.00 ₽"
+            ws[column[13] + row].number_format = "#,##0.00 ₽"
+            ws[column[14] + row].number_format = "#,##0.00 ₽"
             b = 1
             while b < len(column):
-                ws[column[b] + self.row].border = ReportStyle.border
+                ws[column[b] + row].border = ReportStyle.border
                 b += 1
 
         def merge_table_red():
-            ws.merge_cells(start_row=self.row, start_column=1, end_row=self.row, end_column=2)
-            ws.merge_cells(start_row=self.row, start_column=3, end_row=self.row, end_column=6)
-            ws.merge_cells(start_row=self.row, start_column=7, end_row=self.row, end_column=9)
-            ws.merge_cells(start_row=self.row, start_column=11, end_row=self.row, end_column=12)
-            ws[column[1] + self.row].font = ReportStyle.font_red
-            ws[column[3] + self.row].font = ReportStyle.font_red
-            ws[column[7] + self.row].font = ReportStyle.font_red
-            ws[column[10] + self.row].font = ReportStyle.font_red
-            ws[column[11] + self.row].font = ReportStyle.font_red
-            ws[column[13] + self.row].font = ReportStyle.font_red
-            ws[column[14] + self.row].font = ReportStyle.font_red
-            ws[column[1] + self.row].alignment = ReportStyle.align_top
-            ws[column[3] + self.row].alignment = ReportStyle.align_top
-            ws[column[7] + self.row].alignment = ReportStyle.align_top
-            ws[column[10] + self.row].alignment = ReportStyle.align_top
-            ws[column[11] + self.row].alignment = ReportStyle.align_top
-            ws[column[13] + self.row].alignment = ReportStyle.align_top
-            ws[column[14] + self.row].alignment = ReportStyle.align_top
-            ws[column[3] + self.row].number_format = "#,##0.00 ₽"
-            ws[column[7] + self.row].number_format = "#,##0.00 ₽"
-            ws[column[10] + self.row].number_format = "#,##0.00 ₽"
-            ws[column[11] + self.row].number_format = "#,##0.00 ₽"
-            ws[column[13] + self.row].number_format = "#,##0.00 ₽"
-            ws[column[14] + self.row].number_format = "#,##0.00 ₽"
+            ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
+            ws.merge_cells(start_row=row, start_column=3, end_row=row, end_column=6)
+            ws.merge_cells(start_row=row, start_column=7, end_row=row, end_column=9)
+            ws.merge_cells(start_row=row, start_column=11, end_row=row, end_column=12)
+            ws[column[1] + row].font = ReportStyle.font_red
+            ws[column[3] + row].font = ReportStyle.font_red
+            ws[column[7] + row].font = ReportStyle.font_red
+            ws[column[10] + row].font = ReportStyle.font_red
+            ws[column[11] + row].font = ReportStyle.font_red
+            ws[column[13] + row].font = ReportStyle.font_red
+            ws[column[14] + row].font = ReportStyle.font_red
+            ws[column[1] + row].alignment = ReportStyle.align_top
+            ws[column[3] + row].alignment = ReportStyle.align_top
+            ws[column[7] + row].alignment = ReportStyle.align_top
+            ws[column[10] + row].alignment = ReportStyle.align_top
+            ws[column[11] + row].alignment = ReportStyle.align_top
+            ws[column[13] + row].alignment = ReportStyle.align_top
+            ws[column[14] + row].alignment = ReportStyle.align_top
+            ws[column[3] + row].number_format = "#,##0.00 ₽"
+            ws[column[7] + row].number_format = "#,##0.00 ₽"
+            ws[column[10] + row].number_format = "#,##0.00 ₽"
+            ws[column[11] + row].number_format = "#,##0.00 ₽"
+            ws[column[13] + row].number_format = "#,##0.00 ₽"
+            ws[column[14] + row].number_format = "#,##0.00 ₽"
             b = 1
             while b < len(column):
-                ws[column[b] + self.row].border = ReportStyle.border
+                ws[column[b] + row].border = ReportStyle.border
                 b += 1
 
         def merge_width_red():
             ws.merge_cells(
-                start_row=self.row,
+                start_row=row,
                 start_column=1,
-                end_row=self.row,
+                end_row=row,
                 end_column=len(column) - 1,
             )
-            ws[column[1] + self.row].font = ReportStyle.font_red
-            ws[column[1] + self.row].alignment = ReportStyle.align_top
+            ws[column[1] + row].font = ReportStyle.font_red
+            ws[column[1] + row].alignment = ReportStyle.align_top
             b = 1
             while b < len(column):
                 if b == 1:
-                    ws[column[b] + self.row].border = ReportStyle.border_left
+                    ws[column[b] + row].border = ReportStyle.border_left
                 elif b == len(column) - 1:
-                    ws[column[b] + self.row].border = ReportStyle.border_right
+                    ws[column[b] + row].border = ReportStyle.border_right
                 else:
-                    ws[column[b] + self.row].border = ReportStyle.border
+                    ws[column[b] + row].border = ReportStyle.border
                 b += 1
 
         ws[column[1] + next_row()] = "Касса №"
-        ws[column[3] + self.row] = "Сумма"
-        ws[column[7] + self.row] = "Наличными"
-        ws[column[10] + self.row] = "Безналичными"
-        ws[column[11] + self.row] = "Со счета"
-        ws[column[13] + self.row] = "Бонусами"
-        ws[column[14] + self.row] = "MaxBonux"
+        ws[column[3] + row] = "Сумма"
+        ws[column[7] + row] = "Наличными"
+        ws[column[10] + row] = "Безналичными"
+        ws[column[11] + row] = "Со счета"
+        ws[column[13] + row] = "Бонусами"
+        ws[column[14] + row] = "MaxBonux"
         merge_table_h3()
         # раскрвшивание фона для заголовков
         b = 1
         while b < len(column):
-            ws[column[b] + self.row].fill = ReportStyle.fill
+            ws[column[b] + row].fill = ReportStyle.fill
             b += 1
 
         for typpe in cashdesk_report:
@@ -1449,12 +1454,12 @@ class YandexRepository:
                     merge_width_red()
                 for line in cashdesk_report[typpe]:
                     ws[column[1] + next_row()] = line[0]
-                    ws[column[3] + self.row] = line[1]
-                    ws[column[7] + self.row] = line[2]
-                    ws[column[10] + self.row] = line[3]
-                    ws[column[11] + self.row] = line[4]
-                    ws[column[13] + self.row] = line[5]
-                    ws[column[14] + self.row] = line[6] - line[3]
+                    ws[column[3] + row] = line[1]
+                    ws[column[7] + row] = line[2]
+                    ws[column[10] + row] = line[3]
+                    ws[column[11] + row] = line[4]
+                    ws[column[13] + row] = line[5]
+                    ws[column[14] + row] = line[6] - line[3]
                     if line[0] == "Итого":
                         merge_table_red()
                     elif line[0] == "Итого по отчету":
@@ -1495,11 +1500,12 @@ class YandexRepository:
 
         column = ["", "A", "B", "C", "D", "E"]
 
-        self.row = "0"
+        row = "0"
 
         def next_row():
-            self.row = str(int(self.row) + 1)
-            return self.row
+            nonlocal row
+            row = str(int(row) + 1)
+            return row
 
         # объект
         wb = Workbook()
@@ -1527,87 +1533,87 @@ class YandexRepository:
 
         ws[column[1] + next_row()] = "Количество человек за день"
         ws.merge_cells(
-            start_row=self.row,
+            start_row=row,
             start_column=1,
-            end_row=self.row,
+            end_row=row,
             end_column=len(column) - 1,
         )
         # шрифты
-        ws[column[1] + self.row].font = ReportStyle.h1
+        ws[column[1] + row].font = ReportStyle.h1
         # выравнивание
-        ws[column[1] + self.row].alignment = ReportStyle.align_left
+        ws[column[1] + row].alignment = ReportStyle.align_left
         # Высота строк
         ws.row_dimensions[1].height = 24
 
         ws[column[1] + next_row()] = f"{client_count_totals_org[0][0]}"
         ws.merge_cells(
-            start_row=self.row,
+            start_row=row,
             start_column=1,
-            end_row=self.row,
+            end_row=row,
             end_column=len(column) - 1,
         )
-        ws[column[1] + self.row].font = ReportStyle.font
-        ws[column[1] + self.row].alignment = ReportStyle.align_top
+        ws[column[1] + row].font = ReportStyle.font
+        ws[column[1] + row].alignment = ReportStyle.align_top
 
         ws[column[1] + next_row()] = "За период с:"
-        ws[column[1] + self.row].font = ReportStyle.font
-        ws[column[1] + self.row].alignment = ReportStyle.align_top
-        ws[column[2] + self.row] = client_count_totals_org[1][0].strftime("%d.%m.%Y")
-        ws.merge_cells(start_row=self.row, start_column=2, end_row=self.row, end_column=3)
-        ws[column[2] + self.row].font = ReportStyle.font_bold
-        ws[column[2] + self.row].alignment = ReportStyle.align_top
-        ws[column[4] + self.row] = "по"
-        ws[column[4] + self.row].font = ReportStyle.font
-        ws[column[4] + self.row].alignment = ReportStyle.align_top
-        ws[column[5] + self.row] = (client_count_totals_org[-2][0]).strftime("%d.%m.%Y")
-        ws.merge_cells(start_row=self.row, start_column=5, end_row=self.row, end_column=7)
-        ws[column[5] + self.row].font = ReportStyle.font_bold
-        ws[column[5] + self.row].alignment = ReportStyle.align_top
+        ws[column[1] + row].font = ReportStyle.font
+        ws[column[1] + row].alignment = ReportStyle.align_top
+        ws[column[2] + row] = client_count_totals_org[1][0].strftime("%d.%m.%Y")
+        ws.merge_cells(start_row=row, start_column=2, end_row=row, end_column=3)
+        ws[column[2] + row].font = ReportStyle.font_bold
+        ws[column[2] + row].alignment = ReportStyle.align_top
+        ws[column[4] + row] = "по"
+        ws[column[4] + row].font = ReportStyle.font
+        ws[column[4] + row].alignment = ReportStyle.align_top
+        ws[column[5] + row] = (client_count_totals_org[-2][0]).strftime("%d.%m.%Y")
+        ws.merge_cells(start_row=row, start_column=5, end_row=row, end_column=7)
+        ws[column[5] + row].font = ReportStyle.font_bold
+        ws[column[5] + row].alignment = ReportStyle.align_top
 
         # ТАБЛИЦА
         def merge_table():
-            ws.merge_cells(start_row=self.row, start_column=1, end_row=self.row, end_column=2)
-            ws.merge_cells(start_row=self.row, start_column=3, end_row=self.row, end_column=5)
-            ws[column[1] + self.row].font = ReportStyle.font
-            ws[column[3] + self.row].font = ReportStyle.font
-            ws[column[1] + self.row].alignment = ReportStyle.align_top
-            ws[column[3] + self.row].alignment = ReportStyle.align_top
+            ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
+            ws.merge_cells(start_row=row, start_column=3, end_row=row, end_column=5)
+            ws[column[1] + row].font = ReportStyle.font
+            ws[column[3] + row].font = ReportStyle.font
+            ws[column[1] + row].alignment = ReportStyle.align_top
+            ws[column[3] + row].alignment = ReportStyle.align_top
             b = 1
             while b < len(column):
-                ws[column[b] + self.row].border = ReportStyle.border
+                ws[column[b] + row].border = ReportStyle.border
                 b += 1
 
         def merge_table_bold():
-            ws.merge_cells(start_row=self.row, start_column=1, end_row=self.row, end_column=2)
-            ws.merge_cells(start_row=self.row, start_column=3, end_row=self.row, end_column=5)
-            ws[column[1] + self.row].font = ReportStyle.font_bold
-            ws[column[3] + self.row].font = ReportStyle.font_bold
-            ws[column[1] + self.row].alignment = ReportStyle.align_top
-            ws[column[3] + self.row].alignment = ReportStyle.align_top
+            ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
+            ws.merge_cells(start_row=row, start_column=3, end_row=row, end_column=5)
+            ws[column[1] + row].font = ReportStyle.font_bold
+            ws[column[3] + row].font = ReportStyle.font_bold
+            ws[column[1] + row].alignment = ReportStyle.align_top
+            ws[column[3] + row].alignment = ReportStyle.align_top
             b = 1
             while b < len(column):
-                ws[column[b] + self.row].border = ReportStyle.border
+                ws[column[b] + row].border = ReportStyle.border
                 b += 1
 
         ws[column[1] + next_row()] = "Дата"
-        ws[column[3] + self.row] = "Количество клиентов"
+        ws[column[3] + row] = "Количество клиентов"
         merge_table_bold()
         # раскрвшивание фона для заголовков
         b = 1
         while b < len(column):
-            ws[column[b] + self.row].fill = ReportStyle.fill
+            ws[column[b] + row].fill = ReportStyle.fill
             b += 1
 
         for line in client_count_totals_org:
             try:
                 ws[column[1] + next_row()] = line[0].strftime("%d.%m.%Y")
-                ws[column[3] + self.row] = line[1]
+                ws[column[3] + row] = line[1]
                 merge_table()
             except AttributeError:
                 pass
 
         ws[column[1] + next_row()] = "Итого"
-        ws[column[3] + self.row] = client_count_totals_org[-1][1]
+        ws[column[3] + row] = client_count_totals_org[-1][1]
         merge_table_bold()
 
         # увеличиваем все строки по высоте
@@ -1739,6 +1745,10 @@ class YandexRepository:
             detail="Ошибка YaDisk: token не валиден",
         )
 
+    async def close(self) -> None:
+        self._yadisk.close()
+        await self._async_yadisk.close()
+
     async def read_yadisk_files(self, root_path: str, date_from: datetime, file_template_name: str):
         yield self._async_yadisk.listdir(root_path)
 
@@ -0,0 +1,104 @@
+from datetime import date, datetime
+from enum import StrEnum
+from typing import Any, Self
+
+from pydantic import Field, model_validator
+
+from .base import Model
+from .mixins import IdMixin
+
+
+class JobKind(StrEnum):
+    """Виды фоновых задач (долгие отчеты)."""
+
+    CREATE_REPORTS = "create_reports"
+    CREATE_TOTAL_REPORT_BY_DAY = "create_total_report_by_day"
+    CREATE_ATTENDANCE_REPORT = "create_attendance_report"
+    CREATE_PURCHASED_GOODS_REPORT = "create_purchased_goods_report"
+    PREWARM_REPORT_CACHE = "prewarm_report_cache"
+
+
+class JobStatus(StrEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class PeriodParams(Model):
+    """Период отчета."""
+
+    date_from: datetime = Field(description="Начало периода")
+    date_to: datetime = Field(description="Конец периода")
+
+    @model_validator(mode="after")
+    def check_period(self) -> Self:
+        if self.date_from >= self.date_to:
+            raise ValueError("date_from >= date_to")
+        return self
+
+
+class CreateReportsParams(PeriodParams):
+    """Параметры задачи create_reports."""
+
+    use_yadisk: bool = Field(False, description="Сохранить отчеты на Яндекс.Диск")
+    telegram_report: bool = Field(False, description="Отправить отчет в Telegram")
+
+
+class TotalReportByDayParams(PeriodParams):
+    """Параметры задачи create_total_report_by_day."""
+
+    db_name: str = Field(description="База данных")
+    use_cache: bool = Field(True, description="Использовать кеш отчетов")
+    force: bool = Field(False, description="Пересчитать запечатанные дни")
+
+
+class AttendanceReportParams(PeriodParams):
+    """Параметры задачи create_attendance_report."""
+
+    save_to_yandex: bool = Field(False, description="Сохранить отчет на Яндекс.Диск")
+    save_to_google: bool = Field(True, description="Сохранить отчет в Google Таблицы")
+    use_cache: bool = Field(True, description="Использовать кеш отчетов")
+    force: bool = Field(False, description="Пересчитать запечатанные дни")
+
+    @model_validator(mode="after")
+    def check_targets(self) -> Self:
+        if not self.save_to_google and not self.save_to_yandex:
+            raise ValueError("At least one of 'save_to_google' or 'save_to_yandex' must be True")
+        return self
+
+
+class PurchasedGoodsReportParams(PeriodParams):
+    """Параметры задачи create_purchased_goods_report."""
+
+    db_name: str = Field(description="База данных")
+    goods: list[str] = Field(default_factory=list, description="Товары")
+    use_like: bool = Field(False, description="Искать товары по шаблону")
+    save_to_yandex: bool = Field(False, description="Сохранить отчет на Яндекс.Диск")
+    hide_zero: bool = Field(False, description="Скрыть нулевые строки")
+
+
+class PrewarmParams(Model):
+    """Параметры задачи prewarm_report_cache."""
+
+    day: date = Field(description="Закрытый рабочий день")
+
+
+class JobCreate(Model):
+    """Постановка фоновой задачи."""
+
+    kind: JobKind = Field(description="Вид задачи")
+    params: dict[str, Any] = Field(default_factory=dict, description="Параметры задачи")
+
+
+class Job(IdMixin, JobCreate):
+    """Фоновая задача."""
+
+    status: JobStatus = Field(JobStatus.QUEUED, description="Статус")
+    progress_done: int = Field(0, description="Выполнено шагов")
+    progress_total: int = Field(0, description="Всего шагов (0 - неизвестно)")
+    result: Any = Field(None, description="Результат")
+    error: str | None = Field(None, description="Ошибка")
+    created_at: datetime = Field(description="Когда поставлена")
+    started_at: datetime | None = Field(None, description="Когда начато выполнение")
+    finished_at: datetime | None = Field(None, description="Когда завершена")
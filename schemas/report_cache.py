@@ -1,6 +1,7 @@
-from datetime import date
+from collections.abc import Mapping
+from datetime import date, datetime
 
-from pydantic import Field
+from pydantic import Field, field_serializer
 
 from .base import Model
 from .mixins import IdMixin
@@ -16,3 +17,12 @@ class ReportCacheCreate(Model):
 
 class ReportCache(IdMixin, ReportCacheCreate):
     """Кеш отчета."""
+
+    sealed_at: datetime | None = Field(None, description="Когда отчет запечатан (день закрыт)")
+    content_hash: str | None = Field(None, description="Хеш содержимого отчета")
+    source_watermark: str | None = Field(None, description="Отпечаток исходных данных, по которым построен отчет")
+
+    @field_serializer("report_data")
+    def serialize_report_data(self, report_data: Mapping) -> dict:
+        # Компактный отчет хранится как LazyReportData и раскодируется только при сериализации
+        return dict(report_data)
@@ -1,5 +1,6 @@
 import logging
-from datetime import datetime
+from collections.abc import Sequence
+from datetime import date, datetime
 
 from repositories.bars import BarsRepository, get_bars_repo
 from schemas.bars import (
@@ -18,18 +19,48 @@ class BarsService:
     def __init__(self, repository: BarsRepository):
         self._repo = repository
 
-    def choose_db(self, db_name: str):
-        self._repo.set_database(db_name)
+    @property
+    def database(self) -> str | None:
+        return self._repo.database
 
-    def get_tariffs(self, organization_id: int) -> list[Category]:
-        tariffs_ = self._repo.get_tariffs(organization_id)
+    def for_database(self, db_name: str) -> "BarsService":
+        """Сервис, работающий с базой db_name (общий экземпляр не меняется)."""
+
+        return BarsService(repository=self._repo.for_database(db_name))
+
+    async def get_tariffs(self, organization_id: int) -> list[Category]:
+        tariffs_ = await self._repo.get_tariffs(organization_id)
         return [Category.model_validate(tariff) for tariff in tariffs_]
 
-    def get_organisations(self) -> list[Organisation]:
-        organisations_ = self._repo.get_organisations()
+    async def get_organisations(self) -> list[Organisation]:
+        organisations_ = await self._repo.get_organisations()
         return [Organisation.model_validate(org) for org in organisations_]
 
-    def get_total_report(
+    async def get_tariffs_catalog(
+        self, organization_ids: Sequence[int], changed_since: datetime | None = None
+    ) -> list[Category]:
+        """Тарифы организаций (все или измененные начиная с changed_since)."""
+
+        if not organization_ids:
+            return []
+
+        tariffs_ = await self._repo.get_tariffs_catalog(organization_ids, changed_since=changed_since)
+        return [Category.model_validate(tariff) for tariff in tariffs_]
+
+    async def get_tariffs_catalog_watermark(
+        self, organization_ids: Sequence[int]
+    ) -> tuple[datetime | None, int, int | None]:
+        if not organization_ids:
+            return None, 0, None
+
+        return await self._repo.get_tariffs_catalog_watermark(organization_ids)
+
+    async def invalidate_reference_cache(self) -> int:
+        """Сбросить кеш организаций и тарифов выбранной базы."""
+
+        return await self._repo.invalidate_reference_cache()
+
+    async def get_total_report(
         self,
         organization_id: int,
         date_from: datetime,
@@ -38,7 +69,7 @@ class BarsService:
         hide_internal: bool,
         hide_discount: bool,
     ) -> TotalReport:
-        total_report_ = self._repo.get_total_report(
+        total_report_ = await self._repo.get_total_report(
             org=organization_id,
             date_from=date_from,
             date_to=date_to,
@@ -50,20 +81,44 @@ class BarsService:
             elements=[TotalReportElement.model_validate(el) for el in total_report_],
         )
 
-    def get_loan_transactions_by_service_names(
+    async def get_total_reports_by_day(
+        self,
+        organization_id: int,
+        date_from: datetime,
+        date_to: datetime,
+        hide_zeroes: bool,
+        hide_internal: bool,
+        hide_discount: bool,
+    ) -> dict[date, TotalReport]:
+        """Итоговые отчеты по каждому дню периода за одно обращение к базе."""
+
+        total_reports_ = await self._repo.get_total_report_by_days(
+            org=organization_id,
+            date_from=date_from,
+            date_to=date_to,
+            hide_zeroes=hide_zeroes,
+            hide_internal=hide_internal,
+            hide_discount=hide_discount,
+        )
+        return {
+            day: TotalReport(elements=[TotalReportElement.model_validate(el) for el in total_report_])
+            for day, total_report_ in total_reports_.items()
+        }
+
+    async def get_loan_transactions_by_service_names(
         self,
         date_from: datetime,
         date_to: datetime,
         service_names: list[str],
         use_like: bool = True,
     ) -> list[ExtendedService]:
-        companies = [Organisation.model_validate(org) for org in self._repo.get_organisations()]
+        companies = [Organisation.model_validate(org) for org in await self._repo.get_organisations()]
         companies_ids = [company.super_account_id for company in companies]
 
         if use_like:
             _unique_transactions = {}
             for service_name in service_names:
-                _transactions = self._repo.get_loan_transactions_by_service_name_pattern(
+                _transactions = await self._repo.get_loan_transactions_by_service_name_pattern(
                     date_from=date_from,
                     date_to=date_to,
                     service_name_pattern=service_name,
@@ -75,7 +130,7 @@ class BarsService:
 
             client_transactions = _unique_transactions.values()
         else:
-            _transactions = self._repo.get_loan_transactions_by_service_names(
+            _transactions = await self._repo.get_loan_transactions_by_service_names(
                 date_from=date_from,
                 date_to=date_to,
                 service_names=service_names,
@@ -96,18 +151,18 @@ class BarsService:
 
         return list(extended_services.values())
 
-    def get_customer_count(
+    async def get_customer_count(
         self,
         date_from: datetime | None = None,
         date_to: datetime | None = None,
     ):
         if date_from:
             if date_to:
-                return self._repo.get_period_customer_count(date_from, date_to)
+                return await self._repo.get_period_customer_count(date_from, date_to)
             date_to = datetime.now()
-            return self._repo.get_period_customer_count(date_from, date_to)
+            return await self._repo.get_period_customer_count(date_from, date_to)
 
-        return self._repo.get_current_customer_count()
+        return await self._repo.get_current_customer_count()
 
 
 def get_bars_service():
@@ -0,0 +1,175 @@
+"""Сервисы, репозитории и клиенты внешних систем уровня приложения.
+
+Граф создается один раз при старте процесса (main.lifespan, worker.py) и закрывается при остановке.
+Общие экземпляры не хранят состояние запроса: база Барс выбирается через for_database(), который
+возвращает привязанную к базе копию сервиса.
+"""
+
+from dataclasses import dataclass
+
+from fastapi import Request
+
+from core.settings import settings
+from db import redis_db
+from db.mssql import MsSqlDatabase
+from gateways.telegram import TelegramBot
+from legacy.barsicreport2 import BarsicReport2Service
+from repositories.bars import BarsRepository
+from repositories.cache import get_cache_repo
+from repositories.google import get_google_repo
+from repositories.jobs import get_job_repo
+from repositories.yandex import YandexRepository, get_yandex_repo
+from services.bars import BarsService
+from services.jobs import JobService, JobServices
+from services.prewarm import PrewarmService
+from services.report_config import get_report_config_service
+from services.reports import ReportService, get_report_service
+from services.rk import get_rk_service
+from services.settings import SettingsService
+from services.tariff_catalog import TariffCatalogService
+from services.workers import WorkerService
+from utils.single_flight import SingleFlight
+
+
+@dataclass(frozen=True)
+class AppServices:
+    telegram_bot: TelegramBot
+    yandex_repo: YandexRepository
+    bars_service: BarsService
+    settings_service: SettingsService
+    report_service: ReportService
+    legacy_service: BarsicReport2Service
+    worker_service: WorkerService
+    job_service: JobService
+    prewarm_service: PrewarmService
+    single_flight: SingleFlight
+
+
+def create_app_services() -> AppServices:
+    """Создать граф сервисов. Вызывается после подключения к Redis."""
+
+    bars_srv = MsSqlDatabase(
+        server=settings.mssql_server,
+        user=settings.mssql_user,
+        password=settings.mssql_pwd,
+    )
+    rk_srv = MsSqlDatabase(
+        server=settings.mssql_server_rk,
+        user=settings.mssql_user_rk,
+        password=settings.mssql_pwd_rk,
+    )
+    telegram_bot = TelegramBot(settings.telegram_token)
+    yandex_repo = get_yandex_repo()
+    cache_repo = get_cache_repo()
+    report_config_service = get_report_config_service()
+    report_service = get_report_service()
+    rk_service = get_rk_service()
+    bars_service = BarsService(repository=BarsRepository(bars_srv, cache=cache_repo))
+    tariff_catalog_service = TariffCatalogService(
+        bars_service=bars_service,
+        report_config_service=report_config_service,
+    )
+    settings_service = SettingsService(
+        bars_service=bars_service,
+        report_config_service=report_config_service,
+        tariff_catalog_service=tariff_catalog_service,
+    )
+    legacy_service = BarsicReport2Service(
+        bars_srv=bars_srv,
+        rk_srv=rk_srv,
+        redis=redis_db.redis,
+        report_config_service=report_config_service,
+        report_service=report_service,
+        settings_service=settings_service,
+        bars_service=bars_service,
+        rk_service=rk_service,
+        yandex_repo=yandex_repo,
+        cache_repo=cache_repo,
+        telegram_bot=telegram_bot,
+    )
+    worker_service = WorkerService(
+        bars_srv=bars_srv,
+        bars_service=bars_service,
+        rk_service=rk_service,
+        report_config_service=report_config_service,
+        legacy_service=legacy_service,
+        report_service=report_service,
+        yandex_repo=yandex_repo,
+        google_repo=get_google_repo(),
+        tariff_catalog_service=tariff_catalog_service,
+    )
+    prewarm_service = PrewarmService(
+        redis=redis_db.redis,
+        worker_service=worker_service,
+        legacy_service=legacy_service,
+        report_service=report_service,
+    )
+    return AppServices(
+        telegram_bot=telegram_bot,
+        yandex_repo=yandex_repo,
+        bars_service=bars_service,
+        settings_service=settings_service,
+        report_service=report_service,
+        legacy_service=legacy_service,
+        worker_service=worker_service,
+        job_service=JobService(
+            repo=get_job_repo(),
+            services=JobServices(
+                worker_service=worker_service,
+                legacy_service=legacy_service,
+                prewarm_service=prewarm_service,
+            ),
+        ),
+        prewarm_service=prewarm_service,
+        single_flight=SingleFlight(
+            redis=redis_db.redis,
+            lease_ttl=settings.single_flight_lease_ttl,
+            poll_interval=settings.single_flight_poll_interval,
+        ),
+    )
+
+
+async def close_app_services(app_services: AppServices) -> None:
+    """Закрыть сессии клиентов внешних систем (пулы MSSQL закрываются отдельно)."""
+
+    await app_services.telegram_bot.close()
+    await app_services.yandex_repo.close()
+
+
+# Зависимости FastAPI: граф создается в main.lifespan и хранится в app.state.services
+
+
+def get_app_services(request: Request) -> AppServices:
+    return request.app.state.services
+
+
+def get_bars_service(request: Request) -> BarsService:
+    return get_app_services(request).bars_service
+
+
+def get_settings_service(request: Request) -> SettingsService:
+    return get_app_services(request).settings_service
+
+
+def get_legacy_service(request: Request) -> BarsicReport2Service:
+    return get_app_services(request).legacy_service
+
+
+def get_worker_service(request: Request) -> WorkerService:
+    return get_app_services(request).worker_service
+
+
+def get_job_service(request: Request) -> JobService:
+    return get_app_services(request).job_service
+
+
+def get_prewarm_service(request: Request) -> PrewarmService:
+    return get_app_services(request).prewarm_service
+
+
+def get_single_flight(request: Request) -> SingleFlight:
+    return get_app_services(request).single_flight
+
+
+def get_telegram_bot(request: Request) -> TelegramBot:
+    return get_app_services(request).telegram_bot
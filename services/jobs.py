@@ -0,0 +1,252 @@
+import hashlib
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any
+from uuid import UUID, uuid4
+
+import orjson
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+from redis.exceptions import RedisError
+from starlette import status
+
+from legacy.barsicreport2 import BarsicReport2Service
+from repositories.jobs import JobRepository
+from schemas.base import Model
+from schemas.jobs import (
+    AttendanceReportParams,
+    CreateReportsParams,
+    Job,
+    JobCreate,
+    JobKind,
+    JobStatus,
+    PrewarmParams,
+    PurchasedGoodsReportParams,
+    TotalReportByDayParams,
+)
+from services.prewarm import PrewarmService
+from services.workers import WorkerService
+from utils.pipeline import ProgressCallback
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+
+
+@dataclass(frozen=True)
+class JobServices:
+    """Сервисы, которыми обработчики выполняют задачи."""
+
+    worker_service: WorkerService
+    legacy_service: BarsicReport2Service
+    prewarm_service: PrewarmService
+
+
+JobHandler = Callable[[JobServices, Any, ProgressCallback], Awaitable[Any]]
+
+
+async def _create_reports(services: JobServices, params: CreateReportsParams, progress: ProgressCallback) -> dict:
+    report_run = await services.legacy_service.run_report(
+        date_from=params.date_from,
+        date_to=params.date_to,
+        use_yadisk=params.use_yadisk,
+        telegram_report=params.telegram_report,
+        progress=progress,
+    )
+    return {
+        "ok": not report_run.failed_days,
+        "Google Report": report_run.spreadsheet_url,
+        "failed_days": report_run.failed_days,
+    }
+
+
+async def _create_total_report_by_day(
+    services: JobServices, params: TotalReportByDayParams, progress: ProgressCallback
+) -> dict:
+    worker_service = services.worker_service.for_database(params.db_name)
+    return await worker_service.get_total_report_with_groups(
+        params.date_from,
+        params.date_to,
+        use_cache=params.use_cache,
+        force=params.force,
+        progress=progress,
+    )
+
+
+async def _create_attendance_report(
+    services: JobServices, params: AttendanceReportParams, progress: ProgressCallback
+) -> dict:
+    worker_service = services.worker_service.for_database("Aquapark_Ulyanovsk")
+    return await worker_service.create_attendance_report(
+        date_from=params.date_from,
+        date_to=params.date_to,
+        save_to_yandex=params.save_to_yandex,
+        save_to_google=params.save_to_google,
+        use_cache=params.use_cache,
+        force=params.force,
+        progress=progress,
+    )
+
+
+async def _create_purchased_goods_report(
+    services: JobServices, params: PurchasedGoodsReportParams, progress: ProgressCallback
+) -> dict:
+    worker_service = services.worker_service.for_database(params.db_name)
+    return await worker_service.create_purchased_goods_report(
+        date_from=params.date_from,
+        date_to=params.date_to,
+        goods=params.goods,
+        use_like=params.use_like,
+        save_to_yandex=params.save_to_yandex,
+        hide_zero=params.hide_zero,
+    )
+
+
+async def _prewarm_report_cache(services: JobServices, params: PrewarmParams, progress: ProgressCallback) -> dict:
+    run = await services.prewarm_service.prewarm_once(params.day)
+    if run is None:
+        return {"ok": True, "skipped": True}
+
+    return asdict(run) | {"ok": run.ok}
+
+
+# Вид задачи -> (параметры, обработчик)
+JOB_HANDLERS: dict[JobKind, tuple[type[Model], JobHandler]] = {
+    JobKind.CREATE_REPORTS: (CreateReportsParams, _create_reports),
+    JobKind.CREATE_TOTAL_REPORT_BY_DAY: (TotalReportByDayParams, _create_total_report_by_day),
+    JobKind.CREATE_ATTENDANCE_REPORT: (AttendanceReportParams, _create_attendance_report),
+    JobKind.CREATE_PURCHASED_GOODS_REPORT: (PurchasedGoodsReportParams, _create_purchased_goods_report),
+    JobKind.PREWARM_REPORT_CACHE: (PrewarmParams, _prewarm_report_cache),
+}
+
+
+def _job_digest(job: Job) -> str:
+    dump = orjson.dumps([job.kind, job.params], option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(dump, digest_size=16).hexdigest()
+
+
+class JobService:
+    """Фоновые задачи: постановка в очередь из API и выполнение в процессах-воркерах (worker.py).
+
+    Задача с теми же параметрами, что и еще не завершенная, не ставится повторно: возвращается уже
+    поставленная. Результат хранится вместе с задачей job_ttl секунд, поэтому клиент может
+    переподключиться и забрать его по id задачи.
+    """
+
+    def __init__(self, repo: JobRepository, services: JobServices):
+        self._repo = repo
+        self._services = services
+
+    async def submit(self, job_create: JobCreate) -> Job:
+        params_model, _ = JOB_HANDLERS[job_create.kind]
+        try:
+            params = params_model.model_validate(job_create.params)
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=jsonable_encoder(e.errors(include_url=False, include_context=False)),
+            )
+
+        job = Job(
+            id=uuid4(),
+            kind=job_create.kind,
+            params=params.model_dump(mode="json"),
+            created_at=datetime.utcnow(),
+        )
+        digest = _job_digest(job)
+        active_id = await self._repo.claim_active(digest, job.id)
+        if active_id != job.id:
+            active_job = await self._repo.get(active_id)
+            if active_job is not None and active_job.status in ACTIVE_STATUSES:
+                return active_job
+            await self._repo.set_active(digest, job.id)
+
+        await self._repo.enqueue(job)
+        logger.info(f"Job {job.id} ({job.kind}) queued")
+        return job
+
+    async def get_job(self, job_id: UUID) -> Job:
+        job = await self._repo.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+        return job
+
+    async def requeue_unfinished(self, worker_id: str) -> None:
+        """Вернуть в очередь задачи, которые выполнялись остановленными (или упавшими) воркерами.
+
+        worker_id - id воркера или glob-шаблон Redis (см. JobRepository.requeue_processing).
+        """
+
+        for job_id in await self._repo.requeue_processing(worker_id):
+            job = await self._repo.get(job_id)
+            if job is not None:
+                job.status = JobStatus.QUEUED
+                await self._repo.save(job)
+            logger.warning(f"Job {job_id} requeued after worker restart")
+
+    async def run_next(self, timeout: float, worker_id: str) -> bool:
+        """Выполнить следующую задачу из очереди. Возвращает False, если очередь пуста.
+
+        Задача снимается из списка воркера, даже если ее не удалось завершить (например, Redis был
+        недоступен при сохранении результата): повторно выполняются только задачи упавших воркеров.
+        """
+
+        job_id = await self._repo.dequeue(timeout, worker_id)
+        if job_id is None:
+            return False
+
+        try:
+            job = await self._repo.get(job_id)
+            if job is not None:
+                await self._run(job)
+
+        except Exception:
+            logger.exception(f"Job {job_id} could not be completed")
+
+        finally:
+            await self._repo.ack(job_id, worker_id)
+
+        return True
+
+    async def _run(self, job: Job) -> None:
+        """Выполнить задачу и сохранить результат.
+
+        Задача открепляется от своих параметров, даже если сохранить ее состояние не удалось, иначе
+        такую же задачу нельзя было бы поставить до истечения job_ttl.
+        """
+
+        try:
+            await self._execute(job)
+        finally:
+            await self._repo.release_active(_job_digest(job), job.id)
+
+    async def _execute(self, job: Job) -> None:
+        params_model, handler = JOB_HANDLERS[job.kind]
+        job.status, job.started_at = JobStatus.RUNNING, datetime.utcnow()
+        await self._repo.save(job)
+        logger.info(f"Job {job.id} ({job.kind}) started")
+
+        async def progress(done: int, total: int) -> None:
+            job.progress_done, job.progress_total = done, total
+            try:
+                await self._repo.save(job)
+            except RedisError as e:
+                logger.error(f"Job {job.id} progress update failed: {e}")
+
+        try:
+            result = await handler(self._services, params_model.model_validate(job.params), progress)
+            job.result = jsonable_encoder(result)
+        except Exception as e:
+            logger.exception(f"Job {job.id} ({job.kind}) failed")
+            job.status = JobStatus.FAILED
+            job.error = str(e.detail) if isinstance(e, HTTPException) else repr(e)
+        else:
+            job.status = JobStatus.DONE
+            logger.info(f"Job {job.id} ({job.kind}) done")
+
+        job.finished_at = datetime.utcnow()
+        await self._repo.save(job)
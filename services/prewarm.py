@@ -0,0 +1,249 @@
+"""Ночной прогрев кеша отчетов.
+
+После закрытия рабочего дня отчеты за последние дни строятся заранее, чтобы утренние запросы только
+читали кеш: total_detail и attendance (вместе с дневными отчетами Смайла), количество клиентов по базам
+и данные прошлого года. В окно прогрева входит и первый закрытый день (старше report_cache_mutable_days):
+он пересобирается и запечатывается. Запуск в нескольких процессах не дублируется: день прогревает
+тот процесс, который взял аренду в Redis.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta
+
+import orjson
+from dateutil.relativedelta import relativedelta
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.settings import settings
+from legacy.barsicreport2 import BarsicReport2Service
+from schemas.total_report import DBName
+from services.reports import ReportService
+from services.workers import WorkerService
+from utils.dates import day_start, days_range
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "barsic:prewarm"
+LAST_RUN_KEY = f"{KEY_PREFIX}:last_run"
+# Аренда дня прогрева: дольше любого разумного прогрева, чтобы день не прогревался дважды
+LEASE_TTL = 6 * 60 * 60
+
+
+@dataclass
+class PrewarmStage:
+    """Результат этапа прогрева."""
+
+    name: str
+    seconds: float = 0.0
+    ok: bool = True
+    error: str | None = None
+    failed_days: list[date] = field(default_factory=list)
+
+
+@dataclass
+class PrewarmRun:
+    """Результат прогрева кеша за закрытый рабочий день."""
+
+    day: date
+    started_at: datetime
+    finished_at: datetime | None = None
+    stages: list[PrewarmStage] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return all(stage.ok for stage in self.stages)
+
+
+def closed_business_day(now: datetime) -> date:
+    """Последний закрытый рабочий день: при запуске вечером - сегодня, после полуночи - вчера."""
+
+    return now.date() if now.hour >= 12 else now.date() - timedelta(days=1)
+
+
+def prewarm_days(day: date) -> list[datetime]:
+    """Дни прогрева: изменяемые дни до day включительно и день перед ними, который к этому времени закрылся."""
+
+    return days_range(
+        day_start(day) - timedelta(days=settings.report_cache_mutable_days + 1), day_start(day) + timedelta(days=1)
+    )
+
+
+class PrewarmService:
+    def __init__(
+        self,
+        redis: Redis | None,
+        worker_service: WorkerService,
+        legacy_service: BarsicReport2Service,
+        report_service: ReportService,
+    ):
+        self._redis = redis
+        self._worker_service = worker_service
+        self._legacy_service = legacy_service
+        self._report_service = report_service
+
+    async def prewarm(self, day: date) -> PrewarmRun:
+        """Построить и сохранить кеши за дни с (day - report_cache_mutable_days - 1) по day включительно."""
+
+        run = PrewarmRun(day=day, started_at=datetime.now())
+        days = prewarm_days(day)
+        logger.info(f"Prewarming report caches from {days[0].date()} to {day}")
+
+        companies = await self._legacy_service.get_companies()
+        beach_companies = [company for company in companies if company.db_name == DBName.BEACH]
+
+        await self._stage(run, "total_detail", lambda: self._prewarm_total_detail(days))
+        await self._stage(run, "attendance", lambda: self._prewarm_attendance(days))
+        await self._stage(
+            run,
+            f"client_count:{settings.mssql_database1}",
+            lambda: self._legacy_service.get_client_count_totals_by_day(
+                settings.mssql_database1, companies[0].id, days
+            ),
+        )
+        if beach_companies:
+            await self._stage(
+                run,
+                f"client_count:{settings.mssql_database2}",
+                lambda: self._legacy_service.get_client_count_totals_by_day(
+                    settings.mssql_database2, beach_companies[0].id, days
+                ),
+            )
+        last_year_day = day_start(day) - relativedelta(years=1)
+        await self._stage(
+            run,
+            "last_year",
+            lambda: self._legacy_service.get_last_year_reports(last_year_day, last_year_day + timedelta(1), companies),
+        )
+        await self._stage(run, "retention", self._report_service.apply_retention)
+
+        run.finished_at = datetime.now()
+        logger.info(
+            f"Prewarm for {day} finished in {(run.finished_at - run.started_at).total_seconds():.1f}s, ok={run.ok}"
+        )
+        await self._save_run(run)
+        return run
+
+    async def prewarm_once(self, day: date) -> PrewarmRun | None:
+        """Прогреть день, если его еще не прогревает (или уже успешно прогрел) другой процесс.
+
+        Аренда дня снимается, если прогрев завершился с ошибками, чтобы его можно было повторить.
+        """
+
+        lease_key = f"{KEY_PREFIX}:lease:{day.isoformat()}"
+        if self._redis is not None:
+            try:
+                if not await self._redis.set(lease_key, "1", nx=True, ex=LEASE_TTL):
+                    logger.info(f"Prewarm for {day} is already done by another process")
+                    return None
+
+            except RedisError as e:
+                logger.error(f"Prewarm lease failed: {e}")
+
+        run = None
+        try:
+            run = await self.prewarm(day)
+            return run
+
+        finally:
+            if run is None or not run.ok:
+                await self._release_lease(lease_key)
+
+    async def get_last_run(self) -> dict | None:
+        if self._redis is None:
+            return None
+
+        raw = await self._redis.get(LAST_RUN_KEY)
+        return orjson.loads(raw) if raw else None
+
+    async def _prewarm_total_detail(self, days: list[datetime]) -> list[date]:
+        _, failed_days = await self._worker_service.prepare_total_detail_reports(days, use_cache=False)
+        return failed_days
+
+    async def _prewarm_attendance(self, days: list[datetime]) -> list[date]:
+        worker_service = self._worker_service.for_database("Aquapark_Ulyanovsk")
+        _, failed_days = await worker_service.prepare_attendance_reports([(day, False) for day in days])
+        return failed_days
+
+    @staticmethod
+    async def _stage(run: PrewarmRun, name: str, prewarm: Callable[[], Awaitable]) -> None:
+        stage = PrewarmStage(name=name)
+        started = time.monotonic()
+        try:
+            result = await prewarm()
+            if isinstance(result, list):
+                stage.failed_days = result
+                stage.ok = not result
+
+        except Exception as e:
+            logger.exception(f"Prewarm stage '{name}' failed")
+            stage.ok, stage.error = False, repr(e)
+
+        stage.seconds = round(time.monotonic() - started, 3)
+        logger.info(f"Prewarm stage '{name}': {stage.seconds}s, ok={stage.ok}")
+        run.stages.append(stage)
+
+    async def _release_lease(self, lease_key: str) -> None:
+        if self._redis is None:
+            return
+
+        try:
+            await self._redis.delete(lease_key)
+        except RedisError as e:
+            logger.error(f"Prewarm lease release failed: {e}")
+
+    async def _save_run(self, run: PrewarmRun) -> None:
+        if self._redis is None:
+            return
+
+        try:
+            await self._redis.set(LAST_RUN_KEY, orjson.dumps(asdict(run) | {"ok": run.ok}))
+        except RedisError as e:
+            logger.error(f"Prewarm run save failed: {e}")
+
+
+class PrewarmScheduler:
+    """Запускает прогрев каждый день в prewarm_time (локальное время процесса)."""
+
+    def __init__(self, prewarm_service: PrewarmService):
+        self._prewarm_service = prewarm_service
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="prewarm-scheduler")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    @staticmethod
+    def next_run(now: datetime) -> datetime:
+        run_at = datetime.combine(now.date(), settings.prewarm_time)
+        return run_at if run_at > now else run_at + timedelta(days=1)
+
+    async def _run(self) -> None:
+        while True:
+            run_at = self.next_run(datetime.now())
+            logger.info(f"Next report cache prewarm at {run_at}")
+            await asyncio.sleep((run_at - datetime.now()).total_seconds())
+            try:
+                await self._prewarm_service.prewarm_once(closed_business_day(run_at))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Report cache prewarm failed: {e}")
+
+
+scheduler: PrewarmScheduler | None = None
@@ -1,4 +1,5 @@
 import logging
+from dataclasses import dataclass
 from datetime import datetime
 from uuid import UUID
 
@@ -7,17 +8,54 @@ from fastapi.exceptions import HTTPException
 from sqlalchemy.exc import IntegrityError
 from starlette import status
 
+from db import config_changes
+from db.config_changes import ConfigChange
 from models.report import (
     GoogleReportIdModel,
-    ReportElementModel,
     ReportNameModel,
 )
 from schemas.google_report_ids import GoogleReportId, GoogleReportIdCreate
-from schemas.report import ReportElement, ReportGroup, ReportName, ReportNameDetail
+from schemas.report import ReportElement, ReportGroup, ReportName
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class ReportConfig:
+    """Загруженная конфигурация отчета: группы и элементы групп."""
+
+    report_name_id: UUID
+    groups: list[ReportGroup]
+    elements_by_group: dict[UUID, list[ReportElement]]
+
+
+# Кеш конфигураций отчетов в памяти процесса (сбрасывается при изменении отчетов, групп и элементов)
+_report_configs: dict[str, ReportConfig] = {}
+_report_configs_version = 0
+
+
+def invalidate_report_config_cache(report_name_ids: list[UUID] | None = None) -> None:
+    """Сбросить закешированные конфигурации отчетов (указанных или всех)."""
+
+    global _report_configs_version  # noqa: PLW0603
+    _report_configs_version += 1
+    if not report_name_ids:
+        _report_configs.clear()
+        return
+
+    for report_name, report_config in list(_report_configs.items()):
+        if report_config.report_name_id in report_name_ids:
+            del _report_configs[report_name]
+
+
+def _on_config_change(change: ConfigChange) -> None:
+    invalidate_report_config_cache(change.report_name_ids)
+
+
+# Изменения конфигурации в других процессах приходят через Postgres NOTIFY
+config_changes.subscribe(("report_name", "report_group", "report_element"), _on_config_change)
+
+
 class ReportConfigService:
     def __init__(
         self,
@@ -27,59 +65,75 @@ class ReportConfigService:
     async def get_report_names(self) -> list[str]:
         return [ReportName.model_validate(report_name_).title for report_name_ in await ReportNameModel.get_all()]
 
-    async def get_report_groups(self, report_name: str, exclude: list[str] | None = None) -> list[ReportGroup]:
-        report_ = await ReportNameModel.get_by_title(report_name)
+    async def get_report_config(self, report_name: str) -> ReportConfig:
+        """Группы и элементы отчета (из кеша или одним запросом из базы)."""
+
+        report_config = _report_configs.get(report_name)
+        if report_config is not None:
+            return report_config
+
+        version = _report_configs_version
+        report_ = await ReportNameModel.get_with_elements_by_title(report_name)
         if report_ is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Report with name '{report_name}' not found.",
             )
 
-        report = ReportNameDetail.model_validate(report_)
+        report_config = ReportConfig(
+            report_name_id=report_.id,
+            groups=[ReportGroup.model_validate(group) for group in report_.groups],
+            elements_by_group={
+                group.id: [ReportElement.model_validate(el) for el in group.elements] for group in report_.groups
+            },
+        )
+        # Не кешируем конфигурацию, если за время загрузки отчеты были изменены
+        if version == _report_configs_version:
+            _report_configs[report_name] = report_config
+
+        return report_config
+
+    async def get_report_groups(self, report_name: str, exclude: list[str] | None = None) -> list[ReportGroup]:
+        report_config = await self.get_report_config(report_name)
         if exclude:
-            report.groups = [group for group in report.groups if group.title not in exclude]
+            return [group for group in report_config.groups if group.title not in exclude]
 
-        return report.groups
+        return list(report_config.groups)
 
     async def get_report_elements(self, report_name: str) -> list[ReportElement]:
         """Получение всех элементов отчета."""
 
-        all_elements = []
-        report_groups = await self.get_report_groups(report_name)
+        report_config = await self.get_report_config(report_name)
 
-        for group in report_groups:
-            elements_ = await ReportElementModel.get_by_group_id(report_group_id=group.id)
-            elements = [ReportElement.model_validate(el) for el in elements_]
-            all_elements.extend(elements)
+        all_elements = []
+        for group in report_config.groups:
+            all_elements.extend(report_config.elements_by_group[group.id])
 
         return all_elements
 
     async def get_report_elements_with_groups(self, report_name: str) -> dict[str, list[str]]:
         """Получение всех элементов отчета по группам."""
 
-        all_elements = {}
-        report_groups = await self.get_report_groups(report_name)
+        report_config = await self.get_report_config(report_name)
 
-        for group in report_groups:
-            elements_ = await ReportElementModel.get_by_group_id(report_group_id=group.id)
-            elements = [ReportElement.model_validate(el) for el in elements_]
-            all_elements[group.title] = [el.title for el in elements]
+        all_elements = {}
+        for group in report_config.groups:
+            all_elements[group.title] = [el.title for el in report_config.elements_by_group[group.id]]
 
         return all_elements
 
     async def get_report_tree(self, report_name: str) -> dict[str, dict | list[str]]:
         """Получение дерева групп отчета, где в листьях находятся названия элементов."""
 
-        report_groups = await self.get_report_groups(report_name, exclude=["Не учитывать"])
+        report_config = await self.get_report_config(report_name)
+        report_groups = [group for group in report_config.groups if group.title != "Не учитывать"]
 
         children_by_parent: dict[UUID | None, list[ReportGroup]] = {}
         elements_by_group: dict[UUID, list[str]] = {}
 
         for group in report_groups:
             children_by_parent.setdefault(group.parent_id, []).append(group)
-
-            elements_ = await ReportElementModel.get_by_group_id(report_group_id=group.id)
-            elements_by_group[group.id] = [ReportElement.model_validate(el).title for el in elements_]
+            elements_by_group[group.id] = [el.title for el in report_config.elements_by_group[group.id]]
 
         root_groups = [group for group in report_groups if group.parent_id is None]
 
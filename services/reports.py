@@ -1,34 +1,133 @@
+import hashlib
 import logging
-from datetime import date
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta
 
+import orjson
+from dateutil.relativedelta import relativedelta
 from fastapi import HTTPException
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.exc import IntegrityError
 from starlette import status
 
+from core.settings import settings
 from models.report_cache import ReportCacheModel
+from repositories.report_cache import ReportCacheRepository, get_report_cache_repo
 from schemas.report_cache import ReportCache, ReportCacheCreate
+from utils.report_codec import LazyReportData, encode_report_data
 
 logger = logging.getLogger(__name__)
 
 
+def is_final_day(report_date: date) -> bool:
+    """День закрыт: данные за него в источнике больше не меняются (старше report_cache_mutable_days)."""
+
+    return report_date < date.today() - timedelta(days=settings.report_cache_mutable_days)
+
+
+def content_hash(report_data: dict) -> str:
+    dump = orjson.dumps(report_data, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return hashlib.blake2b(dump, digest_size=32).hexdigest()
+
+
+def _report_cache_row(report_cache: ReportCacheCreate, source_watermark: str | None) -> dict:
+    """Строка report_cache с полями финальности: отчет за закрытый день запечатывается вместе с хешем содержимого."""
+
+    report_cache_dto = jsonable_encoder(report_cache)
+    report_data = report_cache_dto["report_data"]
+    row = report_cache_dto | {
+        "report_date": report_cache.report_date,
+        "report_blob": None,
+        "sealed_at": datetime.utcnow() if is_final_day(report_cache.report_date) else None,
+        "content_hash": content_hash(report_data),
+        "source_watermark": source_watermark,
+    }
+    if settings.report_cache_compact:
+        row |= {"report_data": {}, "report_blob": encode_report_data(report_data)}
+
+    return row
+
+
+def _to_report_cache(report_cache_: ReportCacheModel) -> ReportCache:
+    """Отчет из строки кеша. Компактное содержимое раскодируется при первом обращении к report_data."""
+
+    report_cache = ReportCache.model_validate(report_cache_)
+    if report_cache_.report_blob is not None:
+        report_cache.report_data = LazyReportData(report_cache_.report_blob)
+
+    return report_cache
+
+
 class ReportService:
-    def __init__(self):
-        pass
+    def __init__(self, cache_repo: ReportCacheRepository):
+        self._cache_repo = cache_repo
 
     async def get_report_by_date(self, report_type: str, report_date: date) -> ReportCache | None:
         """Возвращает отчет по типу и дате."""
 
-        report_cache_ = await ReportCacheModel.get_by_date(report_type=report_type, report_date=report_date)
-        if not report_cache_:
-            return None
+        reports = await self.get_reports_by_dates(report_type=report_type, report_dates=[report_date])
+        return reports.get(report_date)
+
+    async def get_reports_by_dates(self, report_type: str, report_dates: Iterable[date]) -> dict[date, ReportCache]:
+        """Возвращает отчеты одного типа за несколько дат: из кеша, а отсутствующие в нем - одним запросом.
+
+        В кеш попадают только запечатанные отчеты, отчеты за изменяемые дни читаются из Postgres.
+        """
+
+        report_dates = list(report_dates)
+        reports = await self._cache_repo.get_many(report_type, report_dates)
+        missing = [report_date for report_date in report_dates if report_date not in reports]
+        if not missing:
+            return reports
+
+        loaded = await ReportCacheModel.get_by_dates(report_type=report_type, report_dates=missing)
+        loaded = [_to_report_cache(report_cache_) for report_cache_ in loaded]
+        await self._cache_repo.set_many(loaded)
+        return reports | {report.report_date: report for report in loaded}
 
-        return ReportCache.model_validate(report_cache_)
+    async def get_range(self, report_type: str, date_from: date, date_to: date) -> dict[date, ReportCache]:
+        """Возвращает отчеты одного типа за период [date_from, date_to) одним запросом."""
 
-    async def save_report(self, report_cache: ReportCacheCreate) -> None:
-        report_cache_dto = jsonable_encoder(report_cache)
+        reports = await ReportCacheModel.get_range(report_type=report_type, date_from=date_from, date_to=date_to)
+        return {report.report_date: report for report in map(_to_report_cache, reports)}
+
+    async def get_reusable_reports(
+        self,
+        report_type: str,
+        report_dates: Iterable[date],
+        use_cache: bool = True,
+        force: bool = False,
+        source_watermark: str | None = None,
+    ) -> dict[date, ReportCache]:
+        """Сохраненные отчеты, которые не нужно пересчитывать.
+
+        С use_cache=True возвращаются все сохраненные отчеты. При обходе кеша (use_cache=False) сохраняются
+        только запечатанные отчеты, построенные по тем же исходным данным (source_watermark), а с force=True
+        пересчитываются все дни. Пересчитанные отчеты перезаписываются через save_reports.
+        """
+
+        report_dates = list(report_dates)
+        reports = await self.get_reports_by_dates(report_type, report_dates)
+        if use_cache:
+            return reports
+
+        reusable = {}
+        if not force:
+            reusable = {
+                report_date: report
+                for report_date, report in reports.items()
+                if report.sealed_at is not None and report.source_watermark == source_watermark
+            }
+
+        logger.info(
+            f"Report cache '{report_type}': {len(reusable)} sealed days reused, "
+            f"{len(report_dates) - len(reusable)} days to rebuild"
+        )
+        return reusable
+
+    async def save_report(self, report_cache: ReportCacheCreate, source_watermark: str | None = None) -> None:
         try:
-            await ReportCacheModel.create(**report_cache_dto)
+            await ReportCacheModel.create(**_report_cache_row(report_cache, source_watermark))
 
         except IntegrityError:
             raise HTTPException(
@@ -36,11 +135,52 @@ class ReportService:
                 detail="ReportCache with such 'date' and 'report_type' already exists",
             )
 
+        await self._cache_repo.invalidate(report_cache.report_type, [report_cache.report_date])
+
+    async def save_reports(self, report_caches: list[ReportCacheCreate], source_watermark: str | None = None) -> None:
+        """Сохранить отчеты за несколько дней одним запросом, перезаписывая существующие."""
+
+        await ReportCacheModel.upsert_many(
+            [_report_cache_row(report_cache, source_watermark) for report_cache in report_caches]
+        )
+        await self._invalidate(report_caches)
+
+    async def save_immutable_reports(self, report_caches: list[ReportCacheCreate]) -> None:
+        """Сохранить неизменяемые отчеты (закрытые дни). Уже сохраненные отчеты не перезаписываются."""
+
+        await ReportCacheModel.create_many_if_not_exists(
+            [_report_cache_row(report_cache, None) for report_cache in report_caches]
+        )
+        await self._invalidate(report_caches)
+
+    async def apply_retention(self) -> int:
+        """Удалить месяцы кеша старше report_cache_retention_months (целыми партициями)."""
+
+        if settings.report_cache_retention_months <= 0:
+            return 0
+
+        before = date.today().replace(day=1) - relativedelta(months=settings.report_cache_retention_months)
+        dropped = await ReportCacheModel.drop_partitions_before(before)
+        if dropped:
+            self._cache_repo.clear_memory()
+            logger.info(f"Report cache retention: {dropped} partitions before {before} dropped")
+
+        return dropped
+
     async def delete_report(self, report_type: str, report_date: date) -> None:
         report_cache_ = await ReportCacheModel.get_by_date(report_type=report_type, report_date=report_date)
         if report_cache_:
             await report_cache_.delete()
+        await self._cache_repo.invalidate(report_type, [report_date])
+
+    async def _invalidate(self, report_caches: list[ReportCacheCreate]) -> None:
+        report_dates_by_type = {}
+        for report_cache in report_caches:
+            report_dates_by_type.setdefault(report_cache.report_type, []).append(report_cache.report_date)
+
+        for report_type, report_dates in report_dates_by_type.items():
+            await self._cache_repo.invalidate(report_type, report_dates)
 
 
 def get_report_service():
-    return ReportService()
+    return ReportService(cache_repo=get_report_cache_repo())
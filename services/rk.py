@@ -11,15 +11,15 @@ class RKService:
     def __init__(self, repository: RKRepository):
         self._repo = repository
 
-    def choose_db(self, db_name: str):
-        self._repo.set_database(db_name)
+    def for_database(self, db_name: str) -> "RKService":
+        return RKService(repository=self._repo.for_database(db_name))
 
-    def get_smile_report(
+    async def get_smile_report(
         self,
         date_from: datetime,
         date_to: datetime,
     ) -> SmileReport:
-        raw_smile_report = self._repo.get_smile_report(
+        raw_smile_report = await self._repo.get_smile_report(
             date_from=date_from,
             date_to=date_to,
         )
@@ -1,7 +1,8 @@
 import logging
 
-from services.bars import BarsService, get_bars_service
-from services.report_config import ReportConfigService, get_report_config_service
+from services.bars import BarsService
+from services.report_config import ReportConfigService
+from services.tariff_catalog import TariffCatalogService
 
 logger = logging.getLogger(__name__)
 
@@ -11,31 +12,26 @@ class SettingsService:
         self,
         bars_service: BarsService,
         report_config_service: ReportConfigService,
+        tariff_catalog_service: TariffCatalogService,
     ):
         self._bars_service = bars_service
         self._report_config_service = report_config_service
+        self._tariff_catalog_service = tariff_catalog_service
 
-    def choose_db(self, db_name: str):
-        self._bars_service.choose_db(db_name)
+    def for_database(self, db_name: str) -> "SettingsService":
+        """Сервис, работающий с базой db_name (общий экземпляр не меняется)."""
+
+        bars_service = self._bars_service.for_database(db_name)
+        return SettingsService(
+            bars_service=bars_service,
+            report_config_service=self._report_config_service,
+            tariff_catalog_service=TariffCatalogService(
+                bars_service=bars_service,
+                report_config_service=self._report_config_service,
+            ),
+        )
 
     async def get_new_tariff(self, report_name: str) -> list[str]:
         """Возвращает все нераспределенные тарифы."""
 
-        all_tariffs = []
-        organizations = self._bars_service.get_organisations()
-
-        for organization in organizations:
-            organization_tariffs = self._bars_service.get_tariffs(organization.super_account_id)
-            all_tariffs.extend([tariff.name for tariff in organization_tariffs])
-
-        all_tariffs.append("Смайл")
-
-        distributed_tariffs = await self._report_config_service.get_report_elements(report_name)
-        return list(set(all_tariffs) - {tariff.title for tariff in distributed_tariffs})
-
-
-def get_settings_service():
-    return SettingsService(
-        bars_service=get_bars_service(),
-        report_config_service=get_report_config_service(),
-    )
+        return await self._tariff_catalog_service.get_undistributed_tariffs(report_name)
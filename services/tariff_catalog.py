@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from core.settings import settings
+from schemas.bars import Category
+from services.bars import BarsService, get_bars_service
+from services.report_config import ReportConfig, ReportConfigService, get_report_config_service
+
+logger = logging.getLogger(__name__)
+
+# Тариф, которого нет в Барсе, но который распределяется в отчетах
+EXTRA_TARIFFS = ("Смайл",)
+
+
+@dataclass
+class TariffCatalog:
+    """Каталог тарифов организаций одной базы Барса."""
+
+    organization_ids: tuple[int, ...]
+    tariffs: dict[int, str] = field(default_factory=dict)
+    name_counts: Counter = field(default_factory=Counter)
+    watermark: datetime | None = None
+    count: int = 0
+    ids_checksum: int | None = None
+    version: int = 0
+    checked_at: float = 0.0
+
+    def upsert(self, tariff: Category) -> None:
+        old_name = self.tariffs.get(tariff.category_id)
+        if old_name is not None:
+            self.name_counts[old_name] -= 1
+            if not self.name_counts[old_name]:
+                del self.name_counts[old_name]
+
+        self.tariffs[tariff.category_id] = tariff.name
+        self.name_counts[tariff.name] += 1
+
+
+# Каталоги и наборы нераспределенных тарифов хранятся в памяти процесса
+_catalogs: dict[str, TariffCatalog] = {}
+_catalog_locks: dict[str, asyncio.Lock] = {}
+_undistributed: dict[tuple[str, str], tuple[int, ReportConfig, frozenset[str]]] = {}
+
+
+class TariffCatalogService:
+    """Поиск нераспределенных тарифов по каталогу тарифов в памяти.
+
+    Каталог сверяется с базой не чаще, чем раз в tariff_catalog_refresh_interval секунд, по водяному знаку
+    (MAX(ChangeTime), COUNT(*), контрольная сумма набора id). Если изменились только тарифы, дочитываются
+    измененные; если изменился набор тарифов (добавления или удаления), каталог перечитывается целиком.
+    Набор нераспределенных тарифов отчета пересчитывается только при изменении каталога или конфигурации отчета.
+    """
+
+    def __init__(self, bars_service: BarsService, report_config_service: ReportConfigService):
+        self._bars_service = bars_service
+        self._report_config_service = report_config_service
+
+    def for_database(self, db_name: str) -> "TariffCatalogService":
+        return TariffCatalogService(
+            bars_service=self._bars_service.for_database(db_name),
+            report_config_service=self._report_config_service,
+        )
+
+    async def get_undistributed_tariffs(self, report_name: str) -> list[str]:
+        """Тарифы выбранной базы, которые не распределены по группам отчета."""
+
+        database = self._bars_service.database
+        catalog = await self.get_catalog()
+        report_config = await self._report_config_service.get_report_config(report_name)
+
+        cached = _undistributed.get((database, report_name))
+        if cached is not None and cached[0] == catalog.version and cached[1] is report_config:
+            return sorted(cached[2])
+
+        distributed = {element.title for elements in report_config.elements_by_group.values() for element in elements}
+        undistributed = frozenset(set(catalog.name_counts) | set(EXTRA_TARIFFS)) - distributed
+        _undistributed[(database, report_name)] = (catalog.version, report_config, undistributed)
+        return sorted(undistributed)
+
+    async def get_catalog(self) -> TariffCatalog:
+        database = self._bars_service.database
+        catalog = _catalogs.get(database)
+        if catalog is not None and time.monotonic() - catalog.checked_at < settings.tariff_catalog_refresh_interval:
+            return catalog
+
+        lock = _catalog_locks.setdefault(database, asyncio.Lock())
+        async with lock:
+            catalog = _catalogs.get(database)
+            if catalog is None or time.monotonic() - catalog.checked_at >= settings.tariff_catalog_refresh_interval:
+                catalog = _catalogs[database] = await self._refresh(catalog)
+
+        return catalog
+
+    async def _refresh(self, catalog: TariffCatalog | None) -> TariffCatalog:
+        organisations = await self._bars_service.get_organisations()
+        organization_ids = tuple(sorted({organisation.super_account_id for organisation in organisations}))
+        version = catalog.version + 1 if catalog is not None else 1
+        watermark, count, ids_checksum = await self._bars_service.get_tariffs_catalog_watermark(organization_ids)
+        if (
+            catalog is None
+            or catalog.organization_ids != organization_ids
+            or catalog.watermark is None
+            # Набор тарифов изменился: удаления (и добавления с прежним ChangeTime) не видны по ChangeTime
+            or (count, ids_checksum) != (catalog.count, catalog.ids_checksum)
+        ):
+            return await self._load(organization_ids, version, (watermark, count, ids_checksum))
+
+        if watermark != catalog.watermark:
+            changed_tariffs = await self._bars_service.get_tariffs_catalog(
+                organization_ids, changed_since=catalog.watermark
+            )
+            for tariff in changed_tariffs:
+                catalog.upsert(tariff)
+
+            logger.info(f"Tariff catalog of {self._bars_service.database}: {len(changed_tariffs)} tariffs changed")
+            catalog.watermark, catalog.version = watermark, version
+
+        catalog.checked_at = time.monotonic()
+        return catalog
+
+    async def _load(
+        self, organization_ids: tuple[int, ...], version: int, watermark: tuple[datetime | None, int, int | None]
+    ) -> TariffCatalog:
+        """Прочитать каталог целиком.
+
+        watermark прочитан до каталога, поэтому изменения, сделанные между ними, заметит следующая сверка.
+        """
+
+        catalog = TariffCatalog(organization_ids=organization_ids, version=version)
+        catalog.watermark, catalog.count, catalog.ids_checksum = watermark
+        for tariff in await self._bars_service.get_tariffs_catalog(organization_ids):
+            catalog.upsert(tariff)
+
+        catalog.checked_at = time.monotonic()
+        logger.info(f"Tariff catalog of {self._bars_service.database} loaded: {len(catalog.tariffs)} tariffs")
+        return catalog
+
+
+def get_tariff_catalog_service() -> TariffCatalogService:
+    return TariffCatalogService(
+        bars_service=get_bars_service(),
+        report_config_service=get_report_config_service(),
+    )
@@ -1,6 +1,6 @@
+import copy
 import logging
 from calendar import monthrange
-from collections import defaultdict
 from datetime import date, datetime, timedelta
 from typing import Any
 
@@ -9,20 +9,23 @@ import gspread_formatting as gf
 from fastapi import HTTPException
 
 from core.settings import settings
-from db.mssql import MsSqlDatabase
-from legacy import functions
-from legacy.barsicreport2 import BarsicReport2Service, get_legacy_service
+from db.mssql import MsSqlDatabase, get_database_semaphore, run_in_executor
+from legacy import functions, report_plans
+from legacy.barsicreport2 import BarsicReport2Service
 from legacy.to_google_sheets import get_letter_column_name
-from repositories.google import GoogleRepository, get_google_repo
-from repositories.yandex import YandexRepository, get_yandex_repo
+from repositories.google import GoogleRepository
+from repositories.yandex import YandexRepository
 from schemas.bars import TotalReport
 from schemas.google_report_ids import GoogleReportIdCreate
-from schemas.report_cache import ReportCacheCreate
+from schemas.report_cache import ReportCache, ReportCacheCreate
 from schemas.total_report import DBName
-from services.bars import BarsService, get_bars_service
-from services.report_config import ReportConfigService, get_report_config_service
-from services.reports import ReportService, get_report_service
-from services.rk import RKService, get_rk_service
+from services.bars import BarsService
+from services.report_config import ReportConfigService
+from services.reports import ReportService
+from services.rk import RKService
+from services.tariff_catalog import TariffCatalogService
+from utils.pipeline import ProgressCallback, run_by_days
+from utils.pivot import DayPivot
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +41,7 @@ class WorkerService:
         report_service: ReportService,
         yandex_repo: YandexRepository,
         google_repo: GoogleRepository,
+        tariff_catalog_service: TariffCatalogService,
     ):
         self._bars_srv = bars_srv
         self._bars_service = bars_service
@@ -47,15 +51,99 @@ class WorkerService:
         self._report_service = report_service
         self._yandex_repo = yandex_repo
         self._google_repo = google_repo
+        self._tariff_catalog_service = tariff_catalog_service
 
-    def choose_db(self, db_name: str):
-        self._bars_service.choose_db(db_name)
+    def for_database(self, db_name: str) -> "WorkerService":
+        """Сервис, работающий с базой db_name (общий экземпляр не меняется)."""
+
+        worker_service = copy.copy(self)
+        worker_service._bars_service = self._bars_service.for_database(db_name)
+        worker_service._tariff_catalog_service = self._tariff_catalog_service.for_database(db_name)
+        return worker_service
+
+    async def prepare_total_detail_reports(
+        self,
+        report_dates: list[datetime],
+        use_cache: bool = True,
+        force: bool = False,
+        progress: ProgressCallback | None = None,
+    ) -> tuple[dict[datetime, ReportCache | ReportCacheCreate], list[date]]:
+        """Отчеты total_detail за дни: сохраненные в кеше или построенные и сохраненные заново.
+
+        Возвращает отчеты и дни, построить которые не удалось.
+        """
+
+        report_type = "total_detail"
+        failed_days = []
+        total_report_config = await self._report_config_service.get_report_elements_with_groups("ItogReport")
+        fin_report_config = await self._report_config_service.get_report_elements_with_groups("GoogleReport")
+        source_watermark = report_plans.config_digest(total_report_config, fin_report_config)
+        cached_reports = await self._report_service.get_reusable_reports(
+            report_type,
+            [current_date.date() for current_date in report_dates],
+            use_cache=use_cache,
+            force=force,
+            source_watermark=source_watermark,
+        )
+        total_detail_reports = {current_date: cached_reports.get(current_date.date()) for current_date in report_dates}
+
+        missing_dates = [current_date for current_date, report in total_detail_reports.items() if report is None]
+        if missing_dates:
+            org_list1 = await self._legacy_service.list_organisation(
+                database=settings.mssql_database1,
+            )
+            for org in org_list1:
+                if org[0] == 36:
+                    org1 = (org[0], org[2])
+
+            # Итоговые отчеты за все недостающие дни запрашиваются одним пакетом
+            itog_reports_by_day = await run_in_executor(
+                self._get_total_reports_by_day,
+                settings.mssql_database1,
+                org=org1[0],
+                org_name=org1[1],
+                date_from=missing_dates[0],
+                date_to=missing_dates[-1] + timedelta(days=1),
+            )
+
+            async def build_total_detail_report(current_date: datetime) -> ReportCacheCreate:
+                smile_report_month = await self._rk_service.get_smile_report(
+                    date_from=current_date,
+                    date_to=current_date + timedelta(days=1),
+                )
+                month_finance_report = functions.create_month_finance_report(
+                    itog_report_month=itog_reports_by_day[current_date.date()],
+                    total_report_config=total_report_config,
+                    fin_report_config=fin_report_config,
+                    smile_report_month=smile_report_month,
+                )
+                return ReportCacheCreate(
+                    report_date=current_date.date(),
+                    report_type=report_type,
+                    report_data=month_finance_report,
+                )
+
+            built_reports, errors = await run_by_days(
+                missing_dates,
+                build_total_detail_report,
+                semaphore=get_database_semaphore(settings.mssql_database_rk),
+                progress=progress,
+            )
+            await self._report_service.save_reports(list(built_reports.values()), source_watermark=source_watermark)
+            total_detail_reports.update(built_reports)
+            for current_date in errors:
+                del total_detail_reports[current_date]
+            failed_days = [current_date.date() for current_date in errors]
+
+        return total_detail_reports, failed_days
 
     async def get_total_report_with_groups(
         self,
         date_from: datetime,
         date_to: datetime,
         use_cache: bool = True,
+        force: bool = False,
+        progress: ProgressCallback | None = None,
     ) -> dict:
         # total_report = self._bars_service.get_total_report(
         #     organization_id=63,
@@ -66,89 +154,31 @@ class WorkerService:
         #     hide_discount=True,
         # )
 
-        total_detail_full_report = defaultdict()
-
         date_from, date_to = self._period_cutting(date_from, date_to)
+        days_in_month = monthrange(date_from.year, date_from.month)[1]
+        # Строки отчета: (общая группа, группа, тариф) -> количество и сумма по дням
+        total_detail_pivot = DayPivot(days_in_month, measures=2)
 
         logger.info(f"Try build total by day report from {date_from} to {date_to}")
+        report_dates = []
         current_date = date_from
         while current_date < date_to and (
             current_date.month == date_to.month or current_date + timedelta(days=1) == date_to
         ):
-            report_type = "total_detail"
-
-            if use_cache:
-                total_detail_report = await self._report_service.get_report_by_date(report_type, current_date.date())
-            else:
-                total_detail_report = None
-                await self._report_service.delete_report(report_type, current_date.date())
-
-            if total_detail_report is None:
-                smile_report_month = self._rk_service.get_smile_report(
-                    date_from=current_date,
-                    date_to=current_date + timedelta(days=1),
-                )
-                total_report_config = await self._report_config_service.get_report_elements_with_groups("ItogReport")
-                fin_report_config = await self._report_config_service.get_report_elements_with_groups("GoogleReport")
-                org_list1 = self._legacy_service.list_organisation(
-                    database=settings.mssql_database1,
-                )
-                for org in org_list1:
-                    if org[0] == 36:
-                        org1 = (org[0], org[2])
-
-                self._bars_srv.set_database(settings.mssql_database1)
-                with self._bars_srv as connect:
-                    self._legacy_service.itog_report_month = functions.get_total_report(
-                        connect=connect,
-                        org=org1[0],
-                        org_name=org1[1],
-                        date_from=current_date,
-                        date_to=current_date + timedelta(days=1),
-                    )
-
-                self._legacy_service.smile_report_month = smile_report_month
-                month_finance_report = functions.create_month_finance_report(
-                    itog_report_month=self._legacy_service.itog_report_month,
-                    total_report_config=total_report_config,
-                    fin_report_config=fin_report_config,
-                    smile_report_month=self._legacy_service.smile_report_month,
-                )
-                total_detail_report = ReportCacheCreate(
-                    report_date=current_date.date(),
-                    report_type=report_type,
-                    report_data=month_finance_report,
-                )
-
-                await self._report_service.save_report(total_detail_report)
+            report_dates.append(current_date)
+            current_date += timedelta(days=1)
 
-            for (
-                general_group,
-                general_group_content,
-            ) in total_detail_report.report_data.items():
-                full_general_group_content = total_detail_full_report.setdefault(general_group, defaultdict())
+        total_detail_reports, failed_days = await self.prepare_total_detail_reports(
+            report_dates, use_cache=use_cache, force=force, progress=progress
+        )
 
+        for current_date, total_detail_report in total_detail_reports.items():
+            for general_group, general_group_content in total_detail_report.report_data.items():
                 for group_name, group_content in general_group_content.items():
-                    full_group_content = full_general_group_content.setdefault(group_name, [])
-
-                    for group_data in group_content:
-                        wrote = False
-                        for full_group_data in full_group_content:
-                            if group_data[0] == full_group_data[0]:
-                                full_group_data[1][current_date.day] = group_data[1]
-                                full_group_data[2][current_date.day] = group_data[2]
-                                wrote = True
-
-                        if not wrote:
-                            full_group_content.append(
-                                [
-                                    group_data[0],
-                                    {current_date.day: group_data[1]},
-                                    {current_date.day: group_data[2]},
-                                ]
-                            )
-
-            current_date += timedelta(days=1)
+                    for tariff_name, count, amount in group_content:
+                        total_detail_pivot.set(
+                            (general_group, group_name, tariff_name), current_date.day, count, amount
+                        )
 
         gc = gspread.service_account_from_dict(settings.google_api_settings.google_service_account_config)
 
@@ -200,39 +230,7 @@ class WorkerService:
         worksheet = google_doc.get_worksheet(0)
         worksheet.clear()
 
-        days_in_month = monthrange(date_from.year, date_from.month)[1]
-        report_matrix = []
-        total_line = None
-        h2_lines = []
-        h3_lines = []
-        for general_group, general_group_content in total_detail_full_report.items():
-            if general_group in ("Контрольная сумма", "Дата"):
-                continue
-
-            _, _, amounts = general_group_content["Итого по группе"][0]
-            amounts_matrix = [amounts.get(day, "") for day in range(1, days_in_month + 1)]
-            if general_group == "ИТОГО":
-                total_line = [general_group, *amounts_matrix]
-                continue
-
-            report_matrix.append([general_group, *amounts_matrix])
-            h2_lines.append(len(report_matrix) + 4)
-
-            filtered_general_group_content = {k: v for k, v in general_group_content.items() if k is not None}
-            for group_name, group_content in sorted(filtered_general_group_content.items()):
-                if group_name in ("Итого по группе", "None", ""):
-                    continue
-
-                for group_data in group_content:
-                    tariff_name, _, amounts = group_data
-                    amounts_matrix = [amounts.get(day, "") for day in range(1, days_in_month + 1)]
-                    if tariff_name == "Итого по папке":
-                        report_matrix.append([group_name, *amounts_matrix])
-                        h3_lines.append(len(report_matrix) + 4)
-                    elif tariff_name in ("Итого по отчету",):
-                        pass
-                    else:
-                        report_matrix.append([tariff_name, *amounts_matrix])
+        report_matrix, total_line, h2_lines, h3_lines = self._total_detail_sheet(total_detail_pivot)
 
         # Добавление ИТОГО
         report_matrix.append(total_line)
@@ -299,7 +297,46 @@ class WorkerService:
         )
         worksheet.columns_auto_resize(0, table_width)
 
-        return {"ok": True, "Google Report": google_doc.url}
+        return {"ok": not failed_days, "Google Report": google_doc.url, "failed_days": failed_days}
+
+    @staticmethod
+    def _total_detail_sheet(pivot: DayPivot) -> tuple[list[list], list, list[int], list[int]]:
+        """Строки листа "Итоговый отчет в разрезе дня", строка ИТОГО и номера строк заголовков H2/H3."""
+
+        amount = 1
+        report_matrix = []
+        total_line = None
+        h2_lines = []
+        h3_lines = []
+        for general_group, general_group_content in pivot.children().items():
+            if general_group in ("Контрольная сумма", "Дата"):
+                continue
+
+            group_total_name = next(iter(general_group_content["Итого по группе"]))
+            amounts = pivot.row((general_group, "Итого по группе", group_total_name), amount)
+            if general_group == "ИТОГО":
+                total_line = [general_group, *amounts]
+                continue
+
+            report_matrix.append([general_group, *amounts])
+            h2_lines.append(len(report_matrix) + 4)
+
+            group_names = sorted(group_name for group_name in general_group_content if group_name is not None)
+            for group_name in group_names:
+                if group_name in ("Итого по группе", "None", ""):
+                    continue
+
+                for tariff_name in general_group_content[group_name]:
+                    amounts = pivot.row((general_group, group_name, tariff_name), amount)
+                    if tariff_name == "Итого по папке":
+                        report_matrix.append([group_name, *amounts])
+                        h3_lines.append(len(report_matrix) + 4)
+                    elif tariff_name in ("Итого по отчету",):
+                        pass
+                    else:
+                        report_matrix.append([tariff_name, *amounts])
+
+        return report_matrix, total_line, h2_lines, h3_lines
 
     async def create_purchased_goods_report(
         self,
@@ -310,7 +347,7 @@ class WorkerService:
         save_to_yandex: bool,
         hide_zero: bool,
     ) -> dict:
-        extended_services_report = self._bars_service.get_loan_transactions_by_service_names(
+        extended_services_report = await self._bars_service.get_loan_transactions_by_service_names(
             date_from=date_from,
             date_to=date_to,
             service_names=goods,
@@ -335,6 +372,10 @@ class WorkerService:
 
         return result
 
+    def _get_total_reports_by_day(self, database: str, **kwargs) -> dict[date, dict]:
+        with self._bars_srv.connection(database) as connect:
+            return functions.get_total_reports_by_day(connect=connect, **kwargs)
+
     def _create_report_period(
         self, date_from: datetime, date_to: datetime, use_cache: bool = False
     ) -> list[tuple[datetime, bool]]:
@@ -350,66 +391,105 @@ class WorkerService:
 
         return period
 
-    async def create_attendance_report(
+    async def prepare_attendance_reports(
         self,
-        date_from: datetime,
-        date_to: datetime,
-        save_to_yandex: bool,
-        save_to_google: bool,
-        use_cache: bool = True,
-    ) -> dict:
-        attendance_report = {}
+        period: list[tuple[datetime, bool]],
+        force: bool = False,
+        progress: ProgressCallback | None = None,
+    ) -> tuple[dict[date, ReportCache | ReportCacheCreate], list[date]]:
+        """Отчеты attendance за дни периода (день, брать ли из кеша): сохраненные или построенные заново.
+
+        Возвращает отчеты и дни, построить которые не удалось.
+        """
+
         await self._check_undistributed_services(report_name="attendance")
 
-        logger.info(f"Building attendance report from {date_from} to {date_to}...")
-        period = self._create_report_period(date_from, date_to, use_cache=use_cache)
-        for current_date, is_use_cache in period:
-            report_type = "attendance"
-            if is_use_cache:
-                current_attendance_report = await self._report_service.get_report_by_date(
-                    report_type, current_date.date()
+        attendance_report = {}
+        report_type = "attendance"
+        failed_days = []
+        report_config = await self._report_config_service.get_report_tree(report_type)
+        source_watermark = report_plans.config_digest(report_config)
+        # Дни месяца до date_from всегда берутся из кеша, остальные - в зависимости от use_cache
+        cached_reports = await self._report_service.get_reusable_reports(
+            report_type, [current_date.date() for current_date, is_use_cache in period if is_use_cache]
+        )
+        cached_reports |= await self._report_service.get_reusable_reports(
+            report_type,
+            [current_date.date() for current_date, is_use_cache in period if not is_use_cache],
+            use_cache=False,
+            force=force,
+            source_watermark=source_watermark,
+        )
+        for current_date, _ in period:
+            attendance_report[current_date.date()] = cached_reports.get(current_date.date())
+
+        missing_dates = [current_date for current_date, _ in period if attendance_report[current_date.date()] is None]
+        if missing_dates:
+            companies = [
+                company for company in await self._legacy_service.get_companies() if company.db_name == DBName.AQUA
+            ]
+
+            # Итоговые отчеты каждой организации за все недостающие дни запрашиваются одним пакетом
+            total_reports: dict[date, TotalReport] = {}
+            for company in companies:
+                company_total_reports = await self._bars_service.get_total_reports_by_day(
+                    organization_id=company.id,
+                    date_from=missing_dates[0],
+                    date_to=missing_dates[-1] + timedelta(days=1),
+                    hide_zeroes=False,
+                    hide_internal=True,
+                    hide_discount=False,
                 )
-            else:
-                current_attendance_report = None
-                await self._report_service.delete_report(report_type, current_date.date())
-
-            if current_attendance_report is None:
-                report_config = await self._report_config_service.get_report_tree(report_type)
-                companies = [
-                    company for company in self._legacy_service.get_companies() if company.db_name == DBName.AQUA
-                ]
-
-                total_report = None
-                for company in companies:
-                    company_total_report = self._bars_service.get_total_report(
-                        organization_id=company.id,
-                        date_from=current_date,
-                        date_to=current_date + timedelta(days=1),
-                        hide_zeroes=False,
-                        hide_internal=True,
-                        hide_discount=False,
-                    )
-                    if total_report is None:
-                        total_report = company_total_report
+                for day, company_total_report in company_total_reports.items():
+                    if day not in total_reports:
+                        total_reports[day] = company_total_report
                     else:
-                        total_report += company_total_report
+                        total_reports[day] += company_total_report
 
-                customer_count = self._bars_service.get_customer_count(
+            async def build_attendance_report(current_date: datetime) -> ReportCacheCreate:
+                customer_count = await self._bars_service.get_customer_count(
                     date_from=current_date, date_to=current_date + timedelta(days=1)
                 )
 
                 report_data = self._create_attendance_report(
-                    total_report=total_report,
+                    total_report=total_reports.get(current_date.date()),
                     report_config=report_config,
                     customer_count=customer_count,
                 )
-                current_attendance_report = ReportCacheCreate(
+                return ReportCacheCreate(
                     report_date=current_date.date(),
                     report_type=report_type,
                     report_data=report_data,
                 )
-                await self._report_service.save_report(current_attendance_report)
-            attendance_report[current_date.date()] = current_attendance_report
+
+            built_reports, errors = await run_by_days(
+                missing_dates,
+                build_attendance_report,
+                semaphore=get_database_semaphore(self._bars_service.database),
+                progress=progress,
+            )
+            await self._report_service.save_reports(list(built_reports.values()), source_watermark=source_watermark)
+            for current_date, current_attendance_report in built_reports.items():
+                attendance_report[current_date.date()] = current_attendance_report
+            for current_date in errors:
+                del attendance_report[current_date.date()]
+            failed_days = [current_date.date() for current_date in errors]
+
+        return attendance_report, failed_days
+
+    async def create_attendance_report(
+        self,
+        date_from: datetime,
+        date_to: datetime,
+        save_to_yandex: bool,
+        save_to_google: bool,
+        use_cache: bool = True,
+        force: bool = False,
+        progress: ProgressCallback | None = None,
+    ) -> dict:
+        logger.info(f"Building attendance report from {date_from} to {date_to}...")
+        period = self._create_report_period(date_from, date_to, use_cache=use_cache)
+        attendance_report, failed_days = await self.prepare_attendance_reports(period, force=force, progress=progress)
 
         report_path = self._yandex_repo.save_attendance_report(
             report=attendance_report,
@@ -418,7 +498,8 @@ class WorkerService:
         )
 
         result = {
-            "ok": True,
+            "ok": not failed_days,
+            "failed_days": failed_days,
             "local_path": report_path,
             "yandex_public_url": None,
             "yandex_download_link": None,
@@ -465,16 +546,7 @@ class WorkerService:
         return result
 
     async def _check_undistributed_services(self, report_name: str) -> None:
-        all_tariffs = []
-        organizations = self._bars_service.get_organisations()
-        for organization in organizations:
-            organization_tariffs = self._bars_service.get_tariffs(organization.super_account_id)
-            all_tariffs.extend([tariff.name for tariff in organization_tariffs])
-
-        all_tariffs.append("Смайл")
-        distributed_tariffs = await self._report_config_service.get_report_elements(report_name)
-        distributed_tariff_names = {tariff.title for tariff in distributed_tariffs}
-        new_tariffs = sorted(set(all_tariffs) - distributed_tariff_names)
+        new_tariffs = await self._tariff_catalog_service.get_undistributed_tariffs(report_name)
 
         if new_tariffs:
             error_message = f"Найдены нераспределенные тарифы в отчете {report_name}: {new_tariffs}"
@@ -490,13 +562,18 @@ class WorkerService:
         report_type: str,
         report: dict[date, Any],
     ) -> dict[date, Any]:
-        month_report: dict[date, Any] = {}
+        month_start = date(date_from.year, date_from.month, 1)
         days_in_month = monthrange(date_from.year, date_from.month)[1]
-        for day in range(1, days_in_month + 1):
-            current_day = date(date_from.year, date_from.month, day)
+        cached_reports = await self._report_service.get_range(
+            report_type, month_start, month_start + timedelta(days=days_in_month)
+        )
+
+        month_report: dict[date, Any] = {}
+        for day in range(days_in_month):
+            current_day = month_start + timedelta(days=day)
             day_report = report.get(current_day)
             if day_report is None:
-                day_report = await self._report_service.get_report_by_date(report_type, current_day)
+                day_report = cached_reports.get(current_day)
             if day_report is not None:
                 month_report[current_day] = day_report
 
@@ -510,18 +587,8 @@ class WorkerService:
     ):
         """Создает отчет по посещаемости."""
 
-        total_report_map = {el.name: el for el in total_report.elements}
-
-        result = {}
-        for h1_header, h2_headers in report_config.items():
-            h1 = result.setdefault(h1_header, {})
-            for h2_header, h3_headers in h2_headers.items():
-                h2 = h1.setdefault(h2_header, {})
-                for h3_header, elements in h3_headers.items():
-                    h2.setdefault(h3_header, 0)
-                    for element in elements:
-                        if total_report_map.get(element):
-                            h2[h3_header] += total_report_map[element].good_amount
+        plan = report_plans.get_attendance_plan(report_config)
+        result = report_plans.apply_attendance_plan(plan, total_report)
 
         result.setdefault("Количество посещений", {}).setdefault(
             "Количество посещений / Количество посещений", {}
@@ -560,21 +627,3 @@ class WorkerService:
             date_to = datetime(date_from.year, date_from.month, days_in_month) + timedelta(days=1)
 
         return date_from, date_to
-
-
-def get_worker_service() -> WorkerService:
-    bars_srv = MsSqlDatabase(
-        server=settings.mssql_server,
-        user=settings.mssql_user,
-        password=settings.mssql_pwd,
-    )
-    return WorkerService(
-        bars_srv=bars_srv,
-        bars_service=get_bars_service(),
-        rk_service=get_rk_service(),
-        report_config_service=get_report_config_service(),
-        legacy_service=get_legacy_service(),
-        report_service=get_report_service(),
-        yandex_repo=get_yandex_repo(),
-        google_repo=get_google_repo(),
-    )
@@ -0,0 +1,13 @@
+"""
+Запросы для суммового отчета по кассам.
+"""
+
+# Порядок параметров: from, to
+SP_REPORT_CASH_DESK_MONEY_SQL = "EXEC sp_reportCashDeskMoney @from=?, @to=?"
+
+SERVICE_POINTS_SQL = """
+    SELECT
+        ServicePointId, Name, SuperAccountId, Type, Code, IsInternal
+    FROM
+        ServicePoint
+"""
@@ -6,5 +6,39 @@ GET_TARIFFS_SQL = """
            [Guid],
            [ChangeTime]
     FROM [Category]
-    WHERE [OrganizationId] = {organization_id}
+    WHERE [OrganizationId] = ?
+"""
+
+# Водяной знак для проверки актуальности закешированных тарифов
+GET_TARIFFS_WATERMARK_SQL = """
+    SELECT MAX([ChangeTime]), COUNT(*)
+    FROM [Category]
+    WHERE [OrganizationId] = ?
+"""
+
+# Каталог тарифов нескольких организаций (для поиска нераспределенных тарифов)
+GET_TARIFFS_CATALOG_SQL = """
+    SELECT [CategoryId],
+           [StockType],
+           [Name],
+           [OrganizationId],
+           [Guid],
+           [ChangeTime]
+    FROM [Category]
+    WHERE [OrganizationId] IN ({organization_ids})
+"""
+
+# Тарифы, измененные начиная с водяного знака каталога
+GET_TARIFFS_CATALOG_CHANGES_SQL = (
+    GET_TARIFFS_CATALOG_SQL
+    + """
+      AND [ChangeTime] >= ?
+"""
+)
+
+# Водяной знак каталога: MAX(ChangeTime), количество и контрольная сумма набора CategoryId
+GET_TARIFFS_CATALOG_WATERMARK_SQL = """
+    SELECT MAX([ChangeTime]), COUNT(*), CHECKSUM_AGG(CHECKSUM([CategoryId]))
+    FROM [Category]
+    WHERE [OrganizationId] IN ({organization_ids})
 """
@@ -0,0 +1,12 @@
+"""
+Запрос количества клиентов за период.
+Порядок параметров: sa, from, to.
+"""
+
+SP_REPORT_CLIENT_COUNT_TOTALS_SQL = "EXEC sp_reportClientCountTotals @sa=?, @from=?, @to=?, @categoryId=0"
+
+
+def sp_report_client_count_totals_batch_sql(days_count: int) -> str:
+    """Пакет из вызовов процедуры для нескольких дней: один запрос к серверу, по набору строк на каждый день."""
+
+    return "SET NOCOUNT ON;\n" + ";\n".join([SP_REPORT_CLIENT_COUNT_TOTALS_SQL] * days_count)
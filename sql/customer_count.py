@@ -20,7 +20,7 @@ PERIOD_CUSTOMERS_SQL = """
     WHERE mt.ServicePointId = 1  -- Турникет
         AND td.StockInfoIdFrom = 523  -- Вход в зону
         -- AND StockInfoIdTo = 523  -- Выход из в зоны
-        AND mt.TransTime > '{date_from}' AND mt.TransTime < '{date_to}'
+        AND mt.TransTime > ? AND mt.TransTime < ?
         AND mt.SuperAccountTo IN (
             SELECT SuperAccountId
             FROM [AquaPark_Ulyanovsk].[dbo].[SuperAccount] sa
@@ -37,7 +37,7 @@ PERIOD_CUSTOMER_COUNT_SQL = """
     WHERE mt.ServicePointId = 1  -- Турникет
         AND td.StockInfoIdFrom = 523  -- Вход в зону
         -- AND StockInfoIdTo = 523  -- Выход из в зоны
-        AND mt.TransTime > '{date_from}' AND mt.TransTime < '{date_to}'
+        AND mt.TransTime > ? AND mt.TransTime < ?
         AND mt.SuperAccountTo IN (
             SELECT SuperAccountId
             FROM [AquaPark_Ulyanovsk].[dbo].[SuperAccount] sa
@@ -16,3 +16,25 @@ GET_COMPANIES_SQL = """
     FROM [SuperAccount]
     WHERE [Type] = 1
 """
+
+# Водяной знак для проверки актуальности закешированного списка организаций
+GET_COMPANIES_WATERMARK_SQL = """
+    SELECT MAX([ChangeTime]), COUNT(*)
+    FROM [SuperAccount]
+    WHERE [Type] = ?
+"""
+
+# Полный список полей организаций (legacy-отчеты обращаются к полям по индексу)
+LIST_ORGANISATIONS_SQL = """
+    SELECT
+        SuperAccountId, Type, Descr, CanRegister, CanPass, IsStuff, IsBlocked,
+        BlockReason, DenyReturn, ClientCategoryId, DiscountCard, PersonalInfoId,
+        Address, Inn, ExternalId, RegisterTime,LastTransactionTime,
+        LegalEntityRelationTypeId, SellServicePointId, DepositServicePointId,
+        AllowIgnoreStoredPledge, Email, Latitude, Longitude, Phone, WebSite,
+        TNG_ProfileId
+    FROM
+        SuperAccount
+    WHERE
+        Type = ?
+"""
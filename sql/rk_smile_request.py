@@ -13,6 +13,6 @@ RK_SMILE_TOTAL_SUM = """
     WHERE [SIFR] NOT IN (1164191, 1164182, 1163446) AND [STATE] = 6 AND [ISTATION] = 15033 AND [VISIT] IN (
         SELECT [SIFR]
         FROM [RK7].[dbo].[VISITS]
-        WHERE [QUITTIME] >= '{date_from}' AND [QUITTIME] < '{date_to}'
+        WHERE [QUITTIME] >= ? AND [QUITTIME] < ?
     )
 """
@@ -1,15 +1,25 @@
 """
 Запроса для получения итогового отчета.
+
+Параметры передаются маркерами (?), поэтому текст запроса одинаков для всех дат и организаций
+и сервер переиспользует план. Порядок параметров: sa, from, to, hideZeroes, hideInternal[, hideDiscount].
 """
 
 # В старых версиях БД нет параметра hide_discount
 SP_REPORT_TOTALS_V2_OLD_VERSION_SQL = """
-    exec sp_reportOrganizationTotals_v2
-    @sa={org},
-    @from='{date_from}',
-    @to='{date_to}',
-    @hideZeroes={hide_zeroes},
-    @hideInternal={hide_internal}
+    EXEC sp_reportOrganizationTotals_v2
+    @sa=?,
+    @from=?,
+    @to=?,
+    @hideZeroes=?,
+    @hideInternal=?
 """
 
-SP_REPORT_TOTALS_V2_SQL = SP_REPORT_TOTALS_V2_OLD_VERSION_SQL + ",@hideDiscount={hide_discount}"
+SP_REPORT_TOTALS_V2_SQL = SP_REPORT_TOTALS_V2_OLD_VERSION_SQL + ",@hideDiscount=?"
+
+
+def sp_report_totals_v2_batch_sql(days_count: int, is_legacy_database: bool = False) -> str:
+    """Пакет из вызовов процедуры для нескольких дней: один запрос к серверу, по набору строк на каждый день."""
+
+    sql = SP_REPORT_TOTALS_V2_OLD_VERSION_SQL if is_legacy_database else SP_REPORT_TOTALS_V2_SQL
+    return "SET NOCOUNT ON;\n" + ";\n".join([sql] * days_count)
@@ -8,7 +8,7 @@ _GET_LOAN_TRANSACTIONS_BY_SERVICE_NAME = """
             JOIN (
                 SELECT [CheckId]
                 FROM [AquaPark_Ulyanovsk].[dbo].[Check]
-                WHERE [Data] > '{date_from}' AND [Data] < '{date_to}' AND [Status] = 1
+                WHERE [Data] > ? AND [Data] < ? AND [Status] = 1
             ) ch0 ON cd0.CheckId = ch0.CheckId
             WHERE {condition}
         ) cdetail ON mt0.CheckDetailId = cdetail.Id
@@ -49,16 +49,13 @@ _GET_LOAN_TRANSACTIONS_BY_SERVICE_NAME = """
     )
 """
 
+# Порядок параметров: date_from, date_to, <параметры условия>, companies_ids, companies_ids
 GET_LOAN_TRANSACTIONS_BY_SERVICE_NAME_PATTERN = _GET_LOAN_TRANSACTIONS_BY_SERVICE_NAME.format(
-    condition="[Name] LIKE '%{service_name_pattern}%'",
-    date_from="{date_from}",
-    date_to="{date_to}",
+    condition="[Name] LIKE ?",
     companies_ids="{companies_ids}",
 )
 
 GET_LOAN_TRANSACTIONS_BY_SERVICE_NAMES = _GET_LOAN_TRANSACTIONS_BY_SERVICE_NAME.format(
     condition="[Name] IN ({service_names})",
-    date_from="{date_from}",
-    date_to="{date_to}",
     companies_ids="{companies_ids}",
 )
@@ -0,0 +1,102 @@
+import asyncio
+import fnmatch
+import time
+
+import pytest
+
+
+class FakeRedis:
+    """Redis в памяти процесса: строки с временем жизни и списки (команды, которые используют очередь и аренды)."""
+
+    def __init__(self):
+        self.values: dict[str, tuple[str, float | None]] = {}
+        self.lists: dict[str, list[str]] = {}
+
+    async def get(self, key: str) -> str | None:
+        item = self.values.get(key)
+        if item is None:
+            return None
+
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.values[key]
+            return None
+
+        return value
+
+    async def set(self, key: str, value: str | bytes, nx: bool = False, ex: float | None = None) -> bool | None:
+        if nx and await self.get(key) is not None:
+            return None
+
+        # Как клиент с decode_responses=True: значения читаются строками
+        value = value.decode() if isinstance(value, bytes) else str(value)
+        self.values[key] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+    async def expire(self, key: str, seconds: float) -> bool:
+        value = await self.get(key)
+        if value is None:
+            return False
+
+        self.values[key] = (value, time.monotonic() + seconds)
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        deleted = 0
+        for key in keys:
+            deleted += self.values.pop(key, None) is not None
+            deleted += self.lists.pop(key, None) is not None
+
+        return deleted
+
+    async def lpush(self, key: str, *values: str) -> int:
+        items = self.lists.setdefault(key, [])
+        for value in values:
+            items.insert(0, str(value))
+
+        return len(items)
+
+    async def lrange(self, key: str, start: int, end: int) -> list[str]:
+        items = self.lists.get(key, [])
+        return items[start : None if end == -1 else end + 1]
+
+    async def lrem(self, key: str, count: int, value: str) -> int:
+        items = self.lists.get(key, [])
+        removed = items.count(value)
+        self.lists[key] = [item for item in items if item != value]
+        self._drop_empty(key)
+        return removed
+
+    async def lmove(self, source: str, destination: str, src: str, dest: str) -> str | None:
+        items = self.lists.get(source)
+        if not items:
+            return None
+
+        value = items.pop(0 if src == "LEFT" else -1)
+        self._drop_empty(source)
+        target = self.lists.setdefault(destination, [])
+        target.insert(0 if dest == "LEFT" else len(target), value)
+        return value
+
+    async def blmove(self, source: str, destination: str, timeout: float, src: str, dest: str) -> str | None:
+        deadline = time.monotonic() + timeout
+        while (value := await self.lmove(source, destination, src, dest)) is None:
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(0.01)
+
+        return value
+
+    def _drop_empty(self, key: str) -> None:
+        if not self.lists.get(key, True):
+            del self.lists[key]
+
+    async def scan_iter(self, match: str):
+        for key in list(self.values) + list(self.lists):
+            if fnmatch.fnmatchcase(key, match):
+                yield key
+
+
+@pytest.fixture
+def fake_redis() -> FakeRedis:
+    return FakeRedis()
@@ -0,0 +1,58 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from repositories.cache import CacheRepository
+
+ROWS = [{"SuperAccountId": 36, "Balance": Decimal("10.50"), "ChangeTime": datetime(2026, 10, 1, 12, 0)}]
+
+
+class Source:
+    def __init__(self):
+        self.loads = 0
+        self.watermark_loads = 0
+        self.watermark = (datetime(2026, 10, 1), 1)
+
+    async def load(self) -> list:
+        self.loads += 1
+        return [dict(row) for row in ROWS]
+
+    async def load_watermark(self) -> tuple:
+        self.watermark_loads += 1
+        return self.watermark
+
+
+@pytest.fixture
+def source() -> Source:
+    return Source()
+
+
+def _get_or_load(cache_repo: CacheRepository, source: Source):
+    return cache_repo.get_or_load("key", loader=source.load, watermark_loader=source.load_watermark)
+
+
+@pytest.mark.asyncio
+async def test_cached_rows_keep_types(fake_redis, source):
+    cache_repo = CacheRepository(redis=fake_redis, ttl=60, recheck_interval=60)
+
+    loaded = await _get_or_load(cache_repo, source)
+    cached = await _get_or_load(cache_repo, source)
+
+    assert loaded == cached == ROWS
+    assert type(cached[0]["Balance"]) is Decimal
+    assert source.loads == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_reads_watermark_once(fake_redis, source):
+    cache_repo = CacheRepository(redis=fake_redis, ttl=60, recheck_interval=0)
+    await _get_or_load(cache_repo, source)
+    source.watermark_loads = 0
+
+    source.watermark = (datetime(2026, 10, 2), 2)
+    await _get_or_load(cache_repo, source)
+    assert (source.watermark_loads, source.loads) == (1, 2)
+
+    await _get_or_load(cache_repo, source)
+    assert (source.watermark_loads, source.loads) == (2, 2)
@@ -0,0 +1,35 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import orjson
+
+from utils.codecs import dump_value, load_value
+
+
+def test_round_trip_through_json():
+    value = {
+        "date": date(2026, 10, 18),
+        "datetime": datetime(2026, 10, 18, 23, 59, 30),
+        "decimal": Decimal("1234.50"),
+        "rows": [(1, "Аквапарк", Decimal("0.1")), [None, True, 1.5]],
+        "nested": {"ids": (1, 2, 3)},
+    }
+
+    loaded = load_value(orjson.loads(orjson.dumps(dump_value(value))))
+
+    assert loaded == value
+    assert type(loaded["decimal"]) is Decimal
+    assert type(loaded["datetime"]) is datetime
+    assert type(loaded["date"]) is date
+    assert type(loaded["rows"][0]) is tuple
+
+
+def test_keys_become_strings():
+    assert load_value(dump_value({1: "a"})) == {"1": "a"}
+
+
+def test_plain_json_values_are_unchanged():
+    value = {"a": [1, 2.5, "x", None, {"b": False}]}
+
+    assert dump_value(value) == value
+    assert load_value(value) == value
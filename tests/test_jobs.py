@@ -0,0 +1,122 @@
+from datetime import date
+from uuid import uuid4
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from repositories.jobs import QUEUE_KEY, JobRepository
+from schemas.jobs import JobCreate, JobKind, JobStatus, PrewarmParams
+from services import jobs
+from services.jobs import JobService, JobServices
+
+PREWARM = JobCreate(kind=JobKind.PREWARM_REPORT_CACHE, params={"day": "2026-10-17"})
+
+
+@pytest.fixture
+def job_repo(fake_redis) -> JobRepository:
+    return JobRepository(redis=fake_redis, ttl=60)
+
+
+@pytest.fixture
+def job_service(job_repo) -> JobService:
+    return JobService(
+        repo=job_repo, services=JobServices(worker_service=None, legacy_service=None, prewarm_service=None)
+    )
+
+
+@pytest.fixture
+def handled(monkeypatch) -> list[date]:
+    days = []
+
+    async def prewarm(services: JobServices, params: PrewarmParams, progress) -> dict:
+        days.append(params.day)
+        await progress(1, 1)
+        return {"ok": True}
+
+    monkeypatch.setitem(jobs.JOB_HANDLERS, JobKind.PREWARM_REPORT_CACHE, (PrewarmParams, prewarm))
+    return days
+
+
+@pytest.mark.asyncio
+async def test_job_round_trip(job_service, job_repo, fake_redis, handled):
+    job = await job_service.submit(PREWARM)
+
+    assert await job_service.run_next(timeout=0.1, worker_id="default:0")
+
+    done = await job_service.get_job(job.id)
+    assert done.status == JobStatus.DONE
+    assert done.result == {"ok": True}
+    assert (done.progress_done, done.progress_total) == (1, 1)
+    assert handled == [date(2026, 10, 17)]
+    assert await fake_redis.lrange(job_repo.processing_key("default:0"), 0, -1) == []
+    assert not await job_service.run_next(timeout=0.05, worker_id="default:0")
+
+
+@pytest.mark.asyncio
+async def test_same_params_are_not_queued_twice(job_service, handled):
+    first = await job_service.submit(PREWARM)
+
+    assert (await job_service.submit(PREWARM)).id == first.id
+
+    await job_service.run_next(timeout=0.1, worker_id="default:0")
+    assert (await job_service.submit(PREWARM)).id != first.id
+
+
+@pytest.mark.asyncio
+async def test_job_of_crashed_worker_is_requeued(job_service, job_repo, fake_redis):
+    job = await job_service.submit(PREWARM)
+    other = await job_service.submit(JobCreate(kind=JobKind.PREWARM_REPORT_CACHE, params={"day": "2026-10-16"}))
+    # Воркеры взяли задачи и упали, не завершив их
+    assert await job_repo.dequeue(0.1, "default:0") == job.id
+    assert await job_repo.dequeue(0.1, "other:0") == other.id
+
+    await job_service.requeue_unfinished("default:0")
+
+    assert await fake_redis.lrange(QUEUE_KEY, 0, -1) == [str(job.id)]
+    assert await fake_redis.lrange(job_repo.processing_key("other:0"), 0, -1) == [str(other.id)]
+    assert (await job_service.get_job(job.id)).status == JobStatus.QUEUED
+
+    await job_service.requeue_unfinished("other:*")
+    assert await fake_redis.lrange(QUEUE_KEY, 0, -1) == [str(job.id), str(other.id)]
+
+
+@pytest.mark.asyncio
+async def test_failed_handler_marks_job_failed(job_service, monkeypatch):
+    async def fail(services, params, progress):
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(jobs.JOB_HANDLERS, JobKind.PREWARM_REPORT_CACHE, (PrewarmParams, fail))
+    job = await job_service.submit(PREWARM)
+
+    await job_service.run_next(timeout=0.1, worker_id="default:0")
+
+    failed = await job_service.get_job(job.id)
+    assert failed.status == JobStatus.FAILED
+    assert "boom" in failed.error
+
+
+@pytest.mark.asyncio
+async def test_job_is_acked_when_result_cannot_be_saved(job_service, job_repo, fake_redis, handled, monkeypatch):
+    job = await job_service.submit(PREWARM)
+    save = job_repo.save
+
+    async def save_until_done(saved_job):
+        if saved_job.status == JobStatus.DONE:
+            raise RedisConnectionError("Redis is unavailable")
+        await save(saved_job)
+
+    monkeypatch.setattr(job_repo, "save", save_until_done)
+
+    assert await job_service.run_next(timeout=0.1, worker_id="default:0")
+
+    assert await fake_redis.lrange(job_repo.processing_key("default:0"), 0, -1) == []
+    # Параметры задачи освобождены: такую же задачу можно поставить снова
+    assert (await job_service.submit(PREWARM)).id != job.id
+
+
+@pytest.mark.asyncio
+async def test_unknown_job_id_is_acked(job_repo, job_service, fake_redis):
+    await fake_redis.lpush(QUEUE_KEY, str(uuid4()))
+
+    assert await job_service.run_next(timeout=0.1, worker_id="default:0")
+    assert await fake_redis.lrange(job_repo.processing_key("default:0"), 0, -1) == []
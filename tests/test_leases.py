@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from utils.leases import redis_lease
+
+
+@pytest.mark.asyncio
+async def test_lease_excludes_concurrent_holders(fake_redis):
+    holders, overlaps = 0, 0
+
+    async def hold() -> None:
+        nonlocal holders, overlaps
+        async with redis_lease(fake_redis, "lease", ttl=10, poll_interval=0.01):
+            holders += 1
+            overlaps += holders > 1
+            await asyncio.sleep(0.02)
+            holders -= 1
+
+    await asyncio.gather(*(hold() for _ in range(5)))
+
+    assert overlaps == 0
+    assert await fake_redis.get("lease") is None
+
+
+@pytest.mark.asyncio
+async def test_lease_is_renewed_while_held(fake_redis):
+    async with redis_lease(fake_redis, "lease", ttl=0.3, poll_interval=0.01):
+        await asyncio.sleep(0.6)
+        assert await fake_redis.get("lease") is not None
+
+
+@pytest.mark.asyncio
+async def test_lease_of_another_holder_is_not_released(fake_redis):
+    async with redis_lease(fake_redis, "lease", ttl=10, poll_interval=0.01):
+        # Аренда истекла (например, процесс завис) и ее взял другой процесс
+        await fake_redis.set("lease", "other", ex=10)
+
+    assert await fake_redis.get("lease") == "other"
+
+
+@pytest.mark.asyncio
+async def test_waiter_takes_expired_lease(fake_redis):
+    await fake_redis.set("lease", "crashed", ex=0.05)
+
+    async with redis_lease(fake_redis, "lease", ttl=10, poll_interval=0.01):
+        assert await fake_redis.get("lease") != "crashed"
+
+
+@pytest.mark.asyncio
+async def test_without_redis_block_runs():
+    ran = False
+    async with redis_lease(None, "lease", ttl=10, poll_interval=0.01):
+        ran = True
+
+    assert ran
@@ -0,0 +1,69 @@
+import pytest
+
+from db import mssql
+from db.mssql import MsSqlConnectionPool
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def opened(monkeypatch) -> list[FakeConnection]:
+    connections = []
+
+    def open_connection(connection_string: str) -> FakeConnection:
+        connections.append(FakeConnection())
+        return connections[-1]
+
+    monkeypatch.setattr(mssql, "_open_connection", open_connection)
+    return connections
+
+
+def _pool(min_size: int, idle_timeout: float = 300) -> MsSqlConnectionPool:
+    return MsSqlConnectionPool(
+        server="server",
+        port=1433,
+        database="database",
+        user="user",
+        password="password",
+        min_size=min_size,
+        max_size=5,
+        idle_timeout=idle_timeout,
+        ping_interval=300,
+        acquire_timeout=1,
+    )
+
+
+def test_fill_opens_min_size_connections(opened):
+    pool = _pool(min_size=2)
+
+    pool.fill()
+
+    metrics = pool.metrics()
+    assert (metrics.size, metrics.idle, metrics.in_use) == (2, 2, 0)
+    assert len(opened) == 2
+
+    pooled = pool.acquire()
+    assert pooled.connection in opened
+    assert len(opened) == 2
+    pool.release(pooled)
+
+
+def test_release_closes_idle_connections_over_min_size(opened):
+    pool = _pool(min_size=1, idle_timeout=-1)
+    borrowed = [pool.acquire() for _ in range(3)]
+
+    for pooled in borrowed:
+        pool.release(pooled)
+
+    metrics = pool.metrics()
+    assert (metrics.size, metrics.idle) == (1, 1)
+    assert sum(connection.closed for connection in opened) == 2
@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from utils.pivot import DayPivot
+
+
+def test_set_and_add_fill_day_cells():
+    pivot = DayPivot(days_count=3, measures=2)
+
+    pivot.set(("Аквапарк", "Билеты", "Взрослый"), 1, 10, 100.0)
+    pivot.add(("Аквапарк", "Билеты", "Взрослый"), 1, 5, 50.0)
+    pivot.add(("Аквапарк", "Билеты", "Взрослый"), 3, 1, 10.0)
+
+    assert pivot.row(("Аквапарк", "Билеты", "Взрослый")) == [15, "", 1]
+    assert pivot.row(("Аквапарк", "Билеты", "Взрослый"), measure=1) == [150.0, "", 10.0]
+
+
+def test_keys_and_children_keep_first_appearance_order():
+    pivot = DayPivot(days_count=1)
+    keys = [("B", "y"), ("A", "x"), ("B", "a"), ("A", "b")]
+    for key in keys:
+        pivot.set(key, 1, 1)
+
+    assert list(pivot) == [("B", "y"), ("B", "a"), ("A", "x"), ("A", "b")]
+    assert list(pivot.children()) == ["B", "A"]
+    assert list(pivot.children(("A",))) == ["x", "b"]
+    assert ("A", "x") in pivot
+    assert ("A", "z") not in pivot
+
+
+def test_key_length_is_fixed_by_first_row():
+    pivot = DayPivot(days_count=1)
+    pivot.set(("A", "x"), 1, 1)
+
+    with pytest.raises(ValueError):
+        pivot.set(("A",), 1, 1)
+
+
+def test_matches_dict_of_rows():
+    rng = random.Random(7)
+    days_count = 31
+    pivot = DayPivot(days_count=days_count, measures=2, empty=0)
+    expected: dict[tuple, list[list]] = {}
+    for _ in range(2000):
+        key = (f"group{rng.randrange(3)}", f"tariff{rng.randrange(20)}")
+        day = rng.randint(1, days_count)
+        count, amount = rng.randrange(10), rng.randrange(1000) / 4
+        pivot.add(key, day, count, amount)
+        row = expected.setdefault(key, [[0] * days_count, [0] * days_count])
+        row[0][day - 1] += count
+        row[1][day - 1] += amount
+
+    assert set(pivot) == set(expected)
+    for key, (counts, amounts) in expected.items():
+        assert pivot.row(key) == counts
+        assert pivot.row(key, measure=1) == amounts
@@ -0,0 +1,78 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from core.settings import settings
+from schemas.report_cache import ReportCacheCreate
+from schemas.total_report import Company, DBName
+from services.prewarm import PrewarmService, prewarm_days
+from services.reports import _report_cache_row, is_final_day
+
+
+class FakeWorkerService:
+    """Строит пустые отчеты и сохраняет строки report_cache так же, как ReportService."""
+
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+
+    def for_database(self, database: str) -> "FakeWorkerService":
+        return self
+
+    async def prepare_total_detail_reports(self, days: list[datetime], use_cache: bool = True):
+        return self._save("total_detail", days), []
+
+    async def prepare_attendance_reports(self, period: list[tuple[datetime, bool]]):
+        return self._save("attendance", [day for day, _ in period]), []
+
+    def _save(self, report_type: str, days: list[datetime]) -> dict:
+        reports = {}
+        for day in days:
+            report = ReportCacheCreate(report_date=day.date(), report_type=report_type, report_data={})
+            self.rows.append(_report_cache_row(report, source_watermark=None))
+            reports[day.date()] = report
+
+        return reports
+
+
+class FakeLegacyService:
+    async def get_companies(self) -> list[Company]:
+        return [Company(id=1, name="Аквапарк", db_name=DBName.AQUA)]
+
+    async def get_client_count_totals_by_day(self, database: str, company_id: int, days: list[datetime]) -> dict:
+        return {}
+
+    async def get_last_year_reports(self, date_from: datetime, date_to: datetime, companies: list[Company]) -> dict:
+        return {}
+
+
+class FakeReportService:
+    async def apply_retention(self) -> None:
+        return None
+
+
+@pytest.mark.parametrize("day", [date.today(), date.today() - timedelta(days=1)])
+def test_prewarm_days_include_first_final_day(day: date):
+    days = [current_date.date() for current_date in prewarm_days(day)]
+
+    assert days[-1] == day
+    assert len(days) == settings.report_cache_mutable_days + 2
+    assert is_final_day(days[0])
+    assert not is_final_day(days[-1])
+
+
+@pytest.mark.asyncio
+async def test_prewarm_seals_closed_days():
+    rows = []
+    service = PrewarmService(
+        redis=None,
+        worker_service=FakeWorkerService(rows),
+        legacy_service=FakeLegacyService(),
+        report_service=FakeReportService(),
+    )
+
+    run = await service.prewarm(date.today())
+
+    assert run.ok
+    sealed = {(row["report_type"], row["report_date"]) for row in rows if row["sealed_at"] is not None}
+    first_day = date.today() - timedelta(days=settings.report_cache_mutable_days + 1)
+    assert sealed == {("total_detail", first_day), ("attendance", first_day)}
@@ -0,0 +1,57 @@
+import random
+
+import orjson
+import pytest
+
+from utils.report_codec import LazyReportData, decode_report_data, encode_report_data
+
+
+def _random_report(rng: random.Random, depth: int = 3) -> dict:
+    names = [f"Группа {i}" for i in range(8)] + ["Итого по группе", "Итого по папке", ""]
+    report = {}
+    for _ in range(rng.randint(1, 6)):
+        if depth and rng.random() < 0.5:
+            report[rng.choice(names)] = _random_report(rng, depth - 1)
+        else:
+            report[rng.choice(names)] = [
+                [rng.choice(names), rng.randint(-(2**40), 2**40), rng.uniform(-1e6, 1e6)],
+                [rng.choice([None, True, False]), rng.randrange(100), []],
+            ]
+
+    return report
+
+
+def test_round_trip():
+    rng = random.Random(11)
+    for _ in range(100):
+        report = _random_report(rng)
+        assert decode_report_data(encode_report_data(report)) == report
+
+
+def test_round_trip_keeps_json_types():
+    report = {"a": [1, 1.0, "1", None, True, False, {"b": [2.5, -3]}], "": {}}
+
+    decoded = decode_report_data(encode_report_data(report))
+
+    assert orjson.dumps(decoded) == orjson.dumps(report)
+    assert type(decoded["a"][0]) is int
+    assert type(decoded["a"][1]) is float
+
+
+def test_tuples_become_lists():
+    assert decode_report_data(encode_report_data({"row": ("Смайл", 2, 3.5)})) == {"row": ["Смайл", 2, 3.5]}
+
+
+def test_unsupported_value():
+    with pytest.raises(TypeError):
+        encode_report_data({"value": object()})
+
+
+def test_lazy_report_data_decodes_on_first_access():
+    report = {"ИТОГО": {"": [["Сумма", 1, 2.0]]}}
+    lazy = LazyReportData(encode_report_data(report))
+
+    assert "bytes" in repr(lazy)
+    assert dict(lazy) == report
+    assert lazy["ИТОГО"] == report["ИТОГО"]
+    assert len(lazy) == 1
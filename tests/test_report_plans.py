@@ -0,0 +1,233 @@
+"""Планы отчетов дают тот же результат, что и прежний обход конфигурации (эталонные функции ниже)."""
+
+import random
+
+import pytest
+
+from legacy import report_plans
+from schemas.bars import TotalReport, TotalReportElement
+from schemas.rk import SmileReport
+
+SERVICES = [f"Услуга {i}" for i in range(25)] + ["Дата", "Депозит", "Организация", "Смайл"]
+FOLDERS = ["Билеты", "Абонементы", "Общепит", ""]
+
+
+def reference_finance_report(itog_report_month, total_report_config, fin_report_config, smile_report_month):
+    month_finance_report = {}
+    control_sum_group = month_finance_report.setdefault("Контрольная сумма", {})
+    control_sum = control_sum_group.setdefault("Cумма", [["Сумма", 0, 0.0]])
+
+    for group_name, groups in total_report_config.items():
+        finreport_group = month_finance_report.setdefault(group_name, {})
+        finreport_group_total = finreport_group.setdefault("Итого по группе", [["Итого по группе", 0, 0.0]])
+        for oldgroup in groups:
+            try:
+                for service_name in fin_report_config[oldgroup]:
+                    try:
+                        service_count, service_sum, org_name, _ = itog_report_month[service_name]
+
+                        if service_name == "Дата":
+                            product_group = finreport_group.setdefault(oldgroup, [])
+                            product_group.append([service_name, service_count, service_sum])
+                        elif service_name == "Депозит":
+                            product_group = finreport_group.setdefault(oldgroup, [])
+                            product_group.append([service_name, 0, service_sum])
+                            finreport_group_total[0][2] += service_sum
+                            control_sum[0][2] += service_sum
+                        elif service_name == "Организация":
+                            pass
+                        else:
+                            product_group = finreport_group.setdefault(org_name, [["Итого по папке", 0, 0.0]])
+                            product_group.append([service_name, service_count, service_sum])
+                            product_group[0][1] += service_count
+                            product_group[0][2] += service_sum
+                            finreport_group_total[0][1] += service_count
+                            finreport_group_total[0][2] += service_sum
+                            if service_name != "Итого по отчету":
+                                control_sum[0][1] += service_count
+                                control_sum[0][2] += service_sum
+                    except (KeyError, TypeError):
+                        continue
+
+            except KeyError:
+                pass
+            if oldgroup == "Общепит":
+                product_group = finreport_group.setdefault("Общепит (Смайл)", [["Итого по папке", 0, 0.0]])
+                product_group.append(["Смайл", smile_report_month.total_count, smile_report_month.total_sum])
+                product_group[0][1] += smile_report_month.total_count
+                product_group[0][2] += smile_report_month.total_sum
+                finreport_group_total[0][1] += smile_report_month.total_count
+                finreport_group_total[0][2] += smile_report_month.total_sum
+
+    control_sum[0][1] += smile_report_month.total_count
+    control_sum[0][2] += smile_report_month.total_sum
+    month_finance_report["ИТОГО"]["Итого по группе"][0][1] += smile_report_month.total_count
+    month_finance_report["ИТОГО"]["Итого по группе"][0][2] += smile_report_month.total_sum
+    month_finance_report["ИТОГО"][""][0][1] += smile_report_month.total_count
+    month_finance_report["ИТОГО"][""][0][2] += smile_report_month.total_sum
+    month_finance_report["ИТОГО"][""][1][1] += smile_report_month.total_count
+    month_finance_report["ИТОГО"][""][1][2] += smile_report_month.total_sum
+    return month_finance_report
+
+
+def reference_agent_report(month_total_report, agent_report_config, smile_report_month):
+    result = {}
+    result["Контрольная сумма"] = {}
+    result["Контрольная сумма"]["Cумма"] = [["Сумма", 0, 0.0]]
+    result["ИТОГО"] = {}
+    result["ИТОГО"][""] = [["Сумма", 0, 0.0]]
+
+    def add_service(org, tariff, count, summ):
+        result[org]["Итого по группе"][0][1] += count
+        result[org]["Итого по группе"][0][2] += summ
+        if tariff != "Итого по отчету":
+            result["Контрольная сумма"]["Cумма"][0][1] += count
+            result["Контрольная сумма"]["Cумма"][0][2] += summ
+
+    for org, tariffs in agent_report_config.items():
+        result[org] = {}
+        result[org]["Итого по группе"] = [["Итого по группе", 0, 0.0]]
+        for tariff in tariffs:
+            try:
+                service_name = month_total_report[tariff][2]
+                count = month_total_report[tariff][0]
+                summ = month_total_report[tariff][1]
+
+                if tariff == "Дата":
+                    result[org][tariff] = [[tariff, count, summ]]
+                elif tariff == "Депозит":
+                    result[org][tariff] = [[tariff, 0, summ]]
+                    result[org]["Итого по группе"][0][2] += summ
+                    result["Контрольная сумма"]["Cумма"][0][2] += summ
+                elif tariff == "Организация":
+                    pass
+                else:
+                    try:
+                        if result[org][service_name]:
+                            result[org][service_name].append([tariff, count, summ])
+                        else:
+                            result[org][service_name] = [["Итого по папке", 0, 0.0], [tariff, count, summ]]
+                    except KeyError:
+                        result[org][service_name] = [["Итого по папке", 0, 0.0], (tariff, count, summ)]
+                    result[org][service_name][0][1] += count
+                    result[org][service_name][0][2] += summ
+                    add_service(org, tariff, count, summ)
+            except (KeyError, TypeError):
+                pass
+
+            if tariff == "Смайл":
+                result[org]["Смайл"] = [
+                    ["Итого по папке", 0, 0.0],
+                    ("Смайл", smile_report_month.total_count, smile_report_month.total_sum),
+                ]
+                result[org]["Смайл"][0][1] += smile_report_month.total_count
+                result[org]["Смайл"][0][2] += smile_report_month.total_sum
+                result[org]["Итого по группе"][0][1] += smile_report_month.total_count
+                result[org]["Итого по группе"][0][2] += smile_report_month.total_sum
+                result["Контрольная сумма"]["Cумма"][0][1] += smile_report_month.total_count
+                result["Контрольная сумма"]["Cумма"][0][2] += smile_report_month.total_sum
+                result["ИТОГО"][""][0][1] += smile_report_month.total_count
+                result["ИТОГО"][""][0][2] += smile_report_month.total_sum
+
+    return result
+
+
+def reference_attendance_report(report_config, total_report):
+    total_report_map = {el.name: el for el in total_report.elements}
+    result = {}
+    for h1_header, h2_headers in report_config.items():
+        h1 = result.setdefault(h1_header, {})
+        for h2_header, h3_headers in h2_headers.items():
+            h2 = h1.setdefault(h2_header, {})
+            for h3_header, elements in h3_headers.items():
+                h2.setdefault(h3_header, 0)
+                for element in elements:
+                    if total_report_map.get(element):
+                        h2[h3_header] += total_report_map[element].good_amount
+
+    return result
+
+
+def _services(rng: random.Random) -> list[str]:
+    return rng.sample(SERVICES, rng.randint(0, 8))
+
+
+def _month_total_report(rng: random.Random) -> dict[str, tuple]:
+    report = {"Итого по отчету": (rng.randrange(1000), rng.randrange(10**6) / 100, "", "")}
+    for service in rng.sample(SERVICES, 20):
+        if rng.random() < 0.05:
+            report[service] = None  # строка без данных: пропускается (TypeError)
+        else:
+            report[service] = (rng.randrange(100), rng.randrange(10**5) / 100, rng.choice(FOLDERS), "Группа")
+
+    return report
+
+
+def _smile_report(rng: random.Random) -> SmileReport:
+    return SmileReport(total_count=rng.randrange(50), total_sum=rng.randrange(10**4) / 100)
+
+
+@pytest.fixture(autouse=True)
+def _clear_plans():
+    report_plans.clear_plans()
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_finance_plan_matches_reference(seed: int):
+    rng = random.Random(seed)
+    old_groups = [f"Старая группа {i}" for i in range(6)] + ["Общепит"]
+    fin_report_config = {group: _services(rng) for group in old_groups if rng.random() < 0.9}
+    fin_report_config["Итого"] = ["Итого по отчету"]
+    total_report_config = {
+        f"Группа {i}": rng.sample(old_groups + ["Нет в конфигурации"], rng.randint(0, 3)) for i in range(4)
+    }
+    total_report_config["ИТОГО"] = ["Итого"]
+    itog_report_month, smile_report_month = _month_total_report(rng), _smile_report(rng)
+
+    plan = report_plans.get_finance_plan(total_report_config, fin_report_config)
+
+    assert report_plans.apply_finance_plan(plan, itog_report_month, smile_report_month) == reference_finance_report(
+        itog_report_month, total_report_config, fin_report_config, smile_report_month
+    )
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_agent_plan_matches_reference(seed: int):
+    rng = random.Random(seed)
+    agent_report_config = {f"Организация {i}": _services(rng) + ["Итого по отчету"] * (i == 0) for i in range(4)}
+    month_total_report, smile_report_month = _month_total_report(rng), _smile_report(rng)
+
+    plan = report_plans.get_agent_plan(agent_report_config)
+
+    assert report_plans.apply_agent_plan(plan, month_total_report, smile_report_month) == reference_agent_report(
+        month_total_report, agent_report_config, smile_report_month
+    )
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_attendance_plan_matches_reference(seed: int):
+    rng = random.Random(seed)
+    report_config = {
+        f"h1 {i}": {f"h2 {j}": {f"h3 {k}": _services(rng) for k in range(3)} for j in range(2)} for i in range(3)
+    }
+    total_report = TotalReport(
+        elements=[
+            TotalReportElement(
+                SuperName="Группа", ViewString=None, Name=name, GoodAmount=rng.randrange(100), Amount=rng.random()
+            )
+            for name in rng.sample(SERVICES, 15)
+        ]
+    )
+
+    plan = report_plans.get_attendance_plan(report_config)
+
+    assert report_plans.apply_attendance_plan(plan, total_report) == reference_attendance_report(
+        report_config, total_report
+    )
+
+
+def test_plans_are_cached_by_config_content():
+    config = {"Организация": ["Услуга 1"]}
+
+    assert report_plans.get_agent_plan(config) is report_plans.get_agent_plan({"Организация": ["Услуга 1"]})
+    assert report_plans.get_agent_plan(config) is not report_plans.get_agent_plan({"Организация": ["Услуга 2"]})
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from utils.single_flight import KEY_PREFIX, SingleFlight, flight_key
+
+
+@pytest.fixture
+def single_flight(fake_redis) -> SingleFlight:
+    return SingleFlight(redis=fake_redis, lease_ttl=10, poll_interval=0.01)
+
+
+def test_flight_key_ignores_param_order():
+    assert flight_key("total", db_name="aqua", day="2026-10-18") == flight_key(
+        "total", day="2026-10-18", db_name="aqua"
+    )
+    assert flight_key("total", db_name="aqua") != flight_key("total", db_name="beach")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_compute_once(single_flight):
+    calls = 0
+
+    async def compute() -> dict:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"total": 1}
+
+    results = await asyncio.gather(*(single_flight.run("key", compute) for _ in range(5)))
+
+    assert calls == 1
+    assert results == [{"total": 1}] * 5
+
+
+@pytest.mark.asyncio
+async def test_follower_process_gets_leader_result(single_flight, fake_redis):
+    calls = 0
+
+    async def compute() -> dict:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"total": 1}
+
+    # Второй процесс: общий Redis, но свои вычисления в процессе (_run_shared в обход _flights)
+    follower = SingleFlight(redis=fake_redis, lease_ttl=10, poll_interval=0.01)
+    leader_result, follower_result = await asyncio.gather(
+        single_flight.run("key", compute), follower._run_shared("key", compute)
+    )
+
+    assert calls == 1
+    assert leader_result == follower_result == {"total": 1}
+    assert await fake_redis.get(f"{KEY_PREFIX}:lease:key") is None
+
+
+@pytest.mark.asyncio
+async def test_follower_process_gets_leader_http_error(single_flight, fake_redis):
+    async def compute() -> dict:
+        await asyncio.sleep(0.05)
+        raise HTTPException(status_code=404, detail="Not found")
+
+    follower = SingleFlight(redis=fake_redis, lease_ttl=10, poll_interval=0.01)
+    results = await asyncio.gather(
+        single_flight.run("key", compute), follower._run_shared("key", compute), return_exceptions=True
+    )
+
+    assert [(error.status_code, error.detail) for error in results] == [(404, "Not found")] * 2
+
+
+@pytest.mark.asyncio
+async def test_follower_computes_when_leader_is_gone(single_flight, fake_redis):
+    # Аренда упавшего ведущего без результата
+    await fake_redis.set(f"{KEY_PREFIX}:lease:key", "crashed", ex=0.05)
+
+    async def compute() -> dict:
+        return {"total": 2}
+
+    assert await single_flight.run("key", compute) == {"total": 2}
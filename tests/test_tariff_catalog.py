@@ -0,0 +1,99 @@
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from core.settings import settings
+from schemas.bars import Category
+from services import tariff_catalog
+from services.tariff_catalog import TariffCatalogService
+
+CHANGE_TIME = datetime(2026, 10, 1, 12, 0)
+
+
+@dataclass
+class FakeOrganisation:
+    super_account_id: int
+
+
+class FakeBarsService:
+    """Таблица Category в памяти; водяной знак считается так же, как в GET_TARIFFS_CATALOG_WATERMARK_SQL."""
+
+    database = "Aquapark_Ulyanovsk"
+
+    def __init__(self):
+        self.rows: dict[int, Category] = {}
+        self.full_loads = 0
+
+    def put(self, category_id: int, name: str, change_time: datetime = CHANGE_TIME) -> None:
+        self.rows[category_id] = Category(
+            CategoryId=category_id, StockType=1, Name=name, OrganizationId=1, Guid=uuid4(), ChangeTime=change_time
+        )
+
+    async def get_organisations(self) -> list[FakeOrganisation]:
+        return [FakeOrganisation(super_account_id=1)]
+
+    async def get_tariffs_catalog(self, organization_ids, changed_since: datetime | None = None) -> list[Category]:
+        if changed_since is None:
+            self.full_loads += 1
+            return list(self.rows.values())
+
+        return [row for row in self.rows.values() if row.change_time >= changed_since]
+
+    async def get_tariffs_catalog_watermark(self, organization_ids) -> tuple[datetime | None, int, int | None]:
+        if not self.rows:
+            return None, 0, None
+
+        return max(row.change_time for row in self.rows.values()), len(self.rows), hash(frozenset(self.rows))
+
+
+@pytest.fixture
+def bars_service(monkeypatch) -> FakeBarsService:
+    monkeypatch.setattr(tariff_catalog, "_catalogs", {})
+    monkeypatch.setattr(settings, "tariff_catalog_refresh_interval", 0)
+    bars_service = FakeBarsService()
+    bars_service.put(1, "Взрослый")
+    bars_service.put(2, "Детский")
+    return bars_service
+
+
+@pytest.fixture
+def catalog_service(bars_service) -> TariffCatalogService:
+    return TariffCatalogService(bars_service=bars_service, report_config_service=None)
+
+
+@pytest.mark.asyncio
+async def test_changed_tariffs_are_read_incrementally(catalog_service, bars_service):
+    await catalog_service.get_catalog()
+    bars_service.put(2, "Детский до 7 лет", change_time=datetime(2026, 10, 2))
+
+    catalog = await catalog_service.get_catalog()
+
+    assert catalog.tariffs == {1: "Взрослый", 2: "Детский до 7 лет"}
+    assert bars_service.full_loads == 1
+
+
+@pytest.mark.asyncio
+async def test_delete_and_add_with_same_count_and_watermark_reloads(catalog_service, bars_service):
+    first = await catalog_service.get_catalog()
+    del bars_service.rows[2]
+    bars_service.put(3, "Семейный")
+
+    catalog = await catalog_service.get_catalog()
+
+    assert catalog.tariffs == {1: "Взрослый", 3: "Семейный"}
+    assert set(catalog.name_counts) == {"Взрослый", "Семейный"}
+    assert catalog.version > first.version
+    assert bars_service.full_loads == 2
+
+
+@pytest.mark.asyncio
+async def test_unchanged_catalog_is_not_reloaded(catalog_service, bars_service):
+    first = await catalog_service.get_catalog()
+
+    catalog = await catalog_service.get_catalog()
+
+    assert catalog is first
+    assert catalog.version == first.version
+    assert bars_service.full_loads == 1
@@ -0,0 +1,55 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+# Метки типов, которые JSON не сохраняет
+DATETIME = "__datetime__"
+DATE = "__date__"
+DECIMAL = "__decimal__"
+TUPLE = "__tuple__"
+
+_SCALAR_DUMPERS = (
+    (datetime, DATETIME, datetime.isoformat),
+    (date, DATE, date.isoformat),
+    (Decimal, DECIMAL, str),
+)
+_SCALAR_LOADERS = {
+    DATETIME: datetime.fromisoformat,
+    DATE: date.fromisoformat,
+    DECIMAL: Decimal,
+}
+
+
+def dump_value(value: Any) -> Any:
+    """Привести значение к JSON-совместимому виду без потери типов (datetime, date, Decimal, tuple)."""
+
+    if isinstance(value, dict):
+        return {str(key): dump_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [dump_value(item) for item in value]
+    if isinstance(value, tuple):
+        return {TUPLE: [dump_value(item) for item in value]}
+
+    for type_, tag, dump in _SCALAR_DUMPERS:
+        if isinstance(value, type_):
+            return {tag: dump(value)}
+
+    return value
+
+
+def load_value(value: Any) -> Any:
+    """Восстановить значение, сохраненное dump_value."""
+
+    if isinstance(value, list):
+        return [load_value(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+
+    if len(value) == 1:
+        tag, item = next(iter(value.items()))
+        if tag == TUPLE:
+            return tuple(load_value(element) for element in item)
+        if tag in _SCALAR_LOADERS:
+            return _SCALAR_LOADERS[tag](item)
+
+    return {key: load_value(item) for key, item in value.items()}
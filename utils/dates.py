@@ -0,0 +1,22 @@
+from datetime import date, datetime, time, timedelta
+
+
+def day_start(value: date) -> datetime:
+    """Начало суток (00:00:00) для даты или даты со временем."""
+
+    if isinstance(value, datetime):
+        value = value.date()
+
+    return datetime.combine(value, time.min)
+
+
+def days_range(date_from: datetime, date_to: datetime) -> list[datetime]:
+    """Список дней [date_from, date_to) с шагом в одни сутки."""
+
+    days = []
+    current_date = date_from
+    while current_date < date_to:
+        days.append(current_date)
+        current_date += timedelta(days=1)
+
+    return days
@@ -0,0 +1,75 @@
+"""Аренда в Redis (SET NX с продлением) для взаимного исключения между процессами."""
+
+import asyncio
+import contextlib
+import logging
+import uuid
+from collections.abc import AsyncIterator
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+@contextlib.asynccontextmanager
+async def redis_lease(redis: Redis | None, key: str, ttl: int, poll_interval: float) -> AsyncIterator[None]:
+    """Выполнить блок with, держа аренду key; если аренду держит другой процесс - дождаться ее.
+
+    Аренда продлевается, пока выполняется блок, поэтому аренда упавшего процесса истекает не позже чем через ttl.
+    Без Redis (или при его ошибках) блок выполняется без аренды.
+    """
+
+    token = uuid.uuid4().hex
+    if redis is None or not await _acquire(redis, key, token, ttl, poll_interval):
+        yield
+        return
+
+    async with hold_lease(redis, key, token, ttl):
+        yield
+
+
+async def try_acquire_lease(redis: Redis, key: str, token: str, ttl: int) -> bool:
+    """Взять аренду key с токеном token, если ее никто не держит. Ошибки Redis не перехватываются."""
+
+    return bool(await redis.set(key, token, nx=True, ex=ttl))
+
+
+@contextlib.asynccontextmanager
+async def hold_lease(redis: Redis, key: str, token: str, ttl: int) -> AsyncIterator[None]:
+    """Продлевать взятую аренду, пока выполняется блок with, и снять ее после (если она еще наша)."""
+
+    renewal = asyncio.create_task(_renew(redis, key, token, ttl))
+    try:
+        yield
+    finally:
+        renewal.cancel()
+        with contextlib.suppress(RedisError):
+            if await redis.get(key) == token:
+                await redis.delete(key)
+
+
+async def _acquire(redis: Redis, key: str, token: str, ttl: int, poll_interval: float) -> bool:
+    while True:
+        try:
+            if await try_acquire_lease(redis, key, token, ttl):
+                return True
+
+        except RedisError as e:
+            logger.error(f"Lease '{key}' failed: {e}")
+            return False
+
+        await asyncio.sleep(poll_interval)
+
+
+async def _renew(redis: Redis, key: str, token: str, ttl: int) -> None:
+    while True:
+        await asyncio.sleep(ttl / 3)
+        try:
+            if await redis.get(key) != token:
+                logger.error(f"Lease '{key}' lost")
+                return
+            await redis.expire(key, ttl)
+
+        except RedisError as e:
+            logger.error(f"Lease '{key}' renewal failed: {e}")
@@ -0,0 +1,54 @@
+import asyncio
+import contextlib
+import logging
+from collections.abc import Awaitable, Callable, Iterable
+from datetime import datetime
+from typing import TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Прогресс долгой операции: (выполнено шагов, всего шагов)
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+
+
+async def run_by_days(
+    days: Iterable[datetime],
+    build: Callable[[datetime], Awaitable[T]],
+    semaphore: asyncio.Semaphore | None = None,
+    progress: ProgressCallback | None = None,
+) -> tuple[dict[datetime, T], dict[datetime, Exception]]:
+    """Построить отчеты за дни параллельно (не больше, чем позволяет semaphore, если он задан).
+
+    Ошибка одного дня не прерывает остальные: успешные результаты и ошибки возвращаются раздельно,
+    результаты упорядочены по дате. progress вызывается после каждого завершенного дня.
+    """
+
+    days = sorted(days)
+    done = 0
+
+    async def build_day(day: datetime) -> T:
+        nonlocal done
+        try:
+            async with semaphore or contextlib.nullcontext():
+                return await build(day)
+        finally:
+            done += 1
+            if progress is not None:
+                await progress(done, len(days))
+
+    results = await asyncio.gather(*(build_day(day) for day in days), return_exceptions=True)
+
+    built, errors = {}, {}
+    for day, result in zip(days, results, strict=True):
+        if isinstance(result, BaseException):
+            if not isinstance(result, Exception):
+                raise result
+
+            logger.error(f"Report for {day.date()} failed: {result!r}")
+            errors[day] = result
+        else:
+            built[day] = result
+
+    return built, errors
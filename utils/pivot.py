@@ -0,0 +1,94 @@
+from collections.abc import Hashable, Iterator
+from typing import Any
+
+Key = tuple[Hashable, ...]
+
+
+class DayPivot:
+    """Сводная таблица "строка × день месяца".
+
+    Строки адресуются ключом-кортежем (например, общая группа, группа, тариф) и хранятся
+    во вложенных словарях в порядке первого появления. Значения каждой строки лежат в плотных
+    массивах по дням (по одному массиву на показатель), поэтому запись значения и выборка строки
+    не требуют перебора.
+    """
+
+    def __init__(self, days_count: int, measures: int = 1, empty: Any = ""):
+        self._days_count = days_count
+        self._measures = measures
+        self._empty = empty
+        self._tree: dict = {}
+        self._depth: int | None = None
+
+    @property
+    def days_count(self) -> int:
+        return self._days_count
+
+    def set(self, key: Key, day: int, *values: Any) -> None:
+        """Записать значения показателей строки за день (день месяца, начиная с 1)."""
+
+        row = self._row(key)
+        for measure, value in enumerate(values):
+            row[measure][day - 1] = value
+
+    def add(self, key: Key, day: int, *values: Any) -> None:
+        """Прибавить значения показателей строки за день (пустые ячейки считаются нулем)."""
+
+        row = self._row(key)
+        for measure, value in enumerate(values):
+            current = row[measure][day - 1]
+            row[measure][day - 1] = value if current == self._empty else current + value
+
+    def row(self, key: Key, measure: int = 0) -> list:
+        """Значения показателя строки по дням."""
+
+        return self._node(key)[measure]
+
+    def children(self, prefix: Key = ()) -> dict:
+        """Дочерние узлы префикса ключа в порядке первого появления."""
+
+        return self._node(prefix) if prefix else self._tree
+
+    def __contains__(self, key: Key) -> bool:
+        try:
+            self._node(key)
+        except KeyError:
+            return False
+
+        return True
+
+    def __iter__(self) -> Iterator[Key]:
+        """Ключи всех строк в порядке первого появления."""
+
+        def walk(node: dict, prefix: Key, depth: int) -> Iterator[Key]:
+            for name, child in node.items():
+                if depth == 1:
+                    yield (*prefix, name)
+                else:
+                    yield from walk(child, (*prefix, name), depth - 1)
+
+        if self._depth is not None:
+            yield from walk(self._tree, (), self._depth)
+
+    def _node(self, key: Key) -> Any:
+        node = self._tree
+        for name in key:
+            node = node[name]
+
+        return node
+
+    def _row(self, key: Key) -> list[list]:
+        if self._depth is None:
+            self._depth = len(key)
+        elif len(key) != self._depth:
+            raise ValueError(f"Pivot key {key!r} must have {self._depth} parts")
+
+        node = self._tree
+        for name in key[:-1]:
+            node = node.setdefault(name, {})
+
+        row = node.get(key[-1])
+        if row is None:
+            row = node[key[-1]] = [[self._empty] * self._days_count for _ in range(self._measures)]
+
+        return row
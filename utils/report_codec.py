@@ -0,0 +1,150 @@
+"""Компактное хранение содержимого отчетов (report_cache.report_blob).
+
+Отчет (вложенные словари и списки из JSON) раскладывается на три части:
+    - словарь строк: каждое название группы, тарифа или заголовка хранится один раз;
+    - форма: дерево, в котором строки заменены номерами в словаре, а числа — метками;
+    - массивы чисел: целые (int64) и дробные (float64) значения в порядке обхода.
+Все части сжимаются zlib одним блоком. Раскодирование откладывается до первого обращения к данным
+(LazyReportData), поэтому чтение кеша без использования содержимого ничего не разбирает.
+"""
+
+import struct
+import zlib
+from array import array
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+import orjson
+
+FORMAT_VERSION = 1
+COMPRESSION_LEVEL = 6
+
+# Узлы формы: контейнеры - списки с меткой в начале, скаляры - числа
+DICT = 0
+LIST = 1
+INT = 0
+FLOAT = 1
+NONE = 2
+TRUE = 3
+FALSE = 4
+STRING = 5  # STRING + номер строки в словаре
+
+_HEADER = struct.Struct("<BII")
+_SCALAR_CODES = {None: NONE, True: TRUE, False: FALSE}
+_SCALAR_VALUES = {NONE: None, TRUE: True, FALSE: False}
+
+
+class _Encoder:
+    def __init__(self):
+        self.strings: dict[str, int] = {}
+        self.ints = array("q")
+        self.floats = array("d")
+
+    def intern(self, value: str) -> int:
+        return self.strings.setdefault(value, len(self.strings))
+
+    def shape(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            node = [DICT]
+            for key, item in value.items():
+                node.append(self.intern(str(key)))
+                node.append(self.shape(item))
+            return node
+        if isinstance(value, list | tuple):
+            return [LIST, *(self.shape(item) for item in value)]
+        if isinstance(value, str):
+            return STRING + self.intern(value)
+        if isinstance(value, bool) or value is None:
+            return _SCALAR_CODES[value]
+        if isinstance(value, int):
+            self.ints.append(value)
+            return INT
+        if isinstance(value, float):
+            self.floats.append(value)
+            return FLOAT
+
+        raise TypeError(f"Unsupported report value {value!r}")
+
+
+class _Decoder:
+    def __init__(self, strings: list[str], ints: array, floats: array):
+        self.strings = strings
+        self.ints = iter(ints)
+        self.floats = iter(floats)
+
+    def value(self, node: Any) -> Any:
+        if isinstance(node, list):
+            if node[0] == DICT:
+                return {self.strings[node[i]]: self.value(node[i + 1]) for i in range(1, len(node), 2)}
+            return [self.value(item) for item in node[1:]]
+        if node >= STRING:
+            return self.strings[node - STRING]
+        if node == INT:
+            return next(self.ints)
+        if node == FLOAT:
+            return next(self.floats)
+
+        return _SCALAR_VALUES[node]
+
+
+def encode_report_data(report_data: dict) -> bytes:
+    """Упаковать содержимое отчета (JSON-совместимый словарь) в компактный сжатый вид."""
+
+    encoder = _Encoder()
+    shape = encoder.shape(report_data)
+    structure = orjson.dumps([list(encoder.strings), shape])
+    ints, floats = encoder.ints.tobytes(), encoder.floats.tobytes()
+    payload = _HEADER.pack(FORMAT_VERSION, len(structure), len(ints)) + structure + ints + floats
+    return zlib.compress(payload, COMPRESSION_LEVEL)
+
+
+def decode_report_data(blob: bytes) -> dict:
+    """Восстановить содержимое отчета, упакованное encode_report_data."""
+
+    payload = zlib.decompress(blob)
+    version, structure_size, ints_size = _HEADER.unpack_from(payload)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported report_data format version {version}")
+
+    offset = _HEADER.size
+    strings, shape = orjson.loads(payload[offset : offset + structure_size])
+    offset += structure_size
+    ints = array("q", payload[offset : offset + ints_size])
+    floats = array("d", payload[offset + ints_size :])
+    return _Decoder(strings, ints, floats).value(shape)
+
+
+class LazyReportData(Mapping):
+    """Содержимое отчета, которое раскодируется при первом обращении к данным."""
+
+    __slots__ = ("_blob", "_data")
+
+    def __init__(self, blob: bytes):
+        self._blob = blob
+        self._data: dict | None = None
+
+    @property
+    def blob(self) -> bytes:
+        """Упакованное содержимое (без раскодирования)."""
+
+        return self._blob
+
+    @property
+    def data(self) -> dict:
+        if self._data is None:
+            self._data = decode_report_data(self._blob)
+        return self._data
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        if self._data is None:
+            return f"{self.__class__.__name__}(<{len(self._blob)} bytes>)"
+        return f"{self.__class__.__name__}({self._data!r})"
@@ -0,0 +1,145 @@
+"""Объединение одинаковых одновременных запросов (single flight).
+
+Первый запрос с данным ключом выполняет вычисление, остальные ждут его результат:
+    - в процессе - через общий asyncio.Future;
+    - между процессами - через аренду в Redis (utils.leases): ведущий процесс сохраняет
+      результат под токеном аренды, ведомые опрашивают его, пока аренда жива. Если ведущий упал
+      или завершился с ошибкой (кроме HTTPException), аренду берет и вычисляет один из ведомых.
+Без Redis (или при его ошибках) запросы объединяются только внутри процесса.
+"""
+
+import asyncio
+import hashlib
+import logging
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+import orjson
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from utils.leases import hold_lease, try_acquire_lease
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "barsic:single_flight"
+
+T = TypeVar("T")
+
+# Вычисления, которые сейчас выполняются в процессе
+_flights: dict[str, asyncio.Future] = {}
+
+
+def flight_key(name: str, **params: Any) -> str:
+    """Ключ вычисления: имя и нормализованные параметры (порядок параметров не важен)."""
+
+    dump = orjson.dumps(jsonable_encoder(params), option=orjson.OPT_SORT_KEYS)
+    return f"{name}:{hashlib.blake2b(dump, digest_size=16).hexdigest()}"
+
+
+class SingleFlight:
+    def __init__(self, redis: Redis | None, lease_ttl: int, poll_interval: float):
+        self._redis = redis
+        self._lease_ttl = lease_ttl
+        self._poll_interval = poll_interval
+
+    async def run(self, key: str, compute: Callable[[], Awaitable[T]]) -> T | Any:
+        """Выполнить compute один раз на все одновременные вызовы с тем же ключом.
+
+        Ведомые процессы получают результат в JSON-совместимом виде (через jsonable_encoder).
+        """
+
+        flight = _flights.get(key)
+        if flight is not None:
+            try:
+                return await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                # Отменен ведущий запрос (клиент отключился), а не этот: вычисляем сами
+                if not flight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+            return await self.run(key, compute)
+
+        flight = _flights[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await self._run_shared(key, compute)
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            # Ошибку получают ожидающие; если их нет, не даем asyncio ругаться на непрочитанное исключение
+            flight.exception()
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            del _flights[key]
+
+    async def _run_shared(self, key: str, compute: Callable[[], Awaitable[T]]) -> T | Any:
+        if self._redis is None:
+            return await compute()
+
+        lease_key = f"{KEY_PREFIX}:lease:{key}"
+        token = uuid.uuid4().hex
+        while True:
+            try:
+                acquired = await try_acquire_lease(self._redis, lease_key, token, self._lease_ttl)
+                leader_token = token if acquired else await self._redis.get(lease_key)
+            except RedisError as e:
+                logger.error(f"Single flight lease for '{key}' failed: {e}")
+                return await compute()
+
+            if acquired:
+                async with hold_lease(self._redis, lease_key, token, self._lease_ttl):
+                    return await self._lead(f"{KEY_PREFIX}:result:{key}:{token}", compute)
+
+            if leader_token is not None:
+                found, result = await self._wait_leader(key, lease_key, leader_token)
+                if found:
+                    return result
+
+    async def _lead(self, result_key: str, compute: Callable[[], Awaitable[T]]) -> T:
+        try:
+            result = await compute()
+            await self._publish(result_key, {"result": jsonable_encoder(result)})
+            return result
+
+        except HTTPException as e:
+            # Ошибки запроса одинаковы для всех ожидающих: отдаем их, а не вычисляем заново
+            await self._publish(result_key, {"error": {"status_code": e.status_code, "detail": e.detail}})
+            raise
+
+    async def _wait_leader(self, key: str, lease_key: str, leader_token: str) -> tuple[bool, Any]:
+        """Дождаться результата ведущего. (False, None), если ведущий пропал без результата."""
+
+        result_key = f"{KEY_PREFIX}:result:{key}:{leader_token}"
+        while True:
+            try:
+                raw = await self._redis.get(result_key)
+                if raw is None and await self._redis.get(lease_key) != leader_token:
+                    # Ведущий мог сохранить результат между двумя чтениями
+                    raw = await self._redis.get(result_key)
+                    if raw is None:
+                        return False, None
+
+            except RedisError as e:
+                logger.error(f"Single flight wait for '{key}' failed: {e}")
+                return False, None
+
+            if raw is not None:
+                published = orjson.loads(raw)
+                if "error" in published:
+                    raise HTTPException(**published["error"])
+                return True, published["result"]
+
+            await asyncio.sleep(self._poll_interval)
+
+    async def _publish(self, result_key: str, published: dict) -> None:
+        try:
+            await self._redis.set(result_key, orjson.dumps(published), ex=self._lease_ttl)
+        except RedisError as e:
+            logger.error(f"Single flight result publish failed: {e}")
@@ -0,0 +1,109 @@
+"""Процессы-воркеры фоновых задач (очередь в Redis, см. services.jobs).
+
+Запуск: python worker.py. Главный процесс возвращает в очередь задачи, оставшиеся от прошлого запуска,
+запускает job_workers процессов и перезапускает упавшие. У каждого воркера свой список выполняемых задач
+(id воркера - job_worker_group и номер слота), поэтому задача упавшего воркера возвращается в очередь
+перед его перезапуском.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import signal
+from multiprocessing.connection import wait
+
+from redis.asyncio import Redis
+
+from core.settings import settings
+from db import config_changes, mssql, redis_db
+from services.container import close_app_services, create_app_services
+
+logger = logging.getLogger(__name__)
+
+# Сколько секунд воркер ждет задачу, прежде чем проверить, не пора ли остановиться
+DEQUEUE_TIMEOUT = 5
+
+
+def _connect_redis() -> Redis:
+    return Redis(host=settings.redis_host, port=settings.redis_port, db=0, decode_responses=True)
+
+
+async def _run_worker(worker_id: str) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, stop.set)
+    loop.add_signal_handler(signal.SIGINT, stop.set)
+
+    redis_db.redis = _connect_redis()
+    config_changes.listener = config_changes.ConfigChangesListener(settings.pg_listen_dsn)
+    config_changes.listener.start()
+    app_services = create_app_services()
+    try:
+        # Задача, начатая до сигнала остановки, доделывается
+        while not stop.is_set():
+            await app_services.job_service.run_next(timeout=DEQUEUE_TIMEOUT, worker_id=worker_id)
+
+    finally:
+        await close_app_services(app_services)
+        await config_changes.listener.stop()
+        await redis_db.redis.close()
+        mssql.shutdown_executor()
+        mssql.close_pools()
+
+
+def _worker_process(worker_id: str) -> None:
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_run_worker(worker_id))
+
+
+async def _requeue_unfinished(worker_id: str) -> None:
+    redis_db.redis = _connect_redis()
+    app_services = create_app_services()
+    try:
+        await app_services.job_service.requeue_unfinished(worker_id)
+    finally:
+        await close_app_services(app_services)
+        await redis_db.redis.close()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_requeue_unfinished(f"{settings.job_worker_group}:*"))
+
+    context = multiprocessing.get_context("spawn")
+    processes: dict[str, multiprocessing.Process] = {}
+    stopping = False
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while not stopping:
+        for worker_id, process in list(processes.items()):
+            if not process.is_alive():
+                logger.warning(f"Job worker {process.pid} exited with code {process.exitcode}")
+                del processes[worker_id]
+                asyncio.run(_requeue_unfinished(worker_id))
+
+        for slot in range(settings.job_workers):
+            worker_id = f"{settings.job_worker_group}:{slot}"
+            if worker_id not in processes:
+                process = context.Process(target=_worker_process, args=(worker_id,), name="barsic-job-worker")
+                process.start()
+                logger.info(f"Job worker {process.pid} ({worker_id}) started")
+                processes[worker_id] = process
+
+        wait([process.sentinel for process in processes.values()])
+
+    for process in processes.values():
+        process.join()
+
+
+if __name__ == "__main__":
+    main()